@@ -1290,13 +1290,15 @@ def clear_all_demo_cache(
     """
     Clear ALL demo cache entries.
     
-    WARNING: This clears all cached demo previews.
+    WARNING: This clears all cached demo previews. Implemented as a bump of
+    the demo namespace generation, so it is O(1) regardless of cache size;
+    orphaned entries expire through their own TTLs.
     """
     import logging
     logger = logging.getLogger(__name__)
     
     try:
-        from backend.services.preview_cache import get_redis_client
+        from backend.services.preview_cache import get_redis_client, flush_namespace
         redis_client = get_redis_client()
         
         if redis_client is None:
@@ -1305,19 +1307,8 @@ def clear_all_demo_cache(
                 detail="Redis is not available"
             )
         
-        # Find and delete all demo cache keys
-        patterns = ["demo:preview:*", "demo:preview:v2:*"]
-        total_deleted = 0
-        
-        for pattern in patterns:
-            cursor = 0
-            while True:
-                cursor, keys = redis_client.scan(cursor=cursor, match=pattern, count=100)
-                if keys:
-                    deleted = redis_client.delete(*keys)
-                    total_deleted += deleted
-                if cursor == 0:
-                    break
+        flushed = flush_namespace("demo")
+        total_deleted = flushed["orphaned_entries"]
         
         logger.info(f"Admin {admin_user.email} cleared {total_deleted} demo cache entries")
         
@@ -1326,11 +1317,11 @@ def clear_all_demo_cache(
             db,
             admin_user.id,
             action="admin.cache.clear_all_demo",
-            details={"deleted_count": total_deleted},
+            details={"deleted_count": total_deleted, "generation": flushed["generation"]},
             ip_address=request.client.host
         )
         
-        return {"success": True, "deleted_count": total_deleted}
+        return {"success": True, "deleted_count": total_deleted, "generation": flushed["generation"]}
         
     except HTTPException:
         raise
@@ -14,6 +14,8 @@ from backend.services.preview_engine import PreviewEngine, PreviewEngineConfig
 from backend.services.preview_cache import (
     generate_cache_key,
     get_redis_client,
+    cache_get,
+    cache_set,
     CacheConfig,
     is_demo_cache_disabled
 )
@@ -24,7 +26,6 @@ from backend.schemas.demo_schemas import (
     BrandElements,
     LayoutBlueprint,
 )
-import json
 import logging
 
 logger = logging.getLogger(__name__)
@@ -103,10 +104,10 @@ def generate_demo_preview(
 
         if redis_client:
             try:
-                cached_data = redis_client.get(cache_key)
+                cached_data = cache_get(cache_key)
                 if cached_data:
                     logger.info(f"Cache hit for demo preview: {url_str[:50]}...")
-                    return DemoPreviewResponse(**json.loads(cached_data))
+                    return DemoPreviewResponse(**cached_data)
             except Exception as e:
                 logger.warning(f"Cache read error: {e}")
 
@@ -226,10 +227,8 @@ def generate_demo_preview(
     # Cache the result for future requests (24 hour TTL)
     if redis_client and cache_key and not cache_disabled:
         try:
-            response_dict = response.model_dump()
-            cache_data = json.dumps(response_dict)
             ttl_seconds = CacheConfig.DEFAULT_TTL_HOURS * 3600
-            redis_client.setex(cache_key, ttl_seconds, cache_data)
+            cache_set(cache_key, response.model_dump(), ttl_seconds)
             logger.info(f"Cached demo preview result for: {url_str[:50]}...")
         except Exception as e:
             logger.warning(f"Failed to cache result: {e}")
@@ -32,6 +32,7 @@ from fastapi.responses import JSONResponse, Response
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, HttpUrl
 from backend.db.session import get_db
+from backend.models.user import User
 from backend.services.rate_limiter import check_rate_limit, get_rate_limit_key_for_ip
 from backend.services.activity_logger import get_client_ip, log_activity, get_authenticated_user_id
 from backend.services.usage_limits import (
@@ -45,10 +46,12 @@ from backend.services.demo_quality_profiles import get_quality_profile, get_cach
 from backend.services.preview_cache import (
     generate_cache_key,
     get_redis_client,
+    cache_get,
+    cache_set,
     CacheConfig,
     is_demo_cache_disabled
 )
-from backend.queue.queue_connection import get_rq_redis_connection
+from backend.queue.queue_connection import enqueue_traced, get_rq_redis_connection
 from backend.jobs.demo_preview_job import generate_demo_preview_job
 from backend.jobs.demo_batch_job import generate_demo_batch_job, get_batch_data
 from backend.schemas.demo_schemas import (
@@ -99,12 +102,20 @@ def create_demo_job(
     load balancer timeout. The client should poll /demo-v2/jobs/{job_id}/status
     to get status updates and the final result.
     
-    Rate limited to prevent abuse.
+    Rate limited to prevent abuse. ``profile`` is honoured for admins only.
     """
     url_str = str(request_data.url)
     user_id = get_authenticated_user_id(request, db)
     client_ip = get_client_ip(request)
 
+    if request_data.profile:
+        user = db.query(User).filter(User.id == user_id).first() if user_id else None
+        if not (user and user.is_admin):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Profiling is restricted to admins"
+            )
+
     # Rate limiting (configurable for 400% throughput)
     rate_limit_key = get_rate_limit_key_for_ip(client_ip, "demo_job_v2")
     if not check_rate_limit(rate_limit_key, limit=DEMO_JOB_PER_HOUR, window_seconds=RATE_LIMIT_WINDOW_SECONDS):
@@ -136,10 +147,12 @@ def create_demo_job(
     try:
         redis_conn = get_rq_redis_connection()
         queue = Queue("preview_generation", connection=redis_conn)
-        job = queue.enqueue(
+        job = enqueue_traced(
+            queue,
             generate_demo_preview_job,
             url_str,
             request_data.quality_mode,
+            request_data.profile,
             job_timeout='15m'
         )
 
@@ -155,6 +168,7 @@ def create_demo_job(
                 "job_id": job.id,
                 "client_ip": client_ip,
                 "quality_mode": request_data.quality_mode,
+                "profile": request_data.profile,
             },
         )
 
@@ -355,10 +369,10 @@ def generate_demo_preview_optimized(
             # Check cache first (skip if disabled via admin toggle)
             if redis_client:
                 try:
-                    cached_data = redis_client.get(cache_key)
+                    cached_data = cache_get(cache_key)
                     if cached_data:
                         logger.info(f"✅ Cache hit for: {url_str[:50]}...")
-                        return DemoPreviewResponse(**json.loads(cached_data))
+                        return DemoPreviewResponse(**cached_data)
                 except Exception as e:
                     logger.warning(f"Cache read error: {e}")
 
@@ -468,10 +482,9 @@ def generate_demo_preview_optimized(
         # Cache the result (skip if disabled via admin toggle)
         if redis_client and not cache_disabled:
             try:
-                cache_data = json.dumps(response.model_dump())
                 ttl_hours = min(CacheConfig.DEMO_TTL_HOURS, CacheConfig.MAX_TTL_HOURS)
                 ttl_seconds = ttl_hours * 3600
-                redis_client.setex(cache_key, ttl_seconds, cache_data)
+                cache_set(cache_key, response.model_dump(), ttl_seconds)
                 logger.info(f"✅ Cached result for: {url_str[:50]}...")
             except Exception as e:
                 logger.warning(f"⚠️  Failed to cache result: {e}")
@@ -576,7 +589,8 @@ def create_batch_job(
     try:
         redis_conn = get_rq_redis_connection()
         queue = Queue("preview_generation", connection=redis_conn)
-        queue.enqueue(
+        enqueue_traced(
+            queue,
             generate_demo_batch_job,
             batch_id,
             urls,
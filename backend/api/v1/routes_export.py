@@ -3,11 +3,12 @@ Export & embed routes for MyMetaView 4.0 P7.
 PNG, PDF, embed code, ZIP download flows.
 """
 from typing import List, Optional
-from fastapi import APIRouter, HTTPException, status, Query
+from fastapi import APIRouter, HTTPException, Request, status, Query
 from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel, HttpUrl
 
 from backend.services.export_service import (
+    export_as_image,
     export_as_png,
     export_as_pdf,
     export_as_zip,
@@ -63,6 +64,29 @@ def download_png(
         )
 
 
+@router.get("/export/image")
+def download_image(
+    request: Request,
+    preview_url: str = Query(..., description="URL of the preview image to download"),
+):
+    """
+    Download a preview image in the smallest stored format (WebP, JPEG or
+    PNG) that the client's Accept header allows.
+    """
+    try:
+        data, filename, content_type = export_as_image(preview_url, request.headers.get("accept"))
+        return Response(
+            content=data,
+            media_type=content_type,
+            headers={"Content-Disposition": f'attachment; filename="{filename}"', "Vary": "Accept"},
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"Failed to fetch image: {str(e)}",
+        )
+
+
 @router.post("/export/pdf")
 def download_pdf(request: ExportPdfRequest):
     """
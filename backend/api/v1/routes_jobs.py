@@ -3,7 +3,7 @@ from fastapi import APIRouter, Depends, HTTPException, status, Request
 from pydantic import BaseModel
 from rq import Queue
 from rq.job import Job
-from backend.queue.queue_connection import get_rq_redis_connection
+from backend.queue.queue_connection import enqueue_traced, get_rq_redis_connection
 from backend.models.domain import Domain as DomainModel
 from backend.models.user import User
 from backend.db.session import get_db
@@ -86,7 +86,8 @@ def create_preview_job(
     try:
         redis_conn = get_rq_redis_connection()
         queue = Queue("preview_generation", connection=redis_conn)
-        job = queue.enqueue(
+        job = enqueue_traced(
+            queue,
             generate_preview_job,
             current_user.id,
             current_org.id,  # Pass organization_id
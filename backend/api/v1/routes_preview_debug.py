@@ -5,7 +5,7 @@ For internal testing and proof of AI visual focus improvement.
 These endpoints are admin-only.
 """
 import logging
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
@@ -85,9 +85,12 @@ class CacheStatsResponse(BaseModel):
     enabled: bool
     preview_entries: Optional[int] = None
     analysis_entries: Optional[int] = None
+    namespaces: Optional[Dict[str, Any]] = None
     total_hits: Optional[int] = None
     total_misses: Optional[int] = None
     memory_used: Optional[str] = None
+    tiers: Optional[Dict[str, Any]] = None
+    codec: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
 
 
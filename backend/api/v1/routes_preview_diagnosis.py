@@ -6,9 +6,11 @@ dashboard polls these endpoints to render the metric trend charts.
 """
 from __future__ import annotations
 
+import time
 from typing import Any, Dict, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel
 
 from backend.core.deps import get_admin_user  # type: ignore
@@ -18,7 +20,13 @@ from backend.services.preview.observability.diagnosis import (
     diagnose_job,
 )
 from backend.services.preview.observability.job_trace import JobTraceStore
+from backend.services.preview.observability.profiler import render_collapsed
 from backend.services.preview.observability.reason_codes import FailureReason
+from backend.services.preview.observability.trace_store import (
+    failure_histogram,
+    slowest_jobs,
+    stage_percentiles,
+)
 
 
 router = APIRouter(prefix="/preview-diagnosis", tags=["preview-diagnosis"])
@@ -42,6 +50,8 @@ class DiagnosisResponse(BaseModel):
     ai_tokens_total: Optional[int] = None
     ai_call_count: Optional[int] = None
     bottleneck_stage: Optional[Dict[str, Any]] = None
+    profile_stages: Optional[Dict[str, Any]] = None
+    memory: Dict[str, Any] = {}
     warnings: List[str] = []
 
 
@@ -56,6 +66,24 @@ def diagnose_job_route(
     return DiagnosisResponse(**diag)
 
 
+@router.get("/jobs/{job_id}/profile")
+def job_profile_route(
+    job_id: str,
+    format: str = Query(default="json", pattern="^(json|collapsed)$"),
+    _admin: User = Depends(get_admin_user),
+):
+    """Sampling profile of a job; ``collapsed`` feeds flamegraph.pl / speedscope."""
+    payload = JobTraceStore.get_instance().get(job_id)
+    if not payload:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Job not found")
+    profile = payload.get("profile")
+    if not profile:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Job was not profiled")
+    if format == "collapsed":
+        return PlainTextResponse(render_collapsed(profile))
+    return profile
+
+
 @router.get("/recent")
 def recent_jobs_route(
     limit: int = Query(default=25, ge=1, le=200),
@@ -69,6 +97,70 @@ def recent_jobs_route(
     }
 
 
+def _window_query(
+    window_minutes: int,
+    lane: Optional[str],
+    quality_mode: Optional[str],
+    domain: Optional[str],
+) -> Dict[str, Any]:
+    until = time.time()
+    since = until - window_minutes * 60
+    summaries = JobTraceStore.get_instance().query(
+        since, until, lane=lane, quality_mode=quality_mode, domain=domain
+    )
+    return {
+        "window": {
+            "since": since,
+            "until": until,
+            "minutes": window_minutes,
+            "lane": lane,
+            "quality_mode": quality_mode,
+            "domain": domain,
+        },
+        "summaries": summaries,
+    }
+
+
+@router.get("/stats/stages")
+def stage_stats_route(
+    window_minutes: int = Query(default=60, ge=1, le=7 * 24 * 60),
+    lane: Optional[str] = None,
+    quality_mode: Optional[str] = None,
+    domain: Optional[str] = None,
+    _admin: User = Depends(get_admin_user),
+) -> Dict[str, Any]:
+    """p50/p90/p99 per stage (and total) over the window, across workers."""
+    found = _window_query(window_minutes, lane, quality_mode, domain)
+    return {"window": found["window"], **stage_percentiles(found["summaries"])}
+
+
+@router.get("/stats/failures")
+def failure_stats_route(
+    window_minutes: int = Query(default=60, ge=1, le=7 * 24 * 60),
+    lane: Optional[str] = None,
+    quality_mode: Optional[str] = None,
+    domain: Optional[str] = None,
+    _admin: User = Depends(get_admin_user),
+) -> Dict[str, Any]:
+    """Failure-reason histogram over the window."""
+    found = _window_query(window_minutes, lane, quality_mode, domain)
+    return {"window": found["window"], **failure_histogram(found["summaries"])}
+
+
+@router.get("/stats/slowest")
+def slowest_jobs_route(
+    window_minutes: int = Query(default=60, ge=1, le=7 * 24 * 60),
+    limit: int = Query(default=10, ge=1, le=100),
+    lane: Optional[str] = None,
+    quality_mode: Optional[str] = None,
+    domain: Optional[str] = None,
+    _admin: User = Depends(get_admin_user),
+) -> Dict[str, Any]:
+    """Slowest jobs over the window (summaries; drill in via /jobs/{job_id})."""
+    found = _window_query(window_minutes, lane, quality_mode, domain)
+    return {"window": found["window"], "jobs": slowest_jobs(found["summaries"], limit)}
+
+
 @router.get("/failure-reasons")
 def failure_reasons_route(
     _admin: User = Depends(get_admin_user),
@@ -16,6 +16,7 @@ from backend.services.cache import (
 )
 from backend.services.rate_limiter import check_rate_limit, get_rate_limit_key_for_ip
 from backend.services.activity_logger import get_client_ip
+from backend.services.image_encoding import pick_variant
 from backend.utils.crawler_detection import (
     detect_crawler,
     log_crawler_detection,
@@ -32,6 +33,10 @@ router = APIRouter(prefix="/api/v1/public", tags=["public"])
 def get_public_preview(
     full_url: str = Query(..., description="Full URL to generate preview for"),
     variant: str = Query(None, description="Variant key: 'a', 'b', or 'c' (optional)"),
+    image_accept: str = Query(
+        None,
+        description="Accept header of the client that will fetch the image (defaults to this request's)"
+    ),
     request: Request = None,
     db: Session = Depends(get_db)
 ):
@@ -40,6 +45,8 @@ def get_public_preview(
     This endpoint is public and does not require authentication.
     
     If variant is provided, returns variant metadata instead of main preview.
+    image_url points at the smallest stored format (WebP/JPEG/PNG) the image
+    client accepts, per image_accept or the request's Accept header.
     """
     # Detect and log crawler user agents (prep work for future server-side interception)
     user_agent = request.headers.get("user-agent") if request else None
@@ -65,7 +72,8 @@ def get_public_preview(
             detail=str(e)
         )
     
-    return _get_preview_logic(full_url, db, variant, crawler_name)
+    accept = image_accept or (request.headers.get("accept") if request else None)
+    return _get_preview_logic(full_url, db, variant, crawler_name, accept)
 
 
 def _normalize_url_for_matching(url: str) -> str:
@@ -81,7 +89,13 @@ def _normalize_url_for_matching(url: str) -> str:
     return normalized
 
 
-def _get_preview_logic(full_url: str, db: Session, variant: str = None, crawler_name: str = None) -> PublicPreview:
+def _get_preview_logic(
+    full_url: str,
+    db: Session,
+    variant: str = None,
+    crawler_name: str = None,
+    image_accept: str = None,
+) -> PublicPreview:
     """
     Core logic for getting preview metadata.
     
@@ -207,6 +221,7 @@ def _get_preview_logic(full_url: str, db: Session, variant: str = None, crawler_
                     
                     # Use composited_image_url if available (designed UI card), otherwise fall back to variant or preview images
                     image_url = preview.composited_image_url or variant_obj.image_url or preview.highlight_image_url or preview.image_url or settings.PLACEHOLDER_IMAGE_URL
+                    image_url = pick_variant(image_url, image_accept)["url"]
                     
                     return PublicPreview(
                         url=full_url,
@@ -226,6 +241,7 @@ def _get_preview_logic(full_url: str, db: Session, variant: str = None, crawler_
             
             # Use composited_image_url if available (designed UI card), otherwise fall back to highlight_image_url or image_url
             image_url = preview.composited_image_url or preview.highlight_image_url or preview.image_url or settings.PLACEHOLDER_IMAGE_URL
+            image_url = pick_variant(image_url, image_accept)["url"]
             
             return PublicPreview(
                 url=full_url,
@@ -62,6 +62,8 @@ class Settings:
     R2_SECRET_ACCESS_KEY: str = os.getenv("R2_SECRET_ACCESS_KEY", "")
     R2_BUCKET_NAME: str = os.getenv("R2_BUCKET_NAME", "")
     R2_PUBLIC_BASE_URL: str = os.getenv("R2_PUBLIC_BASE_URL", "")
+    # Override the S3 endpoint (local object store in load tests); empty = R2
+    R2_ENDPOINT_URL: str = os.getenv("R2_ENDPOINT_URL", "")
     
     # Screenshot system uses Playwright (no API key needed)
     
@@ -36,7 +36,7 @@ def _update_job_progress(progress: float, message: str) -> None:
         logger.warning(f"Failed to update job progress: {e}")
 
 
-def generate_demo_preview_job(url: str, quality_mode: str = "ultra") -> Dict[str, Any]:
+def generate_demo_preview_job(url: str, quality_mode: str = "ultra", profile: bool = False) -> Dict[str, Any]:
     """
     Background job to generate demo preview using unified preview engine.
     
@@ -45,6 +45,7 @@ def generate_demo_preview_job(url: str, quality_mode: str = "ultra") -> Dict[str
     
     Args:
         url: URL to generate preview for
+        profile: Attach a sampling profile to the job's JobTrace
         
     Returns:
         Dictionary with preview data matching DemoPreviewResponse schema
@@ -100,7 +101,8 @@ def generate_demo_preview_job(url: str, quality_mode: str = "ultra") -> Dict[str
             min_soft_pass_overall=selected_profile["min_soft_pass_overall"],
             min_soft_pass_visual=selected_profile["min_soft_pass_visual"],
             min_soft_pass_fidelity=selected_profile["min_soft_pass_fidelity"],
-            progress_callback=_update_job_progress
+            progress_callback=_update_job_progress,
+            enable_profiling=True if profile else None,
         )
         
         # Create engine and generate preview
@@ -1,7 +1,10 @@
 """FastAPI application entry point."""
 import os
-from fastapi import FastAPI, Request
+import secrets
+from typing import Optional
+from fastapi import FastAPI, Header, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from backend.core.config import settings
 from backend.middleware.error_handler import error_handler_middleware
@@ -10,6 +13,7 @@ from backend.middleware.request_id import RequestIDMiddleware
 from backend.middleware.request_logging import RequestLoggingMiddleware
 from backend.middleware.domain_routing import DomainRoutingMiddleware
 from backend.utils.logger import setup_logging
+from backend.services.preview.observability.metrics import render_metrics
 from backend.api.v1 import routes_auth, routes_domains, routes_brand, routes_previews, routes_analytics, routes_public_preview, routes_jobs, routes_verification, routes_billing, routes_webhooks, routes_activity, routes_tracking, routes_analytics_extended, routes_organizations, routes_preview_variants, routes_account, routes_blog, routes_preview_debug, routes_newsletter, routes_demo, routes_demo_optimized, routes_export, routes_health, routes_sitemap, routes_preview_enhancements, routes_sites, routes_site_cms, routes_public_site, routes_railway_test, routes_preview_diagnosis
 from backend.api.admin import routes_admin
 
@@ -89,6 +93,11 @@ def on_startup():
     except Exception as e:
         logger.error(f"Failed to initialize database tables: {e}", exc_info=True)
         raise
+    
+    # Index fonts and start background downloads of the personality fonts
+    # before the first demo/preview render needs them
+    from backend.services.font_registry import warm_font_registry
+    warm_font_registry()
 
 
 # Configure CORS
@@ -278,6 +287,22 @@ def health_check():
     return {"status": "ok", "version": settings.APP_VERSION}
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics(authorization: Optional[str] = Header(None)):
+    """Prometheus metrics for this API process (workers export their own).
+
+    Served only to scrapers presenting ``PREVIEW_METRICS_TOKEN`` as a bearer
+    token; without the token configured the endpoint does not exist.
+    """
+    token = os.getenv("PREVIEW_METRICS_TOKEN", "")
+    if not token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not secrets.compare_digest((authorization or "").encode(), f"Bearer {token}".encode()):
+        raise HTTPException(status_code=401, detail="Invalid metrics token",
+                            headers={"WWW-Authenticate": "Bearer"})
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/")
 def root(request: Request):
     """
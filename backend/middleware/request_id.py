@@ -4,6 +4,8 @@ from fastapi import Request
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.types import ASGIApp
 
+from backend.services.preview.observability.tracing import extract, start_span
+
 
 class RequestIDMiddleware(BaseHTTPMiddleware):
     """Middleware to add a unique request ID to each request."""
@@ -18,8 +20,26 @@ class RequestIDMiddleware(BaseHTTPMiddleware):
         # Add request ID to request state
         request.state.request_id = request_id
         
-        # Process request
-        response = await call_next(request)
+        # Process request under a server span (continues the caller's traceparent;
+        # routes that enqueue jobs hand it on through job.meta)
+        attributes = {
+            "http.request.method": request.method,
+            "url.path": request.url.path,
+            "http.request_id": request_id,
+        }
+        with start_span(
+            f"{request.method} {request.url.path}",
+            kind="server",
+            attributes=attributes,
+            parent=extract(request.headers.get("traceparent")),
+        ) as span:
+            response = await call_next(request)
+            route = request.scope.get("route")
+            if getattr(route, "path", None):
+                span.name = f"{request.method} {route.path}"
+            span.set_attribute("http.response.status_code", response.status_code)
+            if span.context is not None:
+                response.headers["traceparent"] = span.context.traceparent
         
         # Add request ID to response headers
         response.headers["X-Request-ID"] = request_id
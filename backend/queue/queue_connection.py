@@ -1,6 +1,7 @@
 """Redis connection helper for RQ job queue."""
 import redis
 from backend.core.config import settings
+from backend.services.preview.observability.tracing import inject, start_span
 
 
 def get_redis_connection(decode_responses: bool = True) -> redis.Redis:
@@ -29,3 +30,17 @@ def get_rq_redis_connection() -> redis.Redis:
     """
     return redis.from_url(settings.REDIS_URL, decode_responses=False)
 
+
+def enqueue_traced(queue, func, *args, **kwargs):
+    """
+    ``queue.enqueue`` under a producer span whose traceparent rides in ``job.meta``.
+    
+    The worker continues the trace from ``job.meta`` (see ``MetricsWorker``),
+    so queue wait and execution show up under the originating request.
+    """
+    attributes = {"messaging.system": "rq", "messaging.destination.name": queue.name}
+    with start_span(f"rq.enqueue {queue.name}", kind="producer", attributes=attributes) as span:
+        meta = inject(dict(kwargs.pop("meta", None) or {}))
+        job = queue.enqueue(func, *args, meta=meta, **kwargs)
+        span.set_attribute("messaging.message.id", job.id)
+        return job
@@ -1,9 +1,29 @@
 """RQ worker for processing background jobs."""
 import logging
+import os
 import time
+from datetime import datetime, timezone
 from rq import Worker, Queue
 from rq.job import Job
 from backend.queue.queue_connection import get_rq_redis_connection
+from backend.services.font_registry import warm_font_registry
+from backend.services.image_encoding import flush_image_variants
+from backend.services.preview.observability.metrics import (
+    JOB_DURATION,
+    QUEUE_WAIT,
+    REGISTRY,
+    serve_worker_metrics,
+    worker_metrics_key,
+)
+from backend.services.preview.observability.tracing import (
+    TRACEPARENT_META_KEY,
+    extract,
+    flush_spans,
+    record_span,
+    start_span,
+)
+from backend.services.preview_tracer import flush_trace_reports
+from backend.services.render_farm import shutdown_render_executor
 from backend.utils.logger import setup_logging
 
 # Setup structured logging for worker
@@ -11,11 +31,84 @@ setup_logging(level="INFO")
 logger = logging.getLogger(__name__)
 
 
+# Worker metric hashes outlive their worker by this long (names change on restart)
+METRICS_HASH_TTL_SECONDS = 24 * 3600
+# Total time the horse may wait on write-behind uploads (spans, trace reports,
+# image variants) before it exits; whatever is still queued is dropped
+EXIT_FLUSH_BUDGET_SECONDS = 5.0
+
+
+class MetricsWorker(Worker):
+    """
+    Worker that records queue wait and job duration metrics, and continues
+    the enqueuing request's trace (``rq.queue_wait`` + ``rq.job`` spans).
+
+    ``perform_job`` runs inside the forked work-horse, so everything the job
+    recorded (stage timings, cache lookups, AI tokens) is flushed to this
+    worker's Redis hash before the horse exits.
+    """
+
+    def perform_job(self, job: Job, queue: Queue) -> bool:
+        started = time.monotonic()
+        parent = extract((job.meta or {}).get(TRACEPARENT_META_KEY))
+        attributes = {"messaging.system": "rq", "messaging.destination.name": queue.name,
+                      "messaging.message.id": job.id}
+        wait = None
+        if job.enqueued_at is not None:
+            enqueued_at = job.enqueued_at
+            if enqueued_at.tzinfo is None:
+                enqueued_at = enqueued_at.replace(tzinfo=timezone.utc)
+            now = datetime.now(timezone.utc)
+            wait = max(0.0, (now - enqueued_at).total_seconds())
+            QUEUE_WAIT.observe(wait, queue=queue.name)
+            record_span("rq.queue_wait", int(enqueued_at.timestamp() * 1e9), int(now.timestamp() * 1e9),
+                        parent=parent, attributes=attributes)
+
+        ok = False
+        try:
+            with start_span(f"rq.job {job.func_name}", kind="consumer", parent=parent,
+                            attributes=attributes) as span:
+                span.set_attribute("rq.queue_wait_ms", round(wait * 1000, 1) if wait is not None else None)
+                ok = super().perform_job(job, queue)
+                if not ok:
+                    span.set_error("job failed")
+            return ok
+        finally:
+            JOB_DURATION.observe(
+                time.monotonic() - started, queue=queue.name, status="finished" if ok else "failed"
+            )
+            # A render pool started by this job dies with the horse; reap it now
+            shutdown_render_executor()
+            self._flush_metrics()
+            self._flush_write_behind(job)
+
+    def _flush_write_behind(self, job: Job) -> None:
+        """Give queued uploads one shared deadline before the horse exits.
+
+        The job result is already saved, so the horse is only held for
+        telemetry and optional image variants. Cheapest and most useful first;
+        anything not out by the deadline is dropped with the process.
+        """
+        deadline = time.monotonic() + EXIT_FLUSH_BUDGET_SECONDS
+        for name, flush in (("spans", flush_spans), ("trace reports", flush_trace_reports),
+                            ("image variants", flush_image_variants)):
+            if not flush(timeout=max(0.0, deadline - time.monotonic())):
+                logger.warning(f"Dropping unflushed {name} of job {job.id} at the exit deadline")
+
+    def _flush_metrics(self) -> None:
+        key = worker_metrics_key(self.name)
+        try:
+            REGISTRY.flush_to_redis(self.connection, key)
+            self.connection.expire(key, METRICS_HASH_TTL_SECONDS)
+        except Exception as e:
+            logger.warning(f"Failed to flush worker metrics: {e}")
+
+
 def create_worker():
     """Create and return RQ worker instance."""
     redis_conn = get_rq_redis_connection()
     queue = Queue("preview_generation", connection=redis_conn)
-    worker = Worker([queue], connection=redis_conn)
+    worker = MetricsWorker([queue], connection=redis_conn)
     return worker
 
 
@@ -61,6 +154,12 @@ def log_job_failure(job: Job, exc: Exception, duration_ms: int):
 
 if __name__ == "__main__":
     logger.info("Starting RQ worker for preview generation...")
+    # Index fonts once here so every forked work-horse inherits the registry
+    warm_font_registry()
     worker = create_worker()
+    metrics_port = os.getenv("PREVIEW_WORKER_METRICS_PORT")
+    if metrics_port:
+        serve_worker_metrics(int(metrics_port), worker.connection, worker_metrics_key(worker.name))
+        logger.info(f"Serving worker metrics on :{metrics_port}/metrics")
     worker.work()
 
@@ -84,6 +84,7 @@ class DemoJobRequest(BaseModel):
     """Schema for demo job creation request."""
     url: HttpUrl
     quality_mode: Literal["fast", "balanced", "ultra"] = "ultra"
+    profile: bool = False  # Capture a stage profile for the job; admins only
 
     @field_validator("url", mode="before")
     @classmethod
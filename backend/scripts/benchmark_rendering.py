@@ -0,0 +1,500 @@
+#!/usr/bin/env python3
+"""
+Rendering micro-benchmarks with a stored baseline.
+
+Times the CPU-heavy image code on fixed-seed inputs (synthetic screenshot,
+brand palette, short/long copy) and records ops/sec plus tracemalloc peak
+memory per function:
+
+  - template generators in preview_image_generator
+  - text_layout (wrapping / font fitting)
+  - gradient_generator / render_layers / texture_engine / image_effects / adaptive_template_engine
+  - visual_quality_validator / readability_auto_fixer / platform_optimizer
+  - image_encoding (budgeted WebP / JPEG variants)
+
+Each case reports the median of its timed runs: at least MIN_RUNS and
+--min-time seconds' worth, or exactly --slow-runs for cases whose warm-up
+call takes SLOW_CALL_SECONDS or more (<= 1 op/s), where a time budget would
+leave a single noisy sample. Under --check, cases that look slow are
+measured again (--retries) and only fail if no attempt is within tolerance,
+so a noisy neighbour doesn't fail the gate on its own.
+
+Machines differ in speed, so every run also times a fixed calibration
+workload; expected ops/sec are scaled by calibration(now) / calibration(baseline)
+before applying the tolerance. Shared machines also speed up and slow down
+over seconds, so each case is calibrated on its own, right before and after
+it runs, and scaled by that rather than by the run-wide number.
+
+Usage:
+  cd <project_root>
+  PYTHONPATH=. python backend/scripts/benchmark_rendering.py             # report
+  PYTHONPATH=. python backend/scripts/benchmark_rendering.py --check     # gate
+  PYTHONPATH=. python backend/scripts/benchmark_rendering.py --update-baseline
+  PYTHONPATH=. python backend/scripts/benchmark_rendering.py --only gradient
+
+Exit codes (--check):
+  0 - no regressions beyond tolerance
+  1 - at least one function regressed
+  2 - baseline missing or benchmark crashed
+"""
+import argparse
+import io
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+from datetime import date
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Time the renders themselves, in this process; the render farm's pool would
+# otherwise split multi-platform/variant batches across however many cores
+# the machine has.
+os.environ.setdefault("PREVIEW_RENDER_WORKERS", "0")
+
+SEED = 20240611
+DEFAULT_TOLERANCE = 0.30          # ops/sec may drop 30% before failing
+DEFAULT_MEMORY_TOLERANCE = 0.50   # peak memory may grow 50% ...
+MEMORY_SLACK_KB = 2048            # ... plus a fixed allowance for tiny functions
+MIN_RUNS = 5                      # timed runs per case, however long --min-time is
+SLOW_CALL_SECONDS = 1.0           # warm-up at least this long -> fixed run count
+DEFAULT_SLOW_RUNS = 3
+DEFAULT_RETRIES = 1               # re-measurements of cases that look slow (--check)
+CASE_CALIBRATION_SECONDS = 0.2    # calibration before and after each case
+
+SHORT_TITLE = "Ship previews that convert"
+LONG_TITLE = (
+    "The all-in-one platform that turns every shared link into a scroll-stopping, "
+    "on-brand preview your customers actually click"
+)
+DESCRIPTION = (
+    "Generate social previews from any URL in seconds. Brand colors, logos and "
+    "social proof are extracted automatically and composed into a design that fits."
+)
+BLUEPRINT = {"primary_color": "#2563EB", "secondary_color": "#1E40AF", "accent_color": "#F59E0B"}
+CREDIBILITY = [{"type": "rating", "value": "4.9★ from 2,000+ reviews"}]
+
+
+def _project_root() -> Path:
+    return Path(__file__).resolve().parent.parent.parent
+
+
+def _baseline_path() -> Path:
+    return _project_root() / "backend" / "scripts" / "rendering_benchmark_baseline.json"
+
+
+# ---------------------------------------------------------------------------
+# Fixed-seed inputs
+# ---------------------------------------------------------------------------
+
+
+def make_screenshot(width: int = 1280, height: int = 800, seed: int = SEED) -> bytes:
+    """Deterministic page-like PNG: nav bar, hero photo, text lines, cards."""
+    import numpy as np
+    from PIL import Image, ImageDraw, ImageFilter
+
+    rng = np.random.default_rng(seed)
+    img = Image.new("RGB", (width, height), (248, 250, 252))
+    draw = ImageDraw.Draw(img)
+    draw.rectangle([0, 0, width, 64], fill=(15, 23, 42))
+    for i in range(5):
+        draw.rectangle([width - 560 + i * 100, 24, width - 490 + i * 100, 40], fill=(148, 163, 184))
+
+    photo = rng.integers(0, 255, (height // 8, width // 16, 3), dtype=np.uint8)
+    hero = Image.fromarray(photo).resize((width // 2, height // 2), Image.BILINEAR)
+    img.paste(hero.filter(ImageFilter.GaussianBlur(6)), (width // 2 - 40, 110))
+
+    for line in range(4):
+        y = 140 + line * 44
+        draw.rectangle([60, y, 60 + int(rng.integers(280, 480)), y + 28], fill=(30, 41, 59))
+    draw.rounded_rectangle([60, 340, 240, 392], radius=12, fill=(37, 99, 235))
+    for card in range(3):
+        x = 60 + card * (width - 120) // 3
+        draw.rounded_rectangle([x, 540, x + (width - 180) // 3, 760], radius=16,
+                               fill=tuple(int(c) for c in rng.integers(200, 255, 3)))
+
+    buf = io.BytesIO()
+    img.save(buf, "PNG")
+    return buf.getvalue()
+
+
+# ---------------------------------------------------------------------------
+# Benchmarks
+# ---------------------------------------------------------------------------
+
+
+def build_benchmarks() -> Dict[str, Callable[[], Any]]:
+    """name -> zero-arg callable; inputs are prepared once, outside the timing."""
+    from PIL import Image, ImageDraw
+
+    from backend.services import ai_design_director
+    from backend.services import preview_image_generator as pig
+    from backend.services.adaptive_template_engine import generate_adaptive_preview
+    from backend.services.design_dna_extractor import _get_fallback_dna
+    from backend.services import image_effects
+    from backend.services.gradient_generator import generate_smooth_gradient
+    from backend.services.image_encoding import encode_to_budget
+    from backend.services.image_loading import load_image, resize_image
+    from backend.services.platform_optimizer import optimize_for_platforms
+    from backend.services.render_layers import normalize_stops, render_gradient
+    from backend.services.readability_auto_fixer import auto_fix_readability_bytes
+    from backend.services.texture_engine import (
+        PatternConfig,
+        PatternType,
+        TextureConfig,
+        TextureEngine,
+        TextureType,
+        create_glassmorphism,
+    )
+    from backend.services.visual_quality_validator import validate_visual_quality_from_bytes
+
+    # Measure rendering only: the adaptive engine would otherwise ask the
+    # vision model for design decisions (network, nondeterministic).
+    ai_design_director.get_ai_design_decisions = lambda *args, **kwargs: None
+
+    screenshot = make_screenshot()
+    screenshot_image = Image.open(io.BytesIO(screenshot)).convert("RGB")
+    preview = pig.generate_designed_preview(
+        screenshot, SHORT_TITLE, None, DESCRIPTION, "Get started", "example.com", BLUEPRINT,
+        template_type="article",
+    )
+    preview_image = Image.open(io.BytesIO(preview)).convert("RGB")
+    photo_buffer = io.BytesIO()
+    screenshot_image.resize((2400, 1600)).save(photo_buffer, "JPEG", quality=90)
+    product_photo = photo_buffer.getvalue()
+    dna = _get_fallback_dna("https://example.com", "benchmark")
+    measure_draw = ImageDraw.Draw(Image.new("RGB", (1, 1)))
+
+    def designed(template_type: str, title: str) -> Callable[[], Any]:
+        return lambda: pig.generate_designed_preview(
+            screenshot, title, "Previews for teams", DESCRIPTION, "Get started", "example.com",
+            BLUEPRINT, template_type=template_type, tags=["SaaS", "Design"],
+            credibility_items=CREDIBILITY,
+        )
+
+    benchmarks: Dict[str, Callable[[], Any]] = {
+        "image_generator.hero_short": designed("saas", SHORT_TITLE),
+        "image_generator.hero_long": designed("saas", LONG_TITLE),
+        "image_generator.product": designed("product", SHORT_TITLE),
+        "image_generator.profile": designed("profile", SHORT_TITLE),
+        "image_generator.modern_card": designed("article", LONG_TITLE),
+        "text.fit_box": lambda: pig._fit_text_to_box(LONG_TITLE, 640, 220, measure_draw, max_font_size=96),
+        "text.wrap": lambda: pig._wrap_text(DESCRIPTION, pig._load_font(32, bold=False), 640, measure_draw),
+        "gradient.linear": lambda: generate_smooth_gradient(1200, 630, (37, 99, 235), (245, 158, 11), 135),
+        "gradient.radial": lambda: generate_smooth_gradient(
+            1200, 630, (37, 99, 235), (245, 158, 11), 135, style="radial"),
+        "layers.gradient_build": lambda: render_gradient(
+            (1200, 630), normalize_stops([(37, 99, 235), (245, 158, 11)]), "diagonal"),
+        "layers.overlay_build": lambda: render_gradient(
+            (1200, 630), normalize_stops([(0, 0, 0, 15), (0, 0, 0, 50)]), "vertical", dither=0, space="rgb"),
+        "texture.glassmorphism": lambda: create_glassmorphism(
+            screenshot_image.convert("RGBA"), (100, 100, 600, 300)),
+        "effects.vignette": lambda: image_effects.apply_vignette(preview_image, intensity=0.15),
+        "effects.noise": lambda: image_effects.apply_noise(preview_image, intensity=0.02),
+        "effects.glow": lambda: image_effects.apply_glow(
+            preview_image.convert("RGBA"), (300, 200, 600, 200), (99, 102, 241), intensity=20),
+        "adaptive.generate": lambda: generate_adaptive_preview(
+            dna, SHORT_TITLE, "Previews for teams", DESCRIPTION, CREDIBILITY[0]["value"], None, screenshot),
+        "visual_quality.validate": lambda: validate_visual_quality_from_bytes(preview),
+        "readability.fix": lambda: auto_fix_readability_bytes(preview),
+        "platform.optimize": lambda: optimize_for_platforms(
+            preview_image, ["twitter", "linkedin", "facebook", "slack"]),
+        "encode.webp_budget": lambda: encode_to_budget(preview_image, "webp", 150 * 1024),
+        "encode.jpeg_budget": lambda: encode_to_budget(preview_image, "jpeg", 150 * 1024),
+        "image.product_photo": lambda: resize_image(
+            load_image(product_photo, "RGBA", target=(560, 500), contain=True), (560, 373)),
+    }
+    # A fresh seeded engine per call: every run draws the same random layout
+    for texture_type in TextureType:
+        config = TextureConfig(texture_type, intensity=0.5, scale=1.0, opacity=80, blend_mode="overlay")
+        benchmarks[f"texture.{texture_type.value}"] = (
+            lambda c=config: TextureEngine(seed=SEED).generate_texture(1200, 630, c))
+    for pattern_type in PatternType:
+        config = PatternConfig(pattern_type, color=(255, 255, 255), size=24, opacity=60, thickness=2)
+        benchmarks[f"pattern.{pattern_type.value}"] = (
+            lambda c=config: TextureEngine(seed=SEED).generate_pattern(1200, 630, c))
+    return benchmarks
+
+
+def calibrate(min_time: float = 0.5) -> float:
+    """ops/sec of a fixed pure-Python + numpy workload (machine speed)."""
+    import numpy as np
+
+    values = np.random.default_rng(SEED).random(200_000)
+
+    def workload():
+        total = 0
+        for i in range(100_000):
+            total += i * i
+        np.sort(values)
+        return total
+
+    return measure(workload, min_time=min_time, max_runs=50, trace_memory=False)["ops_per_sec"]
+
+
+def measure(
+    fn: Callable[[], Any],
+    min_time: float = 1.0,
+    max_runs: Optional[int] = None,
+    trace_memory: bool = True,
+    slow_runs: int = DEFAULT_SLOW_RUNS,
+) -> Dict[str, float]:
+    """First call (traced) warms caches and gives peak memory; then timed runs.
+
+    Slow cases get exactly ``slow_runs`` timed runs; the rest run until both
+    MIN_RUNS and ``min_time`` are reached (or ``max_runs``, if given), so
+    sub-millisecond cases are sampled over the same span as slower ones.
+    """
+    import random
+
+    import numpy as np
+
+    random.seed(SEED)
+    np.random.seed(SEED % (2 ** 32))
+    peak_kb = 0.0
+    warmup_started = time.perf_counter()
+    if trace_memory:
+        tracemalloc.start()
+        try:
+            fn()
+            peak_kb = tracemalloc.get_traced_memory()[1] / 1024
+        finally:
+            tracemalloc.stop()
+    else:
+        fn()
+    slow = time.perf_counter() - warmup_started >= SLOW_CALL_SECONDS
+
+    durations: List[float] = []
+    started = time.perf_counter()
+    while True:
+        if slow:
+            if len(durations) >= slow_runs:
+                break
+        elif (max_runs is not None and len(durations) >= max_runs) or (
+            len(durations) >= MIN_RUNS and time.perf_counter() - started >= min_time
+        ):
+            break
+        t0 = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - t0)
+    durations.sort()
+    median = durations[len(durations) // 2]
+    return {
+        "ops_per_sec": round(1.0 / median, 4) if median > 0 else float("inf"),
+        "median_ms": round(median * 1000, 2),
+        "runs": len(durations),
+        "peak_kb": round(peak_kb, 1),
+    }
+
+
+def measure_case(
+    fn: Callable[[], Any],
+    min_time: float = 1.0,
+    slow_runs: int = DEFAULT_SLOW_RUNS,
+) -> Dict[str, float]:
+    """``measure`` plus the machine speed around it (mean of calibrations before and after)."""
+    before = calibrate(CASE_CALIBRATION_SECONDS)
+    result = measure(fn, min_time=min_time, slow_runs=slow_runs)
+    result["calibration_ops_per_sec"] = round((before + calibrate(CASE_CALIBRATION_SECONDS)) / 2, 4)
+    return result
+
+
+def run_benchmarks(
+    only: Optional[List[str]] = None,
+    min_time: float = 1.0,
+    slow_runs: int = DEFAULT_SLOW_RUNS,
+) -> Dict[str, Dict[str, float]]:
+    benchmarks = build_benchmarks()
+    results: Dict[str, Dict[str, float]] = {}
+    for name, fn in benchmarks.items():
+        if only and not any(name.startswith(prefix) for prefix in only):
+            continue
+        results[name] = measure_case(fn, min_time=min_time, slow_runs=slow_runs)
+        r = results[name]
+        print(f"  {name:<32} {r['ops_per_sec']:>10.2f} ops/s  {r['median_ms']:>9.1f} ms  "
+              f"{r['peak_kb'] / 1024:>8.1f} MB peak  {r['runs']:>3} runs", flush=True)
+    return results
+
+
+def layer_cache_report() -> Dict[str, Dict[str, float]]:
+    """Print render layer cache hit rate and time saved per template."""
+    from backend.services.render_layers import layer_cache_stats
+
+    stats = layer_cache_stats()
+    if stats:
+        print("Layer cache:")
+        for template, s in stats.items():
+            print(f"  {template:<32} {s['hit_rate']:>9.1%} hits  {s['build_ms']:>9.1f} ms built  "
+                  f"{s['saved_ms']:>9.1f} ms saved", flush=True)
+    return stats
+
+
+# ---------------------------------------------------------------------------
+# Baseline
+# ---------------------------------------------------------------------------
+
+
+def load_baseline() -> Dict[str, Any]:
+    path = _baseline_path()
+    if not path.exists():
+        raise FileNotFoundError(f"Baseline not found: {path}")
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(results: Dict[str, Dict[str, float]], calibration: float, previous: Optional[Dict[str, Any]] = None) -> None:
+    previous = previous or {}
+    benchmarks = dict(previous.get("benchmarks") or {})
+    benchmarks.update({
+        name: {key: r[key] for key in ("ops_per_sec", "peak_kb", "calibration_ops_per_sec") if key in r}
+        for name, r in results.items()
+    })
+    data = {
+        "_comment": "Rendering micro-benchmark baseline. Regenerate with --update-baseline.",
+        "tolerance": previous.get("tolerance", DEFAULT_TOLERANCE),
+        "memory_tolerance": previous.get("memory_tolerance", DEFAULT_MEMORY_TOLERANCE),
+        "calibration_ops_per_sec": calibration,
+        "last_updated": date.today().isoformat(),
+        "benchmarks": dict(sorted(benchmarks.items())),
+    }
+    _baseline_path().write_text(json.dumps(data, indent=2) + "\n")
+
+
+def compare_to_baseline(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Any],
+    calibration: Optional[float] = None,
+) -> Tuple[bool, List[str]]:
+    """Return (passed, report lines). Only benchmarks present in both are gated."""
+    tolerance = float(baseline.get("tolerance", DEFAULT_TOLERANCE))
+    memory_tolerance = float(baseline.get("memory_tolerance", DEFAULT_MEMORY_TOLERANCE))
+    base_calibration = baseline.get("calibration_ops_per_sec")
+
+    passed = True
+    lines: List[str] = []
+    for name, result in sorted(results.items()):
+        base = (baseline.get("benchmarks") or {}).get(name)
+        if not base:
+            lines.append(f"NEW   {name}: no baseline ({result['ops_per_sec']:.2f} ops/s)")
+            continue
+        # Per-case calibrations when both sides have them, else the run-wide ones
+        if result.get("calibration_ops_per_sec") and base.get("calibration_ops_per_sec"):
+            now, then = result["calibration_ops_per_sec"], base["calibration_ops_per_sec"]
+        else:
+            now, then = calibration, base_calibration
+        speed = (now / then) if now and then else 1.0
+        expected = base["ops_per_sec"] * speed
+        floor = expected * (1 - tolerance)
+        memory_ceiling = base["peak_kb"] * (1 + memory_tolerance) + MEMORY_SLACK_KB
+        problems = []
+        if result["ops_per_sec"] < floor:
+            problems.append(f"{result['ops_per_sec']:.2f} ops/s < {floor:.2f} (expected {expected:.2f})")
+        if result["peak_kb"] > memory_ceiling:
+            problems.append(f"peak {result['peak_kb']:.0f} KB > {memory_ceiling:.0f} KB")
+        if problems:
+            passed = False
+            lines.append(f"SLOW  {name}: " + "; ".join(problems))
+        else:
+            lines.append(f"OK    {name}: {result['ops_per_sec']:.2f} ops/s ({result['ops_per_sec'] / expected:.0%} of expected)")
+    return passed, lines
+
+
+def regressed_benchmarks(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Any],
+    calibration: Optional[float] = None,
+) -> List[str]:
+    """Names outside speed or memory tolerance of ``baseline``."""
+    return [name for name in sorted(results)
+            if not compare_to_baseline({name: results[name]}, baseline, calibration)[0]]
+
+
+def _relative_speed(result: Dict[str, float]) -> float:
+    return result["ops_per_sec"] / (result.get("calibration_ops_per_sec") or 1.0)
+
+
+def recheck(
+    results: Dict[str, Dict[str, float]],
+    names: List[str],
+    min_time: float = 1.0,
+    slow_runs: int = DEFAULT_SLOW_RUNS,
+) -> None:
+    """Measure ``names`` again, keeping the faster (calibrated) time and lower peak per case."""
+    benchmarks = build_benchmarks()
+    for name in names:
+        again = measure_case(benchmarks[name], min_time=min_time, slow_runs=slow_runs)
+        best = dict(again if _relative_speed(again) > _relative_speed(results[name]) else results[name])
+        best["peak_kb"] = min(again["peak_kb"], results[name]["peak_kb"])
+        results[name] = best
+        print(f"  {name:<32} {again['ops_per_sec']:>10.2f} ops/s on retry", flush=True)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Rendering micro-benchmarks")
+    parser.add_argument("--check", action="store_true", help="Fail on regressions vs baseline")
+    parser.add_argument("--update-baseline", action="store_true", help="Write current results as baseline")
+    parser.add_argument("--only", action="append", default=None, help="Benchmark name prefix (repeatable)")
+    parser.add_argument("--min-time", type=float, default=1.0, help="Seconds of timed runs per benchmark")
+    parser.add_argument("--slow-runs", type=int, default=DEFAULT_SLOW_RUNS,
+                        help="Timed runs (median) for cases slower than 1 op/s")
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES,
+                        help="Re-measure cases that look slow this many times before failing (--check)")
+    parser.add_argument("--output", default=None, help="Write results JSON here")
+    args = parser.parse_args()
+    if args.update_baseline and args.only:
+        parser.error("--update-baseline needs a full run (drop --only)")
+
+    root = _project_root()
+    os.chdir(root)
+    if "." not in sys.path:
+        sys.path.insert(0, ".")
+    # Renderers log every decision at INFO; keep the report readable
+    logging.disable(logging.WARNING)
+
+    calibration = calibrate()
+    print(f"Calibration: {calibration:.2f} ops/s")
+    try:
+        results = run_benchmarks(args.only, args.min_time, args.slow_runs)
+    except Exception as e:
+        print(f"ERROR: benchmark crashed: {e}")
+        return 2
+
+    layer_stats = layer_cache_report()
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(
+            {"calibration_ops_per_sec": calibration, "benchmarks": results, "layer_cache": layer_stats},
+            indent=2))
+
+    if args.update_baseline:
+        previous = load_baseline() if _baseline_path().exists() else None
+        save_baseline(results, calibration, previous)
+        print(f"Baseline written to {_baseline_path()}")
+        return 0
+
+    if not args.check:
+        return 0
+    try:
+        baseline = load_baseline()
+    except FileNotFoundError as e:
+        print(f"ERROR: {e}")
+        return 2
+    for _ in range(args.retries):
+        suspects = regressed_benchmarks(results, baseline, calibration)
+        if not suspects:
+            break
+        print(f"Re-measuring {len(suspects)} case(s) outside tolerance:")
+        try:
+            recheck(results, suspects, args.min_time, args.slow_runs)
+        except Exception as e:
+            print(f"ERROR: benchmark crashed: {e}")
+            return 2
+    ok, lines = compare_to_baseline(results, baseline, calibration)
+    print("\n".join(lines))
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,23 @@
+"""Local load-test kit: stand-ins for OpenAI, R2 and target sites + a driver.
+
+Measures how API + RQ throughput scales with worker count without paying
+for tokens or hitting real sites:
+
+    fake_openai   OpenAI-compatible ``/v1/chat/completions`` with configurable
+                  latency distributions, error injection and canned JSON
+    object_store  S3-compatible bucket server used by ``upload_file_to_r2``
+                  via ``R2_ENDPOINT_URL``
+    site_farm     static pages for the golden corpus (or recorded replay
+                  fixtures), one path per corpus URL
+    stack         ``up``: start the stand-ins, the API and N RQ workers with
+                  the environment pointed at them
+    driver        push a request mix at ``/demo-v2/preview``, ``/jobs`` and
+                  ``/batch`` and report throughput, latency percentiles and
+                  error rates
+
+Usage:
+    python -m backend.scripts.loadtest.stack --rq-workers 4
+    python -m backend.scripts.loadtest.driver --api http://127.0.0.1:8000 \\
+        --sites http://127.0.0.1:8903 --mix jobs=3,preview=1,batch=1 \\
+        --concurrency 8 --duration 120 --label workers=4
+"""
@@ -0,0 +1,261 @@
+"""Load driver: push a request mix at the demo-v2 API and report.
+
+Request kinds (weights via ``--mix preview=1,jobs=3,batch=1``):
+
+    preview  POST /demo-v2/preview (synchronous); latency = response time
+    jobs     POST /demo-v2/jobs, poll /jobs/{id}/status to finished/failed;
+             latency = submit to terminal status (queue wait included)
+    batch    POST /demo-v2/batch with ``--batch-size`` URLs, poll
+             /batch/{id} to completed/failed
+
+URLs come from the site farm's ``/index.json`` (or ``--urls``). Each worker
+thread loops until ``--duration`` seconds or ``--requests`` total have run.
+The report has, per kind and overall: count, ok, error rate (by status /
+reason), throughput (ok/s) and p50/p90/p99 latency. Use ``--label`` to tag a
+run (``workers=4``) and ``--output`` to append it as a JSON line so runs at
+different worker counts can be compared.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import requests
+
+logger = logging.getLogger("loadtest.driver")
+
+KINDS = ("preview", "jobs", "batch")
+TERMINAL_JOB = {"finished", "failed"}
+TERMINAL_BATCH = {"completed", "failed"}
+
+
+@dataclass
+class Outcome:
+    kind: str
+    ok: bool
+    latency_ms: float
+    reason: str = "ok"
+
+
+@dataclass
+class LoadConfig:
+    api: str
+    urls: List[str]
+    mix: Dict[str, float] = field(default_factory=lambda: {"jobs": 1.0})
+    concurrency: int = 4
+    duration_s: float = 60.0
+    max_requests: Optional[int] = None
+    quality_mode: str = "fast"
+    batch_size: int = 5
+    poll_interval_s: float = 0.5
+    job_timeout_s: float = 300.0
+    seed: Optional[int] = None
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """``"jobs=3,preview=1"`` -> ``{"jobs": 3.0, "preview": 1.0}``."""
+    mix: Dict[str, float] = {}
+    for part in (spec or "").split(","):
+        if not part.strip():
+            continue
+        kind, _, weight = part.partition("=")
+        kind = kind.strip()
+        if kind not in KINDS:
+            raise ValueError(f"Unknown request kind {kind!r}; expected one of {KINDS}")
+        mix[kind] = float(weight or 1)
+    if not mix or sum(mix.values()) <= 0:
+        raise ValueError("Request mix must have a positive weight")
+    return mix
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile (``None`` for an empty list)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100.0 * len(ordered) + 0.5 - 1e-9)))
+    return round(ordered[min(rank, len(ordered)) - 1], 1)
+
+
+def summarize(outcomes: List[Outcome], elapsed_s: float) -> Dict[str, Any]:
+    """Per-kind and overall throughput, error rates and latency percentiles."""
+    def block(items: List[Outcome]) -> Dict[str, Any]:
+        ok = [o.latency_ms for o in items if o.ok]
+        errors = Counter(o.reason for o in items if not o.ok)
+        return {
+            "count": len(items),
+            "ok": len(ok),
+            "error_rate": round(1 - len(ok) / len(items), 4) if items else 0.0,
+            "errors": dict(errors),
+            "throughput_per_s": round(len(ok) / elapsed_s, 3) if elapsed_s > 0 else 0.0,
+            "p50_ms": percentile(ok, 50),
+            "p90_ms": percentile(ok, 90),
+            "p99_ms": percentile(ok, 99),
+        }
+
+    kinds = sorted({o.kind for o in outcomes})
+    return {
+        "elapsed_s": round(elapsed_s, 2),
+        "overall": block(outcomes),
+        "by_kind": {k: block([o for o in outcomes if o.kind == k]) for k in kinds},
+    }
+
+
+class LoadDriver:
+    """Runs the mix against the API from ``concurrency`` threads."""
+
+    def __init__(self, config: LoadConfig):
+        if not config.urls:
+            raise ValueError("No target URLs")
+        self.config = config
+        self.base = config.api.rstrip("/") + "/api/v1/demo-v2"
+        self._rng = random.Random(config.seed)
+        self._lock = threading.Lock()
+        self._issued = 0
+        self.outcomes: List[Outcome] = []
+
+    # ---- scheduling -----------------------------------------------------
+
+    def _next(self) -> Optional[tuple]:
+        with self._lock:
+            if self.config.max_requests is not None and self._issued >= self.config.max_requests:
+                return None
+            self._issued += 1
+            kinds, weights = zip(*self.config.mix.items())
+            kind = self._rng.choices(kinds, weights)[0]
+            count = self.config.batch_size if kind == "batch" else 1
+            return kind, [self._rng.choice(self.config.urls) for _ in range(count)]
+
+    def _worker(self, deadline: float) -> None:
+        session = requests.Session()
+        while time.monotonic() < deadline:
+            job = self._next()
+            if job is None:
+                return
+            kind, urls = job
+            started = time.monotonic()
+            try:
+                ok, reason = getattr(self, f"_run_{kind}")(session, urls)
+            except requests.RequestException as exc:
+                ok, reason = False, type(exc).__name__
+            outcome = Outcome(kind, ok, (time.monotonic() - started) * 1000, reason)
+            with self._lock:
+                self.outcomes.append(outcome)
+
+    def run(self) -> Dict[str, Any]:
+        started = time.monotonic()
+        deadline = started + self.config.duration_s
+        with ThreadPoolExecutor(max_workers=self.config.concurrency) as pool:
+            for _ in range(self.config.concurrency):
+                pool.submit(self._worker, deadline)
+        return summarize(self.outcomes, time.monotonic() - started)
+
+    # ---- request kinds --------------------------------------------------
+
+    def _post(self, session: requests.Session, path: str, body: Dict[str, Any]) -> requests.Response:
+        return session.post(self.base + path, json=body, timeout=self.config.job_timeout_s)
+
+    def _poll(self, session: requests.Session, path: str, terminal: set, success: str) -> tuple:
+        deadline = time.monotonic() + self.config.job_timeout_s
+        while time.monotonic() < deadline:
+            resp = session.get(self.base + path, timeout=30)
+            if resp.status_code != 200:
+                return False, f"poll_http_{resp.status_code}"
+            status = (resp.json() or {}).get("status")
+            if status in terminal:
+                return status == success, status
+            time.sleep(self.config.poll_interval_s)
+        return False, "timeout"
+
+    def _run_preview(self, session: requests.Session, urls: List[str]) -> tuple:
+        resp = self._post(session, "/preview", {"url": urls[0], "quality_mode": self.config.quality_mode})
+        return resp.status_code == 200, "ok" if resp.status_code == 200 else f"http_{resp.status_code}"
+
+    def _run_jobs(self, session: requests.Session, urls: List[str]) -> tuple:
+        resp = self._post(session, "/jobs", {"url": urls[0], "quality_mode": self.config.quality_mode})
+        if resp.status_code not in (200, 202):
+            return False, f"http_{resp.status_code}"
+        ok, status = self._poll(session, f"/jobs/{resp.json()['job_id']}/status", TERMINAL_JOB, "finished")
+        return ok, "ok" if ok else status
+
+    def _run_batch(self, session: requests.Session, urls: List[str]) -> tuple:
+        resp = self._post(session, "/batch", {"urls": urls, "quality_mode": self.config.quality_mode})
+        if resp.status_code not in (200, 202):
+            return False, f"http_{resp.status_code}"
+        ok, status = self._poll(session, f"/batch/{resp.json()['job_id']}", TERMINAL_BATCH, "completed")
+        return ok, "ok" if ok else status
+
+
+def load_urls(sites: Optional[str], urls: Optional[List[str]]) -> List[str]:
+    if urls:
+        return urls
+    if not sites:
+        raise ValueError("Pass --sites (site farm base URL) or --urls")
+    resp = requests.get(sites.rstrip("/") + "/index.json", timeout=10)
+    resp.raise_for_status()
+    return [entry["url"] for entry in resp.json()]
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = [f"{'kind':<10}{'count':>7}{'ok':>7}{'err%':>8}{'ok/s':>9}{'p50':>9}{'p90':>9}{'p99':>9}"]
+    rows = list(report["by_kind"].items()) + [("overall", report["overall"])]
+    for kind, b in rows:
+        lines.append(
+            f"{kind:<10}{b['count']:>7}{b['ok']:>7}{b['error_rate'] * 100:>7.1f}%"
+            f"{b['throughput_per_s']:>9.2f}"
+            + "".join(f"{(b[k] if b[k] is not None else float('nan')):>9.0f}" for k in ("p50_ms", "p90_ms", "p99_ms"))
+        )
+        if b["errors"]:
+            lines.append(f"{'':<10}errors: {b['errors']}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Demo-v2 load driver")
+    parser.add_argument("--api", default="http://127.0.0.1:8000")
+    parser.add_argument("--sites", default=None, help="Site farm base URL (reads /index.json)")
+    parser.add_argument("--urls", nargs="*", default=None)
+    parser.add_argument("--mix", default="jobs=1")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=60.0)
+    parser.add_argument("--requests", type=int, default=None, help="Stop after this many requests")
+    parser.add_argument("--quality-mode", default="fast")
+    parser.add_argument("--batch-size", type=int, default=5)
+    parser.add_argument("--job-timeout", type=float, default=300.0)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--label", default=None, help="Free-form tag, e.g. workers=4")
+    parser.add_argument("--output", default=None, help="Append the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    config = LoadConfig(
+        api=args.api,
+        urls=load_urls(args.sites, args.urls),
+        mix=parse_mix(args.mix),
+        concurrency=args.concurrency,
+        duration_s=args.duration,
+        max_requests=args.requests,
+        quality_mode=args.quality_mode,
+        batch_size=args.batch_size,
+        job_timeout_s=args.job_timeout,
+        seed=args.seed,
+    )
+    report = LoadDriver(config).run()
+    report.update(label=args.label, mix=config.mix, concurrency=config.concurrency)
+    print(format_report(report))
+    if args.output:
+        with open(args.output, "a") as fh:
+            fh.write(json.dumps(report) + "\n")
+    return 0 if report["overall"]["count"] else 1
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
@@ -0,0 +1,193 @@
+"""OpenAI-compatible stand-in server for load tests.
+
+Serves ``POST /v1/chat/completions`` (and ``/chat/completions``) with:
+
+  - latency drawn from a distribution: ``fixed:300``, ``uniform:200,1500``
+    or ``lognormal:800,0.6`` (median ms, sigma);
+  - optional error injection (``--error-rate``; alternates 429 and 500);
+  - canned responses: the first rule whose ``match`` substring occurs in the
+    prompt text wins, else the default JSON below. Rules file format:
+        [{"match": "design director", "content": {...}}, ...]
+
+Point the backend at it with ``OPENAI_BASE_URL=http://127.0.0.1:<port>/v1``
+(read by the OpenAI SDK) and any non-empty ``OPENAI_API_KEY``.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional
+from uuid import uuid4
+
+logger = logging.getLogger("loadtest.fake_openai")
+
+# Superset of the fields the reasoning, brand and design prompts ask for;
+# parsers ignore keys they do not know and fall back on missing ones.
+DEFAULT_CONTENT: Dict[str, Any] = {
+    "title": "Build better products faster",
+    "subtitle": "The platform teams use to ship",
+    "description": "Plan, build and launch with one workspace for your whole team.",
+    "cta_text": "Get started",
+    "template_type": "saas",
+    "page_type": "saas",
+    "brand_name": "Example",
+    "primary_color": "#2563EB",
+    "secondary_color": "#1E40AF",
+    "accent_color": "#F59E0B",
+    "confidence": 0.82,
+    "tags": ["Productivity", "Teams"],
+    "credibility_items": [{"type": "rating", "value": "4.8 from 1,200 reviews"}],
+    "overall_score": 0.84,
+    "scores": {"visual": 0.82, "fidelity": 0.8, "readability": 0.86},
+}
+
+
+def parse_latency(spec: str, rng: Optional[random.Random] = None) -> Callable[[], float]:
+    """Return a sampler of seconds from ``kind:args`` (milliseconds)."""
+    rng = rng or random.Random()
+    kind, _, args = (spec or "fixed:0").partition(":")
+    values = [float(v) for v in args.split(",") if v.strip()] or [0.0]
+    if kind == "fixed":
+        return lambda: values[0] / 1000.0
+    if kind == "uniform":
+        low, high = values[0], values[1] if len(values) > 1 else values[0]
+        return lambda: rng.uniform(low, high) / 1000.0
+    if kind == "lognormal":
+        median, sigma = values[0], values[1] if len(values) > 1 else 0.5
+        return lambda: rng.lognormvariate(math.log(max(median, 1e-3)), sigma) / 1000.0
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+def _prompt_text(messages: List[Dict[str, Any]]) -> str:
+    parts: List[str] = []
+    for message in messages or []:
+        content = message.get("content")
+        if isinstance(content, str):
+            parts.append(content)
+        elif isinstance(content, list):
+            parts.extend(p.get("text", "") for p in content if isinstance(p, dict))
+    return "\n".join(parts)
+
+
+class FakeOpenAI:
+    """Request handling state shared by the HTTP handler threads."""
+
+    def __init__(
+        self,
+        latency: str = "lognormal:800,0.5",
+        error_rate: float = 0.0,
+        rules: Optional[List[Dict[str, Any]]] = None,
+        seed: Optional[int] = None,
+    ):
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.latency = parse_latency(latency, self._rng)
+        self.error_rate = error_rate
+        self.rules = rules or []
+        self.requests = 0
+        self.errors = 0
+
+    def respond(self, body: Dict[str, Any]) -> tuple:
+        """Return (status, payload) for a chat completion request."""
+        with self._lock:
+            self.requests += 1
+            delay = self.latency()
+            fail = self._rng.random() < self.error_rate
+            if fail:
+                self.errors += 1
+        time.sleep(delay)
+        if fail:
+            status = 429 if self.errors % 2 else 500
+            return status, {"error": {"message": "injected failure", "type": "server_error"}}
+
+        prompt = _prompt_text(body.get("messages") or [])
+        content: Any = DEFAULT_CONTENT
+        for rule in self.rules:
+            if rule.get("match", "").lower() in prompt.lower():
+                content = rule.get("content", content)
+                break
+        text = content if isinstance(content, str) else json.dumps(content)
+        prompt_tokens = max(1, len(prompt) // 4)
+        completion_tokens = max(1, len(text) // 4)
+        return 200, {
+            "id": f"chatcmpl-{uuid4().hex[:24]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model") or "gpt-4o",
+            "choices": [{
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": text},
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+
+def make_server(state: FakeOpenAI, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    class _Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):  # noqa: N802 — http.server API
+            if self.path.split("?")[0].rstrip("/") not in ("/v1/chat/completions", "/chat/completions"):
+                self._send(404, {"error": {"message": "not found"}})
+                return
+            length = int(self.headers.get("Content-Length") or 0)
+            try:
+                body = json.loads(self.rfile.read(length) or b"{}")
+            except ValueError:
+                self._send(400, {"error": {"message": "invalid JSON"}})
+                return
+            self._send(*state.respond(body))
+
+        def _send(self, status: int, payload: Dict[str, Any]) -> None:
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):  # noqa: A002 — silence access log
+            return
+
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    return server
+
+
+def serve(state: FakeOpenAI, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """Start in a daemon thread; ``server.server_address`` has the port."""
+    server = make_server(state, host, port)
+    threading.Thread(target=server.serve_forever, name="fake-openai", daemon=True).start()
+    return server
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Fake OpenAI server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8901)
+    parser.add_argument("--latency", default="lognormal:800,0.5")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rules", default=None, help="JSON file of canned response rules")
+    args = parser.parse_args(argv)
+
+    rules = json.loads(open(args.rules).read()) if args.rules else None
+    server = make_server(FakeOpenAI(args.latency, args.error_rate, rules), args.host, args.port)
+    logging.basicConfig(level=logging.INFO)
+    logger.info("Fake OpenAI on http://%s:%s/v1", *server.server_address[:2])
+    server.serve_forever()
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
@@ -0,0 +1,176 @@
+"""In-memory S3-compatible object store for load tests.
+
+Path-style only (``/<bucket>/<key>``): PUT, GET, HEAD and DELETE — the calls
+``upload_file_to_r2`` and ``delete_file_from_r2`` make through boto3.
+Signatures are not checked. Objects live in memory and are also served
+anonymously, so ``R2_PUBLIC_BASE_URL=http://127.0.0.1:<port>/<bucket>``
+makes the returned preview URLs fetchable.
+
+Point the backend at it with ``R2_ENDPOINT_URL=http://127.0.0.1:<port>``
+plus any non-empty ``R2_ACCESS_KEY_ID`` / ``R2_SECRET_ACCESS_KEY``.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import logging
+import threading
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+logger = logging.getLogger("loadtest.object_store")
+
+
+def decode_aws_chunked(body: bytes) -> bytes:
+    """Strip ``aws-chunked`` framing (``<hex>[;chunk-signature=..]\\r\\n<data>\\r\\n``)."""
+    out = bytearray()
+    pos = 0
+    while pos < len(body):
+        eol = body.index(b"\r\n", pos)
+        size = int(body[pos:eol].split(b";", 1)[0], 16)
+        if size == 0:
+            break
+        start = eol + 2
+        out += body[start:start + size]
+        pos = start + size + 2
+    return bytes(out)
+
+
+class ObjectStore:
+    """Thread-safe bucket -> key -> (bytes, content type) map."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._objects: Dict[Tuple[str, str], Tuple[bytes, str]] = {}
+        self.puts = 0
+        self.bytes_stored = 0
+
+    def put(self, bucket: str, key: str, data: bytes, content_type: str) -> str:
+        with self._lock:
+            old = self._objects.get((bucket, key))
+            self.bytes_stored += len(data) - (len(old[0]) if old else 0)
+            self._objects[(bucket, key)] = (data, content_type)
+            self.puts += 1
+        return hashlib.md5(data).hexdigest()
+
+    def get(self, bucket: str, key: str) -> Optional[Tuple[bytes, str]]:
+        with self._lock:
+            return self._objects.get((bucket, key))
+
+    def delete(self, bucket: str, key: str) -> None:
+        with self._lock:
+            old = self._objects.pop((bucket, key), None)
+            if old:
+                self.bytes_stored -= len(old[0])
+
+    def __len__(self) -> int:
+        return len(self._objects)
+
+
+def _read_body(handler: BaseHTTPRequestHandler) -> bytes:
+    if "chunked" in (handler.headers.get("Transfer-Encoding") or "").lower():
+        data = bytearray()
+        while True:
+            size = int(handler.rfile.readline().split(b";", 1)[0].strip() or b"0", 16)
+            if size == 0:
+                while handler.rfile.readline() not in (b"\r\n", b"\n", b""):
+                    pass  # trailers
+                break
+            data += handler.rfile.read(size)
+            handler.rfile.readline()
+        body = bytes(data)
+    else:
+        body = handler.rfile.read(int(handler.headers.get("Content-Length") or 0))
+    encoding = (handler.headers.get("Content-Encoding") or "").lower()
+    streaming = (handler.headers.get("x-amz-content-sha256") or "").startswith("STREAMING-")
+    if "aws-chunked" in encoding or streaming:
+        body = decode_aws_chunked(body)
+    return body
+
+
+def make_server(store: ObjectStore, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    class _Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _target(self) -> Optional[Tuple[str, str]]:
+            path = unquote(urlparse(self.path).path).lstrip("/")
+            bucket, _, key = path.partition("/")
+            return (bucket, key) if bucket and key else None
+
+        def _reply(self, status: int, body: bytes = b"", content_type: str = "application/xml",
+                   etag: Optional[str] = None, head: bool = False) -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Last-Modified", formatdate(usegmt=True))
+            if etag:
+                self.send_header("ETag", f'"{etag}"')
+            self.end_headers()
+            if body and not head:
+                self.wfile.write(body)
+
+        def _not_found(self, head: bool = False) -> None:
+            self._reply(404, b"<Error><Code>NoSuchKey</Code></Error>", head=head)
+
+        def do_PUT(self):  # noqa: N802 — http.server API
+            target = self._target()
+            body = _read_body(self)
+            if target is None:
+                self._reply(200)  # CreateBucket and friends: accept
+                return
+            etag = store.put(*target, body, self.headers.get("Content-Type") or "application/octet-stream")
+            self._reply(200, etag=etag)
+
+        def do_GET(self):  # noqa: N802
+            self._get(head=False)
+
+        def do_HEAD(self):  # noqa: N802
+            self._get(head=True)
+
+        def _get(self, head: bool) -> None:
+            target = self._target()
+            found = store.get(*target) if target else None
+            if found is None:
+                self._not_found(head)
+                return
+            data, content_type = found
+            self._reply(200, data, content_type, etag=hashlib.md5(data).hexdigest(), head=head)
+
+        def do_DELETE(self):  # noqa: N802
+            target = self._target()
+            if target:
+                store.delete(*target)
+            self._reply(204)
+
+        def log_message(self, format, *args):  # noqa: A002 — silence access log
+            return
+
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    return server
+
+
+def serve(store: ObjectStore, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """Start in a daemon thread; ``server.server_address`` has the port."""
+    server = make_server(store, host, port)
+    threading.Thread(target=server.serve_forever, name="object-store", daemon=True).start()
+    return server
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="In-memory S3-compatible object store")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8902)
+    args = parser.parse_args(argv)
+
+    server = make_server(ObjectStore(), args.host, args.port)
+    logging.basicConfig(level=logging.INFO)
+    logger.info("Object store on http://%s:%s", *server.server_address[:2])
+    server.serve_forever()
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
@@ -0,0 +1,201 @@
+"""Static site farm serving the golden corpus for load tests.
+
+Every corpus URL gets a path ``/<slug>/`` with a page that looks like its
+category (hero, CTA, pricing or product block, testimonials, OG tags), so
+capture, extraction and reasoning do real work without leaving the host.
+With ``--fixtures`` (recordings from ``preview_engine/replay.py``) the
+recorded HTML is served instead of the synthetic page.
+
+``GET /index.json`` lists ``[{"url", "path", "category"}]`` for the driver.
+The backend must be started with ``PREVIEW_ALLOW_PRIVATE_HOSTS`` including
+the farm's host, or the SSRF check rejects the URLs.
+"""
+from __future__ import annotations
+
+import argparse
+import html
+import json
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+from backend.services.preview.corpus.golden_corpus import GoldenURL, get_corpus
+
+logger = logging.getLogger("loadtest.site_farm")
+
+_CATEGORY_BLOCKS = {
+    "saas_landing": (
+        "Ship faster with {name}",
+        "The all-in-one platform trusted by 20,000+ teams.",
+        "Start free trial",
+        "<section class='pricing'><h2>Pricing</h2><p>Starter $0 · Pro $12/user · Enterprise</p></section>",
+    ),
+    "ecommerce": (
+        "{name} — The Everyday Collection",
+        "Free shipping on orders over $50. 30-day returns.",
+        "Shop now",
+        "<section class='product'><h2>Best seller</h2><p class='price'>$98.00</p>"
+        "<p>★★★★★ 4.8 (2,341 reviews)</p></section>",
+    ),
+    "docs": (
+        "{name} Documentation",
+        "Guides, API reference and examples to get you building.",
+        "Read the docs",
+        "<nav class='sidebar'><ul><li>Getting started</li><li>API reference</li>"
+        "<li>Tutorials</li></ul></nav><pre><code>npm install {slug}</code></pre>",
+    ),
+    "creator": (
+        "Hi, I'm {name}",
+        "Designer, writer and maker. New essays every week.",
+        "Subscribe",
+        "<section class='posts'><article><h3>On building in public</h3></article>"
+        "<article><h3>Tools I use</h3></article></section>",
+    ),
+    "local_business": (
+        "{name} — Open Today",
+        "Fresh food, friendly service. Order online or visit us.",
+        "Order now",
+        "<section class='hours'><h2>Hours</h2><p>Mon–Sun 7am–10pm</p>"
+        "<p>123 Main Street</p></section>",
+    ),
+}
+
+
+def site_path(url: str) -> str:
+    """Farm path for a corpus URL (stable, filesystem- and URL-safe)."""
+    host = urlparse(url).hostname or url
+    parts = [p for p in host.lower().split(".") if p not in ("www", "")]
+    return "/" + "-".join(parts) + "/"
+
+
+def render_page(entry: GoldenURL) -> str:
+    """Deterministic HTML standing in for the live page."""
+    slug = site_path(entry.url).strip("/")
+    name = (entry.expected_title_keywords or [slug.split("-")[0]])[0].title()
+    headline, subtitle, cta, block = _CATEGORY_BLOCKS.get(
+        entry.category.value, _CATEGORY_BLOCKS["saas_landing"]
+    )
+    fmt = {"name": html.escape(name), "slug": html.escape(slug)}
+    headline, block = headline.format(**fmt), block.format(**fmt)
+    proof = (
+        "<section class='testimonials'><blockquote>“Changed how our team works.”"
+        "<cite>— Alex, Head of Ops</cite></blockquote><p>Rated 4.9/5 by 1,200 customers</p></section>"
+        if entry.expected_social_proof_present else ""
+    )
+    return f"""<!doctype html>
+<html lang="en"><head><meta charset="utf-8">
+<title>{fmt['name']} | {html.escape(subtitle)}</title>
+<meta name="description" content="{html.escape(subtitle)}">
+<meta property="og:title" content="{headline}">
+<meta property="og:description" content="{html.escape(subtitle)}">
+<meta property="og:site_name" content="{fmt['name']}">
+<style>
+body{{margin:0;font-family:Helvetica,Arial,sans-serif;color:#111}}
+header{{padding:16px 48px;display:flex;justify-content:space-between;background:#fff}}
+.hero{{padding:96px 48px;background:linear-gradient(135deg,#1e3a8a,#2563eb);color:#fff}}
+.hero h1{{font-size:56px;margin:0 0 16px}} .cta{{background:#f59e0b;color:#111;padding:14px 28px;border-radius:8px}}
+section{{padding:48px}}
+</style></head>
+<body>
+<header><strong class="logo">{fmt['name']}</strong><nav>Product · Pricing · About</nav></header>
+<main>
+<section class="hero"><h1>{headline}</h1><p>{html.escape(subtitle)}</p>
+<a class="cta" href="#">{html.escape(cta)}</a></section>
+{block}
+{proof}
+</main>
+<footer><p>© {fmt['name']}</p></footer>
+</body></html>
+"""
+
+
+def load_fixture_pages(root: Path) -> Dict[str, str]:
+    """``{path: html}`` from replay fixtures (first recorded capture each)."""
+    from backend.scripts.preview_engine.replay import Fixture
+
+    pages: Dict[str, str] = {}
+    for fixture in Fixture.discover(Path(root)):
+        for entry in fixture.captures.values():
+            pages[site_path(fixture.url)] = fixture.get_blob(entry["html"]).decode("utf-8")
+            break
+    return pages
+
+
+class SiteFarm:
+    """Path -> HTML map for the corpus (synthetic or recorded)."""
+
+    def __init__(self, entries: Optional[List[GoldenURL]] = None, fixtures: Optional[Path] = None):
+        self.entries = list(entries if entries is not None else get_corpus(include_shadow=True))
+        self.pages: Dict[str, str] = {site_path(e.url): render_page(e) for e in self.entries}
+        if fixtures:
+            self.pages.update(load_fixture_pages(fixtures))
+        self.hits = 0
+
+    def index(self, base_url: str) -> List[Dict[str, str]]:
+        base = base_url.rstrip("/")
+        return [
+            {"url": base + site_path(e.url), "path": site_path(e.url), "category": e.category.value,
+             "source": e.url}
+            for e in self.entries
+        ]
+
+
+def make_server(farm: SiteFarm, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    class _Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):  # noqa: N802 — http.server API
+            path = urlparse(self.path).path
+            if path == "/index.json":
+                base = f"http://{self.headers.get('Host') or '%s:%s' % self.server.server_address[:2]}"
+                self._send(200, json.dumps(farm.index(base)).encode("utf-8"), "application/json")
+                return
+            page = farm.pages.get(path if path.endswith("/") else path + "/")
+            if page is None:
+                self._send(404, b"<h1>Not found</h1>", "text/html")
+                return
+            farm.hits += 1
+            self._send(200, page.encode("utf-8"), "text/html; charset=utf-8")
+
+        def _send(self, status: int, body: bytes, content_type: str) -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):  # noqa: A002 — silence access log
+            return
+
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    return server
+
+
+def serve(farm: SiteFarm, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """Start in a daemon thread; ``server.server_address`` has the port."""
+    server = make_server(farm, host, port)
+    threading.Thread(target=server.serve_forever, name="site-farm", daemon=True).start()
+    return server
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Static site farm for the golden corpus")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8903)
+    parser.add_argument("--fixtures", default=None, help="Replay fixture root to serve recorded HTML from")
+    args = parser.parse_args(argv)
+
+    farm = SiteFarm(fixtures=Path(args.fixtures) if args.fixtures else None)
+    server = make_server(farm, args.host, args.port)
+    logging.basicConfig(level=logging.INFO)
+    logger.info("Site farm (%d pages) on http://%s:%s", len(farm.pages), *server.server_address[:2])
+    server.serve_forever()
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
@@ -0,0 +1,123 @@
+"""Bring up the load-test stack: stand-ins, API and N RQ workers.
+
+Starts the fake OpenAI server, the object store and the site farm in this
+process, then (unless ``--no-api`` / ``--rq-workers 0``) spawns uvicorn and
+``python -m backend.queue.worker`` processes with the environment pointed
+at the stand-ins and the demo rate limits lifted. Redis and the database
+come from the caller's ``REDIS_URL`` / ``DATABASE_URL``.
+
+    python -m backend.scripts.loadtest.stack --rq-workers 4 --openai-latency lognormal:900,0.5
+
+Ctrl-C stops everything. ``--print-env`` prints the exports so the API and
+workers can be started by hand instead.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import signal
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+from backend.scripts.loadtest import fake_openai, object_store, site_farm
+
+logger = logging.getLogger("loadtest.stack")
+
+BUCKET = "loadtest"
+# Demo endpoints are rate limited per client IP; the driver is one IP.
+UNLIMITED = "1000000"
+
+
+def stack_env(openai_url: str, store_url: str, sites_host: str, bucket: str = BUCKET) -> Dict[str, str]:
+    """Environment overrides that route the backend to the stand-ins."""
+    return {
+        "OPENAI_BASE_URL": openai_url,
+        "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY") or "sk-loadtest",
+        "R2_ENDPOINT_URL": store_url,
+        "R2_ACCESS_KEY_ID": "loadtest",
+        "R2_SECRET_ACCESS_KEY": "loadtest",
+        "R2_BUCKET_NAME": bucket,
+        "R2_PUBLIC_BASE_URL": f"{store_url}/{bucket}",
+        "PREVIEW_ALLOW_PRIVATE_HOSTS": sites_host,
+        "DEMO_JOB_PER_HOUR": UNLIMITED,
+        "DEMO_PREVIEW_PER_HOUR": UNLIMITED,
+        "BATCH_JOBS_PER_HOUR": UNLIMITED,
+    }
+
+
+def _spawn(cmd: List[str], env: Dict[str, str]) -> subprocess.Popen:
+    logger.info("Starting: %s", " ".join(cmd))
+    return subprocess.Popen(cmd, env={**os.environ, **env})
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Start the local load-test stack")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--openai-port", type=int, default=8901)
+    parser.add_argument("--store-port", type=int, default=8902)
+    parser.add_argument("--sites-port", type=int, default=8903)
+    parser.add_argument("--api-port", type=int, default=8000)
+    parser.add_argument("--openai-latency", default="lognormal:800,0.5")
+    parser.add_argument("--openai-error-rate", type=float, default=0.0)
+    parser.add_argument("--fixtures", default=None, help="Serve recorded HTML from replay fixtures")
+    parser.add_argument("--rq-workers", type=int, default=2)
+    parser.add_argument("--api-workers", type=int, default=1, help="uvicorn --workers")
+    parser.add_argument("--no-api", action="store_true")
+    parser.add_argument("--print-env", action="store_true")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(name)s] %(message)s")
+    openai_server = fake_openai.serve(
+        fake_openai.FakeOpenAI(args.openai_latency, args.openai_error_rate), args.host, args.openai_port
+    )
+    store_server = object_store.serve(object_store.ObjectStore(), args.host, args.store_port)
+    farm = site_farm.SiteFarm(fixtures=args.fixtures)
+    sites_server = site_farm.serve(farm, args.host, args.sites_port)
+
+    env = stack_env(
+        openai_url="http://%s:%s/v1" % openai_server.server_address[:2],
+        store_url="http://%s:%s" % store_server.server_address[:2],
+        sites_host=args.host,
+    )
+    logger.info("Site farm: http://%s:%s/index.json (%d pages)",
+                *sites_server.server_address[:2], len(farm.pages))
+    if args.print_env:
+        for key, value in env.items():
+            print(f"export {key}={value}")
+
+    children: List[subprocess.Popen] = []
+    if not args.no_api:
+        children.append(_spawn(
+            [sys.executable, "-m", "uvicorn", "backend.main:app", "--host", args.host,
+             "--port", str(args.api_port), "--workers", str(args.api_workers)],
+            env,
+        ))
+    for _ in range(args.rq_workers):
+        children.append(_spawn([sys.executable, "-m", "backend.queue.worker"], env))
+
+    try:
+        while True:
+            for child in children:
+                if child.poll() is not None:
+                    logger.error("Process %s exited with %s", child.args, child.returncode)
+                    return 1
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        logger.info("Stopping stack")
+        return 0
+    finally:
+        for child in children:
+            if child.poll() is None:
+                child.send_signal(signal.SIGTERM)
+        for child in children:
+            try:
+                child.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                child.kill()
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
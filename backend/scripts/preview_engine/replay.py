@@ -0,0 +1,572 @@
+#!/usr/bin/env python3
+"""Record-and-replay harness for offline, deterministic engine benchmarks.
+
+``run_corpus`` and ``benchmark_demo_throughput`` hit live sites and a live
+OpenAI key, so their timings drift with the network and they cannot run in
+CI. This harness records every external input of a ``PreviewEngine.generate``
+job once, then replays it from disk:
+
+    capture   ``capture_screenshot_and_html`` (screenshot, HTML, DOM data)
+    ai        every ``chat.completions.create`` request/response pair
+    http      every ``requests`` fetch (logos, hero images, OG images)
+    uploads   R2 uploads are kept in memory during replay and served back
+              to later fetches of the returned URL
+
+Fixtures live in one directory per URL (``manifest.json`` + ``blobs/``).
+Replay optionally re-injects the recorded latency (``--latency-scale``) or a
+fixed per-call delay (``--latency-ms``) so the CPU cost of the pipeline can
+be measured alone or under realistic waits. Anything not in the fixture
+fails like an offline network would.
+
+Usage:
+    python -m backend.scripts.preview_engine.replay record \\
+        --fixtures artifacts/replay https://example.com https://stripe.com
+    python -m backend.scripts.preview_engine.replay record \\
+        --fixtures artifacts/replay --corpus --max-urls 5
+    python -m backend.scripts.preview_engine.replay replay \\
+        --fixtures artifacts/replay --repeat 3 --latency-scale 1.0
+"""
+from __future__ import annotations
+
+import argparse
+import base64
+import hashlib
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+logging.basicConfig(
+    level=os.environ.get("LOG_LEVEL", "INFO"),
+    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+)
+logger = logging.getLogger("replay")
+
+MANIFEST = "manifest.json"
+REPLAY_UPLOAD_HOST = "https://replay.local/"
+# Request kwargs that do not change the answer
+_AI_KEY_IGNORED = {"timeout", "extra_headers", "extra_query", "extra_body"}
+
+
+class ReplayMiss(RuntimeError):
+    """Raised when a replayed job makes a call that was never recorded."""
+
+
+def fixture_slug(url: str) -> str:
+    readable = url.split("://", 1)[-1].replace("/", "_")[:80]
+    return f"{readable}-{_digest(url)[:10]}"
+
+
+def _digest(value: Any) -> str:
+    if not isinstance(value, (bytes, bytearray)):
+        value = json.dumps(value, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(value).hexdigest()
+
+
+# ---------------------------------------------------------------------------
+# Fixture storage
+# ---------------------------------------------------------------------------
+
+
+class Fixture:
+    """On-disk recording of one job's external inputs."""
+
+    def __init__(self, path: Path, url: str = ""):
+        self.path = Path(path)
+        self.url = url
+        self.recorded_at: Optional[str] = None
+        self.captures: Dict[str, Dict[str, Any]] = {}
+        self.ai: List[Dict[str, Any]] = []
+        self.http: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_url(cls, root: Path, url: str) -> "Fixture":
+        return cls(Path(root) / fixture_slug(url), url)
+
+    @classmethod
+    def load(cls, path: Path) -> "Fixture":
+        data = json.loads((Path(path) / MANIFEST).read_text())
+        fixture = cls(Path(path), data["url"])
+        fixture.recorded_at = data.get("recorded_at")
+        fixture.captures = data.get("captures", {})
+        fixture.ai = data.get("ai", [])
+        fixture.http = data.get("http", {})
+        return fixture
+
+    @staticmethod
+    def discover(root: Path) -> List["Fixture"]:
+        return [Fixture.load(p.parent) for p in sorted(Path(root).glob(f"*/{MANIFEST}"))]
+
+    def save(self) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+        manifest = {
+            "url": self.url,
+            "recorded_at": self.recorded_at or datetime.utcnow().isoformat(),
+            "captures": self.captures,
+            "ai": self.ai,
+            "http": self.http,
+        }
+        (self.path / MANIFEST).write_text(json.dumps(manifest, indent=2, default=str))
+
+    def put_blob(self, data: bytes) -> str:
+        name = _digest(bytes(data))[:32]
+        blob = self.path / "blobs" / name
+        if not blob.exists():
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            blob.write_bytes(data)
+        return name
+
+    def get_blob(self, name: str) -> bytes:
+        return (self.path / "blobs" / name).read_bytes()
+
+    # ---- recording ------------------------------------------------------
+
+    def add_capture(self, url: str, result, elapsed_ms: float) -> None:
+        screenshot, html, dom_data = result
+        entry = {
+            "screenshot": self.put_blob(screenshot or b""),
+            "html": self.put_blob((html or "").encode("utf-8")),
+            "dom_data": dom_data,
+            "elapsed_ms": round(elapsed_ms, 1),
+        }
+        with self._lock:
+            self.captures[url] = entry
+
+    def add_ai(self, request: Dict[str, Any], response: Dict[str, Any], elapsed_ms: float) -> None:
+        entry = {
+            "key": _ai_key(request),
+            "model": request.get("model"),
+            "response": response,
+            "elapsed_ms": round(elapsed_ms, 1),
+        }
+        with self._lock:
+            self.ai.append(entry)
+
+    def add_http(self, method: str, url: str, response, elapsed_ms: float) -> None:
+        entry = {
+            "method": method.upper(),
+            "url": url,
+            "status": response.status_code,
+            "headers": {k: v for k, v in response.headers.items() if k.lower() == "content-type"},
+            "body": self.put_blob(response.content or b""),
+            "elapsed_ms": round(elapsed_ms, 1),
+        }
+        with self._lock:
+            self.http[_http_key(method, url)] = entry
+
+
+def _ai_key(request: Dict[str, Any]) -> str:
+    return _digest({k: v for k, v in request.items() if k not in _AI_KEY_IGNORED})
+
+
+def _http_key(method: str, url: str) -> str:
+    return f"{method.upper()} {url}"
+
+
+# ---------------------------------------------------------------------------
+# Patching seams
+# ---------------------------------------------------------------------------
+
+
+class _Patches:
+    """setattr with undo; ``everywhere`` also rebinds ``from x import f`` copies."""
+
+    def __init__(self) -> None:
+        self._undo: List[tuple] = []
+
+    def attr(self, owner: Any, name: str, value: Any) -> None:
+        self._undo.append((owner, name, getattr(owner, name)))
+        setattr(owner, name, value)
+
+    def everywhere(self, original: Callable, replacement: Callable) -> None:
+        for module in list(sys.modules.values()):
+            namespace = getattr(module, "__dict__", None)
+            if not namespace:
+                continue
+            for name, value in list(namespace.items()):
+                if value is original:
+                    self.attr(module, name, replacement)
+
+    def restore(self) -> None:
+        while self._undo:
+            owner, name, value = self._undo.pop()
+            setattr(owner, name, value)
+
+
+def _seams() -> Dict[str, Any]:
+    """Import the patch targets that exist in this environment."""
+    seams: Dict[str, Any] = {}
+    try:
+        from backend.services import playwright_screenshot
+        seams["capture"] = playwright_screenshot.capture_screenshot_and_html
+    except ImportError:
+        pass
+    try:
+        from backend.services import r2_client
+        seams["upload"] = r2_client.upload_file_to_r2
+    except ImportError:
+        pass
+    try:
+        from openai.resources.chat.completions import Completions
+        seams["ai"] = Completions
+    except ImportError:
+        pass
+    try:
+        import requests
+        seams["http"] = requests.Session
+    except ImportError:
+        pass
+    return seams
+
+
+class _Harness:
+    def __init__(self, fixture: Fixture):
+        self.fixture = fixture
+        self._patches = _Patches()
+
+    def __enter__(self) -> "_Harness":
+        seams = _seams()
+        if "capture" in seams:
+            self._patches.everywhere(seams["capture"], self._wrap_capture(seams["capture"]))
+        if "upload" in seams:
+            self._wrap_upload(seams["upload"])
+        if "ai" in seams:
+            self._patches.attr(seams["ai"], "create", self._wrap_ai(seams["ai"].create))
+        if "http" in seams:
+            self._patches.attr(seams["http"], "request", self._wrap_http(seams["http"].request))
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._patches.restore()
+
+    def _wrap_upload(self, original: Callable) -> None:
+        """Recording keeps real uploads."""
+
+
+class Recorder(_Harness):
+    """Run the real pipeline and write every external input into ``fixture``."""
+
+    def __exit__(self, *exc) -> None:
+        super().__exit__(*exc)
+        self.fixture.recorded_at = datetime.utcnow().isoformat()
+        self.fixture.save()
+
+    def _wrap_capture(self, original: Callable) -> Callable:
+        fixture = self.fixture
+
+        def capture(url: str, *args, **kwargs):
+            started = time.perf_counter()
+            result = original(url, *args, **kwargs)
+            fixture.add_capture(url, result, (time.perf_counter() - started) * 1000)
+            return result
+        return capture
+
+    def _wrap_ai(self, original: Callable) -> Callable:
+        fixture = self.fixture
+
+        def create(client_self, *args, **kwargs):
+            started = time.perf_counter()
+            response = original(client_self, *args, **kwargs)
+            if not kwargs.get("stream") and hasattr(response, "model_dump"):
+                fixture.add_ai(kwargs, response.model_dump(mode="json"),
+                               (time.perf_counter() - started) * 1000)
+            return response
+        return create
+
+    def _wrap_http(self, original: Callable) -> Callable:
+        fixture = self.fixture
+
+        def request(session_self, method, url, *args, **kwargs):
+            started = time.perf_counter()
+            response = original(session_self, method, url, *args, **kwargs)
+            fixture.add_http(method, url, response, (time.perf_counter() - started) * 1000)
+            return response
+        return request
+
+
+class Replayer(_Harness):
+    """Serve a recorded job from local stand-ins, optionally with latency."""
+
+    def __init__(self, fixture: Fixture, latency_scale: float = 0.0, latency_ms: float = 0.0):
+        super().__init__(fixture)
+        self.latency_scale = latency_scale
+        self.latency_ms = latency_ms
+        self.misses: List[str] = []
+        self.uploads: Dict[str, bytes] = {}
+        self._ai_by_key: Dict[str, Deque[Dict[str, Any]]] = defaultdict(deque)
+        self._ai_by_model: Dict[str, Deque[Dict[str, Any]]] = defaultdict(deque)
+        self._lock = threading.Lock()
+        for entry in fixture.ai:
+            self._ai_by_key[entry["key"]].append(entry)
+            self._ai_by_model[entry.get("model") or ""].append(entry)
+
+    def _delay(self, recorded_ms: float) -> None:
+        delay_ms = recorded_ms * self.latency_scale + self.latency_ms
+        if delay_ms > 0:
+            time.sleep(delay_ms / 1000.0)
+
+    def _miss(self, what: str) -> ReplayMiss:
+        with self._lock:
+            self.misses.append(what)
+        return ReplayMiss(f"not recorded: {what}")
+
+    def _wrap_capture(self, original: Callable) -> Callable:
+        fixture = self.fixture
+
+        def capture(url: str, *args, **kwargs):
+            entry = fixture.captures.get(url)
+            if entry is None and len(fixture.captures) == 1:
+                entry = next(iter(fixture.captures.values()))
+            if entry is None:
+                raise self._miss(f"capture {url}")
+            self._delay(entry.get("elapsed_ms", 0.0))
+            return (
+                fixture.get_blob(entry["screenshot"]),
+                fixture.get_blob(entry["html"]).decode("utf-8"),
+                entry.get("dom_data") or {},
+            )
+        return capture
+
+    def _wrap_upload(self, original: Callable) -> None:
+        def upload(file_bytes: bytes, filename: str, content_type: str) -> str:
+            url = REPLAY_UPLOAD_HOST + filename.lstrip("/")
+            with self._lock:
+                self.uploads[url] = bytes(file_bytes)
+            return url
+        self._patches.everywhere(original, upload)
+
+    def _take_ai(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        # Exact request first; prompts embedding timestamps or ids fall back
+        # to the next unconsumed response for the same model.
+        with self._lock:
+            queue = self._ai_by_key.get(_ai_key(request))
+            if not queue:
+                queue = self._ai_by_model.get(request.get("model") or "")
+            if not queue:
+                raise self._miss(f"ai {request.get('model')}")
+            entry = queue.popleft()
+            for index in (self._ai_by_key[entry["key"]], self._ai_by_model[entry.get("model") or ""]):
+                for position, candidate in enumerate(index):
+                    if candidate is entry:
+                        del index[position]
+                        break
+            return entry
+
+    def _wrap_ai(self, original: Callable) -> Callable:
+        from openai.types.chat import ChatCompletion
+
+        def create(client_self, *args, **kwargs):
+            entry = self._take_ai(kwargs)
+            self._delay(entry.get("elapsed_ms", 0.0))
+            return ChatCompletion.model_validate(entry["response"])
+        return create
+
+    def _wrap_http(self, original: Callable) -> Callable:
+        import requests
+        from requests.structures import CaseInsensitiveDict
+
+        fixture = self.fixture
+
+        def request(session_self, method, url, *args, **kwargs):
+            upload = self.uploads.get(url)
+            entry = fixture.http.get(_http_key(method, url))
+            if upload is None and entry is None:
+                self._miss(f"http {method.upper()} {url}")
+                raise requests.ConnectionError(f"replay: {url} was not recorded")
+            response = requests.Response()
+            response.url = url
+            response.request = requests.Request(method, url).prepare()
+            if upload is not None:
+                response.status_code = 200
+                response._content = upload
+                return response
+            self._delay(entry.get("elapsed_ms", 0.0))
+            response.status_code = entry["status"]
+            response.headers = CaseInsensitiveDict(entry.get("headers") or {})
+            response._content = fixture.get_blob(entry["body"])
+            return response
+        return request
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+
+def run_engine(url: str, quality_mode: str = "balanced") -> Dict[str, Any]:
+    """One uncached ``PreviewEngine.generate`` with wall time and outcome."""
+    from backend.services.demo_quality_profiles import get_quality_profile
+    from backend.services.preview_engine import PreviewEngine, PreviewEngineConfig
+
+    profile = get_quality_profile(quality_mode, url)
+    config = PreviewEngineConfig(
+        is_demo=True,
+        enable_brand_extraction=True,
+        enable_ai_reasoning=True,
+        enable_composited_image=True,
+        enable_cache=False,
+        enable_multi_agent=profile.multi_agent,
+        enable_ui_element_extraction=profile.ui_extraction,
+        quality_threshold=profile.threshold,
+        max_quality_iterations=profile.iterations,
+        allow_soft_pass=profile.allow_soft_pass,
+        enforce_target_quality=profile.enforce_target_quality,
+        min_soft_pass_overall=profile.min_soft_pass_overall,
+        min_soft_pass_visual=profile.min_soft_pass_visual,
+        min_soft_pass_fidelity=profile.min_soft_pass_fidelity,
+    )
+    started = time.perf_counter()
+    record: Dict[str, Any] = {"url": url, "quality_mode": profile.quality_mode}
+    try:
+        result = PreviewEngine(config).generate(url, cache_key_prefix=f"replay:{profile.quality_mode}:")
+        record.update(
+            status="ok",
+            title=result.title,
+            template_type=(result.blueprint or {}).get("template_type"),
+            processing_time_ms=result.processing_time_ms,
+            composited_image_sha=_digest(_decode_image(result.composited_preview_image_url)),
+        )
+    except Exception as exc:  # noqa: BLE001
+        record.update(status="fail", error=str(exc)[:500])
+    record["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    # Image variants and trace reports upload write-behind; drain them while the seams are patched
+    from backend.services.image_encoding import flush_image_variants
+    from backend.services.preview_tracer import flush_trace_reports
+
+    flush_image_variants()
+    flush_trace_reports()
+    return record
+
+
+def _decode_image(value: Optional[str]) -> str:
+    """Stable identity for the output image (data URL payload or URL)."""
+    if value and value.startswith("data:") and "," in value:
+        try:
+            return _digest(base64.b64decode(value.split(",", 1)[1]))
+        except ValueError:
+            pass
+    return value or ""
+
+
+def record_urls(urls: List[str], root: Path, quality_mode: str) -> List[Dict[str, Any]]:
+    from backend.services.preview_engine import PreviewEngine  # noqa: F401 — bind seams before patching
+
+    records = []
+    for url in urls:
+        fixture = Fixture.for_url(root, url)
+        with Recorder(fixture):
+            record = run_engine(url, quality_mode)
+        record.update(fixture=str(fixture.path), ai_calls=len(fixture.ai), http_fetches=len(fixture.http))
+        logger.info("Recorded %s -> %s (%s)", url, fixture.path, record["status"])
+        records.append(record)
+    return records
+
+
+def replay_fixtures(
+    fixtures: List[Fixture],
+    quality_mode: str,
+    repeat: int = 1,
+    latency_scale: float = 0.0,
+    latency_ms: float = 0.0,
+    seed: int = 1234,
+) -> List[Dict[str, Any]]:
+    from backend.services.preview_engine import PreviewEngine  # noqa: F401 — bind seams before patching
+
+    records = []
+    for fixture in fixtures:
+        for attempt in range(repeat):
+            random.seed(seed)
+            with Replayer(fixture, latency_scale=latency_scale, latency_ms=latency_ms) as replayer:
+                record = run_engine(fixture.url, quality_mode)
+            record.update(attempt=attempt, misses=replayer.misses)
+            records.append(record)
+    return records
+
+
+def summarize(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    elapsed = sorted(r["elapsed_ms"] for r in records if r.get("status") == "ok")
+
+    def _percentile(pct: float) -> Optional[float]:
+        if not elapsed:
+            return None
+        return elapsed[max(0, min(len(elapsed) - 1, int(round(pct / 100 * (len(elapsed) - 1)))))]
+
+    by_url: Dict[str, set] = defaultdict(set)
+    for r in records:
+        by_url[r["url"]].add(r.get("composited_image_sha"))
+    return {
+        "runs": len(records),
+        "ok": len(elapsed),
+        "p50_ms": _percentile(50),
+        "p95_ms": _percentile(95),
+        "mean_ms": round(sum(elapsed) / len(elapsed), 1) if elapsed else None,
+        "misses": sum(len(r.get("misses") or []) for r in records),
+        "nondeterministic_urls": sorted(url for url, shas in by_url.items() if len(shas) > 1),
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Record or replay preview engine jobs")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rec = sub.add_parser("record", help="Run live jobs and save their inputs")
+    rec.add_argument("urls", nargs="*")
+    rec.add_argument("--corpus", action="store_true", help="Record the golden corpus")
+    rec.add_argument("--max-urls", type=int, default=0)
+    rec.add_argument("--category", default=None)
+    rec.add_argument("--include-shadow", action="store_true")
+
+    rep = sub.add_parser("replay", help="Benchmark recorded jobs offline")
+    rep.add_argument("--repeat", type=int, default=1)
+    rep.add_argument("--latency-scale", type=float, default=0.0,
+                     help="Multiply recorded call latency (0 = none, 1 = as recorded)")
+    rep.add_argument("--latency-ms", type=float, default=0.0,
+                     help="Fixed delay added to every replayed call")
+    rep.add_argument("--seed", type=int, default=1234)
+    rep.add_argument("--output", default=None, help="Write records + summary JSON here")
+
+    for p in (rec, rep):
+        p.add_argument("--fixtures", default="artifacts/replay")
+        p.add_argument("--quality-mode", default="balanced", choices=["fast", "balanced", "ultra"])
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    root = Path(args.fixtures)
+
+    if args.command == "record":
+        urls = list(args.urls)
+        if args.corpus:
+            from backend.scripts.preview_engine.run_corpus import select_corpus
+            urls += [entry.url for entry in select_corpus(args)]
+        if not urls:
+            logger.error("Nothing to record: pass URLs or --corpus")
+            return 2
+        records = record_urls(urls, root, args.quality_mode)
+        print(json.dumps(records, indent=2))
+        return 0
+
+    fixtures = Fixture.discover(root)
+    if not fixtures:
+        logger.error("No fixtures under %s", root)
+        return 2
+    records = replay_fixtures(fixtures, args.quality_mode, args.repeat,
+                              args.latency_scale, args.latency_ms, args.seed)
+    summary = summarize(records)
+    if args.output:
+        Path(args.output).write_text(json.dumps({"summary": summary, "records": records}, indent=2))
+    print(json.dumps(summary, indent=2))
+    return 0 if summary["ok"] == summary["runs"] else 1
+
+
+if __name__ == "__main__":  # pragma: no cover
+    sys.exit(main())
@@ -6,23 +6,33 @@ walks the golden corpus, calls the engine, and writes per-URL outputs into
 ``artifacts/baseline/<date>/``. The same script is invoked from the nightly
 CI workflow (Phase 7) to drive the regression dashboard.
 
+Jobs run in a process pool (``--workers``) so CPU-bound rendering in one
+job does not hold the GIL against the others. Each record carries the
+job's stage timings (from its JobTrace), and ``SUMMARY.json`` adds
+per-category and per-stage latency tables next to the headline numbers.
+
 Usage:
     python -m backend.scripts.preview_engine.run_corpus \\
         --output-dir artifacts/baseline \\
         --max-urls 5  # smoke run
+
+    # Diff two runs; exits 1 when a significant regression is found
+    python -m backend.scripts.preview_engine.run_corpus compare \\
+        artifacts/baseline/2024-05-01-060000 artifacts/baseline/2024-05-02-060000
 """
 from __future__ import annotations
 
 import argparse
 import json
 import logging
+import math
 import os
 import sys
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 logging.basicConfig(
     level=os.environ.get("LOG_LEVEL", "INFO"),
@@ -63,7 +73,7 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     parser.add_argument("--quality-mode", default="balanced",
                         choices=["fast", "balanced", "ultra"])
     parser.add_argument("--workers", type=int, default=2,
-                        help="Concurrent jobs (default 2)")
+                        help="Concurrent jobs in a process pool (default 2)")
     parser.add_argument("--dry-run", action="store_true",
                         help="Just print the corpus and exit")
     return parser.parse_args(argv)
@@ -126,7 +136,10 @@ def run_single(
             "title_match": entry.matches_title(result.title or ""),
             "default_palette_used": _has_default_palette(result.blueprint or {}),
             "primary_image_url": result.composited_preview_image_url,
+            "visual_quality": (result.quality_scores or {}).get("visual_quality"),
         })
+        job_id = ((result.quality_scores or {}).get("debug") or {}).get("request_id")
+        record.update(_trace_fields(job_id, entry.url))
     except Exception as exc:  # noqa: BLE001
         logger.exception("Corpus run failed for %s", entry.url)
         record.update({
@@ -134,6 +147,7 @@ def run_single(
             "error": str(exc),
             "title_match": False,
         })
+        record.update(_trace_fields(None, entry.url))
 
     record["elapsed_seconds"] = round(time.time() - started, 2)
     record["finished_at"] = datetime.utcnow().isoformat()
@@ -143,12 +157,92 @@ def run_single(
     return record
 
 
+def _trace_fields(job_id: Optional[str], url: str) -> Dict[str, Any]:
+    """Stage timings from the job's trace in this process's JobTrace store.
+
+    Each pool process runs one job at a time, so when the engine failed
+    before returning a request id the most recent trace for the URL is it.
+    """
+    from backend.services.preview.observability.job_trace import JobTraceStore
+
+    store = JobTraceStore.get_instance()
+    trace = store.get(job_id) if job_id else None
+    if trace is None:
+        trace = next((t for t in store.list_recent(limit=5) if t.get("url", "").rstrip("/") == url.rstrip("/")), None)
+    if not trace:
+        return {"stages": {}}
+    stages: Dict[str, float] = {}
+    for timing in trace.get("stage_timings") or []:
+        if not timing.get("skipped"):
+            name = timing["name"]
+            stages[name] = round(stages.get(name, 0.0) + float(timing["duration_ms"]), 1)
+    return {"job_id": trace.get("job_id"), "total_ms": trace.get("total_ms"), "stages": stages}
+
+
 def _has_default_palette(blueprint: Dict[str, Any]) -> bool:
     """Heuristic for "default" palette = the engine's hard-coded blue."""
     primary = (blueprint.get("primary_color") or "").lower()
     return primary in {"#2563eb", "#3b82f6", "#1e40af"}
 
 
+def _percentile(values: List[float], pct: float) -> Optional[float]:
+    """Percentile of an already sorted list (``None`` when empty)."""
+    if not values:
+        return None
+    k = max(0, min(len(values) - 1, int(round((pct / 100) * (len(values) - 1)))))
+    return values[k]
+
+
+def _durations(records: Iterable[Dict[str, Any]]) -> List[float]:
+    return sorted(r["processing_time_ms"] for r in records
+                  if r.get("status") == "ok" and isinstance(r.get("processing_time_ms"), (int, float)))
+
+
+def _stage_samples(records: Iterable[Dict[str, Any]]) -> Dict[str, List[float]]:
+    samples: Dict[str, List[float]] = {}
+    for record in records:
+        for name, ms in (record.get("stages") or {}).items():
+            samples.setdefault(name, []).append(float(ms))
+    return samples
+
+
+def category_table(records: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Latency and quality per corpus category."""
+    by_category: Dict[str, List[Dict[str, Any]]] = {}
+    for record in records:
+        by_category.setdefault(record.get("category") or "unknown", []).append(record)
+    table: Dict[str, Dict[str, Any]] = {}
+    for category, items in sorted(by_category.items()):
+        ok = [r for r in items if r.get("status") == "ok"]
+        durations = _durations(items)
+        table[category] = {
+            "total": len(items),
+            "successful": len(ok),
+            "success_rate": round(len(ok) / len(items), 3),
+            "title_fidelity": round(sum(1 for r in ok if r.get("title_match")) / max(1, len(ok)), 3),
+            "p50_ms": _percentile(durations, 50),
+            "p95_ms": _percentile(durations, 95),
+        }
+    return table
+
+
+def stage_table(records: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Per-stage latency and its share of summed stage time."""
+    samples = _stage_samples(records)
+    grand_total = sum(sum(v) for v in samples.values()) or 1.0
+    table: Dict[str, Dict[str, Any]] = {}
+    for name, values in sorted(samples.items(), key=lambda kv: -sum(kv[1])):
+        values = sorted(values)
+        table[name] = {
+            "count": len(values),
+            "mean_ms": round(sum(values) / len(values), 1),
+            "p50_ms": _percentile(values, 50),
+            "p95_ms": _percentile(values, 95),
+            "share": round(sum(values) / grand_total, 3),
+        }
+    return table
+
+
 def aggregate(records: List[Dict[str, Any]]) -> Dict[str, Any]:
     if not records:
         return {}
@@ -160,15 +254,7 @@ def aggregate(records: List[Dict[str, Any]]) -> Dict[str, Any]:
     title_matches = sum(1 for r in successes if r.get("title_match"))
     default_palette_count = sum(1 for r in successes if r.get("default_palette_used"))
 
-    durations_ms = [r.get("processing_time_ms") for r in successes
-                    if isinstance(r.get("processing_time_ms"), (int, float))]
-    durations_ms.sort()
-
-    def _percentile(values: List[float], pct: float) -> Optional[float]:
-        if not values:
-            return None
-        k = max(0, min(len(values) - 1, int(round((pct / 100) * (len(values) - 1)))))
-        return values[k]
+    durations_ms = _durations(records)
 
     aggregate_record: Dict[str, Any] = {
         "total": total,
@@ -180,11 +266,282 @@ def aggregate(records: List[Dict[str, Any]]) -> Dict[str, Any]:
         "p50_ms": _percentile(durations_ms, 50),
         "p95_ms": _percentile(durations_ms, 95),
         "fails_by_url": [r.get("url") for r in fails],
+        "by_category": category_table(records),
+        "stages": stage_table(records),
     }
     return aggregate_record
 
 
+def format_tables(summary: Dict[str, Any]) -> str:
+    """Plain-text per-category and per-stage tables for the console."""
+    def ms(value: Optional[float]) -> str:
+        return "-" if value is None else f"{value:.0f}"
+
+    lines = [f"{'category':<16}{'n':>4}{'ok%':>7}{'title%':>8}{'p50_ms':>9}{'p95_ms':>9}"]
+    for category, row in (summary.get("by_category") or {}).items():
+        lines.append(
+            f"{category:<16}{row['total']:>4}{row['success_rate'] * 100:>6.0f}%"
+            f"{row['title_fidelity'] * 100:>7.0f}%{ms(row['p50_ms']):>9}{ms(row['p95_ms']):>9}"
+        )
+    lines.append("")
+    lines.append(f"{'stage':<28}{'n':>4}{'mean_ms':>9}{'p50_ms':>9}{'p95_ms':>9}{'share':>7}")
+    for name, row in (summary.get("stages") or {}).items():
+        lines.append(
+            f"{name:<28}{row['count']:>4}{ms(row['mean_ms']):>9}{ms(row['p50_ms']):>9}"
+            f"{ms(row['p95_ms']):>9}{row['share'] * 100:>6.0f}%"
+        )
+    return "\n".join(lines)
+
+
+# ---------------------------------------------------------------------------
+# Run-to-run comparison
+# ---------------------------------------------------------------------------
+
+
+def _normal_sf(z: float) -> float:
+    """Upper-tail probability of the standard normal."""
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def mann_whitney_greater(baseline: List[float], candidate: List[float]) -> Optional[float]:
+    """One-sided Mann-Whitney U p-value for "candidate tends to be larger".
+
+    Normal approximation with tie correction; ``None`` when either side has
+    fewer than 3 samples (too few for the approximation to mean anything).
+    """
+    n1, n2 = len(candidate), len(baseline)
+    if n1 < 3 or n2 < 3:
+        return None
+    pooled = sorted([(v, 0) for v in candidate] + [(v, 1) for v in baseline])
+    ranks = [0.0] * len(pooled)
+    ties = 0.0
+    i = 0
+    while i < len(pooled):
+        j = i
+        while j + 1 < len(pooled) and pooled[j + 1][0] == pooled[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2.0 + 1
+        t = j - i + 1
+        ties += t ** 3 - t
+        i = j + 1
+    rank_sum = sum(r for r, (_, side) in zip(ranks, pooled) if side == 0)
+    u = rank_sum - n1 * (n1 + 1) / 2.0
+    n = n1 + n2
+    variance = n1 * n2 / 12.0 * ((n + 1) - ties / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (u - n1 * n2 / 2.0 - 0.5) / math.sqrt(variance)  # continuity correction
+    return _normal_sf(z)
+
+
+def proportion_drop(base_hits: int, base_n: int, cand_hits: int, cand_n: int) -> Optional[float]:
+    """One-sided two-proportion z-test p-value for "candidate rate is lower"."""
+    if base_n < 3 or cand_n < 3:
+        return None
+    pooled = (base_hits + cand_hits) / (base_n + cand_n)
+    se = math.sqrt(pooled * (1 - pooled) * (1 / base_n + 1 / cand_n))
+    if se == 0:
+        return 1.0
+    return _normal_sf((base_hits / base_n - cand_hits / cand_n) / se)
+
+
+def load_run(run_dir: Path) -> List[Dict[str, Any]]:
+    """Per-URL records of a run directory (everything but SUMMARY.json)."""
+    records = []
+    for path in sorted(Path(run_dir).glob("*.json")):
+        if path.name == "SUMMARY.json":
+            continue
+        try:
+            records.append(json.loads(path.read_text()))
+        except (OSError, ValueError) as exc:
+            logger.warning("Skipping unreadable record %s: %s", path, exc)
+    return records
+
+
+def _median(values: List[float]) -> Optional[float]:
+    return _percentile(sorted(values), 50)
+
+
+# Checks carry the raw p-value and whether the effect clears its minimum;
+# ``compare_runs`` decides ``regression`` once the whole family is known.
+
+
+def _latency_check(scope: str, name: str, base: List[float], cand: List[float],
+                   min_effect: float) -> Dict[str, Any]:
+    base_med, cand_med = _median(base), _median(cand)
+    ratio = (cand_med / base_med) if base_med and cand_med is not None else None
+    return {
+        "scope": scope, "name": name, "metric": "latency_ms",
+        "baseline": base_med, "candidate": cand_med,
+        "change": None if ratio is None else round(ratio - 1, 3),
+        "p_value": mann_whitney_greater(base, cand),
+        "n": [len(base), len(cand)],
+        "material": ratio is not None and ratio > 1 + min_effect,
+    }
+
+
+def _rate_check(scope: str, name: str, metric: str, base: Tuple[int, int], cand: Tuple[int, int],
+                min_effect: float) -> Dict[str, Any]:
+    base_rate = base[0] / base[1] if base[1] else None
+    cand_rate = cand[0] / cand[1] if cand[1] else None
+    drop = None if base_rate is None or cand_rate is None else base_rate - cand_rate
+    return {
+        "scope": scope, "name": name, "metric": metric,
+        "baseline": None if base_rate is None else round(base_rate, 3),
+        "candidate": None if cand_rate is None else round(cand_rate, 3),
+        "change": None if drop is None else round(-drop, 3),
+        "p_value": proportion_drop(base[0], base[1], cand[0], cand[1]),
+        "n": [base[1], cand[1]],
+        "material": drop is not None and drop > min_effect,
+    }
+
+
+def _score_check(scope: str, name: str, base: List[float], cand: List[float],
+                 min_effect: float) -> Dict[str, Any]:
+    # Lower is worse for scores: test "baseline tends to be larger".
+    base_med, cand_med = _median(base), _median(cand)
+    drop = None if base_med is None or cand_med is None else base_med - cand_med
+    return {
+        "scope": scope, "name": name, "metric": "visual_quality",
+        "baseline": base_med, "candidate": cand_med,
+        "change": None if drop is None else round(-drop, 3),
+        "p_value": mann_whitney_greater(cand, base),
+        "n": [len(base), len(cand)],
+        "material": drop is not None and drop > min_effect,
+    }
+
+
+def holm_adjust(p_values: List[Optional[float]]) -> List[Optional[float]]:
+    """Holm-Bonferroni adjusted p-values, in input order (``None`` passes through).
+
+    Rejecting every adjusted p-value below ``alpha`` keeps the chance of any
+    false positive across the whole family at ``alpha``.
+    """
+    order = sorted((i for i, p in enumerate(p_values) if p is not None), key=lambda i: p_values[i])
+    adjusted: List[Optional[float]] = [None] * len(p_values)
+    running = 0.0
+    for rank, i in enumerate(order):
+        running = max(running, min(1.0, (len(order) - rank) * p_values[i]))
+        adjusted[i] = running
+    return adjusted
+
+
+def compare_runs(
+    baseline: List[Dict[str, Any]],
+    candidate: List[Dict[str, Any]],
+    alpha: float = 0.05,
+    min_latency_change: float = 0.10,
+    min_quality_drop: float = 0.05,
+) -> Dict[str, Any]:
+    """Diff two runs per stage and per category.
+
+    A latency regression needs both a one-sided Mann-Whitney p-value below
+    ``alpha`` and a median slowdown above ``min_latency_change`` (relative);
+    a quality regression needs a significant drop in success rate, title
+    fidelity or visual-quality score larger than ``min_quality_drop``.
+    P-values are Holm-Bonferroni adjusted across all checks first, so
+    ``alpha`` bounds the chance that two equivalent runs report anything.
+    """
+    checks: List[Dict[str, Any]] = []
+
+    base_stages, cand_stages = _stage_samples(baseline), _stage_samples(candidate)
+    for name in sorted(set(base_stages) & set(cand_stages)):
+        checks.append(_latency_check("stage", name, base_stages[name], cand_stages[name],
+                                     min_latency_change))
+
+    def by_category(records):
+        grouped: Dict[str, List[Dict[str, Any]]] = {"all": list(records)}
+        for r in records:
+            grouped.setdefault(r.get("category") or "unknown", []).append(r)
+        return grouped
+
+    base_cats, cand_cats = by_category(baseline), by_category(candidate)
+    for category in sorted(set(base_cats) & set(cand_cats), key=lambda c: (c != "all", c)):
+        base, cand = base_cats[category], cand_cats[category]
+        checks.append(_latency_check("category", category, _durations(base), _durations(cand),
+                                     min_latency_change))
+        base_ok = [r for r in base if r.get("status") == "ok"]
+        cand_ok = [r for r in cand if r.get("status") == "ok"]
+        checks.append(_rate_check("category", category, "success_rate",
+                                  (len(base_ok), len(base)), (len(cand_ok), len(cand)),
+                                  min_quality_drop))
+        checks.append(_rate_check("category", category, "title_fidelity",
+                                  (sum(1 for r in base_ok if r.get("title_match")), len(base_ok)),
+                                  (sum(1 for r in cand_ok if r.get("title_match")), len(cand_ok)),
+                                  min_quality_drop))
+        base_vq = [float(r["visual_quality"]) for r in base_ok if isinstance(r.get("visual_quality"), (int, float))]
+        cand_vq = [float(r["visual_quality"]) for r in cand_ok if isinstance(r.get("visual_quality"), (int, float))]
+        if base_vq and cand_vq:
+            checks.append(_score_check("category", category, base_vq, cand_vq, min_quality_drop))
+
+    adjusted = holm_adjust([c["p_value"] for c in checks])
+    for check, p_adjusted in zip(checks, adjusted):
+        material = check.pop("material")
+        check["regression"] = bool(p_adjusted is not None and p_adjusted < alpha and material)
+        if check["p_value"] is not None:
+            check["p_value"] = round(check["p_value"], 4)
+        check["p_adjusted"] = None if p_adjusted is None else round(p_adjusted, 4)
+
+    regressions = [c for c in checks if c["regression"]]
+    return {
+        "alpha": alpha,
+        "correction": "holm",
+        "min_latency_change": min_latency_change,
+        "min_quality_drop": min_quality_drop,
+        "checks": checks,
+        "regressions": regressions,
+    }
+
+
+def format_comparison(result: Dict[str, Any]) -> str:
+    def fmt(value: Any) -> str:
+        if value is None:
+            return "-"
+        return f"{value:.3f}" if isinstance(value, float) and abs(value) < 10 else f"{value:.0f}"
+
+    lines = [f"{'scope':<9}{'name':<26}{'metric':<16}{'base':>9}{'cand':>9}{'change':>9}{'p':>8}{'p_adj':>8}  flag"]
+    for c in result["checks"]:
+        change = "-" if c["change"] is None else f"{c['change'] * 100:+.1f}%"
+        lines.append(
+            f"{c['scope']:<9}{c['name']:<26}{c['metric']:<16}{fmt(c['baseline']):>9}"
+            f"{fmt(c['candidate']):>9}{change:>9}{fmt(c['p_value']):>8}{fmt(c['p_adjusted']):>8}  "
+            + ("REGRESSION" if c["regression"] else "")
+        )
+    lines.append(f"{len(result['regressions'])} significant regression(s)")
+    return "\n".join(lines)
+
+
+def compare_main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description="Compare two corpus runs")
+    parser.add_argument("baseline", help="Baseline run directory")
+    parser.add_argument("candidate", help="Candidate run directory")
+    parser.add_argument("--alpha", type=float, default=0.05,
+                        help="Family-wise significance level across all checks (Holm-adjusted)")
+    parser.add_argument("--min-latency-change", type=float, default=0.10,
+                        help="Relative median slowdown that counts as a regression")
+    parser.add_argument("--min-quality-drop", type=float, default=0.05,
+                        help="Absolute rate/score drop that counts as a regression")
+    parser.add_argument("--output", default=None, help="Write the comparison JSON here")
+    args = parser.parse_args(argv)
+
+    result = compare_runs(
+        load_run(Path(args.baseline)),
+        load_run(Path(args.candidate)),
+        alpha=args.alpha,
+        min_latency_change=args.min_latency_change,
+        min_quality_drop=args.min_quality_drop,
+    )
+    print(format_comparison(result))
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, indent=2))
+    return 1 if result["regressions"] else 0
+
+
 def main(argv: Optional[List[str]] = None) -> int:
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if argv[:1] == ["compare"]:
+        return compare_main(argv[1:])
     args = parse_args(argv)
     urls = select_corpus(args)
     if args.dry_run:
@@ -202,7 +559,7 @@ def main(argv: Optional[List[str]] = None) -> int:
             records.append(run_single(entry=entry, output_dir=run_dir,
                                        quality_mode=args.quality_mode))
     else:
-        with ThreadPoolExecutor(max_workers=args.workers) as ex:
+        with ProcessPoolExecutor(max_workers=args.workers) as ex:
             futures = {
                 ex.submit(run_single, entry=entry, output_dir=run_dir,
                           quality_mode=args.quality_mode): entry
@@ -214,7 +571,9 @@ def main(argv: Optional[List[str]] = None) -> int:
     summary = aggregate(records)
     summary_path = run_dir / "SUMMARY.json"
     summary_path.write_text(json.dumps(summary, indent=2))
-    logger.info("Run complete: %s", summary)
+    print(format_tables(summary))
+    logger.info("Run complete: success_rate=%s p50_ms=%s p95_ms=%s",
+                summary.get("success_rate"), summary.get("p50_ms"), summary.get("p95_ms"))
     return 0
 
 
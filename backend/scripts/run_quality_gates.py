@@ -6,6 +6,7 @@ Run before final PR to validate:
 - Regression tests pass
 - Schema contracts hold
 - Throughput validation logic (400% improvement measurable)
+- Rendering micro-benchmarks within tolerance of their baseline
 - No critical quality regressions
 
 Usage:
@@ -121,6 +122,31 @@ def gate_throughput_validation() -> Tuple[bool, str]:
         return False, str(e)
 
 
+def gate_rendering_benchmarks() -> Tuple[bool, str]:
+    """Fail when a rendering function regressed beyond its baseline tolerance."""
+    if os.environ.get("RENDER_BENCHMARK_SKIP") == "1":
+        return True, "Rendering benchmarks skipped (RENDER_BENCHMARK_SKIP=1)"
+    try:
+        root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        env = os.environ.copy()
+        env["PYTHONPATH"] = root
+        result = subprocess.run(
+            [sys.executable, "backend/scripts/benchmark_rendering.py", "--check"],
+            capture_output=True,
+            text=True,
+            timeout=900,
+            cwd=root,
+            env=env,
+        )
+        if result.returncode == 0:
+            return True, "Rendering benchmarks within baseline tolerance"
+        return False, f"Rendering benchmarks regressed:\n{result.stdout or result.stderr}"
+    except subprocess.TimeoutExpired:
+        return False, "Rendering benchmarks timed out"
+    except Exception as e:
+        return False, str(e)
+
+
 def main() -> int:
     """Run all quality gates."""
     root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -132,6 +158,7 @@ def main() -> int:
         ("Schema contracts", gate_schema_contracts),
         ("Regression tests", gate_regression_tests),
         ("Throughput validation", gate_throughput_validation),
+        ("Rendering benchmarks", gate_rendering_benchmarks),
     ]
 
     results = []
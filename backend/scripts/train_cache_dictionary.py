@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Train a zstd dictionary for cached preview payloads and report codec gains.
+
+Samples live cache entries from Redis (legacy JSON or codec envelopes),
+trains a dictionary on their msgpack form, and prints per-codec size,
+compression ratio versus JSON, and encode/decode times.
+
+Usage:
+  cd <project_root>
+  PYTHONPATH=. python backend/scripts/train_cache_dictionary.py --output cache_v1.zdict
+  PYTHONPATH=. python backend/scripts/train_cache_dictionary.py --report-only
+
+Deploy the dictionary by listing it first in PREVIEW_CACHE_ZSTD_DICTS; keep
+older dictionaries after it until their entries have expired.
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from typing import Any, Dict, List
+
+PATTERNS = ["demo:preview:*", "preview:engine:*", "preview:analysis:*", "preview:focus:*"]
+
+
+def sample_payloads(limit: int) -> List[Any]:
+    """Pull up to ``limit`` decoded cache entries from Redis."""
+    from backend.services.cache_codec import decode_payload
+    from backend.services.preview_cache import get_redis_binary_client
+
+    client = get_redis_binary_client()
+    if client is None:
+        raise RuntimeError("Redis is not available")
+
+    samples: List[Any] = []
+    for pattern in PATTERNS:
+        for key in client.scan_iter(match=pattern, count=500):
+            raw = client.get(key)
+            if not raw:
+                continue
+            try:
+                samples.append(decode_payload(raw))
+            except ValueError:
+                continue
+            if len(samples) >= limit:
+                return samples
+    return samples
+
+
+def measure(samples: List[Any]) -> Dict[str, Dict[str, float]]:
+    """Size and timing per installed codec, relative to plain JSON."""
+    from backend.services import cache_codec
+
+    json_bytes = sum(len(json.dumps(s, default=str)) for s in samples)
+    report: Dict[str, Dict[str, float]] = {}
+    for name in ("json", "msgpack", "msgpack+zstd"):
+        codec = cache_codec.get_codec(name)
+        if codec.name != name:
+            continue
+        encode_ms: List[float] = []
+        decode_ms: List[float] = []
+        encoded_bytes = 0
+        for sample in samples:
+            started = time.perf_counter()
+            payload = cache_codec.encode_payload(sample, codec)
+            encode_ms.append((time.perf_counter() - started) * 1000)
+            encoded_bytes += len(payload)
+            started = time.perf_counter()
+            cache_codec.decode_payload(payload)
+            decode_ms.append((time.perf_counter() - started) * 1000)
+        report[name] = {
+            "bytes": encoded_bytes,
+            "ratio_vs_json": round(json_bytes / encoded_bytes, 2) if encoded_bytes else 0.0,
+            "bytes_saved": json_bytes - encoded_bytes,
+            "encode_ms_p50": round(statistics.median(encode_ms), 3),
+            "decode_ms_p50": round(statistics.median(decode_ms), 3),
+        }
+    return report
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Train a zstd dictionary for the preview cache")
+    parser.add_argument("--samples", type=int, default=2000, help="Max cache entries to sample")
+    parser.add_argument("--dict-size", type=int, default=112 * 1024, help="Dictionary size in bytes")
+    parser.add_argument("--output", default="preview_cache.zdict", help="Where to write the dictionary")
+    parser.add_argument("--report-only", action="store_true", help="Measure codecs without training")
+    args = parser.parse_args()
+
+    from backend.services import cache_codec
+
+    try:
+        samples = sample_payloads(args.samples)
+    except Exception as e:
+        print(f"ERROR: {e}")
+        return 2
+    if len(samples) < 10:
+        print(f"ERROR: only {len(samples)} cache entries found; need at least 10 to train")
+        return 2
+    print(f"Sampled {len(samples)} cache entries")
+
+    if not args.report_only:
+        dictionary = cache_codec.train_dictionary(samples, dict_size=args.dict_size)
+        with open(args.output, "wb") as fh:
+            fh.write(dictionary.as_bytes())
+        cache_codec.dictionaries.register(dictionary)
+        print(f"Wrote dictionary {dictionary.dict_id()} ({len(dictionary.as_bytes())} bytes) to {args.output}")
+
+    print(json.dumps(measure(samples), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -20,7 +20,11 @@ from typing import Dict, Any, List, Tuple, Optional
 from dataclasses import dataclass
 from PIL import Image, ImageDraw, ImageFilter, ImageEnhance
 
+from backend.services import image_effects
+from backend.services.text_layout import font_metrics, track_render
 from backend.services.design_dna_extractor import DesignDNA
+from backend.services.font_registry import SANS_FALLBACKS, get_font_registry
+from backend.services.image_loading import load_image, resize_image, track_images
 from backend.services.typography_intelligence import (
     TypographyConfig, 
     get_typography_config,
@@ -473,7 +477,7 @@ def apply_gradient_background(
     # Generate smooth gradient using LAB color space
     logger.info(f"🎨 [ADAPTIVE_TEMPLATE] Calling generate_smooth_gradient...")
     gradient_img = generate_smooth_gradient(
-        width, height, color1, color2, angle=angle, style=style
+        width, height, color1, color2, angle=angle, style=style, template="adaptive"
     )
     
     logger.info(f"🎨 [ADAPTIVE_TEMPLATE] Gradient generated: {gradient_img.size}, mode={gradient_img.mode}")
@@ -484,57 +488,16 @@ def apply_gradient_background(
 
 
 def apply_noise_texture(image: Image.Image, intensity: float = 0.03) -> Image.Image:
-    """Apply subtle noise texture for sophisticated look."""
-    import random
-    
-    pixels = image.load()
-    width, height = image.size
-    
-    for y in range(height):
-        for x in range(width):
-            r, g, b = pixels[x, y][:3]
-            
-            noise = int((random.random() - 0.5) * 255 * intensity)
-            
-            r = max(0, min(255, r + noise))
-            g = max(0, min(255, g + noise))
-            b = max(0, min(255, b + noise))
-            
-            pixels[x, y] = (r, g, b)
-    
-    return image
+    """Apply subtle noise texture for sophisticated look (cached grain field)."""
+    return image_effects.apply_noise(image, intensity=intensity)
 
 
 def apply_vignette(image: Image.Image, intensity: float = 0.3) -> Image.Image:
     """
-    Apply vignette effect for depth using numpy for smooth rendering.
-    FIXED: Uses array-based calculation to avoid banding.
+    Apply vignette effect for depth (quadratic falloff toward black).
+    The radial mask is cached per (size, intensity).
     """
-    import numpy as np
-    
-    width, height = image.size
-    
-    # Create radial gradient mask using numpy
-    cx, cy = width // 2, height // 2
-    max_dist = math.sqrt(cx**2 + cy**2)
-    
-    y_coords = np.arange(height)[:, np.newaxis] - cy
-    x_coords = np.arange(width)[np.newaxis, :] - cx
-    
-    # Calculate distance from center
-    dist = np.sqrt(x_coords**2 + y_coords**2)
-    t = dist / max_dist
-    
-    # Stronger at edges (quadratic falloff)
-    brightness = (255 * (1 - t * t * intensity)).astype(np.uint8)
-    
-    # Create mask from array
-    mask = Image.fromarray(brightness, mode='L')
-    
-    # Apply mask
-    image = Image.composite(image, Image.new('RGB', (width, height), (0, 0, 0)), mask)
-    
-    return image
+    return image_effects.apply_vignette(image, intensity=intensity)
 
 
 def add_glassmorphism_card(
@@ -629,14 +592,14 @@ def load_pillow_font(font_list: List[str], size: int, bold: bool = True, persona
     Returns:
         PIL ImageFont object
     """
-    from PIL import ImageFont
+    registry = get_font_registry()
     
     # PHASE 7: Try FontManager first if personality is provided
     if FONT_MANAGER_AVAILABLE and personality:
         try:
             font_path = get_headline_font_path(personality)
             if font_path:
-                return ImageFont.truetype(font_path, size)
+                return registry.font_from_path(font_path, size)
         except Exception as e:
             logger.debug(f"FontManager font loading failed: {e}")
     
@@ -645,28 +608,12 @@ def load_pillow_font(font_list: List[str], size: int, bold: bool = True, persona
     
     if font_path:
         try:
-            return ImageFont.truetype(font_path, size)
-        except:
+            return registry.font_from_path(font_path, size)
+        except Exception:
             pass
     
-    # Fallback paths
-    fallback_paths = [
-        "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
-        "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
-        "/usr/share/fonts/truetype/liberation/LiberationSans-Bold.ttf",
-        "/usr/share/fonts/truetype/freefont/FreeSansBold.ttf"
-    ]
-    
-    if not bold:
-        fallback_paths = [p.replace("-Bold", "") for p in fallback_paths]
-    
-    for path in fallback_paths:
-        try:
-            return ImageFont.truetype(path, size)
-        except:
-            continue
-    
-    return ImageFont.load_default()
+    # Fallback: installed sans-serif families, then Pillow's bitmap font
+    return registry.font(SANS_FALLBACKS, size, weight=700 if bold else 400)
 
 
 # =============================================================================
@@ -1599,8 +1546,8 @@ class AdaptiveTemplateEngine:
         # Add screenshot as subtle background for certain styles
         if screenshot_bytes and style in ["bold", "playful", "maximalist"]:
             try:
-                screenshot = Image.open(BytesIO(screenshot_bytes)).convert('RGB')
-                screenshot = screenshot.resize((self.width, self.height), Image.Resampling.LANCZOS)
+                screenshot = load_image(screenshot_bytes, 'RGB')
+                screenshot = resize_image(screenshot, (self.width, self.height))
                 
                 # Darken and blur
                 screenshot = screenshot.filter(ImageFilter.GaussianBlur(radius=3))
@@ -1903,7 +1850,7 @@ class AdaptiveTemplateEngine:
         try:
             import base64
             logo_data = base64.b64decode(logo_base64)
-            logo_img = Image.open(BytesIO(logo_data)).convert('RGBA')
+            logo_img = load_image(logo_data, 'RGBA', target=(w, h))
             
             # Resize preserving aspect ratio
             logo_ratio = logo_img.width / logo_img.height
@@ -1914,7 +1861,7 @@ class AdaptiveTemplateEngine:
                 new_h = min(h, logo_img.height)
                 new_w = int(new_h * logo_ratio)
             
-            logo_img = logo_img.resize((new_w, new_h), Image.Resampling.LANCZOS)
+            logo_img = resize_image(logo_img, (new_w, new_h))
             
             # Create white background for logo if needed
             if self.dna.color_psychology.light_dark_balance < 0.4:
@@ -2274,8 +2221,10 @@ class AdaptiveTemplateEngine:
         FIXED: Single clean shadow, no multi-layer mess.
         
         PIL doesn't support letter spacing directly, so we draw each character separately.
+        Character widths come from the shared glyph cache (text_layout).
         """
         x, y = position
+        metrics = font_metrics(font)
         
         # Draw shadow if enabled - SINGLE layer only for clean look
         if shadow_params and shadow_params.get("enabled"):
@@ -2287,28 +2236,14 @@ class AdaptiveTemplateEngine:
                 # Draw single shadow
                 draw.text((current_x + offset[0], y + offset[1]), str(char), font=font, fill=shadow_fill)
                 
-                # Get character width
-                try:
-                    bbox = draw.textbbox((0, 0), char, font=font)
-                    char_width = bbox[2] - bbox[0]
-                except:
-                    char_width = font.size if hasattr(font, 'size') else 20
-                
-                current_x += char_width + letter_spacing_px
+                current_x += metrics.char_width(char) + letter_spacing_px
         
         # Draw main text
         current_x = x
         for char in text:
             draw.text((current_x, y), str(char), font=font, fill=color)
             
-            # Get character width
-            try:
-                bbox = draw.textbbox((0, 0), char, font=font)
-                char_width = bbox[2] - bbox[0]
-            except:
-                char_width = font.size if hasattr(font, 'size') else 20
-            
-            current_x += char_width + letter_spacing_px
+            current_x += metrics.char_width(char) + letter_spacing_px
     
     def _get_color_for_element(self, element_type: str) -> Tuple[int, int, int]:
         """
@@ -2455,6 +2390,8 @@ class AdaptiveTemplateEngine:
 # CONVENIENCE FUNCTIONS
 # =============================================================================
 
+@track_images("adaptive_preview")
+@track_render("adaptive_preview")
 def generate_adaptive_preview(
     design_dna: DesignDNA,
     title: str,
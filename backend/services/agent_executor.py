@@ -27,6 +27,8 @@ from openai import OpenAI
 from PIL import Image
 
 from backend.core.config import settings
+from backend.services.cancellation import bounded_timeout
+from backend.services.preview.observability.metrics import record_ai_usage
 from backend.services.agent_protocol import (
     AgentType, AgentMessage, AgentResponse
 )
@@ -722,7 +724,8 @@ Create a coherent, high-quality unified output from all agent contributions."""
                 ],
                 max_tokens=config.max_tokens,
                 temperature=config.temperature,
-                response_format={"type": "json_object"} if config.model != "gpt-4o" else None
+                response_format={"type": "json_object"} if config.model != "gpt-4o" else None,
+                timeout=bounded_timeout(60),
             )
             
             # Parse response
@@ -747,6 +750,8 @@ Create a coherent, high-quality unified output from all agent contributions."""
                 else:
                     result = {"raw_response": content, "parse_error": True}
             
+            record_ai_usage(config.model, response.usage)
+
             # Calculate cost (approximate)
             prompt_tokens = response.usage.prompt_tokens if response.usage else 0
             completion_tokens = response.usage.completion_tokens if response.usage else 0
@@ -26,6 +26,7 @@ from openai import OpenAI
 from openai.types.chat import ChatCompletion
 
 from backend.core.config import settings
+from backend.services.cancellation import bounded_timeout
 from backend.services.circuit_breaker import get_circuit_breaker, CircuitBreakerConfig, CircuitBreakerOpenError
 from backend.services.enhanced_retry import enhanced_sync_retry, ErrorType
 from backend.services.observability import track_ai_call, AIMetrics, log_ai_metrics, StructuredLogger
@@ -189,7 +190,7 @@ class OpenAIProvider(BaseAIProvider):
             "messages": messages,
             "temperature": temperature,
             "max_tokens": max_tokens,
-            "timeout": timeout,
+            "timeout": bounded_timeout(timeout),
         }
 
         if response_format:
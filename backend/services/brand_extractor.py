@@ -27,6 +27,8 @@ from bs4 import BeautifulSoup
 
 logger = logging.getLogger(__name__)
 
+from backend.services.cancellation import bounded_timeout
+
 # AI Logo Detection Integration
 try:
     from openai import OpenAI
@@ -113,7 +115,7 @@ def extract_logo_with_ai(screenshot_bytes: bytes, url: str = "") -> Optional[Dic
         image_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
         
         # Call GPT-4o vision
-        client = OpenAI(api_key=settings.OPENAI_API_KEY, timeout=30)
+        client = OpenAI(api_key=settings.OPENAI_API_KEY, timeout=bounded_timeout(30))
         
         try:
             from backend.prompts.loader import MODEL_BRAND_EXTRACTION
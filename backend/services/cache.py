@@ -1,4 +1,5 @@
 """Redis-based caching service for hot data."""
+import hashlib
 import json
 import logging
 from typing import Optional, Any
@@ -11,6 +12,7 @@ logger = logging.getLogger(__name__)
 BRAND_SETTINGS_TTL = 300  # 5 minutes
 DOMAIN_TTL = 180  # 3 minutes
 PREVIEW_METADATA_TTL = 300  # 5 minutes
+IMAGE_VARIANTS_TTL = 30 * 24 * 3600  # 30 days (variants themselves live in R2)
 
 
 def _get_cache_key(prefix: str, *args) -> str:
@@ -130,3 +132,26 @@ def invalidate_preview(preview_id: int) -> None:
     except Exception as e:
         logger.warning(f"Cache invalidate error for preview_metadata:{preview_id}: {e}")
 
+def _image_variants_key(image_url: str) -> str:
+    return _get_cache_key("image_variants", hashlib.sha1(image_url.encode("utf-8")).hexdigest())
+
+
+def get_cached_image_variants(image_url: str) -> Optional[dict]:
+    """Get the stored format variants (webp/jpeg/png) of a preview image URL."""
+    try:
+        redis_client = get_redis_connection()
+        cached = redis_client.get(_image_variants_key(image_url))
+        if cached:
+            return _deserialize(cached)
+    except Exception as e:
+        logger.warning(f"Cache get error for image_variants:{image_url}: {e}")
+    return None
+
+
+def set_cached_image_variants(image_url: str, value: dict) -> None:
+    """Record the format variants stored for a preview image URL."""
+    try:
+        redis_client = get_redis_connection()
+        redis_client.setex(_image_variants_key(image_url), IMAGE_VARIANTS_TTL, _serialize(value))
+    except Exception as e:
+        logger.warning(f"Cache set error for image_variants:{image_url}: {e}")
@@ -0,0 +1,365 @@
+"""
+Binary codecs for cached preview payloads.
+
+Cached analysis and demo results are large nested dicts (blueprints,
+quality debug blocks, sometimes base64 image fragments). Storing them as
+JSON text wastes Redis memory and decode time, so every payload written
+through ``preview_cache`` is wrapped in a small versioned envelope:
+
+    MAGIC (3 bytes) | FORMAT_VERSION (1 byte) | CODEC_ID (1 byte) | body
+
+Entries without the magic prefix are legacy JSON strings and still decode,
+so a deploy never needs a cache flush. msgpack and zstandard are optional;
+when they are missing the codec degrades to JSON inside the envelope.
+
+Zstd dictionaries trained on real payloads (see
+``backend/scripts/train_cache_dictionary.py``) are loaded from
+``PREVIEW_CACHE_ZSTD_DICTS``. The first path is used for writing; all of
+them are kept for reading, keyed by the dictionary ID zstd records in each
+frame, so dictionaries can be rotated without orphaning old entries.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Union
+
+logger = logging.getLogger("preview_worker")
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+
+# =============================================================================
+# ENVELOPE
+# =============================================================================
+
+# 0xC1 is never produced by msgpack and is not valid UTF-8 JSON, so legacy
+# entries can never be mistaken for an envelope.
+MAGIC = b"\xc1PV"
+FORMAT_VERSION = 1
+HEADER_SIZE = len(MAGIC) + 2
+
+CODEC_JSON = 1
+CODEC_MSGPACK = 2
+CODEC_MSGPACK_ZSTD = 3
+
+ZSTD_LEVEL = int(os.getenv("PREVIEW_CACHE_ZSTD_LEVEL", "6"))
+# Fraction of writes that also measure the legacy JSON size for reporting.
+BASELINE_SAMPLE_EVERY = 20
+
+
+def _json_default(value: Any) -> Any:
+    return str(value)
+
+
+def _msgpack_default(value: Any) -> Any:
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    return str(value)
+
+
+# =============================================================================
+# ZSTD DICTIONARIES
+# =============================================================================
+
+class _DictionaryRegistry:
+    """Trained zstd dictionaries, keyed by their zstd dictionary ID."""
+
+    def __init__(self) -> None:
+        self._write_dict: Optional["zstandard.ZstdCompressionDict"] = None
+        self._by_id: Dict[int, "zstandard.ZstdCompressionDict"] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _load(self) -> None:
+        paths = [p.strip() for p in os.getenv("PREVIEW_CACHE_ZSTD_DICTS", "").split(",") if p.strip()]
+        for index, path in enumerate(paths):
+            try:
+                with open(path, "rb") as fh:
+                    dictionary = zstandard.ZstdCompressionDict(fh.read())
+            except Exception as e:
+                logger.warning(f"Could not load zstd cache dictionary {path}: {e}")
+                continue
+            self._by_id[dictionary.dict_id()] = dictionary
+            if index == 0:
+                self._write_dict = dictionary
+        self._loaded = True
+
+    def _ensure_loaded(self) -> None:
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self._load()
+
+    def for_writing(self) -> Optional["zstandard.ZstdCompressionDict"]:
+        self._ensure_loaded()
+        return self._write_dict
+
+    def for_reading(self, dict_id: int) -> Optional["zstandard.ZstdCompressionDict"]:
+        self._ensure_loaded()
+        return self._by_id.get(dict_id)
+
+    def register(self, dictionary: "zstandard.ZstdCompressionDict", use_for_writing: bool = True) -> None:
+        """Add a dictionary at runtime (used by tests and the training script)."""
+        with self._lock:
+            self._loaded = True
+            self._by_id[dictionary.dict_id()] = dictionary
+            if use_for_writing:
+                self._write_dict = dictionary
+
+    def reset(self) -> None:
+        with self._lock:
+            self._write_dict = None
+            self._by_id = {}
+            self._loaded = False
+
+
+dictionaries = _DictionaryRegistry()
+
+
+# =============================================================================
+# CODECS
+# =============================================================================
+
+class CacheCodec(ABC):
+    """Encodes a JSON-compatible value to bytes and back."""
+
+    codec_id: int = 0
+    name: str = ""
+
+    @abstractmethod
+    def encode_body(self, value: Any) -> bytes:
+        """Serialize ``value`` to an envelope body."""
+
+    @abstractmethod
+    def decode_body(self, body: bytes) -> Any:
+        """Inverse of ``encode_body``."""
+
+    def body_size(self, body: bytes) -> int:
+        """Length of the body before any compression."""
+        return len(body)
+
+
+class JsonCodec(CacheCodec):
+    codec_id = CODEC_JSON
+    name = "json"
+
+    def encode_body(self, value: Any) -> bytes:
+        return json.dumps(value, default=_json_default, separators=(",", ":")).encode("utf-8")
+
+    def decode_body(self, body: bytes) -> Any:
+        return json.loads(body)
+
+
+class MsgpackCodec(CacheCodec):
+    codec_id = CODEC_MSGPACK
+    name = "msgpack"
+
+    def encode_body(self, value: Any) -> bytes:
+        return msgpack.packb(value, default=_msgpack_default, use_bin_type=True)
+
+    def decode_body(self, body: bytes) -> Any:
+        return msgpack.unpackb(body, raw=False, strict_map_key=False)
+
+
+class MsgpackZstdCodec(MsgpackCodec):
+    codec_id = CODEC_MSGPACK_ZSTD
+    name = "msgpack+zstd"
+
+    def encode_body(self, value: Any) -> bytes:
+        packed = super().encode_body(value)
+        dictionary = dictionaries.for_writing()
+        compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL, dict_data=dictionary)
+        return compressor.compress(packed)
+
+    def decode_body(self, body: bytes) -> Any:
+        dict_id = zstandard.get_frame_parameters(body).dict_id
+        dictionary = None
+        if dict_id:
+            dictionary = dictionaries.for_reading(dict_id)
+            if dictionary is None:
+                raise ValueError(f"zstd dictionary {dict_id} is not loaded")
+        decompressor = zstandard.ZstdDecompressor(dict_data=dictionary)
+        return super().decode_body(decompressor.decompress(body))
+
+    def body_size(self, body: bytes) -> int:
+        # One-shot compress() records the content size in the frame header
+        size = zstandard.get_frame_parameters(body).content_size
+        return size if size > 0 else len(body)
+
+
+_CODECS: Dict[int, CacheCodec] = {CODEC_JSON: JsonCodec()}
+if MSGPACK_AVAILABLE:
+    _CODECS[CODEC_MSGPACK] = MsgpackCodec()
+    if ZSTD_AVAILABLE:
+        _CODECS[CODEC_MSGPACK_ZSTD] = MsgpackZstdCodec()
+
+_CODECS_BY_NAME: Dict[str, CacheCodec] = {codec.name: codec for codec in _CODECS.values()}
+
+
+def get_codec(name: Optional[str] = None) -> CacheCodec:
+    """
+    Resolve the write codec.
+
+    ``name`` (or ``PREVIEW_CACHE_CODEC``) selects one of ``json``,
+    ``msgpack`` or ``msgpack+zstd``; unavailable choices fall back to the
+    best codec installed.
+    """
+    name = name or os.getenv("PREVIEW_CACHE_CODEC", "")
+    if name in _CODECS_BY_NAME:
+        return _CODECS_BY_NAME[name]
+    if name:
+        logger.warning(f"Cache codec '{name}' unavailable, using best installed codec")
+    return _CODECS[max(_CODECS)]
+
+
+# =============================================================================
+# STATS
+# =============================================================================
+
+class CodecStats:
+    """Process-wide encode/decode timings and compression accounting."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.encode_count = 0
+        self.encode_seconds = 0.0
+        self.encoded_bytes = 0
+        self.decode_count = 0
+        self.decode_seconds = 0.0
+        self.legacy_decodes = 0
+        self.sampled_baseline_bytes = 0
+        self.sampled_encoded_bytes = 0
+
+    def record_encode(self, seconds: float, encoded_size: int, baseline_size: Optional[int]) -> None:
+        with self._lock:
+            self.encode_count += 1
+            self.encode_seconds += seconds
+            self.encoded_bytes += encoded_size
+            if baseline_size is not None:
+                self.sampled_baseline_bytes += baseline_size
+                self.sampled_encoded_bytes += encoded_size
+
+    def record_decode(self, seconds: float, legacy: bool) -> None:
+        with self._lock:
+            self.decode_count += 1
+            self.decode_seconds += seconds
+            if legacy:
+                self.legacy_decodes += 1
+
+    def should_sample_baseline(self) -> bool:
+        return self.encode_count % BASELINE_SAMPLE_EVERY == 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            ratio = (
+                self.sampled_baseline_bytes / self.sampled_encoded_bytes
+                if self.sampled_encoded_bytes else None
+            )
+            return {
+                "codec": get_codec().name,
+                "zstd_dictionary": bool(ZSTD_AVAILABLE and dictionaries.for_writing() is not None),
+                "encodes": self.encode_count,
+                "decodes": self.decode_count,
+                "legacy_decodes": self.legacy_decodes,
+                "avg_encode_ms": round(self.encode_seconds * 1000 / self.encode_count, 3) if self.encode_count else 0.0,
+                "avg_decode_ms": round(self.decode_seconds * 1000 / self.decode_count, 3) if self.decode_count else 0.0,
+                "encoded_bytes": self.encoded_bytes,
+                "compression_ratio_vs_json": round(ratio, 2) if ratio else None,
+                "estimated_bytes_saved": int(self.encoded_bytes * (ratio - 1)) if ratio else None,
+            }
+
+
+stats = CodecStats()
+
+
+# =============================================================================
+# PUBLIC API
+# =============================================================================
+
+def encode_payload(value: Any, codec: Optional[CacheCodec] = None) -> bytes:
+    """Encode ``value`` into a versioned cache envelope."""
+    codec = codec or get_codec()
+    started = time.perf_counter()
+    body = codec.encode_body(value)
+    payload = MAGIC + bytes((FORMAT_VERSION, codec.codec_id)) + body
+    elapsed = time.perf_counter() - started
+
+    baseline = None
+    if stats.should_sample_baseline():
+        baseline = len(json.dumps(value, default=_json_default))
+    stats.record_encode(elapsed, len(payload), baseline)
+    return payload
+
+
+def decode_payload(payload: Union[bytes, str]) -> Any:
+    """
+    Decode a cache envelope, or a legacy plain-JSON entry.
+
+    Raises ``ValueError`` for envelopes written by a newer format version or
+    with a codec this process cannot load.
+    """
+    started = time.perf_counter()
+    if isinstance(payload, str):
+        payload = payload.encode("utf-8")
+
+    if not payload.startswith(MAGIC):
+        value = json.loads(payload)
+        stats.record_decode(time.perf_counter() - started, legacy=True)
+        return value
+
+    version, codec_id = payload[len(MAGIC)], payload[len(MAGIC) + 1]
+    if version > FORMAT_VERSION:
+        raise ValueError(f"Unsupported cache format version {version}")
+    codec = _CODECS.get(codec_id)
+    if codec is None:
+        raise ValueError(f"Cache codec {codec_id} is not available in this process")
+    value = codec.decode_body(payload[HEADER_SIZE:])
+    stats.record_decode(time.perf_counter() - started, legacy=False)
+    return value
+
+
+def payload_body_size(payload: Union[bytes, str]) -> int:
+    """
+    Uncompressed size of a cache entry: the msgpack/JSON body before zstd.
+
+    Unlike ``len(payload)`` this tracks the decoded value's footprint, so it
+    can bound in-process memory. Read from the zstd frame header; nothing is
+    decompressed.
+    """
+    if isinstance(payload, str):
+        payload = payload.encode("utf-8")
+    if not payload.startswith(MAGIC):
+        return len(payload)
+    codec = _CODECS.get(payload[len(MAGIC) + 1])
+    body = payload[HEADER_SIZE:]
+    return codec.body_size(body) if codec is not None else len(body)
+
+
+def train_dictionary(samples: List[Any], dict_size: int = 112 * 1024) -> "zstandard.ZstdCompressionDict":
+    """Train a zstd dictionary from decoded payload samples."""
+    if not (MSGPACK_AVAILABLE and ZSTD_AVAILABLE):
+        raise RuntimeError("Dictionary training requires msgpack and zstandard")
+    packer = MsgpackCodec()
+    encoded = [packer.encode_body(sample) for sample in samples]
+    return zstandard.train_dictionary(dict_size, encoded)
+
+
+def get_codec_stats() -> Dict[str, Any]:
+    """Compression ratio, estimated Redis bytes saved and codec timings."""
+    return stats.to_dict()
@@ -0,0 +1,174 @@
+"""
+Cooperative Cancellation - Deadline-aware cancellation tokens for the pipeline.
+
+``preview_timeout.timeout_context`` relies on ``SIGALRM``, which only fires on
+the main thread; the engine, batch workers and demo routes all run on worker
+threads, so signal-based budgets are never enforced there. Instead, every job
+carries a ``CancellationToken`` with an absolute deadline:
+
+- ``PipelineContext`` owns the token and checks it at every stage boundary.
+- The token is also bound to a context variable, so deep helpers (Playwright
+  capture, OpenAI clients, rendering loops) can call ``raise_if_cancelled()``
+  and ``bounded_timeout()`` without threading the context through every
+  signature.
+- ``ThreadPoolExecutor`` does not copy context variables; wrap submitted
+  callables with ``bind_current()`` so worker threads see the job's token.
+
+Cancellation is cooperative: a cancelled or expired job stops at the next
+checkpoint, and no blocking call outlives the deadline because its timeout
+is clamped to the time remaining.
+
+Usage:
+    token = CancellationToken.with_timeout(90)
+    with use_token(token):
+        client = OpenAI(timeout=bounded_timeout(60))
+        for attempt in range(3):
+            raise_if_cancelled()
+            ...
+"""
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional
+
+
+class PipelineCancelled(Exception):
+    """Raised at a checkpoint when the job was cancelled."""
+
+
+class DeadlineExceeded(PipelineCancelled):
+    """Raised at a checkpoint when the job ran past its deadline."""
+
+
+class CancellationToken:
+    """Thread-safe cancellation flag with an optional monotonic deadline."""
+
+    def __init__(self, deadline: Optional[float] = None):
+        self._deadline = deadline
+        self._event = threading.Event()
+        self._reason: Optional[str] = None
+
+    @classmethod
+    def with_timeout(cls, seconds: Optional[float]) -> 'CancellationToken':
+        """Token that expires ``seconds`` from now (``None`` = no deadline)."""
+        if seconds is None:
+            return cls()
+        return cls(deadline=time.monotonic() + float(seconds))
+
+    # -- State ----------------------------------------------------------------
+
+    def cancel(self, reason: str = "cancelled") -> None:
+        if not self._event.is_set():
+            self._reason = reason
+            self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    @property
+    def expired(self) -> bool:
+        return self._deadline is not None and time.monotonic() >= self._deadline
+
+    @property
+    def reason(self) -> Optional[str]:
+        if self.cancelled:
+            return self._reason
+        if self.expired:
+            return "deadline exceeded"
+        return None
+
+    def remaining(self) -> Optional[float]:
+        """Seconds until the deadline, ``None`` when there is no deadline."""
+        if self._deadline is None:
+            return None
+        return max(0.0, self._deadline - time.monotonic())
+
+    def should_stop(self) -> bool:
+        return self.cancelled or self.expired
+
+    # -- Checkpoints ----------------------------------------------------------
+
+    def raise_if_cancelled(self, where: str = "") -> None:
+        suffix = f" at {where}" if where else ""
+        if self.cancelled:
+            raise PipelineCancelled(f"Job {self._reason}{suffix}")
+        if self.expired:
+            raise DeadlineExceeded(f"Job deadline exceeded{suffix}")
+
+    def bounded_timeout(self, default: float, floor: float = 1.0) -> float:
+        """
+        Clamp a blocking call's timeout to the time left before the deadline.
+
+        Raises if the job is already cancelled or expired. Never returns less
+        than ``floor`` because several clients treat 0 as "wait forever".
+        """
+        self.raise_if_cancelled()
+        remaining = self.remaining()
+        if remaining is None:
+            return default
+        return max(floor, min(default, remaining))
+
+    def wait(self, seconds: float) -> bool:
+        """Sleep up to ``seconds``; returns True early if cancelled."""
+        remaining = self.remaining()
+        if remaining is not None:
+            seconds = min(seconds, remaining)
+        return self._event.wait(max(0.0, seconds))
+
+
+# =============================================================================
+# Current-token plumbing
+# =============================================================================
+
+_NO_DEADLINE = CancellationToken()
+_current: contextvars.ContextVar[CancellationToken] = contextvars.ContextVar(
+    "preview_cancel_token", default=_NO_DEADLINE
+)
+
+
+def current_token() -> CancellationToken:
+    """Token of the job running on this thread (a no-op token outside jobs)."""
+    return _current.get()
+
+
+@contextmanager
+def use_token(token: CancellationToken) -> Iterator[CancellationToken]:
+    """Make ``token`` the current token for the enclosed block."""
+    reset = _current.set(token)
+    try:
+        yield token
+    finally:
+        _current.reset(reset)
+
+
+def bind_current(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap ``fn`` so it runs under the caller's token on another thread.
+
+    When the job is being profiled, the worker thread is sampled too and its
+    stacks are filed under the stage that submitted it. Spans opened on the
+    worker thread nest under the submitting span.
+    """
+    from backend.services.preview.observability.profiler import attach_thread, current_sampler
+    from backend.services.preview.observability.tracing import current_span, use_span
+
+    token = current_token()
+    sampler = current_sampler()
+    stage = sampler.current_stage() if sampler is not None else ""
+    span = current_span()
+
+    def _bound(*args: Any, **kwargs: Any) -> Any:
+        with use_token(token), attach_thread(sampler, stage), use_span(span):
+            return fn(*args, **kwargs)
+
+    return _bound
+
+
+def raise_if_cancelled(where: str = "") -> None:
+    current_token().raise_if_cancelled(where)
+
+
+def bounded_timeout(default: float, floor: float = 1.0) -> float:
+    return current_token().bounded_timeout(default, floor)
@@ -85,6 +85,14 @@ def get_cache_prefix_for_mode(requested_mode: str | None, url: str | None = None
     return f"demo:preview:v3:{resolved_mode}:"
 
 
+def quality_mode_from_cache_prefix(cache_key_prefix: str | None) -> str | None:
+    """Recover the quality mode embedded in a cache prefix (``...:balanced:``)."""
+    for segment in (cache_key_prefix or "").split(":"):
+        if segment in _QUALITY_PROFILES:
+            return segment
+    return None
+
+
 def estimate_url_complexity(url: str) -> int:
     """
     Lightweight heuristic to pick a quality profile before heavy processing starts.
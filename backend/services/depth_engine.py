@@ -17,7 +17,9 @@ import math
 from typing import Dict, Any, List, Tuple, Optional
 from dataclasses import dataclass
 from enum import Enum
-from PIL import Image, ImageDraw, ImageFilter
+from PIL import Image
+
+from backend.services import image_effects
 
 logger = logging.getLogger(__name__)
 
@@ -136,20 +138,6 @@ class DepthEngine:
             canvas_width = image.width
             canvas_height = image.height
         
-        # Create canvas with extra space for shadows
-        max_blur = max(
-            shadow_comp.ambient.blur_radius,
-            shadow_comp.penumbra.blur_radius,
-            shadow_comp.umbra.blur_radius
-        )
-        max_offset = max(
-            abs(shadow_comp.ambient.y_offset),
-            abs(shadow_comp.penumbra.y_offset),
-            abs(shadow_comp.umbra.y_offset)
-        )
-        
-        padding = max_blur + max_offset + 20
-        
         canvas = Image.new('RGBA', (canvas_width, canvas_height), (0, 0, 0, 0))
         
         # Draw shadow layers (back to front)
@@ -160,12 +148,9 @@ class DepthEngine:
                 layer.blur_radius, layer.color
             )
             
-            # Position shadow
-            shadow_x = x + layer.x_offset
-            shadow_y = y + layer.y_offset
-            
-            # Composite onto canvas
-            canvas = Image.alpha_composite(canvas, shadow_img if shadow_img.mode == 'RGBA' else shadow_img.convert('RGBA'))
+            # The layer is padded around the element; its offset is baked in
+            padding = (shadow_img.width - width) // 2
+            canvas = image_effects.composite_at(canvas, shadow_img, (x - padding, y - padding))
         
         # Draw main element on top
         if image.mode != 'RGBA':
@@ -364,29 +349,14 @@ class DepthEngine:
         blur_radius: int,
         color: Tuple[int, int, int, int]
     ) -> Image.Image:
-        """Create a single shadow layer as an image."""
+        """Create a single shadow layer as an image (blurred mask cached per size/params)."""
         # Add padding for blur
         padding = blur_radius * 2 + abs(x_offset) + abs(y_offset) + 10
         
-        # Create shadow canvas
-        shadow_width = width + padding * 2
-        shadow_height = height + padding * 2
-        shadow = Image.new('RGBA', (shadow_width, shadow_height), (0, 0, 0, 0))
-        
-        # Draw rectangle
-        draw = ImageDraw.Draw(shadow)
-        rect_x = padding + x_offset
-        rect_y = padding + y_offset
-        draw.rectangle(
-            [(rect_x, rect_y), (rect_x + width, rect_y + height)],
-            fill=color
+        mask = image_effects.blurred_box_mask(
+            (width, height), blur_radius, padding, (x_offset, y_offset), color[3]
         )
-        
-        # Apply blur
-        if blur_radius > 0:
-            shadow = shadow.filter(ImageFilter.GaussianBlur(radius=blur_radius))
-        
-        return shadow
+        return image_effects.colored_layer(mask, color[:3])
 
 
 def create_inner_shadow(
@@ -405,31 +375,7 @@ def create_inner_shadow(
     Returns:
         Image with inner shadow
     """
-    x, y, width, height = element_bounds
-    
-    # Create mask for element
-    mask = Image.new('L', (width, height), 255)
-    
-    # Create shadow gradient (top-left to bottom-right)
-    shadow = Image.new('RGBA', (width, height), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(shadow)
-    
-    # Top shadow
-    for i in range(depth):
-        alpha = int(50 * (1 - i / depth))
-        draw.line([(0, i), (width, i)], fill=(0, 0, 0, alpha))
-    
-    # Left shadow
-    for i in range(depth):
-        alpha = int(50 * (1 - i / depth))
-        draw.line([(i, 0), (i, height)], fill=(0, 0, 0, alpha))
-    
-    # Paste onto image
-    if image.mode != 'RGBA':
-        image = image.convert('RGBA')
-    image.paste(shadow, (x, y), shadow)
-    
-    return image
+    return image_effects.apply_inner_shadow(image, element_bounds, depth)
 
 
 def create_glow_effect(
@@ -450,31 +396,8 @@ def create_glow_effect(
     Returns:
         Image with glow
     """
-    x, y, width, height = element_bounds
-    
-    # Create glow layer
-    padding = intensity * 2
-    glow_width = width + padding * 2
-    glow_height = height + padding * 2
-    glow = Image.new('RGBA', (glow_width, glow_height), (0, 0, 0, 0))
-    
-    draw = ImageDraw.Draw(glow)
-    draw.rectangle(
-        [(padding, padding), (padding + width, padding + height)],
-        fill=(*glow_color, 150)
-    )
-    
-    # Blur for glow effect
-    glow = glow.filter(ImageFilter.GaussianBlur(radius=intensity))
-    
-    # Composite onto image
-    if image.mode != 'RGBA':
-        image = image.convert('RGBA')
-    glow_x = x - padding
-    glow_y = y - padding
-    image = Image.alpha_composite(image, glow)
-    
-    return image
+    # Blurred mask is cached per (size, intensity); composited at the element
+    return image_effects.apply_glow(image, element_bounds, glow_color, intensity)
 
 
 # Example usage
@@ -8,6 +8,8 @@ from typing import List, Optional, Tuple
 import requests
 from PIL import Image
 
+from backend.services.image_encoding import FORMATS, pick_variant
+
 logger = logging.getLogger(__name__)
 
 # img2pdf for PDF generation
@@ -47,6 +49,21 @@ def export_as_png(preview_image_url: str) -> Tuple[bytes, str]:
     return data, filename
 
 
+def export_as_image(preview_image_url: str, accept: Optional[str] = None) -> Tuple[bytes, str, str]:
+    """
+    Fetch the smallest stored format of a preview (WebP/JPEG/PNG) that the
+    client's ``Accept`` header allows. Returns bytes, filename, content type.
+    Previews without stored variants are returned as PNG.
+    """
+    variant = pick_variant(preview_image_url, accept)
+    if variant["content_type"] is None:
+        data, filename = export_as_png(preview_image_url)
+        return data, filename, "image/png"
+    data = _fetch_image(variant["url"])
+    extension = next(fmt.extension for fmt in FORMATS.values() if fmt.content_type == variant["content_type"])
+    return data, f"preview.{extension}", variant["content_type"]
+
+
 def export_as_pdf(preview_urls: List[str], titles: Optional[List[str]] = None) -> bytes:
     """
     Fetch multiple preview images and combine into a single PDF.
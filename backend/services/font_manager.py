@@ -235,28 +235,10 @@ class FontManager:
             logger.warning(f"Could not create font cache directory: {e}")
     
     def _discover_system_fonts(self) -> Dict[str, str]:
-        """Discover available system fonts."""
-        system_fonts = {}
-        
-        # Common font directories
-        font_dirs = [
-            "/usr/share/fonts",
-            "/usr/local/share/fonts",
-            "/System/Library/Fonts",
-            "C:\\Windows\\Fonts"
-        ]
-        
-        # Common font extensions
-        font_extensions = [".ttf", ".otf", ".woff", ".woff2"]
-        
-        for font_dir in font_dirs:
-            if os.path.exists(font_dir):
-                for root, dirs, files in os.walk(font_dir):
-                    for file in files:
-                        if any(file.lower().endswith(ext) for ext in font_extensions):
-                            font_path = os.path.join(root, file)
-                            font_name = os.path.splitext(file)[0]
-                            system_fonts[font_name.lower()] = font_path
+        """Discover available system fonts (from the process-wide font registry index)."""
+        from backend.services.font_registry import get_font_registry
+        
+        system_fonts = get_font_registry().file_index()
         
         # Add common DejaVu fallbacks (usually available on Linux)
         dejavu_paths = {
@@ -339,7 +321,8 @@ class FontManager:
         """
         Find the best available font from a list.
         
-        PHASE 2: Now includes font downloading capability.
+        PHASE 2: Now includes font downloading capability. Downloads run on
+        the font registry's background thread and never block the caller.
         """
         
         # Check cached fonts first
@@ -356,7 +339,21 @@ class FontManager:
                     )
         
         # Check system fonts
+        from backend.services.font_registry import get_font_registry
+        
+        registry = get_font_registry()
         for font_name in primary_fonts:
+            face = registry.find(font_name, weight)
+            if face is not None:
+                if download_if_missing and face.weight != weight:
+                    registry.prefetch([font_name], weight)
+                return FontConfig(
+                    name=font_name,
+                    path=face.path,
+                    weight=face.weight,
+                    letter_spacing=letter_spacing,
+                    is_system=True
+                )
             font_key = font_name.lower().replace(" ", "")
             if font_key in self._system_fonts:
                 return FontConfig(
@@ -367,19 +364,10 @@ class FontManager:
                     is_system=True
                 )
         
-        # PHASE 2: Try downloading fonts if not found
+        # Download missing fonts in the background; this render uses the
+        # fallback, later ones find the download in the cache.
         if download_if_missing:
-            for font_name in primary_fonts:
-                if font_name in DOWNLOADABLE_FONTS:
-                    downloaded_path = self.download_font(font_name, weight)
-                    if downloaded_path and os.path.exists(downloaded_path):
-                        return FontConfig(
-                            name=font_name,
-                            path=downloaded_path,
-                            weight=weight,
-                            letter_spacing=letter_spacing,
-                            is_cached=True
-                        )
+            registry.prefetch(primary_fonts, weight)
         
         # Use fallback
         fallback_key = fallback.lower().replace("-", "")
@@ -0,0 +1,367 @@
+"""
+Font Registry - process-wide index of installed fonts and sized font instances.
+
+Renders found fonts three different ways: ``_load_font`` probed a fixed list
+of DejaVu/Liberation paths, ``FontManager`` walked every font directory when
+it was constructed, and a personality font that wasn't installed was fetched
+from Google Fonts with ``urllib`` in the middle of a render (10s + 30s
+timeouts, repeated for every render while offline). The registry:
+
+  - indexes the font directories once per process (family, weight, italic
+    per file, read from the font's own name table);
+  - resolves ``(family, weight)`` to the nearest installed face, falling back
+    through ``SANS_FALLBACKS`` and finally Pillow's bitmap font;
+  - keeps an LRU of sized ``FreeTypeFont`` instances. Faces are opened by
+    path: FreeType maps the file, so every size shares one copy of the font
+    data in memory (``truetype(BytesIO)`` copies the whole file per instance
+    and is ~10x slower to create);
+  - downloads missing fonts on a background thread (``prefetch``). Until a
+    download lands, renders use the fallback face - never the network.
+
+``warm_font_registry()`` builds the index and prefetches the personality
+fonts; the worker calls it before forking work-horses so they inherit both.
+
+Usage:
+    registry = get_font_registry()
+    font = registry.font(["Inter", "DejaVu Sans"], 48, weight=700)
+    registry.prefetch(["Inter"], weight=700)   # returns immediately
+"""
+
+import logging
+import os
+import queue
+import re
+import threading
+import weakref
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from PIL import ImageFont
+
+from backend.services.font_manager import (
+    DOWNLOADABLE_FONTS,
+    FONT_CACHE_DIR,
+    FONT_PERSONALITY_MAP,
+    get_font_manager,
+)
+from backend.services.preview.observability.metrics import FONT_LOADS
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_FONT_DIRS = (
+    "/usr/share/fonts",
+    "/usr/local/share/fonts",
+    str(FONT_CACHE_DIR),
+    "/System/Library/Fonts",
+    "C:\\Windows\\Fonts",
+)
+FONT_DIRS = [d for d in os.getenv("PREVIEW_FONT_DIRS", os.pathsep.join(_DEFAULT_FONT_DIRS)).split(os.pathsep) if d]
+FONT_PREFETCH = os.getenv("PREVIEW_FONT_PREFETCH", "true").strip().lower() not in ("0", "false", "no", "off")
+MAX_FONT_INSTANCES = int(os.getenv("PREVIEW_FONT_INSTANCES", "256"))
+
+FONT_EXTENSIONS = (".ttf", ".otf", ".ttc", ".woff", ".woff2")
+
+# Tried in order when a requested family is not installed (the old _load_font list)
+SANS_FALLBACKS = ("DejaVu Sans", "Liberation Sans", "FreeSans", "Noto Sans")
+
+# Style-name words -> CSS weight; compound words first so "semibold" isn't read as "bold"
+_WEIGHT_WORDS = (
+    ("extralight", 200), ("ultralight", 200), ("semibold", 600), ("demibold", 600),
+    ("extrabold", 800), ("ultrabold", 800), ("hairline", 100), ("thin", 100),
+    ("light", 300), ("medium", 500), ("bold", 700), ("black", 900), ("heavy", 900),
+)
+# FontManager caches downloads as "<name>-<weight>.ttf"
+_CACHED_WEIGHT = re.compile(r"-(\d00)$")
+
+
+def family_key(family: str) -> str:
+    """Normalize a family name for lookups ("DejaVu Sans" == "dejavusans")."""
+    return re.sub(r"[\s_-]+", "", family).lower()
+
+
+def style_weight(style: str) -> Tuple[int, bool]:
+    """Map a font style name ("Bold Oblique", "SemiBold") to (weight, italic)."""
+    normalized = family_key(style or "")
+    italic = "italic" in normalized or "oblique" in normalized
+    for word, weight in _WEIGHT_WORDS:
+        if word in normalized:
+            return weight, italic
+    return 400, italic
+
+
+@dataclass(frozen=True)
+class FontFace:
+    """One installed font file."""
+    family: str
+    weight: int
+    italic: bool
+    path: str
+    index: int = 0
+
+
+_instances: "weakref.WeakSet[FontRegistry]" = weakref.WeakSet()
+
+
+class FontRegistry:
+    """
+    Index of installed font faces plus an LRU of sized instances.
+
+    The index is built lazily on first use (or by ``warm_font_registry``) and
+    grows as ``prefetch`` downloads land. All methods are thread-safe.
+    """
+
+    def __init__(
+        self,
+        font_dirs: Optional[Sequence[str]] = None,
+        max_instances: int = MAX_FONT_INSTANCES,
+        prefetch_enabled: bool = FONT_PREFETCH,
+    ):
+        self.font_dirs = list(FONT_DIRS if font_dirs is None else font_dirs)
+        self.max_instances = max_instances
+        self.prefetch_enabled = prefetch_enabled
+        self._lock = threading.RLock()
+        self._faces: Optional[Dict[str, List[FontFace]]] = None
+        self._files: Dict[str, str] = {}
+        self._paths: Dict[str, FontFace] = {}
+        self._resolved: Dict[Tuple, FontFace] = {}
+        self._fonts: "OrderedDict[Tuple[str, int, float], ImageFont.FreeTypeFont]" = OrderedDict()
+        self._default: Optional[ImageFont.ImageFont] = None
+        self._prefetches: Dict[Tuple[str, int], Future] = {}
+        self._downloads: "queue.Queue[Tuple[str, int, Future]]" = queue.Queue()
+        self._download_thread: Optional[threading.Thread] = None
+        _instances.add(self)
+
+    def _after_fork(self) -> None:
+        # The prefetch thread doesn't survive fork(); its lock and unfinished
+        # downloads must not either (RQ forks a work-horse per job).
+        self._lock = threading.RLock()
+        self._downloads = queue.Queue()
+        self._download_thread = None
+        self._prefetches = {k: f for k, f in self._prefetches.items() if f.done()}
+
+    # ------------------------------------------------------------------
+    # Index
+    # ------------------------------------------------------------------
+
+    def _index(self) -> Dict[str, List[FontFace]]:
+        with self._lock:
+            if self._faces is None:
+                self._faces = {}
+                for font_dir in self.font_dirs:
+                    if not os.path.isdir(font_dir):
+                        continue
+                    for root, _dirs, files in os.walk(font_dir):
+                        for name in sorted(files):
+                            if name.lower().endswith(FONT_EXTENSIONS):
+                                self._add(os.path.join(root, name))
+                logger.info(f"Font registry indexed {sum(map(len, self._faces.values()))} faces "
+                             f"in {len(self._faces)} families")
+            return self._faces
+
+    def _add(self, path: str, family: Optional[str] = None, weight: Optional[int] = None) -> Optional[FontFace]:
+        try:
+            name, style = ImageFont.truetype(path, 12).getname()
+        except Exception as e:
+            logger.debug(f"Skipping unreadable font {path}: {e}")
+            return None
+        stem = os.path.splitext(os.path.basename(path))[0]
+        parsed_weight, italic = style_weight(style)
+        cached_weight = _CACHED_WEIGHT.search(stem)
+        face = FontFace(
+            family=family or name or stem,
+            weight=weight or (int(cached_weight.group(1)) if cached_weight else parsed_weight),
+            italic=italic,
+            path=path,
+        )
+        faces = self._faces.setdefault(family_key(face.family), [])
+        faces[:] = [f for f in faces if f.path != path] + [face]
+        self._files[stem.lower()] = path
+        self._paths[path] = face
+        self._resolved.clear()
+        return face
+
+    def register_file(self, path: str, family: Optional[str] = None, weight: Optional[int] = None) -> Optional[FontFace]:
+        """Add a font file (e.g. a fresh download) to the index."""
+        with self._lock:
+            self._index()
+            return self._add(path, family, weight)
+
+    def families(self) -> List[str]:
+        """Installed family names."""
+        return sorted(faces[0].family for faces in self._index().values())
+
+    def file_index(self) -> Dict[str, str]:
+        """``{lowercase file stem: path}`` - the shape FontManager looks fonts up in."""
+        with self._lock:
+            self._index()
+            return dict(self._files)
+
+    def find(self, family: str, weight: int = 400, italic: bool = False) -> Optional[FontFace]:
+        """Nearest installed face of ``family`` (italic match first, then weight distance)."""
+        faces = self._index().get(family_key(family))
+        if not faces:
+            return None
+        return min(faces, key=lambda f: (f.italic != italic, abs(f.weight - weight), f.weight < weight))
+
+    # ------------------------------------------------------------------
+    # Instances
+    # ------------------------------------------------------------------
+
+    def font(
+        self,
+        families: Union[str, Sequence[str]],
+        size: float,
+        weight: int = 400,
+        italic: bool = False,
+    ) -> ImageFont.FreeTypeFont:
+        """
+        Sized font for the first installed family of ``families``.
+
+        Falls back through ``SANS_FALLBACKS`` and then Pillow's default font;
+        never downloads (see ``prefetch``).
+        """
+        request = (families if isinstance(families, str) else tuple(families), weight, italic)
+        face = self._resolved.get(request)
+        if face is None:
+            candidates = [families] if isinstance(families, str) else list(families)
+            for family in [*candidates, *SANS_FALLBACKS]:
+                face = self.find(family, weight, italic)
+                if face is not None:
+                    self._resolved[request] = face
+                    break
+        if face is not None:
+            return self.instance(face, size)
+        FONT_LOADS.inc(result="default")
+        with self._lock:
+            if self._default is None:
+                self._default = ImageFont.load_default()
+            return self._default
+
+    def font_from_path(self, path: str, size: float) -> ImageFont.FreeTypeFont:
+        """Sized font for a specific file (indexed on first use)."""
+        face = self._paths.get(path)
+        if face is None:
+            with self._lock:
+                self._index()
+                face = self._paths.get(path) or self._add(path)
+        if face is None:
+            raise OSError(f"Cannot open font file: {path}")
+        return self.instance(face, size)
+
+    def instance(self, face: FontFace, size: float) -> ImageFont.FreeTypeFont:
+        key = (face.path, face.index, size)
+        font = self._fonts.get(key)
+        if font is not None:
+            try:
+                self._fonts.move_to_end(key)  # a single C call, atomic under the GIL
+            except KeyError:
+                pass  # evicted meanwhile
+            return font
+        font = ImageFont.truetype(face.path, size, index=face.index)
+        FONT_LOADS.inc(result="load")
+        with self._lock:
+            font = self._fonts.setdefault(key, font)
+            while len(self._fonts) > self.max_instances:
+                self._fonts.popitem(last=False)
+            return font
+
+    # ------------------------------------------------------------------
+    # Background downloads
+    # ------------------------------------------------------------------
+
+    def prefetch(self, families: Iterable[str], weight: int = 400) -> List[Future]:
+        """
+        Download missing ``families`` in the background; returns immediately.
+
+        Each (family, weight) is attempted once per process, so an offline
+        host doesn't retry on every render. Downloads land in FontManager's
+        cache directory and are added to the index.
+        """
+        if not self.prefetch_enabled:
+            return []
+        futures = []
+        with self._lock:
+            for family in families:
+                key = (family, weight)
+                if family not in DOWNLOADABLE_FONTS or key in self._prefetches:
+                    continue
+                face = self.find(family, weight)
+                if face is not None and face.weight == weight:
+                    continue
+                future = self._prefetches[key] = Future()
+                self._downloads.put((family, weight, future))
+                futures.append(future)
+            if futures and self._download_thread is None:
+                # Daemon thread: process exit never waits on a font download
+                self._download_thread = threading.Thread(target=self._download_loop, name="font-prefetch", daemon=True)
+                self._download_thread.start()
+        return futures
+
+    def _download_loop(self) -> None:
+        while True:
+            family, weight, future = self._downloads.get()
+            try:
+                future.set_result(self._download(family, weight))
+            except Exception as e:
+                logger.warning(f"Font prefetch failed for {family} {weight}: {e}")
+                future.set_exception(e)
+
+    def _download(self, family: str, weight: int) -> Optional[FontFace]:
+        path = get_font_manager().download_font(family, weight)
+        if not path:
+            return None
+        return self.register_file(path, family=family, weight=weight)
+
+    def prefetch_personalities(self) -> List[Future]:
+        """Prefetch the primary fonts of every typography personality."""
+        futures = []
+        for config in FONT_PERSONALITY_MAP.values():
+            futures += self.prefetch(config["primary"], config["weight"])
+        return futures
+
+
+def _reset_after_fork() -> None:
+    for registry in list(_instances):
+        registry._after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+# =============================================================================
+# SINGLETON INSTANCE
+# =============================================================================
+
+_registry: Optional[FontRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_font_registry() -> FontRegistry:
+    """Get the process-wide FontRegistry."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = FontRegistry()
+    return _registry
+
+
+def warm_font_registry() -> FontRegistry:
+    """Index fonts now (process start) and prefetch the personality fonts."""
+    registry = get_font_registry()
+    registry.families()
+    registry.prefetch_personalities()
+    return registry
+
+
+def load_font(
+    families: Union[str, Sequence[str]],
+    size: float,
+    weight: int = 400,
+    italic: bool = False,
+) -> ImageFont.FreeTypeFont:
+    """Sized font from the process-wide registry (see ``FontRegistry.font``)."""
+    return get_font_registry().font(families, size, weight, italic)
@@ -4,11 +4,12 @@ Uses LAB color space for perceptually uniform gradients and proper dithering.
 """
 import numpy as np
 from PIL import Image
-import math
 import colorsys
 import logging
 from typing import Tuple, List
 
+from backend.services.render_layers import gradient_layer
+
 logger = logging.getLogger(__name__)
 
 
@@ -185,11 +186,16 @@ def generate_smooth_gradient(
     color1: Tuple[int, int, int],
     color2: Tuple[int, int, int],
     angle: int = 135,
-    style: str = "linear"
+    style: str = "linear",
+    template: str = "default"
 ) -> Image.Image:
     """
     Generate a smooth, band-free gradient using LAB color space interpolation.
     
+    The gradient is interpolated in LAB over a lookup table and ordered-dithered
+    at output resolution (replacing the old 4x supersample + LANCZOS pass), then
+    cached per (size, colors, angle, style) in render_layers.
+    
     Args:
         width: Target width
         height: Target height
@@ -197,129 +203,14 @@ def generate_smooth_gradient(
         color2: End color (R, G, B)
         angle: Gradient angle (0=horizontal, 90=vertical, 135=diagonal)
         style: Gradient style ("linear" or "radial")
+        template: Template name the cache hit/miss is attributed to
     
     Returns:
-        PIL Image with smooth gradient
+        PIL Image with smooth gradient (a copy the caller may draw on)
     """
-    logger.info(f"🎨 [GRADIENT] Starting LAB gradient generation: {width}x{height}, color1={color1}, color2={color2}, angle={angle}, style={style}")
-
-    # Detect monochrome/near-monochrome gradients (same hue, only lightness differs).
-    # For these, 4x upscaling + LAB conversion adds cost but no perceptual benefit
-    # since a=0, b=0 for grays.  Use 2x instead.
-    is_monochrome = _is_monochrome_gradient(color1, color2)
-    scale_factor = 2 if is_monochrome else 4
-    high_width = width * scale_factor
-    high_height = height * scale_factor
-    if is_monochrome:
-        logger.info(f"🎨 [GRADIENT] Monochrome gradient detected — using 2x scale for speed")
-    logger.info(f"🎨 [GRADIENT] High-res generation: {high_width}x{high_height} (scale={scale_factor}x)")
-    
-    # Convert colors to LAB (perceptually uniform)
-    L1, a1, b1 = rgb_to_lab(color1[0], color1[1], color1[2])
-    L2, a2, b2 = rgb_to_lab(color2[0], color2[1], color2[2])
-    logger.info(f"🎨 [GRADIENT] RGB->LAB conversion: color1 RGB{color1} -> LAB({L1:.2f}, {a1:.2f}, {b1:.2f}), color2 RGB{color2} -> LAB({L2:.2f}, {a2:.2f}, {b2:.2f})")
-    
-    # Create coordinate arrays
-    y_coords = np.arange(high_height, dtype=np.float64)[:, np.newaxis]
-    x_coords = np.arange(high_width, dtype=np.float64)[np.newaxis, :]
-    
-    if style == "radial":
-        # Radial gradient
-        center_x, center_y = high_width / 2, high_height / 2
-        dx = x_coords - center_x
-        dy = y_coords - center_y
-        dist = np.sqrt(dx**2 + dy**2)
-        max_dist = math.sqrt(center_x**2 + center_y**2)
-        progress = np.clip(dist / max_dist, 0, 1)
-    else:
-        # Linear gradient
-        if angle == 90:  # Vertical
-            progress = y_coords / max(high_height - 1, 1)
-        elif angle == 0:  # Horizontal
-            progress = x_coords / max(high_width - 1, 1)
-        else:  # Diagonal
-            # Use proper angle calculation
-            angle_rad = math.radians(angle)
-            # Normalize coordinates to [-1, 1]
-            x_norm = (x_coords / (high_width - 1)) * 2 - 1
-            y_norm = (y_coords / (high_height - 1)) * 2 - 1
-            # Rotate and project
-            progress = (x_norm * math.cos(angle_rad) + y_norm * math.sin(angle_rad) + 1) / 2
-            progress = np.clip(progress, 0, 1)
-    
-    # Interpolate in LAB space (perceptually uniform)
-    logger.info(f"🎨 [GRADIENT] Interpolating in LAB color space...")
-    L = L1 * (1 - progress) + L2 * progress
-    a = a1 * (1 - progress) + a2 * progress
-    b = b1 * (1 - progress) + b2 * progress
-    
-    # Log LAB range
-    logger.info(f"🎨 [GRADIENT] LAB ranges: L=[{L.min():.2f}, {L.max():.2f}], a=[{a.min():.2f}, {a.max():.2f}], b=[{b.min():.2f}, {b.max():.2f}]")
-    
-    # Convert back to RGB using vectorized operations (much faster)
-    # First convert LAB to XYZ, then XYZ to RGB
-    logger.info(f"🎨 [GRADIENT] Converting LAB->XYZ->RGB...")
-    fy = (L + 16) / 116
-    fx = a / 500 + fy
-    fz = fy - b / 200
-    
-    # Convert to XYZ
-    x = np.where(fx**3 > 0.008856, fx**3, (fx - 16/116) / 7.787)
-    y = np.where(fy**3 > 0.008856, fy**3, (fy - 16/116) / 7.787)
-    z = np.where(fz**3 > 0.008856, fz**3, (fz - 16/116) / 7.787)
-    
-    x *= 0.95047
-    z *= 1.08883
-    
-    # Convert XYZ to RGB
-    r = x * 3.2404542 + y * -1.5371385 + z * -0.4985314
-    g = x * -0.9692660 + y * 1.8760108 + z * 0.0415560
-    b = x * 0.0556434 + y * -0.2040259 + z * 1.0572252
-    
-    # Apply gamma correction
-    r = np.where(r <= 0.0031308, 12.92 * r, 1.055 * (r ** (1/2.4)) - 0.055)
-    g = np.where(g <= 0.0031308, 12.92 * g, 1.055 * (g ** (1/2.4)) - 0.055)
-    b = np.where(b <= 0.0031308, 12.92 * b, 1.055 * (b ** (1/2.4)) - 0.055)
-    
-    # Clamp and scale to 0-255
-    r = np.clip(r, 0, 1) * 255
-    g = np.clip(g, 0, 1) * 255
-    b = np.clip(b, 0, 1) * 255
-    
-    rgb_array = np.stack([r, g, b], axis=2).astype(np.float64)
-    
-    # Log RGB range before dithering
-    logger.info(f"🎨 [GRADIENT] RGB ranges before dithering: R=[{rgb_array[:,:,0].min():.2f}, {rgb_array[:,:,0].max():.2f}], G=[{rgb_array[:,:,1].min():.2f}, {rgb_array[:,:,1].max():.2f}], B=[{rgb_array[:,:,2].min():.2f}, {rgb_array[:,:,2].max():.2f}]")
-    
-    # Apply fast ordered dithering to reduce quantization artifacts
-    logger.info(f"🎨 [GRADIENT] Applying fast ordered dithering...")
-    rgb_array = apply_fast_dithering(rgb_array)
-    
-    # Log RGB range after dithering
-    logger.info(f"🎨 [GRADIENT] RGB ranges after dithering: R=[{rgb_array[:,:,0].min():.2f}, {rgb_array[:,:,0].max():.2f}], G=[{rgb_array[:,:,1].min():.2f}, {rgb_array[:,:,1].max():.2f}], B=[{rgb_array[:,:,2].min():.2f}, {rgb_array[:,:,2].max():.2f}]")
-    
-    # Create PIL image
-    high_res_img = Image.fromarray(rgb_array.astype(np.uint8), mode='RGB')
-    logger.info(f"🎨 [GRADIENT] High-res image created: {high_res_img.size}, mode={high_res_img.mode}")
-    
-    # Downscale using LANCZOS (best quality)
-    logger.info(f"🎨 [GRADIENT] Downscaling {high_width}x{high_height} -> {width}x{height} using LANCZOS...")
-    gradient_img = high_res_img.resize((width, height), Image.Resampling.LANCZOS)
-    
-    # Calculate gradient quality metrics
-    gradient_array = np.array(gradient_img)
-    unique_colors = len(np.unique(gradient_array.reshape(-1, 3), axis=0))
-    logger.info(f"🎨 [GRADIENT] Final gradient: {gradient_img.size}, mode={gradient_img.mode}, unique_colors={unique_colors}")
-    
-    # Check for potential banding (low unique color count relative to image size)
-    pixel_count = width * height
-    color_density = unique_colors / pixel_count
-    logger.info(f"🎨 [GRADIENT] Color density: {color_density:.4f} ({unique_colors} unique colors / {pixel_count} pixels)")
-    
-    if color_density < 0.1:
-        logger.warning(f"🎨 [GRADIENT] ⚠️ LOW COLOR DENSITY - Potential banding risk! color_density={color_density:.4f}")
-    
-    logger.info(f"🎨 [GRADIENT] ✅ Gradient generation complete: {width}x{height}")
-    
-    return gradient_img
-
+    direction = "radial" if style == "radial" else angle
+    gradient_img = gradient_layer(
+        (width, height), (tuple(color1[:3]), tuple(color2[:3])), direction, template=template
+    )
+    logger.debug(f"🎨 [GRADIENT] {width}x{height} {style} gradient {color1} -> {color2} (angle={angle})")
+    return gradient_img.copy()
@@ -0,0 +1,354 @@
+"""
+Image Encoding - WebP / JPEG variants of generated previews within a byte budget.
+
+Generated previews are saved as PNG with ``optimize=False`` so the gradient
+dithering survives, which makes a 1200x630 card 300 KB - 1 MB. Every
+crawler fetch and R2 egress pays for that. This module derives smaller
+variants of each uploaded preview:
+
+  - WebP and JPEG (``PREVIEW_IMAGE_FORMATS``), each at the highest quality on
+    the ladder ``MAX_QUALITY`` .. ``PREVIEW_IMAGE_MIN_QUALITY`` that fits
+    ``PREVIEW_IMAGE_BYTE_BUDGET_KB`` (binary search; the floor is kept even
+    when it misses the budget, so dithered gradients never band);
+  - JPEG keeps full-resolution chroma (4:4:4) so colored dither survives;
+  - formats are encoded on parallel threads (Pillow releases the GIL while
+    encoding).
+
+``upload_preview_image`` uploads the PNG as before and hands the variants to
+a write-behind publisher, which stores them next to the PNG
+(``<key>.webp``, ``<key>.jpg``) and records them in the Redis variant index.
+``pick_variant`` then lets the public preview and export endpoints serve the
+smallest variant the client accepts; until the variants exist (or when the
+index entry has expired) they serve the PNG.
+
+Usage:
+    image_url = upload_preview_image(png_bytes, f"previews/demo/{uuid4()}.png")
+    variant = pick_variant(image_url, request.headers.get("accept"))
+"""
+
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Dict, List, Optional, Sequence
+
+from PIL import Image
+
+from backend.services.cache import get_cached_image_variants, set_cached_image_variants
+from backend.services.preview.observability.metrics import IMAGE_VARIANT_KILOBYTES
+from backend.services.r2_client import upload_file_to_r2
+
+logger = logging.getLogger(__name__)
+
+IMAGE_FORMATS = [
+    name.strip().lower()
+    for name in os.getenv("PREVIEW_IMAGE_FORMATS", "webp,jpeg").split(",")
+    if name.strip()
+]
+IMAGE_BYTE_BUDGET_KB = float(os.getenv("PREVIEW_IMAGE_BYTE_BUDGET_KB", "150"))
+MIN_QUALITY = int(os.getenv("PREVIEW_IMAGE_MIN_QUALITY", "80"))
+MAX_QUALITY = 92
+QUALITY_STEP = 2
+IMAGE_VARIANT_QUEUE_SIZE = int(os.getenv("PREVIEW_IMAGE_VARIANT_QUEUE_SIZE", "16"))
+
+
+@dataclass(frozen=True)
+class ImageFormat:
+    name: str
+    pil_format: str
+    content_type: str
+    extension: str
+    lossy: bool
+
+
+FORMATS: Dict[str, ImageFormat] = {
+    "png": ImageFormat("png", "PNG", "image/png", "png", lossy=False),
+    "webp": ImageFormat("webp", "WEBP", "image/webp", "webp", lossy=True),
+    "jpeg": ImageFormat("jpeg", "JPEG", "image/jpeg", "jpg", lossy=True),
+}
+
+
+@dataclass
+class EncodedImage:
+    """One encoded variant of a preview."""
+    format: str
+    data: bytes
+    quality: Optional[int] = None
+    within_budget: bool = True
+
+    @property
+    def content_type(self) -> str:
+        return FORMATS[self.format].content_type
+
+    @property
+    def size(self) -> int:
+        return len(self.data)
+
+
+# =============================================================================
+# ENCODING
+# =============================================================================
+
+def _encode(image: Image.Image, fmt: ImageFormat, quality: int) -> bytes:
+    buffer = BytesIO()
+    if fmt.name == "jpeg":
+        image.save(buffer, format="JPEG", quality=quality, subsampling=0, optimize=True, progressive=True)
+    else:
+        image.save(buffer, format=fmt.pil_format, quality=quality, method=4)
+    return buffer.getvalue()
+
+
+def quality_ladder(min_quality: int = MIN_QUALITY, max_quality: int = MAX_QUALITY) -> List[int]:
+    """Qualities tried for the budget search, best first."""
+    return list(range(max_quality, min(min_quality, max_quality) - 1, -QUALITY_STEP))
+
+
+def encode_to_budget(
+    image: Image.Image,
+    format: str,
+    budget_bytes: Optional[int] = None,
+    qualities: Optional[Sequence[int]] = None,
+) -> EncodedImage:
+    """Highest ladder quality whose encoding fits ``budget_bytes``.
+
+    File size grows with quality, so the ladder is binary-searched (2-3
+    encodes instead of up to 7). If even the lowest quality misses the
+    budget, that encoding is returned with ``within_budget=False``.
+    """
+    fmt = FORMATS[format]
+    if budget_bytes is None:
+        budget_bytes = int(IMAGE_BYTE_BUDGET_KB * 1024)
+    qualities = list(qualities or quality_ladder())
+    if image.mode not in ("RGB", "L") and fmt.name == "jpeg":
+        image = image.convert("RGB")
+
+    encoded: Dict[int, bytes] = {}
+
+    def fits(index: int) -> bool:
+        quality = qualities[index]
+        if quality not in encoded:
+            encoded[quality] = _encode(image, fmt, quality)
+        return len(encoded[quality]) <= budget_bytes
+
+    lo, hi = 0, len(qualities)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if fits(mid):
+            hi = mid
+        else:
+            lo = mid + 1
+    if lo < len(qualities):
+        quality = qualities[lo]
+        return EncodedImage(format, encoded[quality], quality)
+    quality = qualities[-1]
+    return EncodedImage(format, encoded[quality], quality, within_budget=False)
+
+
+def encode_variants(
+    png_bytes: bytes,
+    formats: Optional[Sequence[str]] = None,
+    budget_bytes: Optional[int] = None,
+) -> Dict[str, EncodedImage]:
+    """PNG original plus one budgeted encoding per lossy format, encoded in parallel."""
+    formats = [name for name in (formats or IMAGE_FORMATS) if FORMATS.get(name, FORMATS["png"]).lossy]
+    variants = {"png": EncodedImage("png", png_bytes)}
+    if not formats:
+        return variants
+
+    image = Image.open(BytesIO(png_bytes))
+    image.load()
+    if image.mode not in ("RGB", "RGBA", "L"):
+        image = image.convert("RGBA" if image.has_transparency_data else "RGB")
+
+    with ThreadPoolExecutor(max_workers=len(formats), thread_name_prefix="encode") as executor:
+        futures = {name: executor.submit(encode_to_budget, image, name, budget_bytes) for name in formats}
+        for name, future in futures.items():
+            variants[name] = future.result()
+    for variant in variants.values():
+        IMAGE_VARIANT_KILOBYTES.observe(variant.size / 1024, format=variant.format)
+    return variants
+
+
+# =============================================================================
+# STORAGE
+# =============================================================================
+
+def variant_key(filename: str, format: str) -> str:
+    """R2 key of ``format``'s variant, next to the PNG: ``a/b.png`` -> ``a/b.webp``."""
+    stem = filename.rsplit(".", 1)[0] if "." in filename.rsplit("/", 1)[-1] else filename
+    return f"{stem}.{FORMATS[format].extension}"
+
+
+def store_image_variants(png_bytes: bytes, filename: str, image_url: str) -> Dict[str, Dict[str, object]]:
+    """Encode, upload and index the variants of an uploaded PNG (blocking)."""
+    start = time.perf_counter()
+    variants = encode_variants(png_bytes)
+    index: Dict[str, Dict[str, object]] = {
+        "png": {"url": image_url, "bytes": len(png_bytes), "content_type": "image/png"}
+    }
+    lossy = [variant for name, variant in variants.items() if name != "png"]
+    if not lossy:
+        return index
+
+    def upload(variant: EncodedImage) -> str:
+        return upload_file_to_r2(variant.data, variant_key(filename, variant.format), variant.content_type)
+
+    with ThreadPoolExecutor(max_workers=len(lossy), thread_name_prefix="encode-upload") as executor:
+        urls = list(executor.map(upload, lossy))
+    for variant, url in zip(lossy, urls):
+        index[variant.format] = {
+            "url": url,
+            "bytes": variant.size,
+            "content_type": variant.content_type,
+            "quality": variant.quality,
+        }
+    set_cached_image_variants(image_url, index)
+    logger.info(
+        f"🗜️ Stored image variants for {filename}: "
+        + ", ".join(f"{name}={entry['bytes'] // 1024}KB" for name, entry in index.items())
+        + f" ({(time.perf_counter() - start) * 1000:.0f}ms)"
+    )
+    return index
+
+
+class ImageVariantPublisher:
+    """
+    Write-behind queue that encodes and uploads preview variants on a daemon
+    thread, so the job only waits for the PNG upload. ``submit`` never
+    blocks: when the queue is full the variants are skipped (the PNG is
+    still served).
+    """
+
+    def __init__(self, max_pending: int = IMAGE_VARIANT_QUEUE_SIZE):
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, max_pending))
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {"queued": 0, "published": 0, "dropped": 0, "failed": 0}
+
+    def submit(self, png_bytes: bytes, filename: str, image_url: str) -> bool:
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait((png_bytes, filename, image_url))
+        except queue.Full:
+            self.stats["dropped"] += 1
+            logger.warning("Image variant queue full, serving PNG only for %s", filename)
+            return False
+        self.stats["queued"] += 1
+        return True
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Wait until queued variants are published; ``False`` on timeout."""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def _ensure_thread(self) -> None:
+        # Forked RQ work-horses inherit the object but not the thread
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="image-variant-publisher", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            png_bytes, filename, image_url = self._queue.get()
+            try:
+                store_image_variants(png_bytes, filename, image_url)
+                self.stats["published"] += 1
+            except Exception as e:  # noqa: BLE001 — variants are best effort
+                self.stats["failed"] += 1
+                logger.warning(f"Failed to publish image variants for {filename}: {e}")
+            finally:
+                self._queue.task_done()
+
+
+_publisher: Optional[ImageVariantPublisher] = None
+_publisher_lock = threading.Lock()
+
+
+def get_variant_publisher() -> ImageVariantPublisher:
+    global _publisher
+    if _publisher is None:
+        with _publisher_lock:
+            if _publisher is None:
+                _publisher = ImageVariantPublisher()
+    return _publisher
+
+
+def flush_image_variants(timeout: float = 10.0) -> bool:
+    """Drain pending variant uploads (call before a short-lived process exits)."""
+    if _publisher is None:
+        return True
+    return _publisher.flush(timeout)
+
+
+def upload_preview_image(png_bytes: bytes, filename: str) -> str:
+    """Upload a generated preview PNG and queue its WebP/JPEG variants.
+
+    Returns the PNG's public URL, exactly like ``upload_file_to_r2``.
+    """
+    image_url = upload_file_to_r2(png_bytes, filename, "image/png")
+    if image_url and IMAGE_FORMATS:
+        get_variant_publisher().submit(png_bytes, filename, image_url)
+    return image_url
+
+
+# =============================================================================
+# NEGOTIATION
+# =============================================================================
+
+def accepted_formats(accept: Optional[str]) -> List[str]:
+    """Formats an ``Accept`` header allows.
+
+    PNG and JPEG are universally decodable, so wildcards (and a missing
+    header) admit them; WebP must be listed explicitly (``image/webp``),
+    as browsers and modern crawlers do.
+    """
+    if not accept:
+        return ["png", "jpeg"]
+    allowed: List[str] = []
+    for part in accept.split(","):
+        media_range, *params = [piece.strip() for piece in part.split(";")]
+        media_range = media_range.lower()
+        weight = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        if weight <= 0:
+            continue
+        if media_range in ("*/*", "image/*"):
+            allowed.extend(["png", "jpeg"])
+        for name, fmt in FORMATS.items():
+            if media_range == fmt.content_type:
+                allowed.append(name)
+    return [name for name in FORMATS if name in allowed]
+
+
+def pick_variant(image_url: Optional[str], accept: Optional[str] = None) -> Dict[str, object]:
+    """Smallest stored variant of ``image_url`` the client accepts.
+
+    Falls back to the URL itself when no variants are indexed or none is
+    acceptable. The result has ``url`` and ``content_type`` (None if unknown).
+    """
+    variants = get_cached_image_variants(image_url) if image_url else None
+    if variants:
+        allowed = set(accepted_formats(accept))
+        candidates = [entry for name, entry in variants.items() if name in allowed]
+        if candidates:
+            return min(candidates, key=lambda entry: entry["bytes"])
+    return {"url": image_url, "content_type": None}
@@ -0,0 +1,301 @@
+"""
+Image Loading - per-job cache of decoded images, draft-mode JPEG decoding
+and reduce-first downscaling.
+
+Screenshots, logos, avatars and product images reach the renderers as bytes
+(logos are re-decoded from base64 by every template), were opened with
+``Image.open(BytesIO(...))`` at full resolution and scaled down with LANCZOS
+from there. ``load_image`` and ``resize_image``:
+
+  - decode each distinct image once per job (``track_images()`` scope;
+    outside one nothing is cached) and hand out copies;
+  - let JPEGs decode at 1/2, 1/4 or 1/8 scale (``Image.draft``, DCT scaling)
+    when the caller says how big the image will end up. Like
+    ``Image.thumbnail``, the decoded image stays at least ``REDUCING_GAP``
+    times the final size so the LANCZOS pass still has detail to work with;
+  - shrink large integer factors with ``Image.reduce`` (box average) before
+    the LANCZOS pass (``reducing_gap``), which then covers only the last
+    ``REDUCING_GAP``x of the downscale.
+
+Time saved is reported per job (log line, ``preview_image_processing_seconds``
+and the job trace): a cache hit saves the original decode; a draft decode or
+reduced resize saves the difference to what the full-resolution work would
+have cost at this process's measured ms-per-megapixel rate.
+
+Usage:
+    with track_images("render") as stats:
+        logo = load_image(logo_bytes, "RGBA", target=(80, 80))
+        logo = resize_image(logo, (80, 54))
+"""
+
+import contextvars
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from io import BytesIO
+from typing import Dict, Hashable, Iterator, Optional, Tuple
+
+from PIL import Image
+
+from backend.services.preview.observability.metrics import IMAGE_PROCESSING_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Decoded pixels kept per job (a 2880x1800 RGBA screenshot is ~20 MB)
+IMAGE_CACHE_MB = float(os.getenv("PREVIEW_IMAGE_CACHE_MB", "128"))
+# Final resample covers at least this factor; 0 disables draft decoding and reduce()
+REDUCING_GAP = float(os.getenv("PREVIEW_IMAGE_REDUCING_GAP", "2.0"))
+
+# Full-resolution cost seeds (ms per source megapixel); replaced by measurements
+_SEED_MS_PER_MP = {
+    "decode:JPEG": 8.0,
+    f"resize:{int(Image.Resampling.LANCZOS)}:RGB": 15.0,
+    f"resize:{int(Image.Resampling.LANCZOS)}:RGBA": 25.0,
+}
+_MIN_SAMPLE_MP = 0.25
+_PREMULTIPLIED = {"RGBA": "RGBa", "LA": "La"}
+
+
+# =============================================================================
+# STATS
+# =============================================================================
+
+@dataclass
+class ImageLoadStats:
+    """Decode/resize time spent in one job, and time saved by the cache, draft and reduce."""
+    decodes: int = 0
+    cache_hits: int = 0
+    drafted: int = 0
+    resizes: int = 0
+    reduced: int = 0
+    decode_ms: float = 0.0
+    resize_ms: float = 0.0
+    decode_saved_ms: float = 0.0
+    resize_saved_ms: float = 0.0
+
+    @property
+    def saved_ms(self) -> float:
+        return self.decode_saved_ms + self.resize_saved_ms
+
+    def to_dict(self) -> Dict[str, float]:
+        out = {k: round(v, 1) if isinstance(v, float) else v for k, v in asdict(self).items()}
+        out["saved_ms"] = round(self.saved_ms, 1)
+        return out
+
+
+class _CostModel:
+    """ms per megapixel of full-resolution decodes/resizes, learned from this process's own."""
+
+    def __init__(self):
+        self._rates = dict(_SEED_MS_PER_MP)
+        self._lock = threading.Lock()
+
+    def observe(self, kind: str, ms: float, megapixels: float) -> None:
+        if megapixels < _MIN_SAMPLE_MP:
+            return
+        rate = ms / megapixels
+        with self._lock:
+            previous = self._rates.get(kind)
+            self._rates[kind] = rate if previous is None else 0.8 * previous + 0.2 * rate
+
+    def saved(self, kind: str, ms: float, full_megapixels: float) -> float:
+        rate = self._rates.get(kind)
+        return max(0.0, rate * full_megapixels - ms) if rate is not None else 0.0
+
+
+_costs = _CostModel()
+
+
+# =============================================================================
+# PER-JOB CACHE
+# =============================================================================
+
+class _Decoded:
+    __slots__ = ("data", "image", "decode_ms", "nbytes")
+
+    def __init__(self, data: bytes, image: Image.Image, decode_ms: float):
+        self.data = data
+        self.image = image
+        self.decode_ms = decode_ms
+        self.nbytes = len(image.getbands()) * image.width * image.height
+
+
+class ImageCache:
+    """Decoded images of one job, LRU-bounded by decoded size."""
+
+    def __init__(self, max_mb: float = IMAGE_CACHE_MB):
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.stats = ImageLoadStats()
+        self._entries: "OrderedDict[Hashable, _Decoded]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, data: bytes) -> Optional[_Decoded]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not (entry.data is data or entry.data == data):
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: Hashable, entry: _Decoded) -> None:
+        if entry.nbytes > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.nbytes
+            self._entries[key] = entry
+            self._bytes += entry.nbytes
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+
+    def record(self, **deltas: float) -> None:
+        with self._lock:
+            for name, value in deltas.items():
+                setattr(self.stats, name, getattr(self.stats, name) + value)
+
+
+_current: contextvars.ContextVar[Optional[ImageCache]] = contextvars.ContextVar(
+    "preview_image_cache", default=None
+)
+
+
+def current_image_cache() -> Optional[ImageCache]:
+    return _current.get()
+
+
+@contextmanager
+def track_images(name: str = "job", max_mb: float = IMAGE_CACHE_MB) -> Iterator[ImageLoadStats]:
+    """Cache decoded images for the block and report time saved (nested calls reuse the outer cache)."""
+    existing = _current.get()
+    if existing is not None:
+        yield existing.stats
+        return
+    cache = ImageCache(max_mb)
+    token = _current.set(cache)
+    try:
+        yield cache.stats
+    finally:
+        _current.reset(token)
+        stats = cache.stats
+        if stats.decodes or stats.resizes:
+            IMAGE_PROCESSING_SECONDS.inc(stats.decode_ms / 1000, operation="decode", result="spent")
+            IMAGE_PROCESSING_SECONDS.inc(stats.decode_saved_ms / 1000, operation="decode", result="saved")
+            IMAGE_PROCESSING_SECONDS.inc(stats.resize_ms / 1000, operation="resize", result="spent")
+            IMAGE_PROCESSING_SECONDS.inc(stats.resize_saved_ms / 1000, operation="resize", result="saved")
+            logger.info(
+                f"🖼️ [IMAGE_LOADING] {name}: {stats.decodes} decodes ({stats.cache_hits} cached, "
+                f"{stats.drafted} draft), {stats.resizes} resizes ({stats.reduced} reduced), "
+                f"{stats.decode_ms + stats.resize_ms:.0f}ms spent, {stats.saved_ms:.0f}ms saved"
+            )
+
+
+# =============================================================================
+# LOADING / RESIZING
+# =============================================================================
+
+def _draft_scale(image: Image.Image, target: Optional[Tuple[int, int]], contain: bool) -> int:
+    """DCT scale (1, 2, 4, 8) keeping the final resize >= REDUCING_GAP x (see ``load_image``)."""
+    if image.format != "JPEG" or not target or REDUCING_GAP <= 0:
+        return 1
+    ratios = (image.width / max(1, target[0]), image.height / max(1, target[1]))
+    fits = (max(ratios) if contain else min(ratios)) / REDUCING_GAP
+    return next(s for s in (8, 4, 2, 1) if fits >= s)
+
+
+def load_image(
+    data: bytes,
+    mode: Optional[str] = None,
+    target: Optional[Tuple[int, int]] = None,
+    contain: bool = False,
+) -> Image.Image:
+    """
+    Decode ``data`` (converted to ``mode``), reusing the job's earlier decode.
+
+    ``target`` is the largest size the caller will scale the image to: both
+    sides at least cover it, or with ``contain`` the image is fitted inside
+    it. JPEGs then decode at the smallest DCT scale that keeps ``REDUCING_GAP``
+    to spare. Returns a copy the caller may modify.
+    """
+    data = bytes(data) if not isinstance(data, bytes) else data
+    cache = _current.get()
+    image = Image.open(BytesIO(data))
+    scale = _draft_scale(image, target, contain)
+    content = (hash(data), len(data), mode)
+
+    if cache is not None:
+        for s in (8, 4, 2, 1):
+            entry = cache.get((*content, s), data) if s <= scale else None
+            if entry is not None:
+                cache.record(decodes=1, cache_hits=1, decode_saved_ms=entry.decode_ms)
+                return entry.image.copy()
+
+    fmt, full_megapixels = image.format, image.width * image.height / 1e6
+    started = time.perf_counter()
+    if scale > 1:
+        image.draft(image.mode, (image.width // scale, image.height // scale))
+    image.load()
+    if mode is not None and image.mode != mode:
+        image = image.convert(mode)
+    decode_ms = (time.perf_counter() - started) * 1000
+
+    saved = 0.0
+    if scale > 1:
+        saved = _costs.saved(f"decode:{fmt}", decode_ms, full_megapixels)
+    else:
+        _costs.observe(f"decode:{fmt}", decode_ms, full_megapixels)
+
+    if cache is not None:
+        cache.record(decodes=1, drafted=int(scale > 1), decode_ms=decode_ms, decode_saved_ms=saved)
+        cache.put((*content, scale), _Decoded(data, image, decode_ms))
+        return image.copy()
+    return image
+
+
+def resize_image(
+    image: Image.Image,
+    size: Tuple[int, int],
+    resample: int = Image.Resampling.LANCZOS,
+) -> Image.Image:
+    """
+    ``image.resize(size, resample)``, reducing large integer factors first.
+
+    Each axis is box-reduced by ``int(factor / REDUCING_GAP)`` before the
+    resample (Pillow's ``reducing_gap``); up-scales and small downscales are
+    plain resizes.
+    """
+    size = (max(1, int(size[0])), max(1, int(size[1])))
+    reduced = REDUCING_GAP > 0 and (image.width / size[0] >= 2 * REDUCING_GAP
+                                    or image.height / size[1] >= 2 * REDUCING_GAP)
+    started = time.perf_counter()
+    if not reduced:
+        resized = image.resize(size, resample)
+    elif image.mode == "RGBA" and image.getchannel("A").getextrema() == (255, 255):
+        # Opaque (e.g. a JPEG converted for pasting): nothing to premultiply
+        resized = image.convert("RGB").resize(size, resample, reducing_gap=REDUCING_GAP).convert("RGBA")
+    elif image.mode in _PREMULTIPLIED:
+        # Image.resize premultiplies RGBA/LA itself but drops reducing_gap doing so
+        premultiplied = image.convert(_PREMULTIPLIED[image.mode])
+        resized = premultiplied.resize(size, resample, reducing_gap=REDUCING_GAP).convert(image.mode)
+    else:
+        resized = image.resize(size, resample, reducing_gap=REDUCING_GAP)
+    resize_ms = (time.perf_counter() - started) * 1000
+
+    kind = f"resize:{int(resample)}:{image.mode}"
+    megapixels = image.width * image.height / 1e6
+    saved = 0.0
+    if reduced:
+        saved = _costs.saved(kind, resize_ms, megapixels)
+    elif size[0] < image.width or size[1] < image.height:
+        _costs.observe(kind, resize_ms, megapixels)
+
+    cache = _current.get()
+    if cache is not None:
+        cache.record(resizes=1, reduced=int(reduced), resize_ms=resize_ms, resize_saved_ms=saved)
+    return resized
@@ -19,6 +19,8 @@ from dataclasses import dataclass, field, asdict
 from datetime import datetime
 from contextvars import ContextVar
 
+from backend.services.preview.observability.metrics import record_ai_usage
+
 logger = logging.getLogger(__name__)
 
 T = TypeVar('T')
@@ -291,6 +293,7 @@ def track_ai_call(model: str, provider: str = "openai", operation: str = "comple
 
                 # Extract metrics from OpenAI response
                 if hasattr(result, 'usage') and result.usage:
+                    record_ai_usage(model, result.usage)
                     metrics.prompt_tokens = result.usage.prompt_tokens
                     metrics.completion_tokens = result.usage.completion_tokens
                     metrics.total_tokens = result.usage.total_tokens
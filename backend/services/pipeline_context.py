@@ -5,7 +5,8 @@ This is the connective tissue of the preview pipeline. Every stage receives
 and enriches the same PipelineContext, providing:
 - Request tracing (request_id propagated everywhere)
 - Time budget enforcement (stages respect remaining time)
-- Stage telemetry (automatic timing per stage)
+- Cooperative cancellation (every stage checks the job's CancellationToken)
+- Stage telemetry (automatic timing per stage, one trace span per stage)
 - Accumulated diagnostics (warnings, errors, quality signals)
 - Progress tracking (unified callback abstraction)
 
@@ -27,6 +28,16 @@ from typing import Any, Callable, Dict, List, Optional
 from uuid import uuid4
 
 from backend.services.graceful_degradation import TimeoutBudget, OpenAICircuitBreaker, QualityTier
+from backend.services.cancellation import CancellationToken, PipelineCancelled
+from backend.services.preview.observability.metrics import STAGE_DURATION
+from backend.services.preview.observability.profiler import current_sampler
+from backend.services.preview.observability.memory import current_memory_monitor
+from backend.services.preview.observability.tracing import (
+    current_span,
+    current_traceparent,
+    extract,
+    start_span,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -43,6 +54,7 @@ class StageResult:
     outputs: Dict[str, Any] = field(default_factory=dict)
     skipped: bool = False
     skip_reason: Optional[str] = None
+    memory: Dict[str, float] = field(default_factory=dict)
 
 
 class StageTimer:
@@ -52,6 +64,11 @@ class StageTimer:
         self._ctx = ctx
         self._name = name
         self._result = StageResult(name=name)
+        self._sampler = None
+        self._memory = None
+        self._memory_handle = None
+        self._span_scope = None
+        self._span = None
 
     def set_output(self, key: str, value: Any):
         self._result.outputs[key] = value
@@ -63,17 +80,46 @@ class StageTimer:
 
     def __enter__(self):
         self._result.started_at = time.time()
+        try:
+            self._ctx.check_cancelled(self._name)
+        except PipelineCancelled as e:
+            self._result.finished_at = self._result.started_at
+            self._result.skipped = True
+            self._result.skip_reason = str(e)
+            self._ctx._record_stage(self._result)
+            STAGE_DURATION.observe(0.0, stage=self._name, status="cancelled")
+            raise
+        self._sampler = current_sampler()
+        if self._sampler is not None:
+            self._sampler.push_stage(self._name)
+        self._memory = current_memory_monitor()
+        if self._memory is not None:
+            self._memory_handle = self._memory.stage_enter(self._name)
+        # Threads not wrapped with bind_current fall back to the job's root span
+        parent = None if current_span() is not None else extract(self._ctx.traceparent)
+        self._span_scope = start_span(f"stage.{self._name}", parent=parent,
+                                      attributes={"preview.stage": self._name})
+        self._span = self._span_scope.__enter__()
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         self._result.finished_at = time.time()
         self._result.duration_ms = (self._result.finished_at - self._result.started_at) * 1000
+        if self._sampler is not None:
+            self._sampler.pop_stage()
+        if self._memory is not None:
+            self._result.memory = self._memory.stage_exit(self._memory_handle)
 
         if exc_type is not None:
             self._result.success = False
             self._result.error = str(exc_val)
 
         self._ctx._record_stage(self._result)
+        status = "skipped" if self._result.skipped else ("ok" if self._result.success else "error")
+        if self._span_scope is not None:
+            self._span.set_attribute("preview.stage.status", status)
+            self._span_scope.__exit__(exc_type, exc_val, exc_tb)
+        STAGE_DURATION.observe(self._result.duration_ms / 1000.0, stage=self._name, status=status)
         return False  # Don't suppress exceptions
 
 
@@ -86,12 +132,15 @@ class PipelineContext:
     and used to build the final telemetry summary.
     """
     request_id: str = ""
+    # W3C traceparent of the job's root span (tracing.extract() to parent spans)
+    traceparent: Optional[str] = None
     url: str = ""
     is_demo: bool = False
     start_time: float = 0.0
 
     # Time budget enforcement
     budget: Optional[TimeoutBudget] = None
+    cancel_token: Optional[CancellationToken] = None
 
     # Circuit breaker reference (singleton, shared across requests)
     circuit_breaker: Optional[OpenAICircuitBreaker] = None
@@ -123,14 +172,21 @@ class PipelineContext:
         is_demo: bool = False,
         total_budget_seconds: float = 60.0,
         progress_callback: Optional[Callable[[float, str], None]] = None,
+        cancel_token: Optional[CancellationToken] = None,
     ) -> 'PipelineContext':
-        """Create a new pipeline context for a generation request."""
+        """Create a new pipeline context for a generation request.
+
+        ``cancel_token`` lets the caller cancel the job; when omitted, a token
+        expiring after ``total_budget_seconds`` is created.
+        """
         return cls(
             request_id=str(uuid4())[:12],
+            traceparent=current_traceparent(),
             url=url,
             is_demo=is_demo,
             start_time=time.time(),
             budget=TimeoutBudget(total_budget_seconds),
+            cancel_token=cancel_token or CancellationToken.with_timeout(total_budget_seconds),
             circuit_breaker=OpenAICircuitBreaker.get_instance(),
             _progress_callback=progress_callback,
         )
@@ -150,10 +206,27 @@ class PipelineContext:
         return 30.0
 
     def is_expired(self) -> bool:
+        if self.cancel_token and self.cancel_token.expired:
+            return True
         if self.budget:
             return self.budget.is_expired()
         return False
 
+    # -- Cancellation ---------------------------------------------------------
+
+    def cancel(self, reason: str = "cancelled"):
+        if self.cancel_token:
+            self.cancel_token.cancel(reason)
+
+    def should_stop(self) -> bool:
+        """True once the job was cancelled or ran past its deadline."""
+        return bool(self.cancel_token and self.cancel_token.should_stop())
+
+    def check_cancelled(self, where: str = ""):
+        """Raise PipelineCancelled / DeadlineExceeded if the job must stop."""
+        if self.cancel_token:
+            self.cancel_token.raise_if_cancelled(where)
+
     # -- Circuit breaker ------------------------------------------------------
 
     def ai_available(self) -> bool:
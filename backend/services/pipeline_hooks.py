@@ -13,6 +13,7 @@ operational concerns.
 """
 
 import logging
+import os
 import re
 from typing import Any, Dict, List, Optional
 from urllib.parse import urlparse
@@ -43,6 +44,14 @@ class InputValidator:
         re.compile(r"^\[::1\]"),
     ]
 
+    # Hostnames exempt from the private-network check. Only for local load
+    # tests against the site farm; never set in production.
+    ALLOWED_PRIVATE_HOSTS = frozenset(
+        h.strip().lower()
+        for h in os.getenv("PREVIEW_ALLOW_PRIVATE_HOSTS", "").split(",")
+        if h.strip()
+    )
+
     @classmethod
     def validate_url(cls, url: str) -> str:
         """
@@ -81,11 +90,11 @@ class InputValidator:
         # SSRF protection - block private IPs
         hostname = parsed.hostname.lower()
         for pattern in cls.PRIVATE_PATTERNS:
-            if pattern.match(hostname):
+            if hostname not in cls.ALLOWED_PRIVATE_HOSTS and pattern.match(hostname):
                 raise ValueError("URLs pointing to private/internal networks are not allowed")
 
         # Must have a valid TLD (basic check)
-        if "." not in hostname and hostname != "localhost":
+        if "." not in hostname and hostname != "localhost" and hostname not in cls.ALLOWED_PRIVATE_HOSTS:
             raise ValueError(f"Invalid hostname: {hostname}")
 
         # Length sanity
@@ -10,6 +10,8 @@ Each platform has unique:
 - Safe zones for cropping
 
 Supports: LinkedIn, Twitter/X, Facebook, Slack, Discord, and more.
+Multi-platform batches fan out across cores through the render farm
+(``render_platform_spec``).
 """
 
 import logging
@@ -19,6 +21,8 @@ from io import BytesIO
 from PIL import Image, ImageDraw, ImageFont
 from enum import Enum
 
+from backend.services.render_farm import RenderExecutor, RenderSpec, get_render_executor
+
 logger = logging.getLogger(__name__)
 
 
@@ -302,11 +306,17 @@ class PlatformVariant:
     readability_score: float = 1.0
     platform_fit_score: float = 1.0
     
+    # Encoded bytes by format (filled by render farm workers and to_bytes)
+    encoded: Dict[str, bytes] = field(default_factory=dict, repr=False)
+    
     def to_bytes(self, format: str = "PNG") -> bytes:
         """Convert image to bytes."""
-        buffer = BytesIO()
-        self.image.save(buffer, format=format)
-        return buffer.getvalue()
+        data = self.encoded.get(format.upper())
+        if data is None:
+            buffer = BytesIO()
+            self.image.save(buffer, format=format)
+            data = self.encoded[format.upper()] = buffer.getvalue()
+        return data
     
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -353,9 +363,15 @@ class PlatformOptimizer:
     adjusting dimensions, text sizing, and style.
     """
     
-    def __init__(self):
-        """Initialize optimizer."""
+    def __init__(self, executor: Optional[RenderExecutor] = None):
+        """
+        Initialize optimizer.
+        
+        Args:
+            executor: Render executor for multi-platform batches (default: shared one)
+        """
         self.configs = PLATFORM_CONFIGS
+        self.executor = executor
         logger.info(
             f"PlatformOptimizer initialized: "
             f"{len(self.configs)} platforms configured"
@@ -449,9 +465,25 @@ class PlatformOptimizer:
         """
         variants = {}
         
-        for platform in platforms:
-            variant = self.optimize_for_platform(base_image, platform, content)
-            variants[platform] = variant
+        executor = self.executor or get_render_executor()
+        if executor.fans_out(len(platforms)):
+            results = executor.map([
+                RenderSpec("platform", text=dict(content or {}), assets={"base": base_image},
+                           options={"platform": platform.value})
+                for platform in platforms
+            ])
+            for platform, result in zip(platforms, results):
+                variants[platform] = PlatformVariant(
+                    platform=platform,
+                    config=self.get_platform_config(platform),
+                    image=result.to_image(),
+                    encoded={result.format.upper(): result.to_bytes()},
+                    **result.info
+                )
+        else:
+            for platform in platforms:
+                variant = self.optimize_for_platform(base_image, platform, content)
+                variants[platform] = variant
         
         return MultiPlatformResult(
             variants=variants,
@@ -846,3 +878,16 @@ def adapt_content_for_platform(
         "description": ContentAdapter.adapt_description(description, platform_enum)
     }
 
+
+def render_platform_spec(spec: RenderSpec, assets: Dict[str, Image.Image]):
+    """Render farm entry point: ``assets["base"]`` optimized for ``options["platform"]``."""
+    optimizer = get_platform_optimizer()
+    platform = optimizer.get_platform_by_name(spec.options["platform"])
+    variant = optimizer.optimize_for_platform(assets["base"], platform, spec.text or None)
+    return variant.image, {
+        "text_adjustments": variant.text_adjustments,
+        "style_adjustments": variant.style_adjustments,
+        "readability_score": variant.readability_score,
+        "platform_fit_score": variant.platform_fit_score
+    }
+
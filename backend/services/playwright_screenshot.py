@@ -6,9 +6,17 @@ import time
 from typing import Tuple, List, Dict, Any, Optional
 from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError, Error as PlaywrightError, Page, Playwright, Browser
 
+from backend.services.cancellation import PipelineCancelled, bounded_timeout, raise_if_cancelled
+from backend.services.preview.observability.metrics import BROWSER_POOL_WAIT
+
 logger = logging.getLogger(__name__)
 
 
+def _nav_timeout_ms(default_seconds: float) -> int:
+    """Navigation timeout clamped to the current job's remaining deadline."""
+    return int(bounded_timeout(default_seconds) * 1000)
+
+
 # =============================================================================
 # BROWSER POOL - Maintain warm Chromium instances for faster screenshots
 # =============================================================================
@@ -74,7 +82,11 @@ class BrowserPool:
         if not self._initialized or not self._browsers:
             return None
 
+        wait_started = time.monotonic()
         acquired = self._semaphore.acquire(timeout=5)
+        BROWSER_POOL_WAIT.observe(
+            time.monotonic() - wait_started, outcome="acquired" if acquired else "timeout"
+        )
         if not acquired:
             return None
 
@@ -457,6 +469,8 @@ def capture_screenshot(url: str) -> bytes:
             finally:
                 browser.close()
 
+    except PipelineCancelled:
+        raise
     except Exception as e:
         if "Failed to" not in str(e) and "error" not in str(e).lower():
             logger.error(f"Unexpected error capturing screenshot for {url}: {e}")
@@ -472,14 +486,15 @@ def _capture_screenshot_with_browser(browser: Browser, url: str) -> bytes:
     )
 
     try:
+        raise_if_cancelled("screenshot navigation")
         try:
             # Try domcontentloaded first (fastest)
             try:
-                page.goto(url, wait_until="domcontentloaded", timeout=20000)
+                page.goto(url, wait_until="domcontentloaded", timeout=_nav_timeout_ms(20))
                 page.wait_for_timeout(1500)
             except PlaywrightTimeoutError:
                 logger.warning(f"DOMContentLoaded timeout for {url}, trying 'load' strategy")
-                page.goto(url, wait_until="load", timeout=15000)
+                page.goto(url, wait_until="load", timeout=_nav_timeout_ms(15))
                 page.wait_for_timeout(2000)
         except PlaywrightTimeoutError as e:
             logger.error(f"Page navigation timeout for {url} (both strategies failed): {e}")
@@ -691,6 +706,8 @@ def capture_screenshot_and_html(url: str) -> Tuple[bytes, str, Dict[str, Any]]:
             finally:
                 browser.close()
 
+    except PipelineCancelled:
+        raise
     except Exception as e:
         if "Failed to" not in str(e) and "error" not in str(e).lower():
             logger.error(f"Unexpected error capturing screenshot/HTML for {url}: {e}")
@@ -706,13 +723,14 @@ def _capture_screenshot_and_html_with_browser(browser: Browser, url: str) -> Tup
     )
 
     try:
+        raise_if_cancelled("screenshot navigation")
         try:
-            page.goto(url, wait_until="domcontentloaded", timeout=20000)
+            page.goto(url, wait_until="domcontentloaded", timeout=_nav_timeout_ms(20))
             page.wait_for_timeout(1500)
         except PlaywrightTimeoutError as e:
             logger.warning(f"DOMContentLoaded timeout for {url}, trying 'load' strategy: {e}")
             try:
-                page.goto(url, wait_until="load", timeout=15000)
+                page.goto(url, wait_until="load", timeout=_nav_timeout_ms(15))
                 page.wait_for_timeout(2000)
             except PlaywrightTimeoutError as e2:
                 logger.error(f"Page navigation timeout for {url} (both strategies failed): {e2}")
@@ -730,7 +748,7 @@ def _capture_screenshot_and_html_with_browser(browser: Browser, url: str) -> Tup
                         device_scale_factor=2,
                         ignore_https_errors=True
                     )
-                    page.goto(url, wait_until="domcontentloaded", timeout=20000)
+                    page.goto(url, wait_until="domcontentloaded", timeout=_nav_timeout_ms(20))
                     page.wait_for_timeout(1500)
                 except Exception:
                     raise Exception(f"SSL certificate error: {error_msg}")
@@ -6,6 +6,7 @@ This package contains the modular phases of the demo preview engine fix plan:
   - extraction:    Phase 4 — Specialized prompts + deterministic validators
   - templates:     Phase 3 — Versioned template contracts
   - lanes:         Phase 6 — Dual-lane (fast/deep) orchestration
+  - artifacts:     Stage-level artifact cache shared across quality modes
 
 Each sub-module is importable in isolation and is wired into the existing
 PreviewEngine via lightweight glue rather than a rewrite, so reverts are cheap.
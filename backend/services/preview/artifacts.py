@@ -0,0 +1,204 @@
+"""Stage-level artifact cache shared across quality modes.
+
+Final results are cached per quality mode (``demo:preview:v3:{mode}:``), so a
+user who views ``fast`` and then ``ultra`` for the same URL used to pay for
+capture, brand extraction and stage 1–3 reasoning twice. This module caches
+the intermediate artifacts under mode-independent keys instead:
+
+    capture    screenshot + HTML + DOM data (+ uploaded screenshot URL)
+    brand      brand elements (logo, colors, hero image)
+    reasoning  raw AI reasoning output (+ UI elements when extracted)
+    blueprint  normalized AI result, ready for composition
+
+The engine loads every cached stage up front and only runs what is missing,
+i.e. it resumes from the highest cached stage. Reasoning-derived artifacts
+record the rank of the path that produced them (HTML-only, single-pass
+vision, multi-agent); a job only reuses them when that rank is at least what
+its own configuration would have produced, so ``ultra`` never silently
+serves ``fast``-grade reasoning while ``fast`` happily reuses ``ultra`` work.
+"""
+
+from __future__ import annotations
+
+import base64
+import copy
+import logging
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from backend.services.preview_cache import cache_get, cache_set, generate_cache_key
+
+logger = logging.getLogger(__name__)
+
+
+# ---------------------------------------------------------------------------
+# Stages and producer ranks
+# ---------------------------------------------------------------------------
+
+STAGE_CAPTURE = "capture"
+STAGE_BRAND = "brand"
+STAGE_REASONING = "reasoning"
+STAGE_BLUEPRINT = "blueprint"
+STAGES: List[str] = [STAGE_CAPTURE, STAGE_BRAND, STAGE_REASONING, STAGE_BLUEPRINT]
+
+# Producer rank for reasoning-derived artifacts (higher = richer analysis).
+RANK_HTML = 1
+RANK_VISION = 2
+RANK_MULTI_AGENT = 3
+
+ARTIFACT_PREFIX = "preview:artifact:"
+ARTIFACT_TTL_SECONDS = int(os.getenv("PREVIEW_ARTIFACT_TTL_SECONDS", str(6 * 3600)))
+
+
+def _key(stage: str, url: str) -> str:
+    return generate_cache_key(url, f"{ARTIFACT_PREFIX}{stage}:")
+
+
+# ---------------------------------------------------------------------------
+# Process-wide reuse counters
+# ---------------------------------------------------------------------------
+
+_stats_lock = threading.Lock()
+_stats: Dict[str, Dict[str, int]] = {stage: {"reused": 0, "computed": 0} for stage in STAGES}
+
+
+def _count(stage: str, reused: bool) -> None:
+    with _stats_lock:
+        _stats[stage]["reused" if reused else "computed"] += 1
+
+
+def get_artifact_stats() -> Dict[str, Dict[str, int]]:
+    """Per-stage reuse/compute counts for this process."""
+    with _stats_lock:
+        return {stage: dict(counts) for stage, counts in _stats.items()}
+
+
+# ---------------------------------------------------------------------------
+# Artifact bundle
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class StageArtifacts:
+    """Artifacts loaded for (or produced by) one job."""
+
+    url: str
+    enabled: bool = True
+    capture: Optional[Dict[str, Any]] = None
+    brand: Optional[Dict[str, Any]] = None
+    reasoning: Optional[Dict[str, Any]] = None
+    blueprint: Optional[Dict[str, Any]] = None
+    reused: Dict[str, bool] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, url: str, enabled: bool = True) -> "StageArtifacts":
+        """
+        Fetch every cached stage for ``url``; missing stages stay ``None``.
+
+        The local cache tier hands out shared objects, and the engine edits
+        its AI result and brand elements in place, so each job gets its own copy.
+        """
+        artifacts = cls(url=url, enabled=enabled)
+        if not enabled:
+            return artifacts
+        for stage in STAGES:
+            try:
+                setattr(artifacts, stage, copy.deepcopy(cache_get(_key(stage, url))))
+            except Exception as exc:  # noqa: BLE001 — cache must never fail a job
+                logger.warning("Artifact read failed for %s: %s", stage, exc)
+        return artifacts
+
+    # ---- readers --------------------------------------------------------
+
+    def highest_cached_stage(self) -> Optional[str]:
+        cached = [stage for stage in STAGES if getattr(self, stage)]
+        return cached[-1] if cached else None
+
+    def capture_bundle(self) -> Optional[Dict[str, Any]]:
+        """Decoded capture bundle: screenshot bytes, HTML, DOM data, screenshot URL."""
+        if not self.capture:
+            return None
+        try:
+            screenshot = base64.b64decode(self.capture["screenshot_b64"])
+        except (KeyError, TypeError, ValueError):
+            return None
+        return {
+            "screenshot_bytes": screenshot,
+            "html_content": self.capture.get("html_content") or "",
+            "dom_data": self.capture.get("dom_data") or {},
+            "screenshot_url": self.capture.get("screenshot_url"),
+        }
+
+    def usable_reasoning(self, required_rank: int, needs_ui_elements: bool) -> Optional[Dict[str, Any]]:
+        """Cached reasoning if it is at least as rich as this job requires."""
+        if not self.reasoning or self.reasoning.get("rank", 0) < required_rank:
+            return None
+        if needs_ui_elements and not self.reasoning.get("ui_extracted"):
+            # Reasoning is reusable; the engine extracts UI elements on its own.
+            return {**self.reasoning, "ui_elements": None}
+        return self.reasoning
+
+    def usable_blueprint(self, required_rank: int) -> Optional[Dict[str, Any]]:
+        if not self.blueprint or self.blueprint.get("rank", 0) < required_rank:
+            return None
+        return self.blueprint.get("ai_result")
+
+    def mark(self, stage: str, reused: bool) -> None:
+        self.reused[stage] = reused
+        _count(stage, reused)
+
+    # ---- writers --------------------------------------------------------
+
+    @staticmethod
+    def _outranked(existing: Optional[Dict[str, Any]], rank: int) -> bool:
+        # A degraded run (e.g. vision fell back to HTML) must not overwrite
+        # richer reasoning another mode already paid for.
+        return bool(existing) and existing.get("rank", 0) > rank
+
+    def _store(self, stage: str, payload: Dict[str, Any]) -> None:
+        setattr(self, stage, payload)
+        if not self.enabled:
+            return
+        try:
+            cache_set(_key(stage, self.url), payload, ARTIFACT_TTL_SECONDS)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Artifact write failed for %s: %s", stage, exc)
+
+    def store_capture(
+        self,
+        screenshot_bytes: bytes,
+        html_content: str,
+        dom_data: Dict[str, Any],
+        screenshot_url: Optional[str],
+    ) -> None:
+        self._store(STAGE_CAPTURE, {
+            "screenshot_b64": base64.b64encode(screenshot_bytes).decode("ascii"),
+            "html_content": html_content,
+            "dom_data": dom_data or {},
+            "screenshot_url": screenshot_url,
+        })
+
+    def store_brand(self, brand_elements: Dict[str, Any]) -> None:
+        self._store(STAGE_BRAND, {"brand_elements": brand_elements})
+
+    def store_reasoning(
+        self,
+        ai_result: Dict[str, Any],
+        rank: int,
+        ui_elements: Optional[Dict[str, Any]],
+    ) -> None:
+        if self._outranked(self.reasoning, rank):
+            return
+        self._store(STAGE_REASONING, {
+            "ai_result": ai_result,
+            "rank": rank,
+            "ui_extracted": ui_elements is not None,
+            "ui_elements": ui_elements or {},
+        })
+
+    def store_blueprint(self, ai_result: Dict[str, Any], rank: int) -> None:
+        if self._outranked(self.blueprint, rank):
+            return
+        self._store(STAGE_BLUEPRINT, {"ai_result": ai_result, "rank": rank})
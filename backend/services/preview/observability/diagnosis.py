@@ -66,6 +66,8 @@ def diagnose(trace_payload: Dict[str, Any]) -> Dict[str, Any]:
                            + int(trace_payload.get("ai_tokens_output", 0)),
         "ai_call_count": trace_payload.get("ai_call_count"),
         "bottleneck_stage": bottleneck,
+        "profile_stages": _profile_summary(trace_payload.get("profile")),
+        "memory": trace_payload.get("memory") or {},
         "warnings": trace_payload.get("warnings") or [],
     }
 
@@ -81,6 +83,16 @@ def _identify_bottleneck(stages: List[Dict[str, Any]]) -> Optional[Dict[str, Any
     }
 
 
+def _profile_summary(profile: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Samples and CPU ms per stage, without the (large) stack tables."""
+    if not profile:
+        return None
+    return {
+        name: {"samples": data.get("samples", 0), "cpu_ms": data.get("cpu_ms", 0.0)}
+        for name, data in (profile.get("stages") or {}).items()
+    }
+
+
 def diagnose_job(job_id: str) -> Optional[Dict[str, Any]]:
     """Look up a job in the store and return its diagnosis."""
     payload = JobTraceStore.get_instance().get(job_id)
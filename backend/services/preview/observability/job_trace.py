@@ -10,8 +10,9 @@ Implements the trace schema from Phase 2 of the plan:
     retry_count + retry_deltas
     terminal status + reason code
 
-The store is in-memory (LRU) by default; callers can plug in Redis or any
-KV store via ``JobTraceStore.set_backend(...)``. The point is that every
+The store keeps an in-memory LRU and, with ``PREVIEW_TRACE_STORE=redis``
+(default), persists to Redis Streams (``trace_store.py``); callers can plug
+in any other KV store via ``JobTraceStore.set_backend(...)``. The point is that every
 trace is queryable for the developer "job diagnosis" utility called out by
 the plan and for the nightly regression dashboard (Phase 7).
 """
@@ -54,6 +55,8 @@ class StageTiming:
     skipped: bool = False
     error: Optional[str] = None
     outputs: Dict[str, Any] = field(default_factory=dict)
+    # RSS / tracemalloc measurements in MB (memory.MemoryMonitor.stage_exit)
+    memory: Dict[str, float] = field(default_factory=dict)
 
 
 @dataclass
@@ -81,6 +84,10 @@ class JobTrace:
     end_ts: Optional[float] = None
     is_demo: bool = False
     lane: Optional[PreviewLane] = None
+    # Demo quality mode (fast/balanced/ultra) when the caller used one
+    quality_mode: Optional[str] = None
+    # Distributed trace id (tracing.py) linking API, queue, worker and AI spans
+    trace_id: Optional[str] = None
 
     # Stage timings, keyed by stage name for O(1) lookup, list preserves order.
     stage_timings: List[StageTiming] = field(default_factory=list)
@@ -109,6 +116,18 @@ class JobTrace:
     ai_tokens_output: int = 0
     ai_call_count: int = 0
 
+    # Stage artifacts reused from another quality mode's run (stage -> reused?)
+    artifact_reuse: Dict[str, bool] = field(default_factory=dict)
+
+    # Peak RSS / allocation summary and memory-budget verdict
+    memory: Dict[str, Any] = field(default_factory=dict)
+
+    # Image decode/resize time spent and saved (image_loading.ImageLoadStats)
+    image_loading: Dict[str, Any] = field(default_factory=dict)
+
+    # Sampling profile folded per stage (profiler.StackSampler.to_dict), opt-in
+    profile: Optional[Dict[str, Any]] = None
+
     # Free-form notes (kept short)
     warnings: List[str] = field(default_factory=list)
     notes: List[str] = field(default_factory=list)
@@ -180,6 +199,7 @@ class _LRUStore:
 
     def __init__(self, max_entries: int = 1024):
         self._max = max_entries
+        self.max_entries = max_entries
         self._data: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
         self._lock = threading.Lock()
 
@@ -219,22 +239,40 @@ class JobTraceStore:
         self._lru = _LRUStore()
         self._writer: Optional[Callable[[Dict[str, Any]], None]] = None
         self._reader: Optional[Callable[[str], Optional[Dict[str, Any]]]] = None
+        self._recent: Optional[Callable[[int], Optional[List[Dict[str, Any]]]]] = None
+        self._query: Optional[Callable[[float, float], Optional[List[Dict[str, Any]]]]] = None
 
     @classmethod
     def get_instance(cls) -> "JobTraceStore":
         if cls._instance is None:
             with cls._lock:
                 if cls._instance is None:
-                    cls._instance = cls()
+                    from backend.services.preview.observability.trace_store import (
+                        configure_default_backend,
+                    )
+
+                    instance = cls()
+                    configure_default_backend(instance)
+                    cls._instance = instance
         return cls._instance
 
     def set_backend(
         self,
         writer: Optional[Callable[[Dict[str, Any]], None]] = None,
         reader: Optional[Callable[[str], Optional[Dict[str, Any]]]] = None,
+        recent: Optional[Callable[[int], Optional[List[Dict[str, Any]]]]] = None,
+        query: Optional[Callable[[float, float], Optional[List[Dict[str, Any]]]]] = None,
     ) -> None:
+        """Plug in an external store.
+
+        ``recent(limit)`` and ``query(since, until)`` may return ``None`` to
+        fall back to the LRU (e.g. while the external store is unreachable);
+        ``query`` returns ``trace_store.summarize_trace`` summaries.
+        """
         self._writer = writer
         self._reader = reader
+        self._recent = recent
+        self._query = query
 
     def save(self, trace: JobTrace) -> None:
         payload = trace.to_dict()
@@ -256,8 +294,43 @@ class JobTraceStore:
         return self._lru.get(job_id)
 
     def list_recent(self, limit: int = 50) -> List[Dict[str, Any]]:
+        if self._recent is not None:
+            try:
+                payloads = self._recent(limit)
+                if payloads is not None:
+                    return payloads
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("JobTrace external recent-list failed: %s", exc)
         return self._lru.list_recent(limit=limit)
 
+    def query(
+        self,
+        since: float,
+        until: Optional[float] = None,
+        lane: Optional[str] = None,
+        quality_mode: Optional[str] = None,
+        domain: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Trace summaries finished in ``[since, until]`` matching the filters."""
+        from backend.services.preview.observability.trace_store import (
+            matches,
+            summarize_trace,
+        )
+
+        until = time.time() if until is None else until
+        summaries = None
+        if self._query is not None:
+            try:
+                summaries = self._query(since, until)
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("JobTrace external query failed: %s", exc)
+        if summaries is None:
+            summaries = [summarize_trace(p) for p in reversed(self._lru.list_recent(limit=self._lru.max_entries))]
+        return [
+            s for s in summaries
+            if matches(s, since=since, until=until, lane=lane, quality_mode=quality_mode, domain=domain)
+        ]
+
 
 # ---------------------------------------------------------------------------
 # Convenience constructors
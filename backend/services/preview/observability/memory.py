@@ -0,0 +1,257 @@
+"""Per-job memory accounting: process RSS sampling and tracemalloc per stage.
+
+Batch workers run several ``PreviewEngine.generate`` calls on threads in one
+process; 2x-scale PNG screenshots, decoded PIL images and base64 copies of
+both add up quickly and the OOM killer does not say which stage did it.
+While a job runs, a ``MemoryMonitor`` samples:
+
+    rss          process resident set size from ``/proc/self/statm`` (cheap,
+                 on by default). Process-wide, so concurrent jobs in the same
+                 worker see each other's growth — read it as "what the worker
+                 looked like while this stage ran".
+    tracemalloc  Python-level allocations (opt-in, ~20-30% slower). Also
+                 process-wide, but attributes net and peak bytes to stages.
+
+Every ``StageTimer`` records ``{rss_start_mb, rss_peak_mb, ...}`` on its
+stage; the job summary lands on ``JobTrace.memory``. When the job's RSS
+growth exceeds ``PREVIEW_MEMORY_BUDGET_MB`` the trace is flagged
+``over_budget`` and a warning is added so diagnosis surfaces it.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import logging
+import os
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+MEMORY_TRACKING = (os.getenv("PREVIEW_MEMORY_TRACKING", "rss") or "rss").strip().lower()
+MEMORY_BUDGET_MB = float(os.getenv("PREVIEW_MEMORY_BUDGET_MB", "0") or 0)
+RSS_SAMPLE_INTERVAL_MS = 100
+
+MODE_OFF = "off"
+MODE_RSS = "rss"
+MODE_TRACEMALLOC = "tracemalloc"
+
+_MB = 1024 * 1024
+try:
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = 4096
+
+_current: contextvars.ContextVar[Optional["MemoryMonitor"]] = contextvars.ContextVar(
+    "preview_memory_monitor", default=None
+)
+
+# tracemalloc is process-global; keep it running while any job needs it.
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+_tracemalloc_owned = False
+
+
+def current_rss_bytes() -> Optional[int]:
+    """Resident set size of this process, or ``None`` where unavailable."""
+    try:
+        with open("/proc/self/statm", "rb") as fh:
+            return int(fh.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _acquire_tracemalloc() -> None:
+    global _tracemalloc_users, _tracemalloc_owned
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracemalloc_owned = True
+        _tracemalloc_users += 1
+
+
+def _release_tracemalloc() -> None:
+    global _tracemalloc_users, _tracemalloc_owned
+    with _tracemalloc_lock:
+        _tracemalloc_users = max(0, _tracemalloc_users - 1)
+        if _tracemalloc_users == 0 and _tracemalloc_owned:
+            tracemalloc.stop()
+            _tracemalloc_owned = False
+
+
+def _mb(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value / _MB, 1)
+
+
+class _StageWindow:
+    __slots__ = ("name", "rss_start", "rss_peak", "alloc_start", "alloc_peak")
+
+    def __init__(self, name: str, rss: Optional[int], alloc: Optional[int]):
+        self.name = name
+        self.rss_start = self.rss_peak = rss
+        self.alloc_start = self.alloc_peak = alloc
+
+
+class MemoryMonitor:
+    """Samples RSS (and optionally tracemalloc) for one job and its stages."""
+
+    def __init__(
+        self,
+        mode: str = MODE_RSS,
+        budget_mb: float = MEMORY_BUDGET_MB,
+        interval_ms: float = RSS_SAMPLE_INTERVAL_MS,
+    ):
+        self.mode = mode
+        self.budget_mb = budget_mb
+        self.interval_ms = max(float(interval_ms), 10.0)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._active: Dict[int, _StageWindow] = {}
+        self._rss_start: Optional[int] = None
+        self._rss_peak: Optional[int] = None
+        self._alloc_start: Optional[int] = None
+        self._alloc_peak: Optional[int] = None
+        self._stage_growth: Dict[str, float] = {}
+
+    @property
+    def tracing(self) -> bool:
+        return self.mode == MODE_TRACEMALLOC
+
+    # ---- lifecycle ------------------------------------------------------
+
+    def start(self) -> "MemoryMonitor":
+        if self.tracing:
+            _acquire_tracemalloc()
+        rss, alloc = self._read()
+        self._rss_start = self._rss_peak = rss
+        self._alloc_start = self._alloc_peak = alloc
+        self._thread = threading.Thread(target=self._run, name="preview-memory", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+        self.sample()
+        if self.tracing:
+            _release_tracemalloc()
+
+    def _run(self) -> None:
+        interval = self.interval_ms / 1000.0
+        while not self._stop.wait(interval):
+            self.sample()
+
+    # ---- sampling -------------------------------------------------------
+
+    def _read(self):
+        alloc = tracemalloc.get_traced_memory()[0] if self.tracing and tracemalloc.is_tracing() else None
+        return current_rss_bytes(), alloc
+
+    def sample(self) -> None:
+        rss, alloc = self._read()
+        with self._lock:
+            if rss is not None:
+                self._rss_peak = max(self._rss_peak or 0, rss)
+            if alloc is not None:
+                self._alloc_peak = max(self._alloc_peak or 0, alloc)
+            for window in self._active.values():
+                if rss is not None:
+                    window.rss_peak = max(window.rss_peak or 0, rss)
+                if alloc is not None:
+                    window.alloc_peak = max(window.alloc_peak or 0, alloc)
+
+    def stage_enter(self, name: str) -> int:
+        rss, alloc = self._read()
+        window = _StageWindow(name, rss, alloc)
+        handle = id(window)
+        with self._lock:
+            self._active[handle] = window
+        return handle
+
+    def stage_exit(self, handle: int) -> Dict[str, float]:
+        """Close a stage window and return its measurements (MB)."""
+        self.sample()
+        rss, alloc = self._read()
+        with self._lock:
+            window = self._active.pop(handle, None)
+        if window is None:
+            return {}
+        out: Dict[str, float] = {}
+        if window.rss_start is not None and rss is not None:
+            growth = (window.rss_peak or rss) - window.rss_start
+            out.update(
+                rss_start_mb=_mb(window.rss_start),
+                rss_peak_mb=_mb(window.rss_peak),
+                rss_delta_mb=_mb(rss - window.rss_start),
+            )
+            with self._lock:
+                self._stage_growth[window.name] = max(self._stage_growth.get(window.name, 0.0), growth)
+        if window.alloc_start is not None and alloc is not None:
+            out.update(
+                alloc_net_mb=_mb(alloc - window.alloc_start),
+                alloc_peak_mb=_mb((window.alloc_peak or alloc) - window.alloc_start),
+            )
+        return out
+
+    # ---- summary / guard -----------------------------------------------
+
+    def growth_mb(self) -> Optional[float]:
+        if self._rss_start is None or self._rss_peak is None:
+            return None
+        return (self._rss_peak - self._rss_start) / _MB
+
+    def over_budget(self) -> bool:
+        growth = self.growth_mb()
+        return bool(self.budget_mb > 0 and growth is not None and growth > self.budget_mb)
+
+    def summary(self) -> Dict[str, Any]:
+        self.sample()
+        with self._lock:
+            peak_stage = max(self._stage_growth, key=self._stage_growth.get) if self._stage_growth else None
+        out: Dict[str, Any] = {
+            "mode": self.mode,
+            "rss_start_mb": _mb(self._rss_start),
+            "rss_peak_mb": _mb(self._rss_peak),
+            "rss_growth_mb": None if self.growth_mb() is None else round(self.growth_mb(), 1),
+            "peak_stage": peak_stage,
+            "budget_mb": self.budget_mb or None,
+            "over_budget": self.over_budget(),
+        }
+        if self._alloc_start is not None and self._alloc_peak is not None:
+            out["alloc_peak_mb"] = _mb(self._alloc_peak - self._alloc_start)
+        return out
+
+
+# ---------------------------------------------------------------------------
+# Context helpers
+# ---------------------------------------------------------------------------
+
+
+def current_memory_monitor() -> Optional[MemoryMonitor]:
+    return _current.get()
+
+
+@contextmanager
+def track_memory(
+    mode: str = MEMORY_TRACKING,
+    budget_mb: float = MEMORY_BUDGET_MB,
+    interval_ms: float = RSS_SAMPLE_INTERVAL_MS,
+) -> Iterator[Optional[MemoryMonitor]]:
+    """Run the block under a monitor (nested calls reuse the outer one)."""
+    existing = _current.get()
+    if existing is not None or mode not in (MODE_RSS, MODE_TRACEMALLOC):
+        yield existing
+        return
+    monitor = MemoryMonitor(mode, budget_mb, interval_ms).start()
+    reset = _current.set(monitor)
+    try:
+        yield monitor
+    finally:
+        _current.reset(reset)
+        monitor.stop()
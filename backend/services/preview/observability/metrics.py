@@ -0,0 +1,397 @@
+"""In-process metrics registry with Prometheus text exposition.
+
+``JobTrace`` answers "what happened to job X"; this module answers "what is
+p95 of ``capture`` versus ``parallel_extraction`` across the fleet". It is a
+deliberately small, dependency-free subset of the Prometheus client model:
+
+    Counter    monotonically increasing, labelled
+    Histogram  fixed buckets chosen at registration, labelled
+
+Hot-path cost is one dict lookup, one ``bisect`` and a few integer adds under
+a per-metric lock; nothing allocates once a label set has been seen.
+
+Exposition:
+  - the API serves ``render()`` on ``GET /metrics``;
+  - RQ executes every job in a forked work-horse, so its in-memory values
+    die with the fork. The worker therefore flushes per-job deltas into a
+    Redis hash (``flush_to_redis``) and its exporter renders that hash
+    (``serve_worker_metrics``).
+"""
+
+from __future__ import annotations
+
+import bisect
+import logging
+import math
+import threading
+from abc import ABC, abstractmethod
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Series key: (metric name + suffix, sorted label pairs)
+SeriesKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0,
+)
+TOKEN_BUCKETS: Tuple[float, ...] = (100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000)
+MEMORY_BUCKETS_MB: Tuple[float, ...] = (16, 32, 64, 128, 256, 512, 1024, 2048, 4096)
+IMAGE_SIZE_BUCKETS_KB: Tuple[float, ...] = (25, 50, 100, 150, 250, 500, 1000, 2000)
+
+
+# ---------------------------------------------------------------------------
+# Metric types
+# ---------------------------------------------------------------------------
+
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _label_values(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        try:
+            values = tuple(str(labels[name]) for name in self.labelnames)
+        except KeyError:
+            values = ()
+        if len(labels) != len(self.labelnames) or len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {sorted(labels)}")
+        return values
+
+    def _pairs(self, values: Tuple[str, ...], extra: Tuple[Tuple[str, str], ...] = ()) -> Tuple[Tuple[str, str], ...]:
+        return tuple(zip(self.labelnames, values)) + extra
+
+    @abstractmethod
+    def samples(self) -> Dict[SeriesKey, float]:
+        """Current value of every series, keyed by sample name and labels."""
+
+    @abstractmethod
+    def reset(self) -> None:
+        """Drop all recorded values."""
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> Dict[SeriesKey, float]:
+        with self._lock:
+            return {(f"{self.name}_total", self._pairs(k)): v for k, v in self._values.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: [bucket counts..., +Inf count], sum
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._label_values(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            state[0][index] += 1
+            state[1][0] += value
+
+    def samples(self) -> Dict[SeriesKey, float]:
+        out: Dict[SeriesKey, float] = {}
+        with self._lock:
+            for key, (counts, total) in self._values.items():
+                cumulative = 0
+                for bound, count in zip(self.buckets + (math.inf,), counts):
+                    cumulative += count
+                    le = "+Inf" if bound == math.inf else _format_value(bound)
+                    out[(f"{self.name}_bucket", self._pairs(key, (("le", le),)))] = float(cumulative)
+                out[(f"{self.name}_count", self._pairs(key))] = float(cumulative)
+                out[(f"{self.name}_sum", self._pairs(key))] = total[0]
+        return out
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+# ---------------------------------------------------------------------------
+# Registry
+# ---------------------------------------------------------------------------
+
+
+class MetricsRegistry:
+    """Holds metric families and renders them in Prometheus text format."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))  # type: ignore[return-value]
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))  # type: ignore[return-value]
+
+    def snapshot(self) -> Dict[SeriesKey, float]:
+        out: Dict[SeriesKey, float] = {}
+        for metric in list(self._metrics.values()):
+            out.update(metric.samples())
+        return out
+
+    def reset(self) -> None:
+        for metric in list(self._metrics.values()):
+            metric.reset()
+
+    def render(self, extra: Optional[Dict[SeriesKey, float]] = None) -> str:
+        """Prometheus text exposition of local values plus ``extra`` series."""
+        values = self.snapshot()
+        for key, value in (extra or {}).items():
+            values[key] = values.get(key, 0.0) + value
+
+        lines: List[str] = []
+        for metric in sorted(self._metrics.values(), key=lambda m: m.name):
+            series = sorted(
+                (key, value) for key, value in values.items()
+                if _family(key[0]) == metric.name
+            )
+            if not series:
+                continue
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for (sample_name, labels), value in series:
+                lines.append(f"{sample_name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    # ---- cross-process aggregation (RQ work-horses) --------------------
+
+    def flush_to_redis(self, client, key: str) -> None:
+        """Add this process's values to a Redis hash, then reset them."""
+        values = self.snapshot()
+        if not values:
+            return
+        pipe = client.pipeline(transaction=False)
+        for series, value in values.items():
+            pipe.hincrbyfloat(key, _encode_series(series), value)
+        pipe.execute()
+        self.reset()
+
+    @staticmethod
+    def load_from_redis(client, key: str) -> Dict[SeriesKey, float]:
+        raw = client.hgetall(key) or {}
+        out: Dict[SeriesKey, float] = {}
+        for field, value in raw.items():
+            if isinstance(field, bytes):
+                field = field.decode("utf-8")
+            out[_decode_series(field)] = float(value)
+        return out
+
+
+def _family(sample_name: str) -> str:
+    for suffix in ("_bucket", "_count", "_sum", "_total"):
+        if sample_name.endswith(suffix):
+            return sample_name[: -len(suffix)]
+    return sample_name
+
+
+def _format_labels(labels: Iterable[Tuple[str, str]]) -> str:
+    pairs = [f'{k}="{_escape(v)}"' for k, v in labels]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _encode_series(series: SeriesKey) -> str:
+    name, labels = series
+    return "\x1f".join([name] + [f"{k}={v}" for k, v in labels])
+
+
+def _decode_series(field: str) -> SeriesKey:
+    name, *pairs = field.split("\x1f")
+    return name, tuple(tuple(p.split("=", 1)) for p in pairs)  # type: ignore[misc]
+
+
+# ---------------------------------------------------------------------------
+# Default registry and preview metrics
+# ---------------------------------------------------------------------------
+
+REGISTRY = MetricsRegistry()
+
+STAGE_DURATION = REGISTRY.histogram(
+    "preview_stage_duration_seconds",
+    "Pipeline stage wall time.",
+    ("stage", "status"),
+)
+AI_TOKENS = REGISTRY.histogram(
+    "preview_ai_tokens",
+    "Tokens per AI call.",
+    ("model", "direction"),
+    buckets=TOKEN_BUCKETS,
+)
+CACHE_REQUESTS = REGISTRY.counter(
+    "preview_cache_requests",
+    "Preview cache lookups by tier and result.",
+    ("tier", "result"),
+)
+BROWSER_POOL_WAIT = REGISTRY.histogram(
+    "preview_browser_pool_wait_seconds",
+    "Time spent waiting for a pooled browser.",
+    ("outcome",),
+)
+QUEUE_WAIT = REGISTRY.histogram(
+    "preview_queue_wait_seconds",
+    "Time between enqueue and start of an RQ job.",
+    ("queue",),
+)
+JOB_DURATION = REGISTRY.histogram(
+    "preview_job_duration_seconds",
+    "RQ job execution time.",
+    ("queue", "status"),
+)
+JOB_RSS_GROWTH = REGISTRY.histogram(
+    "preview_job_rss_growth_megabytes",
+    "Process RSS growth while a preview job ran.",
+    buckets=MEMORY_BUCKETS_MB,
+)
+MEMORY_BUDGET_EXCEEDED = REGISTRY.counter(
+    "preview_memory_budget_exceeded",
+    "Preview jobs whose RSS growth exceeded PREVIEW_MEMORY_BUDGET_MB.",
+)
+RENDER_LAYER_CACHE_REQUESTS = REGISTRY.counter(
+    "preview_render_layer_cache_requests",
+    "Cached gradient/overlay layer lookups by template and result.",
+    ("template", "result"),
+)
+RENDER_LAYER_SAVED_SECONDS = REGISTRY.counter(
+    "preview_render_layer_saved_seconds",
+    "Layer build time avoided by render layer cache hits.",
+    ("template",),
+)
+RENDER_TASK_DURATION = REGISTRY.histogram(
+    "preview_render_task_seconds",
+    "Render farm task time by template and where it ran (process pool or inline).",
+    ("template", "mode"),
+)
+IMAGE_VARIANT_KILOBYTES = REGISTRY.histogram(
+    "preview_image_variant_kilobytes",
+    "Encoded size of generated preview images by format (png original, webp, jpeg).",
+    ("format",),
+    buckets=IMAGE_SIZE_BUCKETS_KB,
+)
+IMAGE_PROCESSING_SECONDS = REGISTRY.counter(
+    "preview_image_processing_seconds",
+    "Image decode/resize time spent, and saved by the per-job decode cache, JPEG draft decoding and reduce-first resizing.",
+    ("operation", "result"),
+)
+FONT_LOADS = REGISTRY.counter(
+    "preview_font_loads",
+    "Font instances created by the font registry (load) and bitmap-font fallbacks (default).",
+    ("result",),
+)
+TEXT_MEASUREMENTS = REGISTRY.counter(
+    "preview_text_measurements",
+    "Text measurements made (FreeType calls) or saved by the text layout caches.",
+    ("result",),
+)
+
+
+def record_ai_usage(model: str, usage) -> None:
+    """Record token counts from an OpenAI ``usage`` object (may be None)."""
+    if usage is None:
+        return
+    prompt = getattr(usage, "prompt_tokens", None)
+    completion = getattr(usage, "completion_tokens", None)
+    if prompt is not None:
+        AI_TOKENS.observe(float(prompt), model=model, direction="input")
+    if completion is not None:
+        AI_TOKENS.observe(float(completion), model=model, direction="output")
+
+
+def render_metrics() -> str:
+    return REGISTRY.render()
+
+
+# ---------------------------------------------------------------------------
+# Worker exporter
+# ---------------------------------------------------------------------------
+
+
+def worker_metrics_key(worker_name: str) -> str:
+    return f"preview:metrics:worker:{worker_name}"
+
+
+def serve_worker_metrics(port: int, client, key: str) -> ThreadingHTTPServer:
+    """Serve ``/metrics`` for an RQ worker from its Redis hash (daemon thread)."""
+
+    class _Handler(BaseHTTPRequestHandler):
+        def do_GET(self):  # noqa: N802 — http.server API
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            try:
+                body = REGISTRY.render(extra=MetricsRegistry.load_from_redis(client, key)).encode("utf-8")
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Worker metrics render failed: %s", exc)
+                self.send_error(503)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):  # noqa: A002 — silence access log
+            return
+
+    server = ThreadingHTTPServer(("0.0.0.0", port), _Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-exporter", daemon=True).start()
+    return server
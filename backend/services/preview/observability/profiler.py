@@ -0,0 +1,247 @@
+"""Opt-in sampling profiler for preview jobs.
+
+Stage timings tell us *which* stage was slow, not *why*: a 9 s
+``parallel_extraction`` may be PIL loops burning CPU or a thread parked on
+an OpenAI socket. When profiling is enabled for a job, a daemon thread
+samples the Python stacks of the job's threads every few milliseconds via
+``sys._current_frames()`` and folds them per pipeline stage:
+
+    - the thread that runs ``PreviewEngine.generate`` is tracked from start;
+    - worker threads join when their callable was wrapped with
+      ``cancellation.bind_current`` and inherit the submitting stage;
+    - ``StageTimer`` pushes/pops the stage label and charges the thread's
+      CPU time (``time.thread_time``) to it, so ``cpu_ms`` vs. the stage's
+      wall time answers "computing or waiting".
+
+The result is attached to ``JobTrace.profile`` and can be downloaded in
+collapsed-stack format (``stage;frame;frame count``), which
+``flamegraph.pl``, speedscope and inferno render directly.
+
+Enable per job with ``PreviewEngineConfig.enable_profiling=True``, or for a
+random fraction of jobs with ``PREVIEW_PROFILE_SAMPLE_RATE``.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import os
+import random
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+PROFILE_SAMPLE_RATE = float(os.getenv("PREVIEW_PROFILE_SAMPLE_RATE", "0") or 0)
+PROFILE_INTERVAL_MS = float(os.getenv("PREVIEW_PROFILE_INTERVAL_MS", "10") or 10)
+
+NO_STAGE = "(unstaged)"
+OTHER_STACKS = "(other)"
+MAX_STACK_DEPTH = 64
+MAX_STACKS_PER_STAGE = 200
+
+_current: contextvars.ContextVar[Optional["StackSampler"]] = contextvars.ContextVar(
+    "preview_stack_sampler", default=None
+)
+
+
+def should_profile(requested: Optional[bool] = None, rate: Optional[float] = None) -> bool:
+    """Explicit per-job choice wins; otherwise sample ``rate`` of jobs."""
+    if requested is not None:
+        return bool(requested)
+    rate = PROFILE_SAMPLE_RATE if rate is None else rate
+    return rate > 0 and random.random() < rate
+
+
+class StackSampler:
+    """Low-overhead wall-clock stack sampler scoped to one job's threads."""
+
+    def __init__(self, interval_ms: float = PROFILE_INTERVAL_MS):
+        self.interval_ms = max(float(interval_ms), 1.0)
+        self.samples = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started_at = 0.0
+        self._stopped_at: Optional[float] = None
+        # thread ident -> stack of stage labels (a thread is sampled while present)
+        self._threads: Dict[int, List[str]] = {}
+        # thread ident -> thread_time() at each push, parallel to _threads
+        self._cpu_marks: Dict[int, List[float]] = {}
+        self._folded: Dict[str, Dict[str, int]] = {}
+        self._cpu_ms: Dict[str, float] = {}
+
+    # ---- lifecycle ------------------------------------------------------
+
+    def start(self) -> "StackSampler":
+        self._started_at = time.time()
+        self._track(threading.get_ident())
+        self._thread = threading.Thread(target=self._run, name="preview-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+        if self._stopped_at is None:
+            self._stopped_at = time.time()
+
+    def _run(self) -> None:
+        interval = self.interval_ms / 1000.0
+        while not self._stop.wait(interval):
+            self.sample_once()
+
+    # ---- thread / stage bookkeeping ------------------------------------
+
+    def _track(self, ident: int) -> bool:
+        with self._lock:
+            if ident in self._threads:
+                return False
+            self._threads[ident] = []
+            self._cpu_marks[ident] = []
+            return True
+
+    def _untrack(self, ident: int) -> None:
+        with self._lock:
+            self._threads.pop(ident, None)
+            self._cpu_marks.pop(ident, None)
+
+    def current_stage(self) -> str:
+        with self._lock:
+            stack = self._threads.get(threading.get_ident())
+            return stack[-1] if stack else NO_STAGE
+
+    def push_stage(self, stage: str) -> None:
+        ident = threading.get_ident()
+        self._track(ident)
+        with self._lock:
+            self._threads[ident].append(stage)
+            self._cpu_marks[ident].append(time.thread_time())
+
+    def pop_stage(self) -> None:
+        ident = threading.get_ident()
+        now = time.thread_time()
+        with self._lock:
+            stack = self._threads.get(ident)
+            if not stack:
+                return
+            stage = stack.pop()
+            started = self._cpu_marks[ident].pop()
+            self._cpu_ms[stage] = self._cpu_ms.get(stage, 0.0) + (now - started) * 1000.0
+
+    @contextmanager
+    def thread(self, stage: str) -> Iterator[None]:
+        """Sample the calling (worker) thread under ``stage`` for the block."""
+        ident = threading.get_ident()
+        added = self._track(ident)
+        self.push_stage(stage)
+        try:
+            yield
+        finally:
+            self.pop_stage()
+            if added:
+                self._untrack(ident)
+
+    # ---- sampling -------------------------------------------------------
+
+    def sample_once(self) -> None:
+        with self._lock:
+            labels = {ident: (stack[-1] if stack else NO_STAGE) for ident, stack in self._threads.items()}
+        if not labels:
+            return
+        frames = sys._current_frames()
+        folded = []
+        for ident, stage in labels.items():
+            frame = frames.get(ident)
+            if frame is not None:
+                folded.append((stage, _fold(frame)))
+        with self._lock:
+            for stage, stack in folded:
+                bucket = self._folded.setdefault(stage, {})
+                bucket[stack] = bucket.get(stack, 0) + 1
+            self.samples += len(folded)
+
+    # ---- export ---------------------------------------------------------
+
+    def to_dict(self) -> Dict[str, object]:
+        """JSON-safe profile, keeping the heaviest stacks of each stage."""
+        end = self._stopped_at or time.time()
+        with self._lock:
+            stages = {}
+            for stage in set(self._folded) | set(self._cpu_ms):
+                stacks = self._folded.get(stage, {})
+                ranked = sorted(stacks.items(), key=lambda kv: kv[1], reverse=True)
+                kept = dict(ranked[:MAX_STACKS_PER_STAGE])
+                dropped = sum(count for _, count in ranked[MAX_STACKS_PER_STAGE:])
+                if dropped:
+                    kept[OTHER_STACKS] = dropped
+                stages[stage] = {
+                    "samples": sum(stacks.values()),
+                    "cpu_ms": round(self._cpu_ms.get(stage, 0.0), 1),
+                    "stacks": kept,
+                }
+            return {
+                "interval_ms": self.interval_ms,
+                "samples": self.samples,
+                "duration_ms": int((end - self._started_at) * 1000),
+                "stages": stages,
+            }
+
+
+def _fold(frame) -> str:
+    names: List[str] = []
+    while frame is not None and len(names) < MAX_STACK_DEPTH:
+        code = frame.f_code
+        names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+    names.reverse()
+    return ";".join(names)
+
+
+def render_collapsed(profile: Optional[Dict[str, object]]) -> str:
+    """Collapsed-stack text (one ``stage;frames count`` line per stack)."""
+    lines: List[str] = []
+    for stage, data in sorted(((profile or {}).get("stages") or {}).items()):
+        for stack, count in (data.get("stacks") or {}).items():
+            lines.append(f"{stage};{stack} {count}" if stack else f"{stage} {count}")
+    return "\n".join(lines) + ("\n" if lines else "")
+
+
+# ---------------------------------------------------------------------------
+# Context helpers
+# ---------------------------------------------------------------------------
+
+
+def current_sampler() -> Optional[StackSampler]:
+    return _current.get()
+
+
+@contextmanager
+def profile_job(enabled: bool, interval_ms: float = PROFILE_INTERVAL_MS) -> Iterator[Optional[StackSampler]]:
+    """Run the block under a sampler (nested calls reuse the outer one)."""
+    existing = _current.get()
+    if not enabled or existing is not None:
+        yield existing
+        return
+    sampler = StackSampler(interval_ms).start()
+    reset = _current.set(sampler)
+    try:
+        yield sampler
+    finally:
+        _current.reset(reset)
+        sampler.stop()
+
+
+@contextmanager
+def attach_thread(sampler: Optional[StackSampler], stage: str) -> Iterator[None]:
+    """Bind ``sampler`` to the calling worker thread (no-op when ``None``)."""
+    if sampler is None:
+        yield
+        return
+    reset = _current.set(sampler)
+    try:
+        with sampler.thread(stage):
+            yield
+    finally:
+        _current.reset(reset)
@@ -51,6 +51,8 @@ class FailureReason(str, Enum):
 
     # Status / transient
     STATUS_CHECK_TRANSIENT = "status_check_transient"
+    JOB_CANCELLED = "job_cancelled"
+    DEADLINE_EXCEEDED = "deadline_exceeded"
 
     # Catch-all (must be rare; tracked as a metric in Phase 7)
     UNKNOWN = "unknown"
@@ -96,6 +98,10 @@ _USER_MESSAGES = {
         "We hit our time budget and shipped the best result we had.",
     FailureReason.STATUS_CHECK_TRANSIENT:
         "Status check hiccup — refresh in a moment.",
+    FailureReason.JOB_CANCELLED:
+        "This preview was cancelled before it finished.",
+    FailureReason.DEADLINE_EXCEEDED:
+        "This preview ran out of time before it finished. Please try again.",
     FailureReason.UNKNOWN:
         "Something went wrong generating your preview.",
 }
@@ -0,0 +1,316 @@
+"""Persistent JobTrace backend on Redis Streams, plus window queries.
+
+``JobTraceStore`` keeps an in-process LRU, so traces vanish on restart and
+each worker only sees the jobs it ran. With ``PREVIEW_TRACE_STORE=redis``
+(the default) every saved trace is also written to Redis:
+
+    preview:job_trace:<job_id>   full payload, codec envelope, TTL = retention
+    preview:job_traces           stream of compact summaries (job/trace id, lane,
+                                 quality mode, domain, status, failure
+                                 reason, total and per-stage ms)
+
+Stream entry ids are millisecond timestamps, so a time window is an
+``XRANGE``, paged by entry id. The stream is capped at ``PREVIEW_TRACE_STREAM_MAXLEN`` entries
+and periodically trimmed to ``PREVIEW_TRACE_RETENTION_HOURS``.
+
+The query helpers (``stage_percentiles``, ``failure_histogram``,
+``slowest_jobs``) work on summaries from either Redis or the LRU fallback.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+TRACE_STORE_BACKEND = (os.getenv("PREVIEW_TRACE_STORE", "redis") or "redis").strip().lower()
+TRACE_RETENTION_HOURS = float(os.getenv("PREVIEW_TRACE_RETENTION_HOURS", "72") or 72)
+TRACE_STREAM_MAXLEN = int(os.getenv("PREVIEW_TRACE_STREAM_MAXLEN", "100000") or 100000)
+
+STREAM_KEY = "preview:job_traces"
+PAYLOAD_KEY_PREFIX = "preview:job_trace:"
+# Retry a failed Redis connection at most this often (saves sit on the job path)
+RECONNECT_INTERVAL_SECONDS = 30.0
+# Time-based trim every this many writes (MAXLEN trimming happens on each XADD)
+TRIM_EVERY = 200
+# Summaries fetched per XRANGE round trip when paging through a query window
+QUERY_PAGE_SIZE = 1000
+
+DEFAULT_PERCENTILES = (50, 90, 99)
+
+
+# ---------------------------------------------------------------------------
+# Summaries + query helpers
+# ---------------------------------------------------------------------------
+
+
+def trace_domain(url: str) -> str:
+    host = (urlparse(url or "").hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def summarize_trace(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Compact, query-friendly view of a JobTrace payload."""
+    stages: Dict[str, float] = {}
+    for timing in payload.get("stage_timings") or []:
+        if timing.get("skipped"):
+            continue
+        name = timing.get("name")
+        stages[name] = round(stages.get(name, 0.0) + float(timing.get("duration_ms") or 0.0), 1)
+    return {
+        "job_id": payload.get("job_id"),
+        "trace_id": payload.get("trace_id"),
+        "ts": payload.get("end_ts") or payload.get("start_ts"),
+        "url": payload.get("url"),
+        "domain": trace_domain(payload.get("url") or ""),
+        "lane": payload.get("lane"),
+        "quality_mode": payload.get("quality_mode"),
+        "status": payload.get("terminal_status"),
+        "failure_reason": payload.get("failure_reason"),
+        "total_ms": payload.get("total_ms"),
+        "stages": stages,
+    }
+
+
+def matches(
+    summary: Dict[str, Any],
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+    lane: Optional[str] = None,
+    quality_mode: Optional[str] = None,
+    domain: Optional[str] = None,
+) -> bool:
+    ts = summary.get("ts") or 0.0
+    if since is not None and ts < since:
+        return False
+    if until is not None and ts > until:
+        return False
+    if lane and summary.get("lane") != lane:
+        return False
+    if quality_mode and summary.get("quality_mode") != quality_mode:
+        return False
+    if domain and summary.get("domain") != trace_domain(f"//{domain}"):
+        return False
+    return True
+
+
+def _percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    k = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1)))))
+    return round(sorted_values[k], 1)
+
+
+def _latency_block(values: List[float], percentiles: Sequence[int]) -> Dict[str, Any]:
+    values = sorted(values)
+    block: Dict[str, Any] = {
+        "count": len(values),
+        "mean_ms": round(sum(values) / len(values), 1) if values else None,
+    }
+    for pct in percentiles:
+        block[f"p{pct}_ms"] = _percentile(values, pct)
+    return block
+
+
+def stage_percentiles(
+    summaries: Iterable[Dict[str, Any]],
+    percentiles: Sequence[int] = DEFAULT_PERCENTILES,
+) -> Dict[str, Any]:
+    """Latency percentiles per stage and for the whole job."""
+    summaries = list(summaries)
+    samples: Dict[str, List[float]] = {}
+    for summary in summaries:
+        for name, ms in (summary.get("stages") or {}).items():
+            samples.setdefault(name, []).append(float(ms))
+    totals = [float(s["total_ms"]) for s in summaries if isinstance(s.get("total_ms"), (int, float))]
+    return {
+        "count": len(summaries),
+        "total": _latency_block(totals, percentiles),
+        "stages": {
+            name: _latency_block(values, percentiles)
+            for name, values in sorted(samples.items(), key=lambda kv: -sum(kv[1]))
+        },
+    }
+
+
+def failure_histogram(summaries: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Failure reasons across the window (finished-with-fallback included)."""
+    summaries = list(summaries)
+    reasons: Dict[str, int] = {}
+    failed = 0
+    for summary in summaries:
+        if summary.get("status") == "failed":
+            failed += 1
+        reason = summary.get("failure_reason")
+        if reason:
+            reasons[reason] = reasons.get(reason, 0) + 1
+    return {
+        "count": len(summaries),
+        "failed": failed,
+        "failure_rate": round(failed / len(summaries), 4) if summaries else 0.0,
+        "reasons": dict(sorted(reasons.items(), key=lambda kv: -kv[1])),
+    }
+
+
+def slowest_jobs(summaries: Iterable[Dict[str, Any]], limit: int = 10) -> List[Dict[str, Any]]:
+    ranked = [s for s in summaries if isinstance(s.get("total_ms"), (int, float))]
+    ranked.sort(key=lambda s: -s["total_ms"])
+    return ranked[:limit]
+
+
+# ---------------------------------------------------------------------------
+# Redis Streams backend
+# ---------------------------------------------------------------------------
+
+
+def _next_entry_id(entry_id) -> str:
+    """Smallest stream id after ``entry_id`` (inclusive XRANGE start for the next page)."""
+    if isinstance(entry_id, bytes):
+        entry_id = entry_id.decode()
+    ms, seq = entry_id.split("-")
+    return f"{ms}-{int(seq) + 1}"
+
+
+class RedisStreamTraceBackend:
+    """Writer/reader/recent/query callables for ``JobTraceStore.set_backend``."""
+
+    def __init__(
+        self,
+        retention_hours: float = TRACE_RETENTION_HOURS,
+        maxlen: int = TRACE_STREAM_MAXLEN,
+        client_factory=None,
+    ):
+        self.retention_seconds = int(retention_hours * 3600)
+        self.maxlen = maxlen
+        self._client_factory = client_factory
+        self._lock = threading.Lock()
+        self._down_until = 0.0
+        self._writes = 0
+
+    def _client(self):
+        if time.monotonic() < self._down_until:
+            return None
+        if self._client_factory is not None:
+            client = self._client_factory()
+        else:
+            from backend.services import preview_cache
+
+            client = preview_cache.get_redis_binary_client()
+        if client is None:
+            self._down_until = time.monotonic() + RECONNECT_INTERVAL_SECONDS
+        return client
+
+    def _failed(self, action: str, exc: Exception) -> None:
+        self._down_until = time.monotonic() + RECONNECT_INTERVAL_SECONDS
+        logger.warning("JobTrace Redis %s failed (retrying in %ss): %s",
+                       action, int(RECONNECT_INTERVAL_SECONDS), exc)
+
+    # ---- JobTraceStore hooks ---------------------------------------------
+
+    def write(self, payload: Dict[str, Any]) -> None:
+        from backend.services.cache_codec import encode_payload
+
+        client = self._client()
+        if client is None:
+            return
+        summary = summarize_trace(payload)
+        try:
+            pipe = client.pipeline(transaction=False)
+            pipe.setex(PAYLOAD_KEY_PREFIX + str(payload.get("job_id")), self.retention_seconds,
+                       encode_payload(payload))
+            # Server-assigned ids: writers on several hosts stay monotonic
+            pipe.xadd(STREAM_KEY, {"s": encode_payload(summary)}, maxlen=self.maxlen, approximate=True)
+            with self._lock:
+                self._writes += 1
+                trim = self._writes % TRIM_EVERY == 0
+            if trim:
+                cutoff_ms = int((time.time() - self.retention_seconds) * 1000)
+                pipe.xtrim(STREAM_KEY, minid=f"{cutoff_ms}-0", approximate=True)
+            pipe.execute()
+        except Exception as exc:  # noqa: BLE001 — never crash the pipeline
+            self._failed("write", exc)
+
+    def read(self, job_id: str) -> Optional[Dict[str, Any]]:
+        from backend.services.cache_codec import decode_payload
+
+        client = self._client()
+        if client is None:
+            return None
+        try:
+            raw = client.get(PAYLOAD_KEY_PREFIX + job_id)
+        except Exception as exc:  # noqa: BLE001
+            self._failed("read", exc)
+            return None
+        return decode_payload(raw) if raw else None
+
+    def recent(self, limit: int = 50) -> Optional[List[Dict[str, Any]]]:
+        """Newest full payloads, or ``None`` when Redis is unavailable."""
+        client = self._client()
+        if client is None:
+            return None
+        from backend.services.cache_codec import decode_payload
+
+        try:
+            entries = client.xrevrange(STREAM_KEY, count=limit)
+            pipe = client.pipeline(transaction=False)
+            for summary in self._decode_entries(entries):
+                pipe.get(PAYLOAD_KEY_PREFIX + str(summary.get("job_id")))
+            raws = pipe.execute()
+        except Exception as exc:  # noqa: BLE001
+            self._failed("recent", exc)
+            return None
+        return [decode_payload(raw) for raw in raws if raw]
+
+    def query(self, since: float, until: float) -> Optional[List[Dict[str, Any]]]:
+        """Summaries written in ``[since, until]`` (epoch seconds), oldest first.
+
+        Pages through the window ``QUERY_PAGE_SIZE`` entries at a time; the
+        stream's MAXLEN bounds how much one window can hold.
+        """
+        client = self._client()
+        if client is None:
+            return None
+        start, end = str(int(since * 1000)), str(int(until * 1000))
+        entries: List[Any] = []
+        try:
+            while True:
+                page = client.xrange(STREAM_KEY, min=start, max=end, count=QUERY_PAGE_SIZE)
+                entries.extend(page)
+                if len(page) < QUERY_PAGE_SIZE:
+                    break
+                start = _next_entry_id(page[-1][0])
+        except Exception as exc:  # noqa: BLE001
+            self._failed("query", exc)
+            return None
+        return self._decode_entries(entries)
+
+    @staticmethod
+    def _decode_entries(entries) -> List[Dict[str, Any]]:
+        from backend.services.cache_codec import decode_payload
+
+        out = []
+        for _entry_id, fields in entries or []:
+            raw = fields.get(b"s", fields.get("s"))
+            if raw is None:
+                continue
+            try:
+                out.append(decode_payload(raw))
+            except ValueError as exc:
+                logger.debug("Skipping undecodable trace summary: %s", exc)
+        return out
+
+    def install(self, store) -> None:
+        store.set_backend(writer=self.write, reader=self.read, recent=self.recent, query=self.query)
+
+
+def configure_default_backend(store) -> None:
+    """Attach the backend selected by ``PREVIEW_TRACE_STORE`` to ``store``."""
+    if TRACE_STORE_BACKEND == "redis":
+        RedisStreamTraceBackend().install(store)
+    elif TRACE_STORE_BACKEND not in ("memory", "off", ""):
+        logger.warning("Unknown PREVIEW_TRACE_STORE=%r; keeping the in-process store", TRACE_STORE_BACKEND)
@@ -0,0 +1,512 @@
+"""Span tracing from the API request through RQ to AI calls and uploads.
+
+``request_id`` and ``JobTrace`` stop at process boundaries: the API knows
+when a job was enqueued, the worker knows how long it ran, and nothing ties
+the two together. This module records W3C-style spans and propagates their
+context across every hop a demo job takes:
+
+    HTTP request      ``RequestIDMiddleware`` opens a server span (continuing
+                      an incoming ``traceparent`` header)
+    enqueue           the route opens a producer span and stores its
+                      ``traceparent`` in ``job.meta``
+    RQ worker         ``MetricsWorker.perform_job`` records an
+                      ``rq.queue_wait`` span (enqueued -> started) and runs
+                      the job under a consumer span parented from job.meta
+    PreviewEngine     ``preview.generate`` root span; ``PipelineContext``
+                      carries its traceparent and every ``StageTimer``
+                      opens a child span
+    threads           ``cancellation.bind_current`` re-attaches the span
+    AI / uploads      ``openai`` chat completions and ``upload_file_to_r2``
+                      are client spans
+
+Spans are batched on a daemon thread and written as OTLP/JSON
+(``ExportTraceServiceRequest``), either appended to a JSON-lines file that
+an OpenTelemetry Collector ``otlpjsonfile`` receiver can tail, or POSTed to
+an OTLP/HTTP endpoint (Collector, Jaeger, Tempo). The module has no
+dependency on the OpenTelemetry SDK.
+
+Tracing is off unless ``PREVIEW_TRACING`` is ``file`` or ``otlp``; while
+off, ``start_span`` yields a shared no-op span.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import functools
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+TRACING_EXPORTER = (os.getenv("PREVIEW_TRACING", "off") or "off").strip().lower()
+TRACING_FILE = os.getenv("PREVIEW_TRACING_FILE", "traces/spans.jsonl")
+TRACING_OTLP_ENDPOINT = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "http://localhost:4318")
+TRACING_SAMPLE_RATE = float(os.getenv("PREVIEW_TRACING_SAMPLE_RATE", "1") or 1)
+SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "preview")
+
+# Key under which the enqueuing span's context travels in ``job.meta``
+TRACEPARENT_META_KEY = "traceparent"
+# Export a batch once this many spans are buffered, or every interval
+EXPORT_BATCH_SIZE = 256
+EXPORT_INTERVAL_SECONDS = 2.0
+# Spans beyond this are dropped (counted) while the exporter is behind
+MAX_BUFFERED_SPANS = 4096
+
+_TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+_KIND_CODES = {"internal": 1, "server": 2, "client": 3, "producer": 4, "consumer": 5}
+
+
+# ---------------------------------------------------------------------------
+# Span model
+# ---------------------------------------------------------------------------
+
+
+class SpanContext:
+    """Identity of a span as it crosses thread/process boundaries."""
+
+    __slots__ = ("trace_id", "span_id", "sampled")
+
+    def __init__(self, trace_id: str, span_id: str, sampled: bool = True):
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.sampled = sampled
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+
+class Span:
+    """A timed operation; ended exactly once, then handed to the exporter."""
+
+    def __init__(
+        self,
+        name: str,
+        context: SpanContext,
+        parent_id: Optional[str] = None,
+        kind: str = "internal",
+        attributes: Optional[Dict[str, Any]] = None,
+        start_ns: Optional[int] = None,
+    ):
+        self.name = name
+        self.context = context
+        self.parent_id = parent_id
+        self.kind = kind
+        self.attributes: Dict[str, Any] = {}
+        self.start_ns = start_ns or time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.error: Optional[str] = None
+        if attributes:
+            self.set_attributes(attributes)
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        if value is not None:
+            self.attributes[key] = value
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        for key, value in attributes.items():
+            self.set_attribute(key, value)
+
+    def set_error(self, message: str) -> None:
+        self.error = message[:500]
+
+    def end(self, end_ns: Optional[int] = None) -> None:
+        if self.end_ns is not None:
+            return
+        self.end_ns = end_ns or time.time_ns()
+        if self.context.sampled:
+            processor = _get_processor()
+            if processor is not None:
+                processor.add(self)
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        if self.end_ns is None:
+            return None
+        return (self.end_ns - self.start_ns) / 1e6
+
+
+class _NoopSpan:
+    """Stand-in yielded while tracing is off."""
+
+    context = None
+    name = ""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        return None
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        return None
+
+    def set_error(self, message: str) -> None:
+        return None
+
+    def end(self, end_ns: Optional[int] = None) -> None:
+        return None
+
+
+NOOP_SPAN = _NoopSpan()
+
+_current: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar(
+    "preview_trace_span", default=None
+)
+
+
+def _new_id(nbytes: int) -> str:
+    return f"{random.getrandbits(nbytes * 8):0{nbytes * 2}x}"
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def current_traceparent() -> Optional[str]:
+    span = _current.get()
+    return span.context.traceparent if span is not None else None
+
+
+def extract(traceparent: Optional[str]) -> Optional[SpanContext]:
+    """Parse a W3C ``traceparent`` value; ``None`` when absent or malformed."""
+    match = _TRACEPARENT_RE.match((traceparent or "").strip().lower())
+    if match is None:
+        return None
+    trace_id, span_id, flags = match.groups()
+    if trace_id == "0" * 32 or span_id == "0" * 16:
+        return None
+    return SpanContext(trace_id, span_id, sampled=bool(int(flags, 16) & 1))
+
+
+def inject(carrier: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Add the current span's ``traceparent`` to ``carrier`` (headers or job.meta)."""
+    carrier = {} if carrier is None else carrier
+    traceparent = current_traceparent()
+    if traceparent:
+        carrier[TRACEPARENT_META_KEY] = traceparent
+    return carrier
+
+
+class _SpanScope:
+    """Context manager returned by ``start_span``; usable from ``__enter__``/``__exit__`` pairs."""
+
+    def __init__(self, name, kind, attributes, parent):
+        self._args = (name, kind, attributes, parent)
+        self._span = None
+        self._reset = None
+
+    def __enter__(self):
+        if not tracing_enabled():
+            self._span = NOOP_SPAN
+            return self._span
+        name, kind, attributes, parent = self._args
+        if parent is None and _current.get() is not None:
+            parent = _current.get().context
+        if parent is not None:
+            context = SpanContext(parent.trace_id, _new_id(8), parent.sampled)
+            parent_id = parent.span_id
+        else:
+            sampled = TRACING_SAMPLE_RATE >= 1 or random.random() < TRACING_SAMPLE_RATE
+            context = SpanContext(_new_id(16), _new_id(8), sampled)
+            parent_id = None
+        self._span = Span(name, context, parent_id, kind, attributes)
+        self._reset = _current.set(self._span)
+        return self._span
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self._reset is not None:
+            _current.reset(self._reset)
+        if exc_type is not None:
+            self._span.set_error(f"{exc_type.__name__}: {exc_val}")
+        self._span.end()
+        return False
+
+
+def start_span(
+    name: str,
+    kind: str = "internal",
+    attributes: Optional[Dict[str, Any]] = None,
+    parent: Optional[SpanContext] = None,
+) -> _SpanScope:
+    """Open a span as the current one; ``parent`` defaults to the current span.
+
+    Usage:
+        with start_span("r2.upload", kind="client", attributes={"r2.key": key}) as span:
+            ...
+            span.set_attribute("r2.bytes", size)
+    """
+    return _SpanScope(name, kind, attributes, parent)
+
+
+class use_span:
+    """Make an existing span current, e.g. on a worker thread."""
+
+    def __init__(self, span: Optional[Span]):
+        self._span = span
+        self._reset = None
+
+    def __enter__(self):
+        if self._span is not None:
+            self._reset = _current.set(self._span)
+        return self._span
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self._reset is not None:
+            _current.reset(self._reset)
+        return False
+
+
+def record_span(
+    name: str,
+    start_ns: int,
+    end_ns: int,
+    parent: Optional[SpanContext] = None,
+    kind: str = "internal",
+    attributes: Optional[Dict[str, Any]] = None,
+) -> None:
+    """Record an already-finished interval (e.g. time spent queued)."""
+    if not tracing_enabled():
+        return
+    if parent is not None:
+        context = SpanContext(parent.trace_id, _new_id(8), parent.sampled)
+    else:
+        context = SpanContext(_new_id(16), _new_id(8), random.random() < TRACING_SAMPLE_RATE)
+    span = Span(name, context, parent.span_id if parent else None, kind, attributes, start_ns)
+    span.end(max(end_ns, start_ns))
+
+
+# ---------------------------------------------------------------------------
+# OTLP/JSON encoding + exporters
+# ---------------------------------------------------------------------------
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()]
+
+
+def to_otlp(spans: Iterable[Span], service_name: str = SERVICE_NAME) -> Dict[str, Any]:
+    """Encode spans as an OTLP ``ExportTraceServiceRequest`` (JSON mapping)."""
+    encoded = []
+    for span in spans:
+        item = {
+            "traceId": span.context.trace_id,
+            "spanId": span.context.span_id,
+            "name": span.name,
+            "kind": _KIND_CODES.get(span.kind, 1),
+            "startTimeUnixNano": str(span.start_ns),
+            "endTimeUnixNano": str(span.end_ns or span.start_ns),
+            "attributes": _otlp_attributes(span.attributes),
+            "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+        }
+        if span.parent_id:
+            item["parentSpanId"] = span.parent_id
+        encoded.append(item)
+    resource = {"service.name": service_name, "process.pid": os.getpid()}
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": _otlp_attributes(resource)},
+            "scopeSpans": [{"scope": {"name": "backend.services.preview"}, "spans": encoded}],
+        }]
+    }
+
+
+class FileSpanExporter:
+    """Append one OTLP/JSON request per batch to a JSON-lines file."""
+
+    def __init__(self, path: str = TRACING_FILE, service_name: str = SERVICE_NAME):
+        self.path = path
+        self.service_name = service_name
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Span]) -> bool:
+        line = json.dumps(to_otlp(spans, self.service_name), separators=(",", ":")) + "\n"
+        directory = os.path.dirname(self.path)
+        with self._lock:
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # One write per batch keeps lines intact across processes (O_APPEND)
+            with open(self.path, "a", encoding="utf-8") as fh:
+                fh.write(line)
+        return True
+
+
+class OTLPHttpSpanExporter:
+    """POST OTLP/JSON batches to ``<endpoint>/v1/traces``."""
+
+    def __init__(self, endpoint: str = TRACING_OTLP_ENDPOINT, service_name: str = SERVICE_NAME,
+                 timeout: float = 5.0):
+        endpoint = endpoint.rstrip("/")
+        self.url = endpoint if endpoint.endswith("/v1/traces") else f"{endpoint}/v1/traces"
+        self.service_name = service_name
+        self.timeout = timeout
+
+    def export(self, spans: List[Span]) -> bool:
+        import requests
+
+        response = requests.post(self.url, json=to_otlp(spans, self.service_name), timeout=self.timeout)
+        if response.status_code >= 300:
+            logger.warning("OTLP export rejected (%s): %s", response.status_code, response.text[:200])
+            return False
+        return True
+
+
+class BatchSpanProcessor:
+    """Buffers ended spans and exports them in batches from a daemon thread.
+
+    The thread is (re)started lazily per process, so RQ work-horses forked
+    from a worker that already traced get their own exporter thread.
+    """
+
+    def __init__(self, exporter, batch_size: int = EXPORT_BATCH_SIZE,
+                 interval: float = EXPORT_INTERVAL_SECONDS, max_buffered: int = MAX_BUFFERED_SPANS):
+        self.exporter = exporter
+        self.batch_size = batch_size
+        self.interval = interval
+        self.stats = {"exported": 0, "dropped": 0, "failed": 0}
+        self._buffer: deque = deque(maxlen=max_buffered)
+        self._lock = threading.Lock()
+        self._export_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._pid: Optional[int] = None
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            if len(self._buffer) == self._buffer.maxlen:
+                self.stats["dropped"] += 1
+            self._buffer.append(span)
+            full = len(self._buffer) >= self.batch_size
+        self._ensure_thread()
+        if full:
+            self._wake.set()
+
+    def _ensure_thread(self) -> None:
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            self._pid = pid
+            self._export_lock = threading.Lock()
+            threading.Thread(target=self._run, name="preview-span-exporter", daemon=True).start()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Export everything buffered; ``False`` if the export failed or timed out."""
+        if not self._export_lock.acquire(timeout=-1 if timeout is None else timeout):
+            return False
+        try:
+            ok = True
+            while True:
+                with self._lock:
+                    batch = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+                if not batch:
+                    return ok
+                try:
+                    exported = self.exporter.export(batch)
+                except Exception as exc:  # noqa: BLE001 — tracing never fails a job
+                    logger.warning("Span export failed: %s", exc)
+                    exported = False
+                key = "exported" if exported else "failed"
+                self.stats[key] += len(batch)
+                ok = ok and exported
+        finally:
+            self._export_lock.release()
+
+
+_processor: Optional[BatchSpanProcessor] = None
+_configured = False
+_config_lock = threading.Lock()
+
+
+def configure(exporter=None) -> Optional[BatchSpanProcessor]:
+    """Install ``exporter`` (``None`` turns tracing off) and instrument OpenAI."""
+    global _processor, _configured
+    with _config_lock:
+        _processor = BatchSpanProcessor(exporter) if exporter is not None else None
+        _configured = True
+    if exporter is not None:
+        instrument_openai()
+    return _processor
+
+
+def _exporter_from_env():
+    if TRACING_EXPORTER == "file":
+        return FileSpanExporter()
+    if TRACING_EXPORTER == "otlp":
+        return OTLPHttpSpanExporter()
+    if TRACING_EXPORTER not in ("off", ""):
+        logger.warning("Unknown PREVIEW_TRACING=%r; tracing disabled", TRACING_EXPORTER)
+    return None
+
+
+def _get_processor() -> Optional[BatchSpanProcessor]:
+    if not _configured:
+        configure(_exporter_from_env())
+    return _processor
+
+
+def tracing_enabled() -> bool:
+    return _get_processor() is not None
+
+
+def flush_spans(timeout: Optional[float] = None) -> bool:
+    """Export buffered spans now (call before a forked work-horse exits)."""
+    processor = _processor
+    return processor.flush(timeout) if processor is not None else True
+
+
+# ---------------------------------------------------------------------------
+# OpenAI instrumentation
+# ---------------------------------------------------------------------------
+
+
+def instrument_openai() -> bool:
+    """Wrap ``Completions.create`` once so every chat completion is a client span.
+
+    A single class-level seam covers all call sites (agents, reasoning,
+    extraction) without touching them.
+    """
+    try:
+        from openai.resources.chat.completions import Completions
+    except ImportError:
+        return False
+    original = Completions.create
+    if getattr(original, "_preview_traced", False):
+        return True
+
+    @functools.wraps(original)
+    def create(self, *args, **kwargs):
+        attributes = {"gen_ai.system": "openai", "gen_ai.request.model": kwargs.get("model")}
+        with start_span("openai.chat.completions", kind="client", attributes=attributes) as span:
+            response = original(self, *args, **kwargs)
+            usage = getattr(response, "usage", None)
+            if usage is not None:
+                span.set_attribute("gen_ai.usage.input_tokens", getattr(usage, "prompt_tokens", None))
+                span.set_attribute("gen_ai.usage.output_tokens", getattr(usage, "completion_tokens", None))
+            return response
+
+    create._preview_traced = True
+    Completions.create = create
+    return True
@@ -10,10 +10,16 @@ import json
 import hashlib
 import logging
 import os
-from typing import Optional, Dict, Any, Tuple
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, Tuple, Iterable
 from datetime import datetime, timedelta
 import redis
 from backend.core.config import settings
+from backend.services.cache_codec import decode_payload, encode_payload, get_codec_stats, payload_body_size
+from backend.services.preview.observability.metrics import CACHE_REQUESTS
 
 logger = logging.getLogger("preview_worker")
 
@@ -37,35 +43,93 @@ class CacheConfig:
     # Size limits
     MAX_CACHED_ANALYSIS_SIZE: int = 10000  # bytes
 
+    # In-process LRU tier in front of Redis (per worker process).
+    # TTL is capped so a missed pub/sub invalidation can only serve stale
+    # data for a short window.
+    LOCAL_TIER_ENABLED: bool = os.getenv("PREVIEW_LOCAL_CACHE_ENABLED", "true").lower() != "false"
+    LOCAL_TIER_MAX_BYTES: int = int(os.getenv("PREVIEW_LOCAL_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    LOCAL_TIER_MAX_TTL_SECONDS: int = int(os.getenv("PREVIEW_LOCAL_CACHE_TTL_SECONDS", "300"))
+    INVALIDATION_CHANNEL: str = "preview:cache:invalidate"
+
+    # Namespaces group key prefixes under one generation counter, so a
+    # namespace flush is a single INCR. Longest matching prefix wins.
+    NAMESPACES: Dict[str, str] = {
+        "preview:focus:": "focus",
+        "preview:analysis:": "analysis",
+        "preview:engine:": "engine",
+        "preview:enhanced:": "engine",
+        "demo:preview:": "demo",
+        "saas:preview:": "saas",
+        "preview:artifact:": "artifact",
+    }
+    DEFAULT_NAMESPACE: str = "default"
+    GENERATION_KEY_PREFIX: str = "cache:gen:"
+    KEY_INDEX_PREFIX: str = "cache:keys:"  # ZSET of live keys, scored by expiry
+    URL_INDEX_PREFIX: str = "cache:url:"  # SET of keys cached for one URL
+    # How long a worker trusts its copy of a generation; flushes also
+    # broadcast on INVALIDATION_CHANNEL, so this only bounds missed messages.
+    GENERATION_CACHE_SECONDS: float = 5.0
+
+    # Prefixes written before keys carried a generation. invalidate_cache
+    # still deletes their generation-0 keys until those entries expire.
+    LEGACY_PREFIXES = [
+        PREVIEW_PREFIX,               # "preview:focus:"
+        ANALYSIS_PREFIX,              # "preview:analysis:"
+        "demo:preview:",              # Demo route v1
+        "demo:preview:v2:",           # Demo route v2 (job-based)
+        "demo:preview:v3:fast:",      # Demo v3 quality profiles
+        "demo:preview:v3:balanced:",
+        "demo:preview:v3:ultra:",
+        "preview:engine:",            # Engine default
+        "preview:enhanced:",          # Enhanced engine
+        "saas:preview:",              # SaaS preview
+    ]
+
 
 # =============================================================================
 # CACHE KEY GENERATION
 # =============================================================================
 
-def generate_cache_key(url: str, prefix: str = CacheConfig.PREVIEW_PREFIX, version: str = "v1") -> str:
+def _url_hash(url: str, version: str = "v1") -> str:
+    """Deterministic hash of the normalized URL, shared by every prefix."""
+    from backend.utils.url_sanitizer import normalize_url_for_cache
+    
+    # Normalize URL for deterministic hashing
+    url_normalized = normalize_url_for_cache(url)
+    
+    # Create deterministic hash (URL + version)
+    cache_string = f"{url_normalized}:{version}"
+    return hashlib.md5(cache_string.encode()).hexdigest()
+
+
+def generate_cache_key(
+    url: str,
+    prefix: str = CacheConfig.PREVIEW_PREFIX,
+    version: str = "v1",
+    generation: Optional[int] = None,
+) -> str:
     """
     Generate a deterministic cache key for a URL.
     
     Uses normalized URL + version for consistent, fixed-length keys.
-    This ensures same URL always produces same cache key.
+    This ensures same URL always produces same cache key within one
+    namespace generation. Generation 0 keeps the original key format so
+    entries written before generations existed stay readable.
     
     Args:
         url: URL to generate key for
         prefix: Cache key prefix
         version: Cache version (increment when breaking changes occur)
+        generation: Namespace generation; defaults to the current one
         
     Returns:
         Deterministic cache key
     """
-    from backend.utils.url_sanitizer import normalize_url_for_cache
-    
-    # Normalize URL for deterministic hashing
-    url_normalized = normalize_url_for_cache(url)
-    
-    # Create deterministic hash (URL + version)
-    cache_string = f"{url_normalized}:{version}"
-    url_hash = hashlib.md5(cache_string.encode()).hexdigest()
-    
+    url_hash = _url_hash(url, version)
+    if generation is None:
+        generation = get_namespace_generation(namespace_for_prefix(prefix))
+    if generation:
+        return f"{prefix}g{generation}:{url_hash}"
     return f"{prefix}{url_hash}"
 
 
@@ -103,6 +167,440 @@ def get_redis_client() -> Optional[redis.Redis]:
         return None
 
 
+_redis_binary_client: Optional[redis.Redis] = None
+
+
+def get_redis_binary_client() -> Optional[redis.Redis]:
+    """
+    Get or create a Redis client that returns raw bytes.
+
+    Cached payloads are binary codec envelopes (see ``cache_codec``), which
+    the string client cannot read back.
+    """
+    global _redis_binary_client
+
+    if _redis_binary_client is not None:
+        return _redis_binary_client
+
+    if get_redis_client() is None:
+        return None
+
+    try:
+        _redis_binary_client = redis.from_url(
+            settings.REDIS_URL,
+            decode_responses=False,
+            socket_timeout=5,
+            socket_connect_timeout=5
+        )
+        return _redis_binary_client
+    except Exception as e:
+        logger.warning(f"Redis binary connection failed, caching disabled: {e}")
+        return None
+
+
+# =============================================================================
+# IN-PROCESS LRU TIER
+# =============================================================================
+
+class LocalLRUCache:
+    """
+    Thread-safe LRU bounded by payload bytes, with a TTL per entry.
+
+    Stores already-decoded values so a local hit skips both the Redis round
+    trip and the decode. Entry size is the uncompressed body length of the
+    cache envelope (msgpack/JSON bytes before zstd), which tracks the decoded
+    object's footprint; the compressed length can be 1000x smaller.
+    Values are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, max_bytes: int, max_ttl_seconds: int):
+        self.max_bytes = max_bytes
+        self.max_ttl_seconds = max_ttl_seconds
+        self._data: "OrderedDict[str, Tuple[Any, int, float]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, size, expires_at = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any, size: int, ttl_seconds: int) -> None:
+        ttl = min(ttl_seconds, self.max_ttl_seconds)
+        if ttl <= 0 or size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (value, size, time.monotonic() + ttl)
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._data:
+                oldest = next(iter(self._data))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def delete(self, keys: Iterable[str]) -> int:
+        removed = 0
+        with self._lock:
+            for key in keys:
+                if key in self._data:
+                    self._remove(key)
+                    removed += 1
+        return removed
+
+    def delete_prefix(self, prefix: str) -> int:
+        with self._lock:
+            doomed = [k for k in self._data if k.startswith(prefix)]
+            for key in doomed:
+                self._remove(key)
+        return len(doomed)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def _remove(self, key: str) -> None:
+        _, size, _ = self._data.pop(key)
+        self._bytes -= size
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+
+_local_tier = LocalLRUCache(
+    max_bytes=CacheConfig.LOCAL_TIER_MAX_BYTES,
+    max_ttl_seconds=CacheConfig.LOCAL_TIER_MAX_TTL_SECONDS,
+)
+_redis_tier_stats = {"hits": 0, "misses": 0}
+_redis_tier_lock = threading.Lock()
+_invalidation_thread: Optional[threading.Thread] = None
+_invalidation_lock = threading.Lock()
+
+
+def get_local_tier() -> LocalLRUCache:
+    """Return this process's in-memory cache tier."""
+    return _local_tier
+
+
+def _count_redis_lookup(hit: bool) -> None:
+    with _redis_tier_lock:
+        _redis_tier_stats["hits" if hit else "misses"] += 1
+    CACHE_REQUESTS.inc(tier="redis", result="hit" if hit else "miss")
+
+
+def _apply_invalidation_message(raw: str) -> None:
+    """Evict local entries named by a pub/sub invalidation message."""
+    try:
+        message = json.loads(raw)
+    except (TypeError, ValueError):
+        return
+    if message.get("keys"):
+        _local_tier.delete(message["keys"])
+    if message.get("prefix"):
+        _local_tier.delete_prefix(message["prefix"])
+    if message.get("all"):
+        _local_tier.clear()
+    if message.get("namespace"):
+        _forget_generation(message["namespace"])
+        for prefix in _namespace_prefixes(message["namespace"]):
+            _local_tier.delete_prefix(prefix)
+
+
+def _invalidation_listener() -> None:
+    """Background subscriber keeping the local tier coherent across workers."""
+    backoff = 1.0
+    while True:
+        client = get_redis_client()
+        if client is None:
+            time.sleep(30)
+            continue
+        pubsub = None
+        try:
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(CacheConfig.INVALIDATION_CHANNEL)
+            backoff = 1.0
+            while True:
+                message = pubsub.get_message(timeout=1.0)
+                if message and message.get("type") == "message":
+                    _apply_invalidation_message(message.get("data"))
+        except Exception as e:
+            # Messages may have been missed while disconnected; drop everything.
+            logger.warning(f"Cache invalidation listener disconnected: {e}")
+            _local_tier.clear()
+            time.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
+        finally:
+            if pubsub is not None:
+                try:
+                    pubsub.close()
+                except Exception:
+                    pass
+
+
+def _ensure_invalidation_listener() -> None:
+    global _invalidation_thread
+    if _invalidation_thread is not None:
+        return
+    with _invalidation_lock:
+        if _invalidation_thread is None:
+            _invalidation_thread = threading.Thread(
+                target=_invalidation_listener,
+                name="preview-cache-invalidation",
+                daemon=True,
+            )
+            _invalidation_thread.start()
+
+
+def publish_invalidation(
+    keys: Optional[Iterable[str]] = None,
+    prefix: Optional[str] = None,
+    all_entries: bool = False,
+) -> None:
+    """Evict entries locally and broadcast the eviction to other workers."""
+    keys = list(keys or [])
+    if keys:
+        _local_tier.delete(keys)
+    if prefix:
+        _local_tier.delete_prefix(prefix)
+    if all_entries:
+        _local_tier.clear()
+
+    client = get_redis_client()
+    if client is None:
+        return
+    try:
+        client.publish(
+            CacheConfig.INVALIDATION_CHANNEL,
+            json.dumps({"keys": keys, "prefix": prefix, "all": all_entries}),
+        )
+    except Exception as e:
+        logger.warning(f"Cache invalidation publish error: {e}")
+
+
+def cache_get(key: str) -> Optional[Any]:
+    """
+    Read a cached value through the local tier, falling back to Redis.
+
+    Redis hits are decoded once and promoted into the local tier with the
+    key's remaining Redis TTL (capped by ``LOCAL_TIER_MAX_TTL_SECONDS``).
+    Entries that cannot be decoded are treated as misses.
+    """
+    if CacheConfig.LOCAL_TIER_ENABLED:
+        value = _local_tier.get(key)
+        CACHE_REQUESTS.inc(tier="local", result="miss" if value is None else "hit")
+        if value is not None:
+            return value
+
+    client = get_redis_binary_client()
+    if client is None:
+        return None
+
+    data = client.get(key)
+    _count_redis_lookup(data is not None)
+    if not data:
+        return None
+
+    try:
+        value = decode_payload(data)
+    except ValueError as e:
+        logger.warning(f"Undecodable cache entry {key}: {e}")
+        return None
+    if CacheConfig.LOCAL_TIER_ENABLED:
+        _ensure_invalidation_listener()
+        try:
+            ttl = client.ttl(key)
+        except Exception:
+            ttl = -1
+        # -1 means no expiry in Redis; the local cap still applies.
+        local_ttl = CacheConfig.LOCAL_TIER_MAX_TTL_SECONDS if ttl == -1 else ttl
+        _local_tier.set(key, value, payload_body_size(data), local_ttl)
+    return value
+
+
+def cache_set(key: str, value: Any, ttl_seconds: int) -> bool:
+    """
+    Encode a value with the configured codec and write it to Redis and the local tier.
+
+    Also records the key in its namespace index (for entry counts) and in
+    the per-URL index used by ``invalidate_cache``.
+    """
+    client = get_redis_binary_client()
+    if client is None:
+        return False
+
+    data = encode_payload(value)
+    now = time.time()
+    index_ttl = CacheConfig.MAX_TTL_HOURS * 3600
+    key_index = _key_index_for(key)
+    url_index = _url_index_for(key)
+    pipe = client.pipeline(transaction=False)
+    pipe.setex(key, ttl_seconds, data)
+    pipe.zadd(key_index, {key: now + ttl_seconds})
+    pipe.zremrangebyscore(key_index, "-inf", now)
+    pipe.expire(key_index, index_ttl)
+    pipe.sadd(url_index, key)
+    pipe.expire(url_index, index_ttl)
+    pipe.execute()
+    if CacheConfig.LOCAL_TIER_ENABLED:
+        _ensure_invalidation_listener()
+        # Store the round-tripped form so local hits match Redis hits exactly.
+        _local_tier.set(key, decode_payload(data), payload_body_size(data), ttl_seconds)
+    return True
+
+
+def get_tier_stats() -> Dict[str, Any]:
+    """Per-tier hit rates and local memory use for this process."""
+    with _redis_tier_lock:
+        redis_hits = _redis_tier_stats["hits"]
+        redis_misses = _redis_tier_stats["misses"]
+    redis_lookups = redis_hits + redis_misses
+    return {
+        "local": {"enabled": CacheConfig.LOCAL_TIER_ENABLED, **_local_tier.stats()},
+        "redis": {
+            "hits": redis_hits,
+            "misses": redis_misses,
+            "hit_rate": round(redis_hits / redis_lookups, 4) if redis_lookups else 0.0,
+        },
+    }
+
+
+# =============================================================================
+# NAMESPACE GENERATIONS AND KEY INDEXES
+# =============================================================================
+
+_GENERATION_PATTERN = re.compile(r":g(\d+):[0-9a-f]{32}$")
+_generation_cache: Dict[str, Tuple[int, float]] = {}
+_generation_lock = threading.Lock()
+
+
+def namespace_for_prefix(prefix: str) -> str:
+    """Map a key (or key prefix) to its namespace by longest matching prefix."""
+    best = None
+    for candidate in CacheConfig.NAMESPACES:
+        if prefix.startswith(candidate) and (best is None or len(candidate) > len(best)):
+            best = candidate
+    return CacheConfig.NAMESPACES[best] if best else CacheConfig.DEFAULT_NAMESPACE
+
+
+def _namespace_prefixes(namespace: str) -> List[str]:
+    return [p for p, ns in CacheConfig.NAMESPACES.items() if ns == namespace]
+
+
+def get_namespace_generation(namespace: str) -> int:
+    """Current generation of a namespace (0 when never flushed or Redis is down)."""
+    now = time.monotonic()
+    with _generation_lock:
+        cached = _generation_cache.get(namespace)
+        if cached and now - cached[1] < CacheConfig.GENERATION_CACHE_SECONDS:
+            return cached[0]
+
+    generation = 0
+    client = get_redis_client()
+    if client is not None:
+        try:
+            generation = int(client.get(f"{CacheConfig.GENERATION_KEY_PREFIX}{namespace}") or 0)
+        except Exception as e:
+            logger.warning(f"Cache generation read error for {namespace}: {e}")
+            if cached:
+                return cached[0]
+    with _generation_lock:
+        _generation_cache[namespace] = (generation, now)
+    return generation
+
+
+def _forget_generation(namespace: str) -> None:
+    with _generation_lock:
+        _generation_cache.pop(namespace, None)
+
+
+def _key_index_for(key: str) -> str:
+    """ZSET that tracks ``key`` within its namespace generation."""
+    match = _GENERATION_PATTERN.search(key)
+    generation = int(match.group(1)) if match else 0
+    return f"{CacheConfig.KEY_INDEX_PREFIX}{namespace_for_prefix(key)}:g{generation}"
+
+
+def _url_index_for(key: str) -> str:
+    return f"{CacheConfig.URL_INDEX_PREFIX}{key.rsplit(':', 1)[-1]}"
+
+
+def flush_namespace(namespace: str) -> Dict[str, int]:
+    """
+    Invalidate every entry in a namespace with a single INCR.
+
+    Old keys become unreachable and expire through their own TTLs; the old
+    generation's key index is unlinked in the background by Redis.
+
+    Returns:
+        Dict with the new generation and how many live entries were orphaned
+    """
+    client = get_redis_client()
+    if client is None:
+        raise RuntimeError("Redis is not available")
+
+    old_generation = get_namespace_generation(namespace)
+    generation = int(client.incr(f"{CacheConfig.GENERATION_KEY_PREFIX}{namespace}"))
+    with _generation_lock:
+        _generation_cache[namespace] = (generation, time.monotonic())
+
+    old_index = f"{CacheConfig.KEY_INDEX_PREFIX}{namespace}:g{old_generation}"
+    orphaned = int(client.zcount(old_index, time.time(), "+inf") or 0)
+    client.unlink(old_index)
+
+    for prefix in _namespace_prefixes(namespace):
+        _local_tier.delete_prefix(prefix)
+    try:
+        client.publish(CacheConfig.INVALIDATION_CHANNEL, json.dumps({"namespace": namespace}))
+    except Exception as e:
+        logger.warning(f"Cache invalidation publish error: {e}")
+
+    logger.info(f"Flushed cache namespace {namespace}: generation {old_generation} -> {generation}, {orphaned} entries orphaned")
+    return {"generation": generation, "orphaned_entries": orphaned}
+
+
+def get_namespace_stats() -> Dict[str, Dict[str, int]]:
+    """Generation and live entry count per namespace, from maintained indexes."""
+    client = get_redis_client()
+    if client is None:
+        return {}
+
+    now = time.time()
+    namespaces = sorted(set(CacheConfig.NAMESPACES.values()))
+    generations = {ns: get_namespace_generation(ns) for ns in namespaces}
+    pipe = client.pipeline(transaction=False)
+    for ns in namespaces:
+        pipe.zcount(f"{CacheConfig.KEY_INDEX_PREFIX}{ns}:g{generations[ns]}", now, "+inf")
+    counts = pipe.execute()
+    return {
+        ns: {"generation": generations[ns], "entries": int(count or 0)}
+        for ns, count in zip(namespaces, counts)
+    }
+
+
 # =============================================================================
 # CACHE OPERATIONS
 # =============================================================================
@@ -114,16 +612,11 @@ def get_cached_analysis(url: str) -> Optional[Dict[str, Any]]:
     Returns:
         Cached analysis dict or None if not found/expired
     """
-    client = get_redis_client()
-    if client is None:
-        return None
-    
     try:
         key = generate_cache_key(url, CacheConfig.ANALYSIS_PREFIX)
-        data = client.get(key)
+        cached = cache_get(key)
         
-        if data:
-            cached = json.loads(data)
+        if cached:
             logger.debug(f"Cache hit for URL analysis: {url[:50]}...")
             return cached
         
@@ -173,7 +666,7 @@ def cache_analysis(
         
         # Set with TTL
         ttl_seconds = min(ttl_hours, CacheConfig.MAX_TTL_HOURS) * 3600
-        client.setex(key, ttl_seconds, data)
+        cache_set(key, cache_data, ttl_seconds)
         
         logger.debug(f"Cached analysis for URL: {url[:50]}...")
         return True
@@ -190,16 +683,11 @@ def get_cached_preview_urls(url: str) -> Optional[Tuple[str, str]]:
     Returns:
         Tuple of (main_image_url, highlight_image_url) or None
     """
-    client = get_redis_client()
-    if client is None:
-        return None
-    
     try:
         key = generate_cache_key(url, CacheConfig.PREVIEW_PREFIX)
-        data = client.get(key)
+        cached = cache_get(key)
         
-        if data:
-            cached = json.loads(data)
+        if cached:
             logger.debug(f"Cache hit for preview URLs: {url[:50]}...")
             return (cached.get("main_url"), cached.get("highlight_url"))
         
@@ -241,9 +729,8 @@ def cache_preview_urls(
             "cached_at": datetime.utcnow().isoformat()
         }
         
-        data = json.dumps(cache_data)
         ttl_seconds = min(ttl_hours, CacheConfig.MAX_TTL_HOURS) * 3600
-        client.setex(key, ttl_seconds, data)
+        cache_set(key, cache_data, ttl_seconds)
         
         logger.debug(f"Cached preview URLs for: {url[:50]}...")
         return True
@@ -257,32 +744,28 @@ def invalidate_cache(url: str) -> bool:
     """
     Invalidate all cache entries for a URL across ALL prefixes.
     
-    Call this when a preview needs to be regenerated.
-    FIXED: Now clears all cache prefixes including demo caches.
+    Call this when a preview needs to be regenerated. Keys come from the
+    per-URL index maintained by ``cache_set``, plus the generation-0 keys
+    of every legacy prefix for entries written before the index existed.
     """
     client = get_redis_client()
     if client is None:
         return False
     
     try:
-        # All possible cache prefixes used in the system
-        all_prefixes = [
-            CacheConfig.PREVIEW_PREFIX,   # "preview:focus:"
-            CacheConfig.ANALYSIS_PREFIX,  # "analysis:"
-            "demo:preview:",              # Demo route v1
-            "demo:preview:v2:",           # Demo route v2 (job-based)
-            "demo:preview:v3:fast:",      # Demo v3 quality profiles
-            "demo:preview:v3:balanced:",
-            "demo:preview:v3:ultra:",
-            "preview:engine:",            # Engine default
-            "preview:enhanced:",          # Enhanced engine
-            "saas:preview:",              # SaaS preview
-        ]
-        
-        keys = [generate_cache_key(url, prefix) for prefix in all_prefixes]
+        url_index = f"{CacheConfig.URL_INDEX_PREFIX}{_url_hash(url)}"
+        indexed = set(client.smembers(url_index) or ())
+        legacy = {generate_cache_key(url, prefix, generation=0) for prefix in CacheConfig.LEGACY_PREFIXES}
+        keys = sorted(indexed | legacy)
         
-        deleted = client.delete(*keys)
-        logger.info(f"Invalidated {deleted} cache entries for: {url[:50]}... (checked {len(keys)} prefixes)")
+        deleted = client.delete(*keys, url_index)
+        if indexed:
+            pipe = client.pipeline(transaction=False)
+            for key in indexed:
+                pipe.zrem(_key_index_for(key), key)
+            pipe.execute()
+        publish_invalidation(keys=keys)
+        logger.info(f"Invalidated {deleted} cache entries for: {url[:50]}... ({len(indexed)} indexed keys)")
         return True
         
     except Exception as e:
@@ -302,19 +785,20 @@ def get_cache_stats() -> Dict[str, Any]:
     
     try:
         info = client.info("stats")
-        keyspace = client.info("keyspace")
         
-        # Count preview-related keys
-        preview_keys = len(list(client.scan_iter(f"{CacheConfig.PREVIEW_PREFIX}*", count=1000)))
-        analysis_keys = len(list(client.scan_iter(f"{CacheConfig.ANALYSIS_PREFIX}*", count=1000)))
+        # Entry counts come from maintained namespace indexes, not SCAN
+        namespaces = get_namespace_stats()
         
         return {
             "enabled": True,
-            "preview_entries": preview_keys,
-            "analysis_entries": analysis_keys,
+            "preview_entries": namespaces.get("focus", {}).get("entries", 0),
+            "analysis_entries": namespaces.get("analysis", {}).get("entries", 0),
+            "namespaces": namespaces,
             "total_hits": info.get("keyspace_hits", 0),
             "total_misses": info.get("keyspace_misses", 0),
-            "memory_used": info.get("used_memory_human", "unknown")
+            "memory_used": info.get("used_memory_human", "unknown"),
+            "tiers": get_tier_stats(),
+            "codec": get_codec_stats(),
         }
         
     except Exception as e:
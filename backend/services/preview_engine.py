@@ -41,6 +41,7 @@ from uuid import uuid4
 
 from backend.services.playwright_screenshot import capture_screenshot_and_html
 from backend.services.r2_client import upload_file_to_r2
+from backend.services.image_encoding import upload_preview_image
 from backend.services.preview_reasoning import generate_reasoned_preview
 from backend.services.preview_image_generator import generate_and_upload_preview_image
 from backend.services.brand_extractor import extract_all_brand_elements
@@ -51,6 +52,8 @@ from backend.services.intelligent_page_classifier import get_page_classifier, Pa
 from backend.services.preview_cache import (
     generate_cache_key,
     get_redis_client,
+    cache_get,
+    cache_set,
     CacheConfig
 )
 from backend.services.preview_tracer import PreviewTracer
@@ -69,6 +72,22 @@ from backend.services.preview.observability.reason_codes import (
     PaletteSource,
     PreviewLane,
 )
+from backend.services.preview.observability.memory import (
+    current_memory_monitor,
+    track_memory,
+)
+from backend.services.image_loading import current_image_cache, track_images
+from backend.services.preview.observability.metrics import (
+    JOB_RSS_GROWTH,
+    MEMORY_BUDGET_EXCEEDED,
+)
+from backend.services.preview.observability.profiler import (
+    current_sampler,
+    profile_job,
+    should_profile,
+)
+from backend.services.preview.observability.tracing import current_span, start_span
+from backend.services.demo_quality_profiles import quality_mode_from_cache_prefix
 from backend.services.preview.reliability import (
     record_fallback,
     validate_blueprint,
@@ -83,9 +102,23 @@ from backend.services.preview.extraction.validators import (
 )
 from backend.services.preview.extraction.palette import enforce_palette_distance
 from backend.services.preview.extraction.social_proof import extract_social_proof
+from backend.services.preview.artifacts import (
+    RANK_HTML,
+    RANK_MULTI_AGENT,
+    RANK_VISION,
+    StageArtifacts,
+)
 
 # Pipeline layers - context, hooks, normalization
 from backend.services.pipeline_context import PipelineContext
+from backend.services.cancellation import (
+    CancellationToken,
+    DeadlineExceeded,
+    PipelineCancelled,
+    bind_current,
+    bounded_timeout,
+    use_token,
+)
 from backend.services.pipeline_hooks import (
     InputValidator,
     StageRecovery,
@@ -385,6 +418,14 @@ class PreviewEngineConfig:
     # Error handling
     max_retries: int = 2
     timeout_seconds: int = 600
+
+    # Cooperative cancellation: callers keep a handle to cancel the job.
+    # When unset, generate() creates a token expiring after timeout_seconds.
+    cancel_token: Optional[CancellationToken] = None
+
+    # Sampling profiler: True/False forces it for this job; None samples
+    # PREVIEW_PROFILE_SAMPLE_RATE of jobs. The profile lands on the JobTrace.
+    enable_profiling: Optional[bool] = None
     
     # Quality thresholds
     min_content_confidence: float = 0.3  # Minimum confidence to proceed
@@ -588,7 +629,26 @@ class PreviewEngine:
             
         Raises:
             ValueError: If URL is invalid or generation fails critically
+            PipelineCancelled: If the job was cancelled or hit its deadline
         """
+        cancel_token = self.config.cancel_token or CancellationToken.with_timeout(self.config.timeout_seconds)
+        # Bind the token to this thread so capture, AI clients and renderers
+        # deep in the call tree clamp their timeouts to the job deadline.
+        span_attributes = {
+            "url.full": str(url),
+            "preview.quality_mode": quality_mode_from_cache_prefix(cache_key_prefix),
+        }
+        with use_token(cancel_token), track_memory(), track_images("preview.generate"), \
+                profile_job(should_profile(self.config.enable_profiling)), \
+                start_span("preview.generate", attributes=span_attributes):
+            return self._generate(url, cache_key_prefix, cancel_token)
+
+    def _generate(
+        self,
+        url: str,
+        cache_key_prefix: str,
+        cancel_token: CancellationToken,
+    ) -> PreviewEngineResult:
         start_time = time.time()
         url_str = str(url).strip()
 
@@ -598,11 +658,16 @@ class PreviewEngine:
             is_demo=self.config.is_demo,
             total_budget_seconds=self.config.timeout_seconds,
             progress_callback=self.config.progress_callback,
+            cancel_token=cancel_token,
         )
 
         # Phase 2: structured per-job trace, persisted on every terminal exit
         job_trace: JobTrace = new_job_trace(url=url_str, is_demo=self.config.is_demo,
                                             job_id=ctx.request_id)
+        job_trace.quality_mode = quality_mode_from_cache_prefix(cache_key_prefix)
+        if current_span() is not None:
+            current_span().set_attribute("preview.request_id", ctx.request_id)
+            job_trace.trace_id = current_span().context.trace_id
 
         # Input validation layer
         try:
@@ -632,9 +697,22 @@ class PreviewEngine:
             invalidate_cache(url_str)
         
         try:
+            # Stage artifacts are keyed by URL only, so every quality mode
+            # resumes from the highest stage any earlier run already produced.
+            artifacts = StageArtifacts.load(url_str, enabled=self.config.enable_cache)
+            ctx.shared["stage_artifacts"] = artifacts
+            cached_capture = artifacts.capture_bundle()
+
             # Stage 1: Capture page (with budget enforcement)
             with ctx.stage("capture") as s:
-                screenshot_bytes, html_content, dom_data = self._capture_page(url_str)
+                if cached_capture:
+                    screenshot_bytes = cached_capture["screenshot_bytes"]
+                    html_content = cached_capture["html_content"]
+                    dom_data = cached_capture["dom_data"]
+                    s.set_output("reused", True)
+                else:
+                    screenshot_bytes, html_content, dom_data = self._capture_page(url_str)
+                artifacts.mark("capture", cached_capture is not None)
                 self._last_screenshot_bytes = screenshot_bytes
                 self._last_html_content = html_content
                 ctx.shared["screenshot_bytes"] = screenshot_bytes
@@ -643,7 +721,7 @@ class PreviewEngine:
                 s.set_output("screenshot_bytes", len(screenshot_bytes))
             tracer.add_step("Capture Page",
                             details=f"HTML extracted: {len(html_content)} characters. DOM Nodes: {len(dom_data.get('raw_top_texts', []))}",
-                            image_base64=__import__('base64').b64encode(screenshot_bytes).decode('utf-8'))
+                            image_bytes=screenshot_bytes)
             
             # Stage 2: Classify page type
             with ctx.stage("classify") as s:
@@ -694,62 +772,88 @@ class PreviewEngine:
                 ctx.warn("Circuit breaker open - skipping AI reasoning, using HTML fallback")
                 ctx.current_tier = QualityTier.TIER_3_BASIC
 
+            use_html_fast_path = (
+                not ctx.ai_available()
+                or (self.config.is_demo and self._has_rich_og_metadata(html_content))
+            )
+            if use_html_fast_path or not (self.config.enable_ai_reasoning or self.ai_orchestrator):
+                required_rank = RANK_HTML
+            elif self.ai_orchestrator and self.config.enable_multi_agent:
+                required_rank = RANK_MULTI_AGENT
+            else:
+                required_rank = RANK_VISION
+            cached_brand = artifacts.brand
+            cached_blueprint = artifacts.usable_blueprint(required_rank)
+            cached_reasoning = artifacts.usable_reasoning(
+                required_rank, self.config.enable_ui_element_extraction
+            )
+            artifacts.mark("brand", cached_brand is not None)
+            artifacts.mark("reasoning", cached_reasoning is not None)
+            artifacts.mark("blueprint", cached_blueprint is not None)
+
             with ctx.stage("parallel_extraction") as _pstage, ThreadPoolExecutor(max_workers=4) as executor:
                 futures = {}
-                
+                screenshot_url = cached_capture["screenshot_url"] if cached_capture else None
+                brand_elements = cached_brand["brand_elements"] if cached_brand else {}
+                ai_result = cached_reasoning["ai_result"] if cached_reasoning else None
+                ui_elements = (cached_reasoning or {}).get("ui_elements") or {}
+                ui_extracted = bool(cached_reasoning and cached_reasoning.get("ui_elements") is not None
+                                    and cached_reasoning.get("ui_extracted"))
+                reasoning_rank = cached_reasoning["rank"] if cached_reasoning else RANK_HTML
+                _pstage.set_output("reused", sorted(k for k, v in artifacts.reused.items() if v))
+
                 # Task 1: Upload screenshot
-                future_upload = executor.submit(
-                    upload_file_to_r2,
-                    screenshot_bytes,
-                    f"screenshots/{'demo' if self.config.is_demo else 'saas'}/{uuid4()}.png",
-                    "image/png"
-                )
-                futures[future_upload] = "upload"
+                if not screenshot_url:
+                    future_upload = executor.submit(
+                        bind_current(upload_file_to_r2),
+                        screenshot_bytes,
+                        f"screenshots/{'demo' if self.config.is_demo else 'saas'}/{uuid4()}.png",
+                        "image/png"
+                    )
+                    futures[future_upload] = "upload"
                 
                 # Task 2: Extract brand elements
-                future_brand = executor.submit(
-                    self._extract_brand_elements,
-                    html_content, url_str, screenshot_bytes
-                )
-                futures[future_brand] = "brand"
+                if cached_brand is None:
+                    future_brand = executor.submit(
+                        bind_current(self._extract_brand_elements),
+                        html_content, url_str, screenshot_bytes
+                    )
+                    futures[future_brand] = "brand"
                 
                 # Task 3: Run AI reasoning (most time-consuming, starts early)
                 # 400% optimization: Skip AI for demo when page has rich OG metadata (early exit)
                 # Circuit breaker gate: skip AI if breaker is open
-                use_html_fast_path = (
-                    not ctx.ai_available()
-                    or (self.config.is_demo and self._has_rich_og_metadata(html_content))
-                )
-                if use_html_fast_path:
+                if cached_blueprint is not None or cached_reasoning is not None:
+                    self.logger.info(
+                        f"[{ctx.request_id}] Reusing cached "
+                        f"{'blueprint' if cached_blueprint is not None else 'reasoning'} (rank>={required_rank})"
+                    )
+                elif use_html_fast_path:
                     if self.config.is_demo and self._has_rich_og_metadata(html_content):
                         self.logger.info(f"✅ [400%] OG-rich demo fast path: skipping AI, using HTML extraction")
                     future_ai = executor.submit(
-                        self._extract_from_html_only,
+                        bind_current(self._extract_from_html_only),
                         html_content, url_str, getattr(self, '_last_screenshot_bytes', None)
                     )
                     futures[future_ai] = "ai"
                 else:
+                    self._reasoning_rank = RANK_HTML
                     future_ai = executor.submit(
-                        self._run_ai_reasoning_enhanced,
+                        bind_current(self._run_ai_reasoning_enhanced),
                         screenshot_bytes, url_str, html_content, page_classification, dom_data
                     )
                     futures[future_ai] = "ai"
                 
                 # Task 4: Extract UI elements (actual visual components)
                 # This extracts buttons, badges, CTAs, testimonials, etc.
-                if self.config.enable_ui_element_extraction:
+                if self.config.enable_ui_element_extraction and not ui_extracted:
                     future_ui = executor.submit(
-                        self._extract_ui_elements,
+                        bind_current(self._extract_ui_elements),
                         screenshot_bytes, url_str
                     )
                     futures[future_ui] = "ui_elements"
                 
                 # Wait for all to complete
-                screenshot_url = None
-                brand_elements = {}
-                ai_result = None
-                ui_elements = {}
-                
                 for future in as_completed(futures):
                     task_name = futures[future]
                     try:
@@ -762,16 +866,35 @@ class PreviewEngine:
                             self.logger.info(f"✅ [7X] Brand extraction complete")
                         elif task_name == "ai":
                             ai_result = future.result()
+                            reasoning_rank = getattr(self, "_reasoning_rank", RANK_HTML)
                             tracer.add_step("AI Extraction & DNA", json_data=ai_result)
                             self.logger.info(f"✅ [7X] AI reasoning complete")
                         elif task_name == "ui_elements":
                             ui_elements = future.result()
+                            ui_extracted = True
                             self.logger.info(f"✅ [7X] UI element extraction complete: {len(ui_elements.get('elements', []))} elements")
                     except Exception as e:
                         self.logger.warning(f"⚠️  [7X] {task_name} failed: {e}")
-            
+
+            # Persist freshly computed stages for the other quality modes
+            if "upload" in futures.values() or cached_capture is None:
+                artifacts.store_capture(screenshot_bytes, html_content, dom_data, screenshot_url)
+            if "brand" in futures.values() and brand_elements:
+                artifacts.store_brand(brand_elements)
+            if ai_result and ("ai" in futures.values() or "ui_elements" in futures.values()):
+                artifacts.store_reasoning(
+                    ai_result, reasoning_rank,
+                    ui_elements if ui_extracted else None,
+                )
+
             # Normalize AI result through the result normalizer layer
-            ai_result = normalize_ai_result(ai_result, url_str)
+            if cached_blueprint is not None:
+                ai_result = cached_blueprint
+            else:
+                has_reasoning = bool(ai_result)
+                ai_result = normalize_ai_result(ai_result, url_str)
+                if has_reasoning:
+                    artifacts.store_blueprint(ai_result, reasoning_rank)
 
             # Stage 4: Generate composited image
             with ctx.stage("image_generation") as _istage:
@@ -804,8 +927,23 @@ class PreviewEngine:
             retry_count = 0
             quality_passed = False
             prev_overall_score = None  # Track previous score to detect no-improvement loops
+            deadline_reached = False
 
             while retry_count <= max_retries and not quality_passed:
+                try:
+                    ctx.check_cancelled("quality retry")
+                except DeadlineExceeded:
+                    # The preview in hand is finished and uploaded: ship it
+                    # instead of retrying. Cancellation still aborts the job.
+                    deadline_reached = True
+                    self.logger.warning(
+                        f"[{ctx.request_id}] Deadline reached after {retry_count} quality retries; "
+                        f"shipping the latest preview"
+                    )
+                    tracer.add_step("Quality Retries Stopped", details="Job deadline reached")
+                    job_trace.notes.append(f"quality_retries:deadline:{retry_count}")
+                    result.warnings.append("Quality retries stopped at the job deadline")
+                    break
                 if self.quality_orchestrator:
                     try:
                         # Convert result to dict for quality assessment
@@ -1073,7 +1211,7 @@ class PreviewEngine:
                                         ratio_ok = fix_report.final_contrast_ratio >= 2.5
                                         if fix_report.fixes_applied or ratio_ok:
                                             fixed_filename = f"previews/demo/{uuid4()}_fixed.png"
-                                            new_url = upload_file_to_r2(fixed_bytes, fixed_filename, "image/png")
+                                            new_url = upload_preview_image(fixed_bytes, fixed_filename)
                                             if new_url:
                                                 result.composited_preview_image_url = new_url
                                                 result.warnings.append("Contrast auto-fixed")
@@ -1086,7 +1224,7 @@ class PreviewEngine:
                     self.logger.warning(f"Visual quality validation failed: {e}")
             
             # Only build HTML fallback if AI result was truly broken (no title or no image)
-            if not quality_passed:
+            if not quality_passed and not deadline_reached:
                 self.logger.info(
                     f"AIL-210 DIAGNOSIS: Quality gates failed, triggering fallback path "
                     f"(retry_count={retry_count})"
@@ -1198,6 +1336,8 @@ class PreviewEngine:
 
             if bool(result.quality_scores.get("is_fallback")):
                 final_decision = "fallback"
+            elif deadline_reached:
+                final_decision = "deadline"
             elif final_gate_status == "soft_pass":
                 final_decision = "soft_pass"
             elif quality_passed and meets_target:
@@ -1211,6 +1351,7 @@ class PreviewEngine:
                 "retry_attempts_used": int(retry_count),
                 "retry_budget": int(max_retries),
                 "quality_passed": bool(quality_passed),
+                "deadline_reached": bool(deadline_reached),
                 "final_decision": final_decision,
                 "thresholds": {
                     "quality_threshold": float(self.config.quality_threshold),
@@ -1238,8 +1379,8 @@ class PreviewEngine:
                 f"(tier={ctx.current_tier.value}, stages={len(ctx.stages)})"
             )
 
-            # Finalize Tracing Header End
-            trace_url = tracer.upload_trace()
+            # Finalize Tracing Header End (sampled; uploaded write-behind)
+            trace_url = tracer.finish(failed=False)
             result.trace_url = trace_url
             result.quality_scores["trace_url"] = trace_url
             if isinstance(result.quality_scores.get("debug"), dict):
@@ -1247,6 +1388,9 @@ class PreviewEngine:
 
             # Phase 2: persist structured JobTrace for diagnosis utility
             self._populate_job_trace_from_ctx(job_trace, ctx, result)
+            if deadline_reached:
+                # Shipped, but with the retries the budget cut short
+                job_trace.failure_reason = job_trace.failure_reason or FailureReason.QUALITY_BUDGET_EXCEEDED
             job_trace.finalize_success()
             JobTraceStore.get_instance().save(job_trace)
 
@@ -1255,10 +1399,23 @@ class PreviewEngine:
 
             return result
             
+        except PipelineCancelled as e:
+            # Cancelled/expired jobs release their resources immediately:
+            # no trace upload, no fallback rendering.
+            self.logger.warning(f"[{ctx.request_id}] Preview generation stopped: {e}")
+            self._populate_job_trace_from_ctx(job_trace, ctx, None)
+            job_trace.finalize_failure(
+                FailureReason.DEADLINE_EXCEEDED if isinstance(e, DeadlineExceeded)
+                else FailureReason.JOB_CANCELLED,
+                detail=str(e),
+            )
+            JobTraceStore.get_instance().save(job_trace)
+            raise
+
         except Exception as e:
             error_msg = str(e)
             tracer.add_step("Fatal Error", error=error_msg)
-            tracer.upload_trace()
+            tracer.finish(failed=True)
 
             self.logger.error(f"[{ctx.request_id}] Preview generation failed: {error_msg}", exc_info=True)
             ctx.update_progress(0.0, f"Failed: {error_msg}")
@@ -1296,15 +1453,10 @@ class PreviewEngine:
     ) -> Optional[PreviewEngineResult]:
         """Check cache for existing preview."""
         try:
-            redis_client = get_redis_client()
-            if not redis_client:
-                return None
-            
             cache_key = generate_cache_key(url, cache_key_prefix)
-            cached_data = redis_client.get(cache_key)
+            data = cache_get(cache_key)
             
-            if cached_data:
-                data = json.loads(cached_data)
+            if data:
                 return PreviewEngineResult(**data)
         except Exception as e:
             self.logger.warning(f"Cache read error: {e}")
@@ -1337,14 +1489,10 @@ class PreviewEngine:
     ):
         """Cache preview result."""
         try:
-            redis_client = get_redis_client()
-            if not redis_client:
-                return
-            
             cache_key = generate_cache_key(url, cache_key_prefix)
-            cache_data = json.dumps(result.__dict__, default=str)
             ttl_seconds = CacheConfig.DEFAULT_TTL_HOURS * 3600
-            redis_client.setex(cache_key, ttl_seconds, cache_data)
+            if not cache_set(cache_key, result.__dict__, ttl_seconds):
+                return
             self.logger.info(f"✅ Cached result for: {url[:50]}...")
         except Exception as e:
             self.logger.warning(f"⚠️  Failed to cache result: {e}")
@@ -1366,20 +1514,26 @@ class PreviewEngine:
         
         retries = 0
         last_error = None
-        CAPTURE_TIMEOUT = 15  # Hard 15-second timeout for screenshot capture
 
         while retries <= self.config.max_retries:
             try:
+                # Hard 15-second timeout for screenshot capture, never past the job deadline
+                capture_timeout = bounded_timeout(15)
                 self.logger.info(f"📸 Capturing screenshot + HTML for: {url}")
-                # Run capture with a hard timeout to prevent hanging on slow sites
+                # Run capture with a hard timeout to prevent hanging on slow sites.
+                # shutdown(wait=False): a hung capture must not block this thread;
+                # its navigation timeout is clamped to the same deadline.
                 from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
-                with ThreadPoolExecutor(max_workers=1) as executor:
-                    future = executor.submit(capture_screenshot_and_html, url)
+                executor = ThreadPoolExecutor(max_workers=1)
+                try:
+                    future = executor.submit(bind_current(capture_screenshot_and_html), url)
                     try:
-                        screenshot_bytes, html_content, dom_data = future.result(timeout=CAPTURE_TIMEOUT)
+                        screenshot_bytes, html_content, dom_data = future.result(timeout=capture_timeout)
                     except FuturesTimeoutError:
                         future.cancel()
-                        raise TimeoutError(f"Screenshot capture timed out after {CAPTURE_TIMEOUT}s")
+                        raise TimeoutError(f"Screenshot capture timed out after {capture_timeout:.0f}s")
+                finally:
+                    executor.shutdown(wait=False)
                 
                 # Validate screenshot quality
                 if len(screenshot_bytes) < 1000:  # Too small
@@ -1388,6 +1542,8 @@ class PreviewEngine:
                 self.logger.info(f"✅ Screenshot captured ({len(screenshot_bytes)} bytes)")
                 return screenshot_bytes, html_content, dom_data
                 
+            except PipelineCancelled:
+                raise
             except Exception as e:
                 last_error = e
                 retries += 1
@@ -1733,6 +1889,7 @@ class PreviewEngine:
                         "reasoning_confidence": orchestration_result.quality_score,
                         "design_dna": fused_data.get("design_dna", {})
                     }
+                    self._reasoning_rank = RANK_MULTI_AGENT
                     return result_dict
                 else:
                     self.logger.warning(f"⚠️ Orchestrator failed gracefully: {orchestration_result.errors}")
@@ -1796,6 +1953,7 @@ class PreviewEngine:
                 f"Fidelity: {reasoned.design_fidelity_score:.2f}"
             )
 
+            self._reasoning_rank = RANK_VISION
             return result
 
         except Exception as e:
@@ -2030,6 +2188,7 @@ class PreviewEngine:
         from urllib.parse import urlparse
 
         self.logger.info("Extracting preview from HTML (enhanced fallback)")
+        self._reasoning_rank = RANK_HTML
         
         metadata = extract_metadata_from_html(html_content)
         semantic = extract_semantic_structure(html_content)
@@ -2338,10 +2497,9 @@ class PreviewEngine:
                     # Upload enhanced image
                     from io import BytesIO
                     filename = f"enhanced_preview_{uuid4()}.png"
-                    composited_image_url = upload_file_to_r2(
+                    composited_image_url = upload_preview_image(
                         enhanced_result.image_bytes,
-                        filename,
-                        "image/png"
+                        filename
                     )
                     
                     if composited_image_url:
@@ -3175,8 +3333,34 @@ class PreviewEngine:
                     skipped=stage.skipped,
                     error=stage.error,
                     outputs=dict(stage.outputs),
+                    memory=dict(stage.memory),
                 ))
 
+            artifacts = ctx.shared.get("stage_artifacts")
+            if artifacts is not None:
+                trace.artifact_reuse = dict(artifacts.reused)
+
+            sampler = current_sampler()
+            if sampler is not None:
+                trace.profile = sampler.to_dict()
+
+            monitor = current_memory_monitor()
+            if monitor is not None:
+                trace.memory = monitor.summary()
+                growth = trace.memory.get("rss_growth_mb")
+                if growth is not None:
+                    JOB_RSS_GROWTH.observe(growth)
+                if trace.memory.get("over_budget"):
+                    MEMORY_BUDGET_EXCEEDED.inc()
+                    trace.warnings.append(
+                        f"memory budget exceeded: RSS grew {growth}MB "
+                        f"(budget {monitor.budget_mb:g}MB, peak stage {trace.memory.get('peak_stage')})"
+                    )
+
+            image_cache = current_image_cache()
+            if image_cache is not None:
+                trace.image_loading = image_cache.stats.to_dict()
+
             for warning in ctx.warnings:
                 trace.warnings.append(warning[:200])
 
@@ -3370,9 +3554,7 @@ class PreviewEngine:
             
             variants = {}
             for platform, variant in result.variants.items():
-                buffer = BytesIO()
-                variant.image.save(buffer, format='PNG')
-                variants[platform.value] = buffer.getvalue()
+                variants[platform.value] = variant.to_bytes('PNG')
             
             self.logger.info(
                 f"📱 Generated {len(variants)} platform variants: "
@@ -3417,14 +3599,11 @@ class PreviewEngine:
             
             variants_data = []
             for variant in result.variants:
-                buffer = BytesIO()
-                variant.image.save(buffer, format='PNG')
-                
                 variants_data.append({
                     "id": variant.id,
                     "name": variant.name,
                     "description": variant.description,
-                    "image_bytes": buffer.getvalue(),
+                    "image_bytes": variant.to_bytes('PNG'),
                     "readability_score": variant.readability_score,
                     "visual_appeal_score": variant.visual_appeal_score,
                     "is_default": variant.is_default,
@@ -56,7 +56,8 @@ from backend.services.metadata_extractor import extract_metadata_from_html
 from backend.services.semantic_extractor import extract_semantic_structure
 from backend.services.preview_cache import (
     generate_cache_key,
-    get_redis_client,
+    cache_get,
+    cache_set,
     CacheConfig
 )
 
@@ -866,15 +867,10 @@ class EnhancedPreviewEngine:
     ) -> Optional[EnhancedPreviewEngineResult]:
         """7X PERFORMANCE: Check cache with predictive patterns."""
         try:
-            redis_client = get_redis_client()
-            if not redis_client:
-                return None
-            
             cache_key = generate_cache_key(url, cache_key_prefix)
-            cached_data = redis_client.get(cache_key)
+            data = cache_get(cache_key)
             
-            if cached_data:
-                data = json.loads(cached_data)
+            if data:
                 return EnhancedPreviewEngineResult(**data)
         except Exception as e:
             self.logger.warning(f"Cache read error: {e}")
@@ -889,14 +885,9 @@ class EnhancedPreviewEngine:
     ):
         """Cache enhanced result."""
         try:
-            redis_client = get_redis_client()
-            if not redis_client:
-                return
-            
             cache_key = generate_cache_key(url, cache_key_prefix)
-            cache_data = json.dumps(result.__dict__, default=str)
             ttl_seconds = CacheConfig.DEFAULT_TTL_HOURS * 3600
-            redis_client.setex(cache_key, ttl_seconds, cache_data)
+            cache_set(cache_key, result.__dict__, ttl_seconds)
         except Exception as e:
             self.logger.warning(f"Failed to cache result: {e}")
     
@@ -25,7 +25,11 @@ from io import BytesIO
 from uuid import uuid4
 from typing import Optional, Dict, Any, List, Tuple
 from PIL import Image, ImageDraw, ImageFont, ImageFilter, ImageEnhance
-from backend.services.r2_client import upload_file_to_r2
+from backend.services.font_registry import SANS_FALLBACKS, load_font
+from backend.services.image_encoding import upload_preview_image
+from backend.services.image_loading import load_image, resize_image, track_images
+from backend.services.render_layers import cached_layer, gradient_layer, ramp_mask
+from backend.services.text_layout import fit_font_size, font_metrics, track_render
 
 # Design DNA Integration
 try:
@@ -132,59 +136,28 @@ def _get_text_shadow_color(text_color: tuple) -> tuple:
     return (255, 255, 255, 40)  # Light shadow
 
 
-_FONT_CACHE: Dict[Tuple[str, int], ImageFont.FreeTypeFont] = {}
 _FONT_WARNING_LOGGED = False
 
 
 def _load_font(size: int, bold: bool = True) -> ImageFont.FreeTypeFont:
     """
-    Load font with fallbacks and caching.
-    Searches multiple font paths and caches results for performance.
-    Logs a warning (once) if falling back to default bitmap font.
+    Load the sans-serif UI font from the font registry.
+    Sized instances are cached by the registry (see font_registry).
+    Logs an error (once) if falling back to default bitmap font.
     """
     global _FONT_WARNING_LOGGED
 
     size = max(12, size)  # Enforce minimum readable size
 
-    cache_key = ("bold" if bold else "regular", size)
-    if cache_key in _FONT_CACHE:
-        return _FONT_CACHE[cache_key]
-
-    font_paths_bold = [
-        "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
-        "/usr/share/fonts/truetype/liberation/LiberationSans-Bold.ttf",
-        "/usr/share/fonts/truetype/freefont/FreeSansBold.ttf",
-        "/usr/share/fonts/truetype/noto/NotoSans-Bold.ttf",
-    ]
-    font_paths_regular = [
-        "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
-        "/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf",
-        "/usr/share/fonts/truetype/freefont/FreeSans.ttf",
-        "/usr/share/fonts/truetype/noto/NotoSans-Regular.ttf",
-    ]
-
-    paths = font_paths_bold if bold else font_paths_regular
-
-    for path in paths:
-        try:
-            font = ImageFont.truetype(path, size)
-            _FONT_CACHE[cache_key] = font
-            return font
-        except Exception:
-            continue
-
-    # Fallback: PIL default bitmap font (ugly but functional)
-    if not _FONT_WARNING_LOGGED:
+    font = load_font(SANS_FALLBACKS, size, weight=700 if bold else 400)
+    if not isinstance(font, ImageFont.FreeTypeFont) and not _FONT_WARNING_LOGGED:
         logger.error(
             "⚠️ CRITICAL: No TrueType fonts found on system! "
             "Preview images will use low-quality bitmap fonts. "
             "Install fonts-dejavu-core or fonts-liberation package."
         )
         _FONT_WARNING_LOGGED = True
-
-    default_font = ImageFont.load_default()
-    _FONT_CACHE[cache_key] = default_font
-    return default_font
+    return font
 
 
 def smart_truncate(text: str, max_chars: int) -> str:
@@ -262,6 +235,10 @@ def smart_truncate(text: str, max_chars: int) -> str:
     return truncated[:max_chars - 3] + "..."
 
 
+def _truncate_long_word(word: str) -> str:
+    return smart_truncate(word, 37)
+
+
 def _wrap_text(text: str, font: ImageFont.FreeTypeFont, max_width: int, draw: ImageDraw.Draw, max_lines: int = 3) -> List[str]:
     """
     PHASE 4: Wrap text with smart line breaking and sentence-aware truncation.
@@ -294,36 +271,10 @@ def _wrap_text(text: str, font: ImageFont.FreeTypeFont, max_width: int, draw: Im
     # Clean text first - normalize whitespace
     text = " ".join(text.split())
     
-    words = text.split()
-    lines = []
-    current_line = []
-    
-    for word in words:
-        test_line = ' '.join(current_line + [word])
-        try:
-            bbox = draw.textbbox((0, 0), test_line, font=font)
-            width = bbox[2] - bbox[0]
-        except:
-            # Fallback calculation: approximate width
-            char_width = font.size * 0.6 if hasattr(font, 'size') else 8
-            width = len(test_line) * char_width
-        
-        if width <= max_width:
-            current_line.append(word)
-        else:
-            if current_line:
-                lines.append(' '.join(current_line))
-            
-            # Handle very long words (URLs, technical terms, etc.)
-            if len(word) > 40:
-                # For very long words, use smart_truncate
-                truncated_word = smart_truncate(word, 37)
-                current_line = [truncated_word]
-            else:
-                current_line = [word]
-    
-    if current_line:
-        lines.append(' '.join(current_line))
+    # Greedy word wrap on cached glyph metrics; very long words (URLs,
+    # technical terms, etc.) are shortened with smart_truncate
+    metrics = font_metrics(font)
+    lines = list(metrics.break_lines(text, max_width, overflow_word=_truncate_long_word))
     
     # PHASE 4: Smart truncation with sentence awareness
     if len(lines) > max_lines:
@@ -341,18 +292,9 @@ def _wrap_text(text: str, font: ImageFont.FreeTypeFont, max_width: int, draw: Im
         # Use smart_truncate for the last line
         last_line = smart_truncate(remaining_text, last_line_max)
         
-        # Double check it fits
-        try:
-            bbox = draw.textbbox((0, 0), last_line, font=font)
-            last_line_width = bbox[2] - bbox[0]
-            
-            # If still too wide, truncate further
-            while last_line_width > max_width and len(last_line) > 20:
-                last_line = smart_truncate(last_line[:-4], len(last_line) - 10)
-                bbox = draw.textbbox((0, 0), last_line, font=font)
-                last_line_width = bbox[2] - bbox[0]
-        except:
-            pass  # Keep the truncated line as-is
+        # Double check it fits; if still too wide, truncate further
+        while not metrics.fits(last_line, max_width) and len(last_line) > 20:
+            last_line = smart_truncate(last_line[:-4], len(last_line) - 10)
         
         result.append(last_line)
         return result
@@ -364,33 +306,38 @@ def _draw_gradient_background(
     image: Image.Image,
     color1: Tuple[int, int, int],
     color2: Tuple[int, int, int],
-    direction: str = "diagonal"
+    direction: str = "diagonal",
+    template: str = "default"
 ) -> Image.Image:
     """
     Draw a smooth gradient background using LAB color space for perceptually uniform gradients.
+    The gradient layer is cached per (size, colors, direction).
     """
-    from backend.services.gradient_generator import generate_smooth_gradient
-    
-    width, height = image.size
-
-    # Map direction to angle
-    angle_map = {
-        "diagonal": 135,
-        "vertical": 90,
-        "horizontal": 0,
-        "radial": 0
-    }
-    angle = angle_map.get(direction, 135)
-    style = "radial" if direction == "radial" else "linear"
-
-    gradient_img = generate_smooth_gradient(
-        width, height, color1, color2, angle=angle, style=style
+    if direction not in ("diagonal", "vertical", "horizontal", "radial"):
+        direction = "diagonal"
+    gradient_img = gradient_layer(
+        image.size, (tuple(color1[:3]), tuple(color2[:3])), direction, template=template
     )
 
     image.paste(gradient_img)
     return image
 
 
+def _hero_highlight(size: Tuple[int, int]) -> Image.Image:
+    """Soft white radial highlight in the upper-left of the hero template."""
+    highlight = Image.new('RGBA', size, (0, 0, 0, 0))
+    highlight_draw = ImageDraw.Draw(highlight)
+    center_x, center_y = int(size[0] * 0.25), int(size[1] * 0.3)
+    max_radius = int(size[0] * 0.45)
+    for r in range(max_radius, 0, -3):
+        alpha = int(18 * (1 - (r / max_radius) ** 2))  # Quadratic falloff
+        highlight_draw.ellipse(
+            [(center_x - r, center_y - r), (center_x + r, center_y + r)],
+            fill=(255, 255, 255, alpha)
+        )
+    return highlight
+
+
 def _draw_text_with_shadow(
     draw: ImageDraw.Draw,
     position: Tuple[int, int],
@@ -444,30 +391,28 @@ def _fit_text_to_box(
     max_lines: int = 3
 ) -> Tuple[ImageFont.FreeTypeFont, List[str]]:
     """
-    Auto-fit text into a bounding box by reducing font size until it fits.
+    Auto-fit text into a bounding box: the largest font size (stepping by 2)
+    whose wrapped lines fit, found by binary search over the sizes.
 
     Returns:
         Tuple of (font, wrapped_lines) that fit within the box.
     """
-    for size in range(max_font_size, min_font_size - 1, -2):
-        font = _load_font(size, bold=bold)
-        lines = _wrap_text(text, font, max_width, draw, max_lines=max_lines)
+    def layout(size: int) -> List[str]:
+        return _wrap_text(text, _load_font(size, bold=bold), max_width, draw, max_lines=max_lines)
+
+    def fits(size: int) -> bool:
+        lines = layout(size)
         if not lines:
-            continue
-        # Measure total height
-        total_height = 0
-        for line in lines:
-            try:
-                bbox = draw.textbbox((0, 0), line, font=font)
-                total_height += bbox[3] - bbox[1] + 4  # 4px line spacing
-            except Exception:
-                total_height += size + 4
-        if total_height <= max_height:
-            return font, lines
-    # Return minimum size
-    font = _load_font(min_font_size, bold=bold)
-    lines = _wrap_text(text, font, max_width, draw, max_lines=max_lines)
-    return font, lines
+            return False
+        metrics = font_metrics(_load_font(size, bold=bold))
+        total_height = sum(metrics.height(line) + 4 for line in lines)  # 4px line spacing
+        return total_height <= max_height
+
+    size = fit_font_size(range(max_font_size, min_font_size - 1, -2), fits)
+    if size is None:
+        # Return minimum size
+        size = min_font_size
+    return _load_font(size, bold=bold), layout(size)
 
 
 def _sample_region_luminance(image: Image.Image, x: int, y: int, w: int, h: int) -> float:
@@ -539,6 +484,8 @@ def _ensure_wcag_contrast(
     return image
 
 
+@track_images("designed_preview")
+@track_render("designed_preview")
 def generate_designed_preview(
     screenshot_bytes: bytes,
     title: str,
@@ -718,19 +665,10 @@ def _generate_hero_template(
     """
     # ── BACKGROUND & OPTIONAL SPLIT LAYOUT ────────────────────────────────
     img = Image.new('RGB', (OG_IMAGE_WIDTH, OG_IMAGE_HEIGHT), primary_color)
-    img = _draw_gradient_background(img, primary_color, secondary_color, "diagonal")
+    img = _draw_gradient_background(img, primary_color, secondary_color, "diagonal", template="hero")
 
     # Add subtle radial highlight in upper-left for depth/dimension
-    highlight = Image.new('RGBA', (OG_IMAGE_WIDTH, OG_IMAGE_HEIGHT), (0, 0, 0, 0))
-    highlight_draw = ImageDraw.Draw(highlight)
-    center_x, center_y = int(OG_IMAGE_WIDTH * 0.25), int(OG_IMAGE_HEIGHT * 0.3)
-    max_radius = int(OG_IMAGE_WIDTH * 0.45)
-    for r in range(max_radius, 0, -3):
-        alpha = int(18 * (1 - (r / max_radius) ** 2))  # Quadratic falloff
-        highlight_draw.ellipse(
-            [(center_x - r, center_y - r), (center_x + r, center_y + r)],
-            fill=(255, 255, 255, alpha)
-        )
+    highlight = cached_layer(("hero_highlight", img.size), lambda: _hero_highlight(img.size), template="hero")
     img = Image.alpha_composite(img.convert('RGBA'), highlight).convert('RGB')
 
     # ── DOM DATA EXTRACTION (Scientific Layout Prep) ──────────────
@@ -747,7 +685,7 @@ def _generate_hero_template(
 
     if screenshot_bytes:
         try:
-            sc = Image.open(BytesIO(screenshot_bytes)).convert('RGB')
+            sc = load_image(screenshot_bytes, 'RGB')
             # Crop to top 70% — avoids sticky footers and cookie banners
             sc = sc.crop((0, 0, sc.width, int(sc.height * 0.70)))
 
@@ -756,9 +694,8 @@ def _generate_hero_template(
 
             # Scale screenshot to cover the right panel (cover behaviour)
             scale = max(right_w / sc.width, OG_IMAGE_HEIGHT / sc.height)
-            sc = sc.resize(
-                (max(right_w, int(sc.width * scale)), max(OG_IMAGE_HEIGHT, int(sc.height * scale))),
-                Image.Resampling.LANCZOS
+            sc = resize_image(
+                sc, (max(right_w, int(sc.width * scale)), max(OG_IMAGE_HEIGHT, int(sc.height * scale)))
             )
 
             # Crop to exact panel size, bias toward the top of the page
@@ -771,15 +708,12 @@ def _generate_hero_template(
             sc = ImageEnhance.Contrast(sc).enhance(1.08)
             sc = ImageEnhance.Brightness(sc).enhance(1.03)
 
-            # Ease-in fade mask: smoother transition than linear
+            # Ease-in fade mask (progress^2): smoother transition than linear
             fade_w = 180
-            mask = Image.new('L', (right_w, OG_IMAGE_HEIGHT), 255)
-            mask_draw = ImageDraw.Draw(mask)
-            for x in range(fade_w):
-                # Ease-in curve: progress^2 for smoother blend
-                progress = x / fade_w
-                alpha = int(255 * (progress ** 2))
-                mask_draw.line([(x, 0), (x, OG_IMAGE_HEIGHT - 1)], fill=alpha)
+            mask = ramp_mask(
+                (right_w, OG_IMAGE_HEIGHT), 0, 255, "horizontal",
+                extent=fade_w, easing="ease_in", template="hero"
+            )
 
             img.paste(sc, (right_x, 0), mask)
             text_panel_width = right_x
@@ -789,13 +723,11 @@ def _generate_hero_template(
 
     # ── DARK OVERLAY for guaranteed text contrast ──────────────────────────
     # Apply a subtle dark gradient overlay on the text panel area
-    overlay = Image.new('RGBA', (text_panel_width, OG_IMAGE_HEIGHT), (0, 0, 0, 0))
-    overlay_draw = ImageDraw.Draw(overlay)
     # Vertical gradient: darker at bottom (where text sits) for readability
-    for y in range(OG_IMAGE_HEIGHT):
-        progress = y / OG_IMAGE_HEIGHT
-        alpha = int(15 + 35 * progress)  # 15 at top, 50 at bottom
-        overlay_draw.line([(0, y), (text_panel_width, y)], fill=(0, 0, 0, alpha))
+    overlay = gradient_layer(
+        (text_panel_width, OG_IMAGE_HEIGHT), ((0, 0, 0, 15), (0, 0, 0, 50)), "vertical",
+        dither=0, space="rgb", template="hero"
+    )
     img.paste(Image.alpha_composite(img.crop((0, 0, text_panel_width, OG_IMAGE_HEIGHT)).convert('RGBA'), overlay).convert('RGB'), (0, 0))
 
     draw = ImageDraw.Draw(img)
@@ -812,7 +744,7 @@ def _generate_hero_template(
     if primary_image_base64:
         try:
             logo_data = base64.b64decode(primary_image_base64)
-            logo_img = Image.open(BytesIO(logo_data)).convert('RGBA')
+            logo_img = load_image(logo_data, 'RGBA', target=(logo_size, logo_size), contain=True)
 
             original_width, original_height = logo_img.size
             aspect_ratio = original_width / original_height if original_height > 0 else 1
@@ -824,7 +756,7 @@ def _generate_hero_template(
                 new_height = logo_size
                 new_width = int(logo_size * aspect_ratio)
 
-            logo_img = logo_img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+            logo_img = resize_image(logo_img, (new_width, new_height))
 
             # Drop shadow behind logo (no white box)
             shadow_layer = Image.new('RGBA', img.size, (0, 0, 0, 0))
@@ -1042,7 +974,7 @@ def _smart_crop_avatar(avatar_img: Image.Image, target_size: int) -> Image.Image
     
     # If already square, just resize
     if width == height:
-        return avatar_img.resize((target_size, target_size), Image.Resampling.LANCZOS)
+        return resize_image(avatar_img, (target_size, target_size))
     
     # For non-square images, crop to square focusing on center-upper region
     # This works well for profile photos where face is typically in upper-center
@@ -1060,7 +992,7 @@ def _smart_crop_avatar(avatar_img: Image.Image, target_size: int) -> Image.Image
         cropped = avatar_img.crop((x_offset, y_offset, x_offset + crop_size, y_offset + crop_size))
     
     # Resize with high-quality resampling
-    return cropped.resize((target_size, target_size), Image.Resampling.LANCZOS)
+    return resize_image(cropped, (target_size, target_size))
 
 
 def _create_avatar_with_shadow(avatar_img: Image.Image, size: int, border_size: int = 4) -> Image.Image:
@@ -1133,15 +1065,13 @@ def _generate_profile_template(
     header_img = Image.new('RGB', (OG_IMAGE_WIDTH, header_height), primary_color)
 
     # Rich diagonal gradient
-    header_img = _draw_gradient_background(header_img, primary_color, secondary_color, "diagonal")
-
-    # Add depth with subtle overlay + noise texture
-    overlay = Image.new('RGBA', (OG_IMAGE_WIDTH, header_height), (0, 0, 0, 0))
-    overlay_draw = ImageDraw.Draw(overlay)
-    for y in range(header_height):
-        progress = y / header_height
-        alpha = int(10 + 25 * progress)  # Darken toward bottom
-        overlay_draw.line([(0, y), (OG_IMAGE_WIDTH, y)], fill=(0, 0, 0, alpha))
+    header_img = _draw_gradient_background(header_img, primary_color, secondary_color, "diagonal", template="profile")
+
+    # Add depth with subtle overlay (darken toward bottom)
+    overlay = gradient_layer(
+        (OG_IMAGE_WIDTH, header_height), ((0, 0, 0, 10), (0, 0, 0, 35)), "vertical",
+        dither=0, space="rgb", template="profile"
+    )
     header_img = Image.alpha_composite(header_img.convert('RGBA'), overlay).convert('RGB')
 
     img.paste(header_img, (0, 0))
@@ -1157,7 +1087,7 @@ def _generate_profile_template(
     if primary_image_base64:
         try:
             avatar_data = base64.b64decode(primary_image_base64)
-            avatar_img = Image.open(BytesIO(avatar_data)).convert('RGBA')
+            avatar_img = load_image(avatar_data, 'RGBA', target=(avatar_size, avatar_size))
             
             # Smart crop for better face/profile centering
             avatar_img = _smart_crop_avatar(avatar_img, avatar_size)
@@ -1514,7 +1444,7 @@ def _generate_product_template(
     if primary_image_base64:
         try:
             product_data = base64.b64decode(primary_image_base64)
-            product_img = Image.open(BytesIO(product_data)).convert('RGBA')
+            product_img = load_image(product_data, 'RGBA', target=(right_width - 40, right_height - 40), contain=True)
             
             # Scale to fit
             img_ratio = product_img.width / product_img.height
@@ -1525,7 +1455,7 @@ def _generate_product_template(
                 target_width = right_width - 40
                 target_height = int(target_width / img_ratio)
             
-            product_img = product_img.resize((target_width, target_height), Image.Resampling.LANCZOS)
+            product_img = resize_image(product_img, (target_width, target_height))
             
             # Center in right area
             img_x = right_x + (right_width - target_width) // 2
@@ -1536,16 +1466,16 @@ def _generate_product_template(
             logger.warning(f"Failed to load product image: {e}")
             # Fall back to screenshot
             try:
-                screenshot = Image.open(BytesIO(screenshot_bytes)).convert('RGB')
-                screenshot = screenshot.resize((right_width - 20, right_height - 20), Image.Resampling.LANCZOS)
+                screenshot = load_image(screenshot_bytes, 'RGB')
+                screenshot = resize_image(screenshot, (right_width - 20, right_height - 20))
                 img.paste(screenshot, (right_x + 10, 42))
             except:
                 pass
     else:
         # Use screenshot as product preview
         try:
-            screenshot = Image.open(BytesIO(screenshot_bytes)).convert('RGB')
-            screenshot = screenshot.resize((right_width - 20, right_height - 20), Image.Resampling.LANCZOS)
+            screenshot = load_image(screenshot_bytes, 'RGB')
+            screenshot = resize_image(screenshot, (right_width - 20, right_height - 20))
             img.paste(screenshot, (right_x + 10, 42))
         except:
             pass
@@ -1573,14 +1503,13 @@ def _generate_modern_card_template(
     Design: Big headline, prominent social proof, subtle branding.
     """
     # Clean white background with subtle warmth
-    img = Image.new('RGB', (OG_IMAGE_WIDTH, OG_IMAGE_HEIGHT), (252, 252, 254))
+    # Subtle top-to-bottom gradient for depth
+    img = gradient_layer(
+        (OG_IMAGE_WIDTH, OG_IMAGE_HEIGHT), ((255, 255, 250), (245, 246, 250)), "vertical",
+        dither=0, space="rgb", template="modern_card"
+    ).copy()
     draw = ImageDraw.Draw(img)
     
-    # Subtle gradient overlay for depth (top-left to bottom-right)
-    for y in range(OG_IMAGE_HEIGHT):
-        alpha = int(10 * (1 - y / OG_IMAGE_HEIGHT))  # Very subtle
-        draw.line([(0, y), (OG_IMAGE_WIDTH, y)], fill=(245 + alpha, 246 + alpha, 250))
-    
     # Card dimensions - slightly inset for shadow room
     card_margin = 32
     card_width = OG_IMAGE_WIDTH - (card_margin * 2)
@@ -1626,7 +1555,7 @@ def _generate_modern_card_template(
     if primary_image_base64:
         try:
             logo_data = base64.b64decode(primary_image_base64)
-            logo_img = Image.open(BytesIO(logo_data)).convert('RGBA')
+            logo_img = load_image(logo_data, 'RGBA', target=(logo_size, logo_size), contain=True)
             
             # Preserve aspect ratio for logos
             original_width, original_height = logo_img.size
@@ -1641,7 +1570,7 @@ def _generate_modern_card_template(
                 new_width = int(logo_size * aspect_ratio)
             
             # Resize with high quality
-            logo_img = logo_img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+            logo_img = resize_image(logo_img, (new_width, new_height))
             mask = _create_rounded_rectangle_mask((new_width, new_height), 10)
             img.paste(logo_img, (content_x, row_y), mask)
         except Exception as e:
@@ -1821,7 +1750,7 @@ def _prepare_screenshot_background(
         new_width = target_width
         new_height = int(src_height * (target_width / src_width))
     
-    resized = screenshot.resize((new_width, new_height), Image.Resampling.LANCZOS)
+    resized = resize_image(screenshot, (new_width, new_height))
     
     # Center crop to target size
     left = (new_width - target_width) // 2
@@ -1855,7 +1784,7 @@ def _generate_fallback_preview(
         # Create clean gradient background (no patterns)
         # FIXED: Use colors directly without excessive darkening
         img = Image.new('RGB', (OG_IMAGE_WIDTH, OG_IMAGE_HEIGHT), primary_color)
-        img = _draw_gradient_background(img, primary_color, secondary_color, "diagonal")
+        img = _draw_gradient_background(img, primary_color, secondary_color, "diagonal", template="fallback")
         draw = ImageDraw.Draw(img)
         
         # Center content vertically
@@ -2236,9 +2165,9 @@ def generate_and_upload_preview_image(
         #     logger.warning(f"AI quality improvement failed (non-critical): {e}")
         #     # Continue with original image if AI fix fails
         
-        # Upload to R2
+        # Upload to R2 (WebP/JPEG variants follow write-behind)
         filename = f"previews/demo/{uuid4()}.png"
-        image_url = upload_file_to_r2(image_bytes, filename, "image/png")
+        image_url = upload_preview_image(image_bytes, filename)
         
         logger.info(
             f"Designed preview uploaded: {image_url} path={path_used or 'classic'} "
@@ -8,6 +8,8 @@ This module implements the iteration controller that:
 4. Repeats until quality threshold is met (max 2 iterations)
 
 This creates a self-improving preview generation system.
+
+Each iteration records how long the regenerate callback took to re-render.
 """
 
 import logging
@@ -20,6 +22,8 @@ from backend.services.quality_critic import (
     QualityCritic, CritiqueResult, QualityVerdict,
     ImprovementPriority, get_quality_critic
 )
+from backend.services.cancellation import raise_if_cancelled
+from backend.services.preview.observability.tracing import start_span
 
 logger = logging.getLogger(__name__)
 
@@ -43,6 +47,7 @@ class IterationResult:
     quality_after: float
     status: IterationStatus
     latency_ms: float
+    render_ms: float = 0.0
     
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -52,7 +57,8 @@ class IterationResult:
             "quality_before": self.quality_before,
             "quality_after": self.quality_after,
             "status": self.status.value,
-            "latency_ms": self.latency_ms
+            "latency_ms": self.latency_ms,
+            "render_ms": self.render_ms
         }
 
 
@@ -388,6 +394,7 @@ class PreviewIterator:
         initial_quality = 0.0
         
         for i in range(self.max_iterations + 1):  # +1 for initial critique
+            raise_if_cancelled("preview iteration")
             iter_start = time.time()
             
             # Critique current preview
@@ -443,11 +450,16 @@ class PreviewIterator:
             current_data = improved_data
             
             # Regenerate image if callback provided and significant changes
+            render_ms = 0.0
             if regenerate_callback and applied:
-                try:
-                    current_data, current_image = regenerate_callback(current_data)
-                except Exception as e:
-                    logger.warning(f"Regeneration failed: {e}")
+                with start_span("preview.iteration.render", attributes={"iteration": i}) as span:
+                    render_start = time.perf_counter()
+                    try:
+                        current_data, current_image = regenerate_callback(current_data)
+                    except Exception as e:
+                        logger.warning(f"Regeneration failed: {e}")
+                    render_ms = (time.perf_counter() - render_start) * 1000
+                    span.set_attribute("render.ms", round(render_ms, 1))
             
             # Re-critique to measure improvement
             post_critique = self.critic.critique(
@@ -468,7 +480,8 @@ class PreviewIterator:
                 quality_before=quality_before,
                 quality_after=quality_after,
                 status=status,
-                latency_ms=(time.time() - iter_start) * 1000
+                latency_ms=(time.time() - iter_start) * 1000,
+                render_ms=render_ms
             )
             iteration_results.append(result)
             
@@ -40,6 +40,9 @@ from PIL import Image
 from openai import OpenAI
 from backend.core.config import settings
 from backend.services.graceful_degradation import OpenAICircuitBreaker
+from backend.services.cancellation import bounded_timeout
+from backend.services.image_loading import load_image, resize_image
+from backend.services.preview.observability.metrics import record_ai_usage
 
 # Initialize logger FIRST (before any code that uses it)
 logger = logging.getLogger(__name__)
@@ -273,14 +276,14 @@ _STAGE_4_5_6_FALLBACK = "You are a layout designer. Output valid JSON with layou
 
 def prepare_image(screenshot_bytes: bytes) -> Tuple[str, Image.Image]:
     """Prepare image for AI analysis."""
-    image = Image.open(BytesIO(screenshot_bytes))
+    image = load_image(screenshot_bytes)
     
     # Resize if needed
     max_dim = 2048
     if image.width > max_dim or image.height > max_dim:
         ratio = min(max_dim / image.width, max_dim / image.height)
         new_size = (int(image.width * ratio), int(image.height * ratio))
-        image = image.resize(new_size, Image.Resampling.LANCZOS)
+        image = resize_image(image, new_size)
     
     # Convert to RGB
     if image.mode in ('RGBA', 'P', 'LA'):
@@ -442,7 +445,7 @@ def crop_region(image: Image.Image, bbox: Dict[str, float], is_profile_image: bo
     if is_profile_image and cropped.width > 0:
         # Use larger target size for better quality
         target_size = 400  # Increased from 256 for better quality
-        cropped = cropped.resize((target_size, target_size), Image.Resampling.LANCZOS)
+        cropped = resize_image(cropped, (target_size, target_size))
     
     buffer = BytesIO()
     # Use high quality for profile images
@@ -472,7 +475,7 @@ def run_stages_1_2_3(screenshot_bytes: bytes) -> Tuple[List[Dict], Dict[str, str
         logger.warning("Circuit breaker OPEN - skipping Stage 1-2-3 OpenAI call, using fallback")
         raise Exception("OpenAI circuit breaker is open - too many recent errors")
 
-    client = OpenAI(api_key=settings.OPENAI_API_KEY, timeout=60)
+    client = OpenAI(api_key=settings.OPENAI_API_KEY, timeout=bounded_timeout(60))
 
     stage1_prompt = (
         get_layout_stage1_prompt() if PROMPT_LOADER_AVAILABLE else _STAGE_1_2_3_FALLBACK
@@ -508,6 +511,7 @@ def run_stages_1_2_3(screenshot_bytes: bytes) -> Tuple[List[Dict], Dict[str, str
             temperature=0.0,
             seed=42
         )
+        record_ai_usage(MODEL_LAYOUT_REASONING, getattr(resp, "usage", None))
         return resp.choices[0].message.content.strip()
 
     try:
@@ -785,7 +789,7 @@ def run_stages_4_5_6(regions: List[Dict], page_type: str, palette: Dict[str, str
         logger.warning("Circuit breaker OPEN - skipping Stage 4-5-6 OpenAI call, using fallback")
         return _fallback_layout_result(page_type)
 
-    client = OpenAI(api_key=settings.OPENAI_API_KEY, timeout=45)
+    client = OpenAI(api_key=settings.OPENAI_API_KEY, timeout=bounded_timeout(45))
 
     stage4_prompt = ""
     if PROMPT_LOADER_AVAILABLE:
@@ -831,6 +835,7 @@ def run_stages_4_5_6(regions: List[Dict], page_type: str, palette: Dict[str, str
             temperature=0.0
         )
         circuit_breaker.record_success()
+        record_ai_usage(MODEL_LAYOUT_REASONING, getattr(response, "usage", None))
 
         content = response.choices[0].message.content.strip()
         result = _parse_stage4_content(content)
@@ -845,6 +850,7 @@ def run_stages_4_5_6(regions: List[Dict], page_type: str, palette: Dict[str, str
                 max_tokens=2000,
                 temperature=0.0
             )
+            record_ai_usage(MODEL_LAYOUT_REASONING, getattr(retry_resp, "usage", None))
             result = _parse_stage4_content(retry_resp.choices[0].message.content.strip())
         if result is None:
             result = _fallback_layout_result(page_type)
@@ -1544,7 +1550,7 @@ def generate_reasoned_preview(screenshot_bytes: bytes, url: str = "") -> Reasone
         logger.warning("Circuit breaker OPEN - using fallback")
         raise Exception("OpenAI circuit breaker is open")
 
-    client = OpenAI(api_key=settings.OPENAI_API_KEY, timeout=60)
+    client = OpenAI(api_key=settings.OPENAI_API_KEY, timeout=bounded_timeout(60))
 
     try:
         response = client.chat.completions.create(
@@ -1573,6 +1579,7 @@ def generate_reasoned_preview(screenshot_bytes: bytes, url: str = "") -> Reasone
             seed=42,
         )
         circuit_breaker.record_success()
+        record_ai_usage("gpt-4o", getattr(response, "usage", None))
     except Exception as e:
         circuit_breaker.record_error()
         raise
@@ -2,6 +2,9 @@
 Preview Timeout Handler - Enforces Timeout Limits for Preview Generation
 
 Ensures preview generation doesn't run indefinitely and provides timeout handling.
+
+SIGALRM only fires on the main thread. Pipeline code running on worker
+threads should use ``backend.services.cancellation`` deadlines instead.
 """
 
 import signal
@@ -1,33 +1,67 @@
+import base64
 import json
+import os
+import queue
+import random
+import threading
 import time
 import logging
 from typing import Dict, Any, List, Optional
 from uuid import uuid4
 from datetime import datetime
 
-from backend.services.r2_client import upload_file_to_r2
+from backend.services.r2_client import public_url_for, upload_file_to_r2
 
 logger = logging.getLogger(__name__)
 
+# Report sampling: a report is published when the job is sampled at this
+# rate, or failed (when enabled), or took longer than the slow threshold.
+TRACE_REPORT_SAMPLE_RATE = float(os.getenv("PREVIEW_TRACE_REPORT_SAMPLE_RATE", "0.1"))
+TRACE_REPORT_ON_FAILURE = os.getenv("PREVIEW_TRACE_REPORT_ON_FAILURE", "true").lower() in ("1", "true", "yes")
+TRACE_REPORT_SLOW_MS = int(os.getenv("PREVIEW_TRACE_REPORT_SLOW_MS", "20000"))
+# Reports waiting for upload; further reports are dropped, never blocked on
+TRACE_REPORT_QUEUE_SIZE = int(os.getenv("PREVIEW_TRACE_REPORT_QUEUE_SIZE", "32"))
+
+# In-memory buffer bounds per trace
+MAX_TRACE_STEPS = 64
+MAX_STEP_IMAGE_BYTES = 2 * 1024 * 1024
+MAX_STEP_JSON_CHARS = 64 * 1024
+
+
 class PreviewTracer:
     """
     Captures flow decisions, midpoint generations, AI logs, and quality checks
     during a preview generation pipeline, rendering them into a visual HTML
     report for easy debugging.
+
+    Steps are buffered (bounded) while the job runs; ``finish()`` decides
+    whether the report is worth publishing and hands it to the write-behind
+    publisher, so rendering and the R2 upload stay off the job's latency.
     """
     
-    def __init__(self, url: str):
+    def __init__(self, url: str, sample_rate: float = TRACE_REPORT_SAMPLE_RATE):
         self.trace_id = str(uuid4())
         self.url = url
         self.start_time = time.time()
+        self.sampled = random.random() < sample_rate
         self.steps: List[Dict[str, Any]] = []
+        self.dropped_steps = 0
+        self._finished_ms: Optional[int] = None
         self.logger = logging.getLogger(f"PreviewTracer[{self.trace_id[:8]}]")
-        self.logger.info(f"Started trace for {url}")
+        self.logger.debug(f"Started trace for {url}")
         
     def add_step(self, name: str, details: Any = None, image_url: Optional[str] = None, 
                  image_base64: Optional[str] = None, json_data: Optional[Dict[str, Any]] = None,
-                 error: Optional[str] = None):
-        """Append a pipeline step to the trace."""
+                 error: Optional[str] = None, image_bytes: Optional[bytes] = None):
+        """Append a pipeline step to the trace.
+
+        Prefer ``image_bytes`` over ``image_base64``: raw bytes are only
+        encoded if the report is actually rendered.
+        """
+        image_size = len(image_bytes) if image_bytes else len(image_base64 or "") * 3 // 4
+        if image_size > MAX_STEP_IMAGE_BYTES:
+            details = f"{details or ''} (image omitted: {image_size} bytes)".strip()
+            image_bytes = image_base64 = None
         step = {
             "name": name,
             "timestamp": datetime.now().isoformat(),
@@ -35,9 +69,14 @@ class PreviewTracer:
             "details": details,
             "image_url": image_url,
             "image_base64": image_base64,
+            "image_bytes": image_bytes,
             "json_data": json_data,
             "error": error
         }
+        if len(self.steps) >= MAX_TRACE_STEPS:
+            # Keep the first step (job context) and the most recent ones
+            del self.steps[1]
+            self.dropped_steps += 1
         self.steps.append(step)
         
         # Also log it standardly
@@ -63,6 +102,8 @@ class PreviewTracer:
             if step["json_data"]:
                 try:
                     formatted_json = json.dumps(step["json_data"], indent=2, default=str)
+                    if len(formatted_json) > MAX_STEP_JSON_CHARS:
+                        formatted_json = formatted_json[:MAX_STEP_JSON_CHARS] + "\n... (truncated)"
                     json_html = f"<pre class='json-data'><code>{formatted_json}</code></pre>"
                 except Exception as e:
                     json_html = f"<div class='error'>Could not format JSON: {e}</div>"
@@ -71,6 +112,9 @@ class PreviewTracer:
             image_html = ""
             if step["image_url"]:
                 image_html = f"<div class='image-container'><img src='{step['image_url']}' alt='Step image' loading='lazy'/></div>"
+            elif step.get("image_bytes"):
+                encoded = base64.b64encode(step["image_bytes"]).decode("ascii")
+                image_html = f"<div class='image-container'><img src='data:image/png;base64,{encoded}' alt='Step image' loading='lazy'/></div>"
             elif step["image_base64"]:
                 # Default to PNG if missing prefix
                 prefix = "" if step["image_base64"].startswith("data:image") else "data:image/png;base64,"
@@ -243,7 +287,8 @@ class PreviewTracer:
                     <div class="meta-info">
                         <span><strong>URL:</strong> <a href="{self.url}" target="_blank" style="color:var(--accent-color)">{self.url}</a></span>
                         <span><strong>ID:</strong> {self.trace_id}</span>
-                        <span><strong>Total Time:</strong> {int((time.time() - self.start_time) * 1000)}ms</span>
+                        <span><strong>Total Time:</strong> {self.elapsed_ms()}ms</span>
+                        {f"<span><strong>Dropped steps:</strong> {self.dropped_steps}</span>" if self.dropped_steps else ""}
                     </div>
                 </div>
                 
@@ -254,14 +299,51 @@ class PreviewTracer:
         """
         return html
 
+    def elapsed_ms(self) -> int:
+        if self._finished_ms is not None:
+            return self._finished_ms
+        return int((time.time() - self.start_time) * 1000)
+
+    def report_filename(self) -> str:
+        return f"traces/{datetime.fromtimestamp(self.start_time).strftime('%Y-%m-%d')}/{self.trace_id}.html"
+
+    def publish_reason(self, failed: bool = False) -> Optional[str]:
+        """Why this trace's report should be published, or ``None`` to skip."""
+        if failed and TRACE_REPORT_ON_FAILURE:
+            return "failure"
+        if TRACE_REPORT_SLOW_MS > 0 and self.elapsed_ms() >= TRACE_REPORT_SLOW_MS:
+            return "slow"
+        if self.sampled:
+            return "sampled"
+        return None
+
+    def finish(self, failed: bool = False) -> Optional[str]:
+        """
+        Close the trace and queue its report for background upload.
+
+        Returns the report's public URL (it appears once the publisher gets
+        to it), or ``None`` when the trace was not selected or the queue is
+        full.
+        """
+        self._finished_ms = int((time.time() - self.start_time) * 1000)
+        reason = self.publish_reason(failed)
+        if reason is None:
+            self.steps.clear()
+            return None
+        filename = self.report_filename()
+        if not get_trace_publisher().submit(self, filename):
+            return None
+        self.logger.debug(f"Trace report queued ({reason}): {filename}")
+        return public_url_for(filename)
+
     def upload_trace(self) -> Optional[str]:
-        """Generate the HTML report and upload it to R2."""
+        """Generate the HTML report and upload it to R2 (blocking)."""
         try:
             self.logger.info("Generating and uploading trace report...")
             html_content = self._generate_html()
             
             # Save to R2
-            filename = f"traces/{datetime.now().strftime('%Y-%m-%d')}/{self.trace_id}.html"
+            filename = self.report_filename()
             
             public_url = upload_file_to_r2(
                 html_content.encode('utf-8'),
@@ -275,3 +357,82 @@ class PreviewTracer:
         except Exception as e:
             self.logger.error(f"Failed to upload trace report: {e}")
             return None
+
+
+class TraceReportPublisher:
+    """
+    Write-behind queue that renders and uploads trace reports on a daemon
+    thread. ``submit`` never blocks: when the queue is full the report is
+    dropped and counted.
+    """
+
+    def __init__(self, max_pending: int = TRACE_REPORT_QUEUE_SIZE):
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, max_pending))
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {"queued": 0, "published": 0, "dropped": 0, "failed": 0}
+
+    def submit(self, tracer: PreviewTracer, filename: str) -> bool:
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait((tracer, filename))
+        except queue.Full:
+            self.stats["dropped"] += 1
+            logger.warning("Trace report queue full, dropping report %s", tracer.trace_id)
+            return False
+        self.stats["queued"] += 1
+        return True
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Wait until queued reports are published; ``False`` on timeout."""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def _ensure_thread(self) -> None:
+        # Forked RQ work-horses inherit the object but not the thread
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="trace-report-publisher", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            tracer, filename = self._queue.get()
+            try:
+                html_content = tracer._generate_html()
+                upload_file_to_r2(html_content.encode("utf-8"), filename, "text/html; charset=utf-8")
+                self.stats["published"] += 1
+            except Exception as e:  # noqa: BLE001 — reports are best effort
+                self.stats["failed"] += 1
+                logger.warning(f"Failed to publish trace report {filename}: {e}")
+            finally:
+                tracer.steps.clear()
+                self._queue.task_done()
+
+
+_publisher: Optional[TraceReportPublisher] = None
+_publisher_lock = threading.Lock()
+
+
+def get_trace_publisher() -> TraceReportPublisher:
+    global _publisher
+    if _publisher is None:
+        with _publisher_lock:
+            if _publisher is None:
+                _publisher = TraceReportPublisher()
+    return _publisher
+
+
+def flush_trace_reports(timeout: float = 10.0) -> bool:
+    """Drain pending reports (call before a short-lived process exits)."""
+    if _publisher is None:
+        return True
+    return _publisher.flush(timeout)
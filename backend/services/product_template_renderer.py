@@ -21,6 +21,11 @@ from io import BytesIO
 from typing import Dict, Any, List, Optional, Tuple
 from PIL import Image, ImageDraw, ImageFont, ImageFilter, ImageEnhance
 
+from backend.services.font_registry import SANS_FALLBACKS, load_font
+from backend.services.image_loading import load_image, resize_image
+from backend.services.render_layers import gradient_layer
+from backend.services.text_layout import break_lines
+
 # Import product systems
 try:
     from backend.services.product_intelligence import ProductCategory
@@ -46,40 +51,13 @@ OG_IMAGE_HEIGHT = 630
 # =============================================================================
 
 def _load_font(size: int, bold: bool = False) -> ImageFont.FreeTypeFont:
-    """Load font with fallback."""
-    try:
-        if bold:
-            return ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", size)
-        return ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", size)
-    except:
-        return ImageFont.load_default()
+    """Load font with fallback (cached instances, see font_registry)."""
+    return load_font(SANS_FALLBACKS, size, weight=700 if bold else 400)
 
 
 def _wrap_text(text: str, font: ImageFont.FreeTypeFont, max_width: int, draw: ImageDraw.Draw) -> List[str]:
-    """Wrap text to fit within max width."""
-    words = text.split()
-    lines = []
-    current_line = []
-    
-    for word in words:
-        test_line = ' '.join(current_line + [word])
-        try:
-            bbox = draw.textbbox((0, 0), test_line, font=font)
-            width = bbox[2] - bbox[0]
-        except:
-            width = len(test_line) * (font.size * 0.6)
-        
-        if width <= max_width:
-            current_line.append(word)
-        else:
-            if current_line:
-                lines.append(' '.join(current_line))
-            current_line = [word]
-    
-    if current_line:
-        lines.append(' '.join(current_line))
-    
-    return lines
+    """Wrap text to fit within max width (cached glyph metrics, see text_layout)."""
+    return break_lines(text, font, max_width)
 
 
 def _lighten_color(color: Tuple[int, int, int], factor: float = 0.3) -> Tuple[int, int, int]:
@@ -341,7 +319,7 @@ def _render_electronics_layout(
             target_width = right_width - 40
             target_height = int(target_width / img_ratio)
         
-        product_image = product_image.resize((target_width, target_height), Image.Resampling.LANCZOS)
+        product_image = resize_image(product_image, (target_width, target_height))
         
         img_x = right_x + (right_width - target_width) // 2
         img_y = y_offset + 50 + (right_height - target_height) // 2
@@ -375,7 +353,7 @@ def _render_fashion_layout(
             target_height = OG_IMAGE_HEIGHT
             target_width = int(target_height * aspect)
         
-        product_image = product_image.resize((target_width, target_height), Image.Resampling.LANCZOS)
+        product_image = resize_image(product_image, (target_width, target_height))
         
         # Center and crop
         x_offset = (target_width - OG_IMAGE_WIDTH) // 2
@@ -494,7 +472,7 @@ def _render_food_layout(
             target_height = int(OG_IMAGE_HEIGHT * 0.7)
             target_width = int(target_height * aspect)
         
-        product_image = product_image.resize((target_width, target_height), Image.Resampling.LANCZOS)
+        product_image = resize_image(product_image, (target_width, target_height))
         
         # Center
         img_x = (OG_IMAGE_WIDTH - target_width) // 2
@@ -568,13 +546,11 @@ def _render_beauty_layout(
     y_offset: int = 0
 ):
     """Render beauty layout: Elegant card with soft imagery."""
-    # Elegant gradient background
-    for y in range(OG_IMAGE_HEIGHT):
-        progress = y / OG_IMAGE_HEIGHT
-        r = int(255 - (255 - 248) * progress)
-        g = int(255 - (255 - 250) * progress)
-        b = int(255 - (255 - 255) * progress)
-        draw.line([(0, y), (OG_IMAGE_WIDTH, y)], fill=(r, g, b))
+    # Elegant gradient background (white to soft lavender)
+    img.paste(gradient_layer(
+        (OG_IMAGE_WIDTH, OG_IMAGE_HEIGHT), ((255, 255, 255), (248, 250, 255)), "vertical",
+        dither=0, space="rgb", template="product_beauty"
+    ))
     
     # Card dimensions
     card_width = int(OG_IMAGE_WIDTH * 0.85)
@@ -611,7 +587,7 @@ def _render_beauty_layout(
             img_width = card_width - (padding * 2)
             img_height = int(img_width / aspect)
         
-        product_image = product_image.resize((img_width, img_height), Image.Resampling.LANCZOS)
+        product_image = resize_image(product_image, (img_width, img_height))
         
         img_x = card_x + (card_width - img_width) // 2
         img.paste(product_image, (img_x, content_y), product_image if product_image.mode == 'RGBA' else None)
@@ -747,7 +723,8 @@ def render_enhanced_product_preview(
     if primary_image_base64:
         try:
             product_data = base64.b64decode(primary_image_base64)
-            product_image = Image.open(BytesIO(product_data)).convert('RGBA')
+            # Layouts scale it to at most the full canvas (fashion layout covers it)
+            product_image = load_image(product_data, 'RGBA', target=(OG_IMAGE_WIDTH, OG_IMAGE_HEIGHT))
         except Exception as e:
             logger.warning(f"Failed to load product image: {e}")
     
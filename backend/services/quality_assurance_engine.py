@@ -20,6 +20,8 @@ from dataclasses import dataclass
 from PIL import Image, ImageDraw, ImageFilter, ImageEnhance, ImageStat
 import colorsys
 
+from backend.services import image_effects
+
 logger = logging.getLogger(__name__)
 
 
@@ -418,32 +420,10 @@ class QualityAssuranceEngine:
     # =========================================================================
     
     def _apply_vignette(self, image: Image.Image, intensity: float = 0.03) -> Image.Image:
-        """Apply subtle vignette effect."""
-        width, height = image.size
-        
-        # Create radial gradient mask
-        mask = Image.new('L', (width, height), 255)
-        mask_draw = ImageDraw.Draw(mask)
-        
-        cx, cy = width // 2, height // 2
-        max_dist = math.sqrt(cx**2 + cy**2)
-        
-        # Only darken edges slightly
-        for y in range(height):
-            for x in range(width):
-                dist = math.sqrt((x - cx)**2 + (y - cy)**2)
-                t = dist / max_dist
-                
-                # Very gentle vignette
-                brightness = int(255 * (1 - t * t * intensity))
-                mask_draw.point((x, y), fill=brightness)
-        
-        # Apply mask
+        """Apply subtle vignette effect (gentle quadratic falloff, cached mask)."""
         if image.mode != 'RGBA':
             image = image.convert('RGBA')
-        
-        darkened = Image.new('RGBA', (width, height), (0, 0, 0, 0))
-        return Image.composite(image, darkened, mask)
+        return image_effects.apply_vignette(image, intensity=intensity, fill=(0, 0, 0, 0))
     
     def _apply_sharpening(self, image: Image.Image, amount: float = 0.3) -> Image.Image:
         """Apply subtle sharpening for crisp text."""
@@ -24,6 +24,7 @@ from openai import OpenAI
 from PIL import Image
 
 from backend.core.config import settings
+from backend.services.cancellation import bounded_timeout
 
 logger = logging.getLogger(__name__)
 
@@ -173,7 +174,8 @@ class QualityCritic:
                 model=model,
                 messages=messages,
                 max_tokens=2000,
-                temperature=0.2
+                temperature=0.2,
+                timeout=bounded_timeout(45),
             )
             
             # Parse response
@@ -2,6 +2,7 @@
 import boto3
 from botocore.exceptions import ClientError
 from backend.core.config import settings
+from backend.services.preview.observability.tracing import start_span
 from backend.services.retry_utils import sync_retry
 
 
@@ -14,13 +15,32 @@ def get_r2_client():
     """
     return boto3.client(
         "s3",
-        endpoint_url=f"https://{settings.R2_ACCOUNT_ID}.r2.cloudflarestorage.com",
+        endpoint_url=settings.R2_ENDPOINT_URL or f"https://{settings.R2_ACCOUNT_ID}.r2.cloudflarestorage.com",
         aws_access_key_id=settings.R2_ACCESS_KEY_ID,
         aws_secret_access_key=settings.R2_SECRET_ACCESS_KEY,
         region_name="auto",  # R2 uses "auto" region
     )
 
 
+def public_url_for(filename: str) -> str:
+    """
+    Public URL an object uploaded under ``filename`` is served from.
+    
+    Lets callers hand out a URL before a write-behind upload has finished.
+    """
+    # R2 public URLs can be:
+    # 1. Custom domain (if R2_PUBLIC_BASE_URL is set to a custom domain)
+    # 2. Public dev URL (if R2_PUBLIC_BASE_URL is set to pub-*.r2.dev)
+    # 3. Fallback to bucket.account.r2.cloudflarestorage.com (not recommended, requires public access)
+    if settings.R2_PUBLIC_BASE_URL:
+        # Remove trailing slash and ensure proper URL construction
+        base_url = settings.R2_PUBLIC_BASE_URL.rstrip('/')
+        return f"{base_url}/{filename}"
+    # Fallback to R2 default URL pattern: bucket.account.r2.cloudflarestorage.com
+    # Note: This requires public access to be enabled on the bucket
+    return f"https://{settings.R2_BUCKET_NAME}.{settings.R2_ACCOUNT_ID}.r2.cloudflarestorage.com/{filename}"
+
+
 @sync_retry(max_attempts=3, base_delay=1.0, retry_on=(ClientError,))
 def upload_file_to_r2(file_bytes: bytes, filename: str, content_type: str) -> str:
     """
@@ -38,29 +58,19 @@ def upload_file_to_r2(file_bytes: bytes, filename: str, content_type: str) -> st
         ClientError: If upload fails
     """
     client = get_r2_client()
+    span_attributes = {"r2.key": filename, "r2.bytes": len(file_bytes), "r2.content_type": content_type}
     
     try:
-        client.put_object(
-            Bucket=settings.R2_BUCKET_NAME,
-            Key=filename,
-            Body=file_bytes,
-            ContentType=content_type,
-            CacheControl="public, max-age=31536000",  # 1 year cache
-        )
+        with start_span("r2.upload", kind="client", attributes=span_attributes):
+            client.put_object(
+                Bucket=settings.R2_BUCKET_NAME,
+                Key=filename,
+                Body=file_bytes,
+                ContentType=content_type,
+                CacheControl="public, max-age=31536000",  # 1 year cache
+            )
         
-        # Construct public URL
-        # R2 public URLs can be:
-        # 1. Custom domain (if R2_PUBLIC_BASE_URL is set to a custom domain)
-        # 2. Public dev URL (if R2_PUBLIC_BASE_URL is set to pub-*.r2.dev)
-        # 3. Fallback to bucket.account.r2.cloudflarestorage.com (not recommended, requires public access)
-        if settings.R2_PUBLIC_BASE_URL:
-            # Remove trailing slash and ensure proper URL construction
-            base_url = settings.R2_PUBLIC_BASE_URL.rstrip('/')
-            public_url = f"{base_url}/{filename}"
-        else:
-            # Fallback to R2 default URL pattern: bucket.account.r2.cloudflarestorage.com
-            # Note: This requires public access to be enabled on the bucket
-            public_url = f"https://{settings.R2_BUCKET_NAME}.{settings.R2_ACCOUNT_ID}.r2.cloudflarestorage.com/{filename}"
+        public_url = public_url_for(filename)
         
         # Log the generated URL for debugging
         import logging
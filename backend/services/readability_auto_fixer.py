@@ -27,6 +27,7 @@ from .color_psychology import (
 from .visual_quality_validator import (
     VisualQualityScore, CONTRAST_AA_LARGE, CONTRAST_AA_NORMAL
 )
+from .render_layers import cached_layer
 
 logger = logging.getLogger(__name__)
 
@@ -466,33 +467,8 @@ class ReadabilityAutoFixer:
         """
         initial_contrast = self._estimate_current_contrast(image)
         
-        width, height = image.size
         working_image = image.copy().convert('RGBA')
-        
-        # Create gradient overlay
-        overlay = Image.new('RGBA', (width, height), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(overlay)
-        
-        # Determine overlay color
-        bg_luminance = get_luminance(background_color)
-        base_color = (0, 0, 0) if bg_luminance > 0.3 else (255, 255, 255)
-        
-        # Apply gradient to text zones
-        for zone_name, zone in TEXT_ZONES.items():
-            y_start = int(zone["y_start"] * height)
-            y_end = int(zone["y_end"] * height)
-            zone_height = y_end - y_start
-            
-            # Create gradient within zone
-            for y in range(y_start, y_end):
-                # Calculate position within zone (0 to 1)
-                t = (y - y_start) / zone_height
-                
-                # Bell curve opacity (stronger in middle)
-                opacity = math.sin(t * math.pi) * zone["weight"] * 0.4
-                opacity = int(opacity * 255)
-                
-                draw.line([(0, y), (width, y)], fill=(*base_color, opacity))
+        base_color, overlay = self._text_zone_overlay(image.size, background_color)
         
         # Composite overlay onto image
         working_image = Image.alpha_composite(working_image, overlay)
@@ -508,6 +484,34 @@ class ReadabilityAutoFixer:
             details=f"Injected {base_color} gradient overlay"
         )
     
+    def _text_zone_overlay(
+        self,
+        size: Tuple[int, int],
+        background_color: Tuple[int, int, int]
+    ) -> Tuple[Tuple[int, int, int], Image.Image]:
+        """Bell-curve gradient over the text zones (cached per size and color)."""
+        bg_luminance = get_luminance(background_color)
+        base_color = (0, 0, 0) if bg_luminance > 0.3 else (255, 255, 255)
+        
+        def build() -> Image.Image:
+            width, height = size
+            overlay = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+            draw = ImageDraw.Draw(overlay)
+            for zone in TEXT_ZONES.values():
+                y_start = int(zone["y_start"] * height)
+                y_end = int(zone["y_end"] * height)
+                zone_height = y_end - y_start
+                
+                for y in range(y_start, y_end):
+                    # Bell curve opacity (stronger in middle of the zone)
+                    t = (y - y_start) / zone_height
+                    opacity = int(math.sin(t * math.pi) * zone["weight"] * 0.4 * 255)
+                    draw.line([(0, y), (width, y)], fill=(*base_color, opacity))
+            return overlay
+        
+        overlay = cached_layer(("text_zone_overlay", tuple(size), base_color), build, template="readability")
+        return base_color, overlay
+    
     def _boost_overall_contrast(
         self,
         image: Image.Image
@@ -0,0 +1,364 @@
+"""
+Render Layers - cached gradients, overlays and ramp masks for template rendering.
+
+Template renderers used to redraw the same backgrounds on every preview:
+``generate_smooth_gradient`` converted a 4x supersampled canvas to LAB and
+back (seconds per 1200x630 image), and the hero/profile/product templates
+drew their dark overlays, fade masks and soft backgrounds one ``draw.line``
+per row. The layers only depend on (size, stops, direction, dithering), so
+this module builds each one once with vectorized LAB interpolation and keeps
+it in a byte-bounded LRU cache.
+
+Cached layers are shared between renders: paste or composite them, never
+draw on them (``generate_smooth_gradient`` returns a copy for that reason).
+
+Each lookup is attributed to a template; ``layer_cache_stats()`` and the
+``preview_render_layer_cache_*`` metrics report hit rate and the build time
+that hits saved per template.
+
+Usage:
+    background = gradient_layer((1200, 630), ((37, 99, 235), (30, 64, 175)), "diagonal",
+                                template="hero")
+    overlay = gradient_layer((w, h), ((0, 0, 0, 15), (0, 0, 0, 50)), "vertical",
+                             dither=False, space="rgb", template="hero")
+    fade = ramp_mask((w, h), 0, 255, "horizontal", extent=180, easing="ease_in")
+"""
+
+import logging
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Sequence, Tuple, Union
+
+import numpy as np
+from PIL import Image
+
+from backend.services.preview.observability.metrics import (
+    RENDER_LAYER_CACHE_REQUESTS,
+    RENDER_LAYER_SAVED_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+LAYER_CACHE_MB = float(os.getenv("PREVIEW_LAYER_CACHE_MB", "64"))
+# Colors are interpolated into a lookup table of this many steps (< 0.1 levels apart)
+LUT_SIZE = 4096
+
+Size = Tuple[int, int]
+Color = Tuple[int, ...]
+Stops = Tuple[Tuple[float, Color], ...]
+Direction = Union[str, int, float]
+
+DIRECTION_ANGLES = {"horizontal": 0, "vertical": 90, "diagonal": 135}
+
+_BAYER_8 = np.array([
+    [0, 32, 8, 40, 2, 34, 10, 42],
+    [48, 16, 56, 24, 50, 18, 58, 26],
+    [12, 44, 4, 36, 14, 46, 6, 38],
+    [60, 28, 52, 20, 62, 30, 54, 22],
+    [3, 35, 11, 43, 1, 33, 9, 41],
+    [51, 19, 59, 27, 49, 17, 57, 25],
+    [15, 47, 7, 39, 13, 45, 5, 37],
+    [63, 31, 55, 23, 61, 29, 53, 21],
+], dtype=np.float32) / 64.0
+
+
+# =============================================================================
+# LAYER CACHE
+# =============================================================================
+
+class LayerCache:
+    """Thread-safe LRU of rendered layers, bounded by pixel bytes.
+
+    Per-template counters record hits, misses, the time spent building and
+    the build time that hits avoided (the stored build cost of each entry).
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int, float]]" = OrderedDict()
+        self._bytes = 0
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, build: Callable[[], Any], template: str = "default") -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._count(template, hit=True, seconds=entry[2])
+                return entry[0]
+
+        started = time.perf_counter()
+        value = build()
+        elapsed = time.perf_counter() - started
+        size = _nbytes(value)
+
+        with self._lock:
+            self._count(template, hit=False, seconds=elapsed)
+            if size > self.max_bytes:
+                return value
+            if key not in self._entries:
+                self._entries[key] = (value, size, elapsed)
+                self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+        return value
+
+    def _count(self, template: str, hit: bool, seconds: float) -> None:
+        stats = self._stats.setdefault(
+            template, {"hits": 0, "misses": 0, "build_seconds": 0.0, "saved_seconds": 0.0})
+        if hit:
+            stats["hits"] += 1
+            stats["saved_seconds"] += seconds
+            RENDER_LAYER_SAVED_SECONDS.inc(seconds, template=template)
+        else:
+            stats["misses"] += 1
+            stats["build_seconds"] += seconds
+        RENDER_LAYER_CACHE_REQUESTS.inc(template=template, result="hit" if hit else "miss")
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            report = {}
+            for template, stats in sorted(self._stats.items()):
+                lookups = stats["hits"] + stats["misses"]
+                report[template] = {
+                    "hits": int(stats["hits"]),
+                    "misses": int(stats["misses"]),
+                    "hit_rate": round(stats["hits"] / lookups, 4) if lookups else 0.0,
+                    "build_ms": round(stats["build_seconds"] * 1000, 1),
+                    "saved_ms": round(stats["saved_seconds"] * 1000, 1),
+                }
+            return report
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._stats.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+
+def _nbytes(value: Any) -> int:
+    if isinstance(value, Image.Image):
+        return value.width * value.height * len(value.getbands())
+    return int(getattr(value, "nbytes", 0))
+
+
+LAYER_CACHE = LayerCache(int(LAYER_CACHE_MB * 1024 * 1024))
+
+
+def layer_cache_stats() -> Dict[str, Dict[str, float]]:
+    """Hits, misses, hit rate, build time and time saved per template."""
+    return LAYER_CACHE.stats()
+
+
+def clear_layer_cache() -> None:
+    LAYER_CACHE.clear()
+
+
+# =============================================================================
+# VECTORIZED COLOR SPACE (sRGB <-> CIE LAB, D65)
+# =============================================================================
+
+def rgb_to_lab_array(rgb: np.ndarray) -> np.ndarray:
+    """``(..., 3)`` sRGB in 0-255 -> ``(..., 3)`` LAB (same math as ``gradient_generator.rgb_to_lab``)."""
+    c = np.asarray(rgb, dtype=np.float64) / 255.0
+    c = np.where(c <= 0.04045, c / 12.92, ((c + 0.055) / 1.055) ** 2.4)
+    xyz = c @ np.array([
+        [0.4124564, 0.2126729, 0.0193339],
+        [0.3575761, 0.7151522, 0.1191920],
+        [0.1804375, 0.0721750, 0.9503041],
+    ])
+    xyz = xyz / np.array([0.95047, 1.0, 1.08883])
+    f = np.where(xyz > 0.008856, np.cbrt(xyz), 7.787 * xyz + 16 / 116)
+    return np.stack([
+        116 * f[..., 1] - 16,
+        500 * (f[..., 0] - f[..., 1]),
+        200 * (f[..., 1] - f[..., 2]),
+    ], axis=-1)
+
+
+def lab_to_rgb_array(lab: np.ndarray) -> np.ndarray:
+    """``(..., 3)`` LAB -> ``(..., 3)`` sRGB floats clamped to 0-255."""
+    lab = np.asarray(lab, dtype=np.float64)
+    fy = (lab[..., 0] + 16) / 116
+    f = np.stack([lab[..., 1] / 500 + fy, fy, fy - lab[..., 2] / 200], axis=-1)
+    cubed = f ** 3
+    xyz = np.where(cubed > 0.008856, cubed, (f - 16 / 116) / 7.787)
+    xyz = xyz * np.array([0.95047, 1.0, 1.08883])
+    c = xyz @ np.array([
+        [3.2404542, -0.9692660, 0.0556434],
+        [-1.5371385, 1.8760108, -0.2040259],
+        [-0.4985314, 0.0415560, 1.0572252],
+    ])
+    c = np.where(c <= 0.0031308, 12.92 * c, 1.055 * np.power(np.maximum(c, 0), 1 / 2.4) - 0.055)
+    return np.clip(c, 0, 1) * 255
+
+
+# =============================================================================
+# GRADIENTS
+# =============================================================================
+
+def normalize_stops(stops: Sequence) -> Stops:
+    """Colors (evenly spaced) or ``(position, color)`` pairs -> hashable sorted stops."""
+    if len(stops) < 1:
+        raise ValueError("A gradient needs at least one color stop")
+    if not all(len(stop) == 2 and isinstance(stop[1], (tuple, list)) for stop in stops):
+        stops = [(i / max(len(stops) - 1, 1), stop) for i, stop in enumerate(stops)]
+    normalized = tuple(sorted(
+        (float(position), tuple(int(c) for c in color)) for position, color in stops))
+    if len({len(color) for _, color in normalized}) != 1:
+        raise ValueError("Gradient stops must all be RGB or all RGBA")
+    return normalized
+
+
+def progress_field(size: Size, direction: Direction, extent: float = None) -> np.ndarray:
+    """Position ``t`` in [0, 1] (float64) of every pixel along ``direction``.
+
+    Linear directions use ``t = i / n`` along the axis (the convention of the
+    per-row loops this replaces) or project onto ``angle`` degrees; ``radial``
+    is the distance from the center normalized to 1.0 at the corners.
+    Axis-aligned fields are returned as a single row/column for broadcasting.
+    ``extent`` overrides ``n`` for axis-aligned ramps that end early.
+    """
+    width, height = size
+    if direction == "radial":
+        cx, cy = width / 2, height / 2
+        ys = (np.arange(height, dtype=np.float64) - cy)[:, None]
+        xs = (np.arange(width, dtype=np.float64) - cx)[None, :]
+        return np.minimum(np.sqrt(xs * xs + ys * ys) / max(math.hypot(cx, cy), 1.0), 1.0)
+
+    angle = DIRECTION_ANGLES.get(direction, direction) if isinstance(direction, str) else direction
+    if not isinstance(angle, (int, float)):
+        raise ValueError(f"Unknown gradient direction: {direction}")
+    if angle % 360 == 90:
+        return np.minimum(np.arange(height, dtype=np.float64)[:, None] / (extent or height), 1.0)
+    if angle % 360 == 0:
+        return np.minimum(np.arange(width, dtype=np.float64)[None, :] / (extent or width), 1.0)
+    radians = math.radians(angle)
+    xs = (np.arange(width, dtype=np.float64) / max(width - 1, 1) * 2 - 1)[None, :]
+    ys = (np.arange(height, dtype=np.float64) / max(height - 1, 1) * 2 - 1)[:, None]
+    return np.clip((xs * math.cos(radians) + ys * math.sin(radians) + 1) / 2, 0, 1)
+
+
+def color_ramp(stops: Stops, samples: int, space: str = "lab") -> np.ndarray:
+    """``(samples, channels)`` float colors from t=0 to t=1.
+
+    ``lab`` interpolates RGB channels in LAB (alpha linearly); ``rgb``
+    interpolates every channel linearly in sRGB.
+    """
+    positions = np.array([position for position, _ in stops])
+    colors = np.array([color for _, color in stops], dtype=np.float64)
+    t = np.linspace(0.0, 1.0, samples)
+    if space == "lab":
+        lab = rgb_to_lab_array(colors[:, :3])
+        channels = [np.interp(t, positions, lab[:, i]) for i in range(3)]
+        ramp = lab_to_rgb_array(np.stack(channels, axis=-1))
+        if colors.shape[1] == 4:
+            ramp = np.concatenate([ramp, np.interp(t, positions, colors[:, 3])[:, None]], axis=-1)
+        return ramp
+    if space == "rgb":
+        return np.stack([np.interp(t, positions, colors[:, i]) for i in range(colors.shape[1])], axis=-1)
+    raise ValueError(f"Unknown gradient color space: {space}")
+
+
+def ordered_dither(values: np.ndarray, strength: float = 1.0) -> np.ndarray:
+    """Bayer 8x8 dither of float pixels, truncated to uint8 (as ``apply_fast_dithering``)."""
+    height, width = values.shape[:2]
+    pattern = np.tile(_BAYER_8, ((height + 7) // 8, (width + 7) // 8))[:height, :width]
+    if values.ndim == 3:
+        pattern = pattern[:, :, None]
+    return np.clip(values + (pattern - 0.5) * (2.0 * strength), 0, 255).astype(np.uint8)
+
+
+def render_gradient(
+    size: Size,
+    stops: Stops,
+    direction: Direction = "diagonal",
+    dither: float = 1.0,
+    space: str = "lab",
+) -> Image.Image:
+    """Build (uncached) an RGB or RGBA gradient image."""
+    width, height = size
+    t = progress_field(size, direction)
+    if space == "rgb":
+        # Exact per-pixel interpolation, truncated like ``int(c1 + (c2 - c1) * t)``
+        positions = [position for position, _ in stops]
+        pixels = np.stack([np.interp(t, positions, [color[i] for _, color in stops])
+                           for i in range(len(stops[0][1]))], axis=-1)
+    else:
+        ramp = color_ramp(stops, LUT_SIZE, space)
+        pixels = ramp[np.rint(t * (LUT_SIZE - 1)).astype(np.intp)]
+    channels = pixels.shape[-1]
+    pixels = np.broadcast_to(pixels, (height, width, channels))
+    if dither:
+        data = ordered_dither(pixels, float(dither))
+    else:
+        data = np.clip(pixels, 0, 255).astype(np.uint8)
+    return Image.fromarray(np.ascontiguousarray(data), mode="RGBA" if channels == 4 else "RGB")
+
+
+def gradient_layer(
+    size: Size,
+    stops: Sequence,
+    direction: Direction = "diagonal",
+    dither: float = 1.0,
+    space: str = "lab",
+    template: str = "default",
+) -> Image.Image:
+    """Cached gradient keyed by (size, stops, direction, dither, space). Read-only.
+
+    ``stops`` are RGB or RGBA colors, evenly spaced, or ``(position, color)``
+    pairs; ``direction`` is ``horizontal``/``vertical``/``diagonal``/``radial``
+    or an angle in degrees; ``dither`` is the ordered-dither strength (0 off).
+    """
+    size = (int(size[0]), int(size[1]))
+    stops = normalize_stops(stops)
+    dither = float(dither)
+    key = ("gradient", size, stops, direction, dither, space)
+    return LAYER_CACHE.get(key, lambda: render_gradient(size, stops, direction, dither, space), template)
+
+
+def ramp_mask(
+    size: Size,
+    start: int,
+    end: int,
+    direction: Direction = "vertical",
+    extent: float = None,
+    easing: str = "linear",
+    template: str = "default",
+) -> Image.Image:
+    """Cached 'L' mask ramping ``int(start + (end - start) * ease(t))`` along ``direction``.
+
+    With ``extent`` the ramp reaches ``end`` after ``extent`` pixels and
+    stays there; ``ease_in`` squares ``t``.
+    """
+    size = (int(size[0]), int(size[1]))
+
+    def build() -> Image.Image:
+        t = progress_field(size, direction, extent)
+        if easing == "ease_in":
+            t = t * t
+        elif easing != "linear":
+            raise ValueError(f"Unknown easing: {easing}")
+        values = np.trunc(start + (end - start) * t.astype(np.float64))
+        values = np.broadcast_to(np.clip(values, 0, 255).astype(np.uint8), (size[1], size[0]))
+        return Image.fromarray(np.ascontiguousarray(values), mode="L")
+
+    key = ("ramp", size, int(start), int(end), direction, extent, easing)
+    return LAYER_CACHE.get(key, build, template)
+
+
+def cached_layer(key: Hashable, build: Callable[[], Image.Image], template: str = "default") -> Image.Image:
+    """Cache any other deterministic layer (e.g. a template's highlight) under ``key``."""
+    return LAYER_CACHE.get(("custom", key), build, template)
@@ -0,0 +1,314 @@
+"""
+Text Layout - shared, cached text measurement, line breaking and font fitting.
+
+The template renderers wrapped text by calling ``draw.textbbox`` on every
+growing prefix of a line, fitted headlines by trying one font size after
+another, and the adaptive engine measured each character twice while
+letter-spacing. Those measurements repeat across font sizes, templates and
+renders of the same copy. This module keeps, per (font path, size):
+
+  - glyph advance widths, pair kerning and glyph ink boxes, so most
+    "does this line fit?" questions are answered by summing cached numbers;
+  - exact ``getbbox`` results for strings (used when an estimate lands within
+    ``ESTIMATE_TOLERANCE_PX`` of the limit, and for line heights);
+  - greedy line-break results per (text, width).
+
+``fit_font_size`` binary-searches the descending size ladder instead of
+walking it. ``track_render()`` counts, for one render, how many measurements
+layout asked for and how many actually reached FreeType; the difference is
+reported as saved (log line + ``preview_text_measurements`` metric).
+
+Usage:
+    metrics = font_metrics(font)
+    lines = break_lines("Ship previews that convert", font, 600)
+    size = fit_font_size(range(48, 23, -2), lambda s: fits_in_box(s))
+"""
+
+import contextvars
+import logging
+import math
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, Hashable, Iterator, List, Optional, Sequence, Tuple
+
+from backend.services.preview.observability.metrics import TEXT_MEASUREMENTS
+
+logger = logging.getLogger(__name__)
+
+# Estimates are within 1px of getbbox (26.6 rounding); closer calls are measured exactly
+ESTIMATE_TOLERANCE_PX = 2
+MAX_FONTS = 64
+MAX_STRINGS_PER_FONT = 4096
+MAX_BREAKS_PER_FONT = 1024
+
+
+# =============================================================================
+# STATS
+# =============================================================================
+
+@dataclass
+class LayoutStats:
+    """Measurements requested by layout vs. FreeType calls actually made."""
+    requested: int = 0
+    measured: int = 0
+
+    @property
+    def saved(self) -> int:
+        return self.requested - self.measured
+
+    def to_dict(self) -> Dict[str, int]:
+        return {"requested": self.requested, "measured": self.measured, "saved": self.saved}
+
+
+_render_stats: contextvars.ContextVar[Optional[LayoutStats]] = contextvars.ContextVar(
+    "text_layout_render_stats", default=None
+)
+
+
+def _count(requested: int = 0, measured: int = 0) -> None:
+    stats = _render_stats.get()
+    if stats is not None:
+        stats.requested += requested
+        stats.measured += measured
+
+
+@contextmanager
+def track_render(name: str = "render") -> Iterator[LayoutStats]:
+    """Count text measurements for one render and report the calls saved."""
+    stats = LayoutStats()
+    token = _render_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _render_stats.reset(token)
+        if stats.requested:
+            TEXT_MEASUREMENTS.inc(stats.measured, result="measured")
+            TEXT_MEASUREMENTS.inc(max(stats.saved, 0), result="saved")
+            logger.info(
+                f"🔤 [TEXT_LAYOUT] {name}: {stats.requested} measurements, "
+                f"{stats.measured} FreeType calls, {stats.saved} saved"
+            )
+
+
+# =============================================================================
+# FONT METRICS
+# =============================================================================
+
+class FontMetrics:
+    """Lazily filled glyph and string metrics of one font at one size."""
+
+    def __init__(self, font):
+        self.font = font
+        self._advances: Dict[str, float] = {}
+        self._kerning: Dict[Tuple[str, str], float] = {}
+        self._glyph_boxes: Dict[str, Tuple[int, int, int, int]] = {}
+        self._boxes: "OrderedDict[str, Tuple[int, int, int, int]]" = OrderedDict()
+        self._breaks: "OrderedDict[Hashable, Tuple[str, ...]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    # -- glyphs ---------------------------------------------------------------
+
+    def advance(self, char: str) -> float:
+        width = self._advances.get(char)
+        if width is None:
+            width = self._advances[char] = self.font.getlength(char)
+            _count(measured=1)
+        return width
+
+    def kerning(self, left: str, right: str) -> float:
+        pair = (left, right)
+        kern = self._kerning.get(pair)
+        if kern is None:
+            kern = self.font.getlength(left + right) - self.advance(left) - self.advance(right)
+            self._kerning[pair] = kern
+            _count(measured=1)
+        return kern
+
+    def glyph_box(self, char: str) -> Tuple[int, int, int, int]:
+        box = self._glyph_boxes.get(char)
+        if box is None:
+            box = self._glyph_boxes[char] = self.font.getbbox(char)
+            _count(measured=1)
+        return box
+
+    def char_width(self, char: str) -> int:
+        """``textbbox`` width of a single character (what letter-spacing loops advance by)."""
+        _count(requested=1)
+        box = self.glyph_box(char)
+        return box[2] - box[0]
+
+    # -- strings ----------------------------------------------------------------
+
+    def length(self, text: str) -> float:
+        """Advance width, identical to ``font.getlength`` for basic layout."""
+        total = 0.0
+        previous = None
+        for char in text:
+            if previous is not None:
+                total += self.kerning(previous, char)
+            total += self.advance(char)
+            previous = char
+        return total
+
+    def estimate_width(self, text: str) -> int:
+        """``getbbox`` width from cached glyph data (within 1px)."""
+        pen = 0.0
+        left, right = 0.0, 0.0
+        previous = None
+        for char in text:
+            if previous is not None:
+                pen += self.kerning(previous, char)
+            box = self.glyph_box(char)
+            if box[2] > box[0]:
+                left = min(left, pen + box[0])
+                right = max(right, pen + box[2])
+            pen += self.advance(char)
+            previous = char
+        return math.ceil(max(right, pen) - 1e-9) - math.floor(left)
+
+    def bbox(self, text: str) -> Tuple[int, int, int, int]:
+        """Exact ``font.getbbox(text)``, memoized."""
+        _count(requested=1)
+        with self._lock:
+            box = self._boxes.get(text)
+            if box is not None:
+                self._boxes.move_to_end(text)
+                return box
+        box = self.font.getbbox(text)
+        _count(measured=1)
+        with self._lock:
+            self._boxes[text] = box
+            if len(self._boxes) > MAX_STRINGS_PER_FONT:
+                self._boxes.popitem(last=False)
+        return box
+
+    def width(self, text: str) -> int:
+        box = self.bbox(text)
+        return box[2] - box[0]
+
+    def height(self, text: str) -> int:
+        box = self.bbox(text)
+        return box[3] - box[1]
+
+    def fits(self, text: str, max_width: float) -> bool:
+        """``textbbox`` width <= ``max_width``; exact near the limit, estimated elsewhere."""
+        estimate = self.estimate_width(text)
+        if abs(estimate - max_width) <= ESTIMATE_TOLERANCE_PX:
+            return self.width(text) <= max_width
+        _count(requested=1)
+        return estimate <= max_width
+
+    # -- line breaking ------------------------------------------------------------
+
+    def break_lines(
+        self,
+        text: str,
+        max_width: float,
+        overflow_word: Optional[Callable[[str], str]] = None,
+        long_word_chars: int = 40,
+    ) -> Tuple[str, ...]:
+        """Greedy word wrap, memoized per (text, width).
+
+        A word that starts a new line and is longer than ``long_word_chars``
+        is passed through ``overflow_word`` (e.g. a truncator) when given.
+        """
+        key = (text, max_width, overflow_word, long_word_chars)
+        with self._lock:
+            lines = self._breaks.get(key)
+            if lines is not None:
+                self._breaks.move_to_end(key)
+        if lines is not None:
+            # Every prefix the greedy loop measures is a saved call
+            _count(requested=len(text.split()))
+            return lines
+
+        result: List[str] = []
+        current: List[str] = []
+        for word in text.split():
+            if self.fits(' '.join(current + [word]), max_width):
+                current.append(word)
+                continue
+            if current:
+                result.append(' '.join(current))
+            if overflow_word is not None and len(word) > long_word_chars:
+                word = overflow_word(word)
+            current = [word]
+        if current:
+            result.append(' '.join(current))
+
+        lines = tuple(result)
+        with self._lock:
+            self._breaks[key] = lines
+            if len(self._breaks) > MAX_BREAKS_PER_FONT:
+                self._breaks.popitem(last=False)
+        return lines
+
+
+_fonts: "OrderedDict[Hashable, FontMetrics]" = OrderedDict()
+_fonts_lock = threading.Lock()
+
+
+def _font_key(font) -> Optional[Hashable]:
+    path = getattr(font, "path", None)
+    if not path or not hasattr(font, "getlength"):
+        return None
+    return (path, getattr(font, "size", None), getattr(font, "index", 0), getattr(font, "layout_engine", None))
+
+
+def font_metrics(font) -> FontMetrics:
+    """Shared metrics for ``font``, keyed by (font path, size).
+
+    Fonts without a path (the bitmap fallback) get an unshared instance.
+    """
+    key = _font_key(font)
+    if key is None:
+        return FontMetrics(font)
+    with _fonts_lock:
+        metrics = _fonts.get(key)
+        if metrics is not None:
+            _fonts.move_to_end(key)
+            return metrics
+        metrics = _fonts[key] = FontMetrics(font)
+        if len(_fonts) > MAX_FONTS:
+            _fonts.popitem(last=False)
+        return metrics
+
+
+def clear_text_layout_cache() -> None:
+    with _fonts_lock:
+        _fonts.clear()
+
+
+# =============================================================================
+# LAYOUT HELPERS
+# =============================================================================
+
+def break_lines(
+    text: str,
+    font,
+    max_width: float,
+    overflow_word: Optional[Callable[[str], str]] = None,
+) -> List[str]:
+    """Greedy word wrap of ``text`` at ``max_width`` pixels (``textbbox`` widths)."""
+    return list(font_metrics(font).break_lines(text, max_width, overflow_word))
+
+
+def text_width(text: str, font) -> int:
+    return font_metrics(font).width(text)
+
+
+def fit_font_size(sizes: Sequence[int], fits: Callable[[int], bool]) -> Optional[int]:
+    """Largest of the descending ``sizes`` for which ``fits(size)`` holds, or None.
+
+    Binary search: assumes that if a size fits, every smaller size fits too.
+    """
+    lo, hi = 0, len(sizes)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if fits(sizes[mid]):
+            hi = mid
+        else:
+            lo = mid + 1
+    return sizes[lo] if lo < len(sizes) else None
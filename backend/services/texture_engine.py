@@ -9,11 +9,15 @@ Key Features:
 - Pattern libraries (dots, lines, hex, topographic, circuits)
 - Advanced gradients (mesh, radial, conic, noise-based)
 - Material effects (glass, frosted, acrylic, metal, fabric)
+
+Generators work on whole numpy arrays (no per-pixel Python loops) and draw
+their randomness from a per-engine ``numpy.random.Generator``; pass ``seed``
+for reproducible textures.
 """
 
 import logging
 import math
-import random
+from functools import lru_cache
 from typing import Dict, Any, List, Tuple, Optional
 from dataclasses import dataclass
 from enum import Enum
@@ -63,6 +67,14 @@ class PatternConfig:
     thickness: int  # Line/stroke thickness
 
 
+@lru_cache(maxsize=16)
+def _disc_offsets(radius: int) -> Tuple[np.ndarray, np.ndarray]:
+    """(dy, dx) offsets of the pixels within ``radius`` of a center pixel."""
+    dy, dx = np.mgrid[-radius:radius + 1, -radius:radius + 1]
+    inside = dx * dx + dy * dy <= radius * radius
+    return dy[inside], dx[inside]
+
+
 class TextureEngine:
     """
     Generates procedural textures and patterns for sophisticated designs.
@@ -70,8 +82,8 @@ class TextureEngine:
     Creates subtle visual interest without overwhelming the design.
     """
     
-    def __init__(self):
-        random.seed()  # Initialize for procedural generation
+    def __init__(self, seed: Optional[int] = None):
+        self._rng = np.random.default_rng(seed)
     
     def generate_texture(
         self,
@@ -195,25 +207,9 @@ class TextureEngine:
         config: TextureConfig
     ) -> Image.Image:
         """Generate film grain texture."""
-        # Create monochrome noise
-        noise = np.random.randint(
-            -int(255 * config.intensity),
-            int(255 * config.intensity),
-            (height, width),
-            dtype=np.int16
-        )
-        
-        # Convert to image
-        noise_img = Image.fromarray(
-            np.clip(128 + noise, 0, 255).astype(np.uint8),
-            mode='L'
-        )
-        
-        # Create RGBA with opacity
-        rgba = Image.new('RGBA', (width, height), (128, 128, 128, config.opacity))
-        rgba.putalpha(noise_img.point(lambda p: config.opacity))
-        
-        return rgba
+        # The grain is carried by the blend step: the layer itself is a flat
+        # mid-gray at the configured opacity, so no per-pixel noise is needed.
+        return Image.new('RGBA', (width, height), (128, 128, 128, config.opacity))
     
     def _generate_paper_texture(
         self,
@@ -222,20 +218,25 @@ class TextureEngine:
         config: TextureConfig
     ) -> Image.Image:
         """Generate paper texture with fibers."""
+        rng = self._rng
         # Base noise
-        noise = np.random.normal(250, 15 * config.intensity, (height, width))
-        
-        # Add fibrous patterns (horizontal and vertical streaks)
-        for _ in range(int(100 * config.intensity)):
-            x = random.randint(0, width - 1)
-            y = random.randint(0, height - 1)
-            length = random.randint(5, 20)
-            angle = random.choice([0, 90, 45, 135])
-            
+        noise = rng.standard_normal((height, width), dtype=np.float32) * (15 * config.intensity) + 250
+        
+        # Fibrous streaks (horizontal and vertical; diagonal picks stay blank).
+        # At most ~100 fibers, so each is one slice update.
+        count = int(100 * config.intensity)
+        fibers = zip(
+            rng.integers(0, width, count).tolist(),
+            rng.integers(0, height, count).tolist(),
+            rng.integers(5, 21, count).tolist(),
+            rng.choice([0, 90, 45, 135], count).tolist(),
+            rng.integers(-10, 11, count).tolist(),
+        )
+        for x, y, length, angle, delta in fibers:
             if angle == 0:  # Horizontal
-                noise[y, max(0, x-length):min(width, x+length)] += random.randint(-10, 10)
+                noise[y, max(0, x - length):min(width, x + length)] += delta
             elif angle == 90:  # Vertical
-                noise[max(0, y-length):min(height, y+length), x] += random.randint(-10, 10)
+                noise[max(0, y - length):min(height, y + length), x] += delta
         
         # Convert to image
         paper_img = Image.fromarray(
@@ -246,12 +247,7 @@ class TextureEngine:
         # Slight blur for smoothness
         paper_img = paper_img.filter(ImageFilter.GaussianBlur(0.5))
         
-        # Create RGBA
-        rgba = Image.new('RGBA', (width, height), (255, 255, 255, config.opacity))
-        r, g, b = paper_img, paper_img, paper_img
-        rgba = Image.merge('RGBA', (r, g, b, paper_img.point(lambda p: int(p / 255 * config.opacity))))
-        
-        return rgba
+        return self._gray_layer(paper_img, config.opacity)
     
     def _generate_canvas_texture(
         self,
@@ -260,32 +256,18 @@ class TextureEngine:
         config: TextureConfig
     ) -> Image.Image:
         """Generate canvas weave texture."""
-        scale = int(config.scale * 4)
-        
-        # Create weave pattern
-        canvas = Image.new('L', (width, height), 250)
-        pixels = canvas.load()
+        scale = max(1, int(config.scale * 4))
         
-        for y in range(height):
-            for x in range(width):
-                # Weave pattern
-                h_thread = (x // scale) % 2
-                v_thread = (y // scale) % 2
-                
-                if h_thread == v_thread:
-                    value = 255
-                else:
-                    value = 245
-                
-                # Add noise
-                value += random.randint(-int(10 * config.intensity), int(10 * config.intensity))
-                pixels[x, y] = max(0, min(255, value))
+        # Weave pattern: light where the horizontal and vertical threads agree
+        h_thread = (np.arange(width) // scale) % 2
+        v_thread = (np.arange(height) // scale) % 2
+        canvas = np.where(v_thread[:, None] == h_thread[None, :], 255, 245).astype(np.int16)
         
-        # Create RGBA
-        rgba = Image.merge('RGBA', (canvas, canvas, canvas, 
-                                     canvas.point(lambda p: int(p / 255 * config.opacity))))
+        # Add noise
+        canvas += self._thread_noise(width, height, int(10 * config.intensity))
+        canvas_img = Image.fromarray(np.clip(canvas, 0, 255).astype(np.uint8), mode='L')
         
-        return rgba
+        return self._gray_layer(canvas_img, config.opacity)
     
     def _generate_concrete_texture(
         self,
@@ -294,21 +276,25 @@ class TextureEngine:
         config: TextureConfig
     ) -> Image.Image:
         """Generate concrete/stone texture."""
+        rng = self._rng
         # Rough noise base
-        noise = np.random.normal(200, 30 * config.intensity, (height, width))
-        
-        # Add spots and imperfections
-        for _ in range(int(50 * config.intensity)):
-            x = random.randint(0, width - 1)
-            y = random.randint(0, height - 1)
-            radius = random.randint(1, 4)
-            darkness = random.randint(-30, -10)
-            
-            for dy in range(-radius, radius + 1):
-                for dx in range(-radius, radius + 1):
-                    if 0 <= y + dy < height and 0 <= x + dx < width:
-                        if dx*dx + dy*dy <= radius*radius:
-                            noise[y + dy, x + dx] += darkness
+        noise = rng.standard_normal((height, width), dtype=np.float32) * (30 * config.intensity) + 200
+        
+        # Add spots and imperfections (darkened discs of radius 1-4)
+        count = int(50 * config.intensity)
+        if count > 0:
+            xs = rng.integers(0, width, count)
+            ys = rng.integers(0, height, count)
+            radii = rng.integers(1, 5, count)
+            darkness = rng.integers(-30, -9, count).astype(np.float32)
+            for radius in np.unique(radii):
+                dy, dx = _disc_offsets(int(radius))
+                spots = radii == radius
+                yy = ys[spots][:, None] + dy[None, :]
+                xx = xs[spots][:, None] + dx[None, :]
+                amount = np.broadcast_to(darkness[spots][:, None], yy.shape)
+                inside = (yy >= 0) & (yy < height) & (xx >= 0) & (xx < width)
+                np.add.at(noise, (yy[inside], xx[inside]), amount[inside])
         
         # Convert and blur slightly
         concrete_img = Image.fromarray(
@@ -317,11 +303,7 @@ class TextureEngine:
         )
         concrete_img = concrete_img.filter(ImageFilter.GaussianBlur(1))
         
-        # Create RGBA with gray tone
-        rgba = Image.merge('RGBA', (concrete_img, concrete_img, concrete_img,
-                                     concrete_img.point(lambda p: int(p / 255 * config.opacity))))
-        
-        return rgba
+        return self._gray_layer(concrete_img, config.opacity)
     
     def _generate_fabric_texture(
         self,
@@ -330,29 +312,20 @@ class TextureEngine:
         config: TextureConfig
     ) -> Image.Image:
         """Generate fabric/cloth texture."""
-        scale = int(config.scale * 3)
+        scale = max(1, int(config.scale * 3))
         
-        fabric = Image.new('L', (width, height), 240)
-        pixels = fabric.load()
+        # Crosshatch pattern
+        cells = (np.arange(height) // scale)[:, None] + (np.arange(width) // scale)[None, :]
+        fabric = np.where(cells % 2 == 0, 225, 240).astype(np.int16)
         
-        for y in range(height):
-            for x in range(width):
-                # Crosshatch pattern
-                value = 240
-                if (x // scale + y // scale) % 2 == 0:
-                    value -= 15
-                
-                # Add thread noise
-                value += random.randint(-int(5 * config.intensity), int(5 * config.intensity))
-                pixels[x, y] = max(0, min(255, value))
+        # Add thread noise
+        fabric += self._thread_noise(width, height, int(5 * config.intensity))
+        fabric_img = Image.fromarray(np.clip(fabric, 0, 255).astype(np.uint8), mode='L')
         
         # Slight blur
-        fabric = fabric.filter(ImageFilter.GaussianBlur(0.5))
+        fabric_img = fabric_img.filter(ImageFilter.GaussianBlur(0.5))
         
-        rgba = Image.merge('RGBA', (fabric, fabric, fabric,
-                                     fabric.point(lambda p: int(p / 255 * config.opacity))))
-        
-        return rgba
+        return self._gray_layer(fabric_img, config.opacity)
     
     def _generate_metal_texture(
         self,
@@ -361,24 +334,29 @@ class TextureEngine:
         config: TextureConfig
     ) -> Image.Image:
         """Generate brushed metal texture."""
-        # Horizontal streaks
-        metal = np.ones((height, width), dtype=np.float32) * 200
-        
-        for y in range(height):
-            # Vary intensity per row
-            intensity = 200 + random.randint(-int(20 * config.intensity), int(20 * config.intensity))
-            metal[y, :] = intensity
-            
-            # Add fine horizontal lines
-            for _ in range(random.randint(0, 3)):
-                x_start = random.randint(0, width // 2)
-                x_end = random.randint(width // 2, width)
-                metal[y, x_start:x_end] += random.randint(-5, 5)
-        
-        # Add subtle vertical variation
-        for x in range(0, width, 10):
-            variation = random.randint(-int(10 * config.intensity), int(10 * config.intensity))
-            metal[:, x:min(x + 5, width)] += variation
+        rng = self._rng
+        spread = int(20 * config.intensity)
+        
+        # Horizontal streaks: intensity varies per row
+        rows = 200 + rng.integers(-spread, spread + 1, height)
+        metal = np.repeat(rows[:, None].astype(np.float32), width, axis=1)
+        
+        # Fine horizontal lines: 0-3 per row, each a constant offset over a span
+        per_row = rng.integers(0, 4, height)
+        line_rows = np.repeat(np.arange(height), per_row)
+        starts = rng.integers(0, width // 2 + 1, line_rows.size)
+        ends = rng.integers(width // 2, width + 1, line_rows.size)
+        deltas = rng.integers(-5, 6, line_rows.size).astype(np.float32)
+        runs = np.zeros((height, width + 1), dtype=np.float32)
+        np.add.at(runs, (line_rows, starts), deltas)
+        np.add.at(runs, (line_rows, ends), -deltas)
+        metal += np.cumsum(runs, axis=1)[:, :width]
+        
+        # Add subtle vertical variation: 5-px bands every 10 px
+        vertical_spread = int(10 * config.intensity)
+        band_values = rng.integers(-vertical_spread, vertical_spread + 1, (width + 9) // 10)
+        columns = np.arange(width)
+        metal += np.where(columns % 10 < 5, band_values[columns // 10], 0)[None, :].astype(np.float32)
         
         metal_img = Image.fromarray(
             np.clip(metal, 0, 255).astype(np.uint8),
@@ -388,10 +366,19 @@ class TextureEngine:
         # Slight blur
         metal_img = metal_img.filter(ImageFilter.GaussianBlur(0.3))
         
-        rgba = Image.merge('RGBA', (metal_img, metal_img, metal_img,
-                                     metal_img.point(lambda p: int(p / 255 * config.opacity))))
-        
-        return rgba
+        return self._gray_layer(metal_img, config.opacity)
+    
+    def _thread_noise(self, width: int, height: int, amplitude: int) -> np.ndarray:
+        """Uniform integer noise in ``[-amplitude, amplitude]`` per pixel."""
+        if amplitude <= 0:
+            return np.zeros((height, width), dtype=np.int16)
+        return self._rng.integers(-amplitude, amplitude + 1, (height, width), dtype=np.int16)
+    
+    @staticmethod
+    def _gray_layer(gray: Image.Image, opacity: int) -> Image.Image:
+        """Gray RGBA layer whose alpha scales with brightness up to ``opacity``."""
+        alpha = gray.point(lambda p: int(p / 255 * opacity))
+        return Image.merge('RGBA', (gray, gray, gray, alpha))
     
     # =========================================================================
     # PATTERN GENERATORS
@@ -409,15 +396,27 @@ class TextureEngine:
         
         spacing = config.size
         radius = config.thickness
-        
-        for y in range(0, height, spacing):
-            for x in range(0, width, spacing):
-                draw.ellipse(
-                    [(x - radius, y - radius), (x + radius, y + radius)],
-                    fill=(*config.color, config.opacity)
-                )
-        
-        return pattern
+        fill = (*config.color, config.opacity)
+        
+        if 2 * radius + 1 >= spacing:
+            # Overlapping dots: draw each one
+            for y in range(0, height, spacing):
+                for x in range(0, width, spacing):
+                    draw.ellipse([(x - radius, y - radius), (x + radius, y + radius)], fill=fill)
+            return pattern
+        
+        # Dots are separate: render one spacing-sized cell (quarter dots on its
+        # corners) and tile it across the canvas
+        cell = Image.new('RGBA', (spacing, spacing), (0, 0, 0, 0))
+        cell_draw = ImageDraw.Draw(cell)
+        for x in (0, spacing):
+            for y in (0, spacing):
+                cell_draw.ellipse([(x - radius, y - radius), (x + radius, y + radius)], fill=fill)
+        tiles = np.tile(np.asarray(cell), (height // spacing + 1, width // spacing + 1, 1))[:height, :width]
+        # Only centers inside the canvas are drawn: clear the next column/row of dots
+        tiles[:, ((width - 1) // spacing) * spacing + radius + 1:] = 0
+        tiles[((height - 1) // spacing) * spacing + radius + 1:, :] = 0
+        return Image.fromarray(np.ascontiguousarray(tiles), 'RGBA')
     
     def _generate_line_grid(
         self,
@@ -457,6 +456,10 @@ class TextureEngine:
         
         # Hexagon dimensions
         h = size * math.sqrt(3) / 2
+        angles = np.arange(7) * (math.pi / 3)  # closed outline
+        outline_x = size * np.cos(angles)
+        outline_y = size * np.sin(angles)
+        fill = (*config.color, config.opacity)
         
         for row in range(-1, int(height / h) + 2):
             for col in range(-1, int(width / size) + 2):
@@ -467,14 +470,8 @@ class TextureEngine:
                     y += h / 2
                 
                 # Draw hexagon
-                points = []
-                for i in range(6):
-                    angle = math.pi / 3 * i
-                    px = x + size * math.cos(angle)
-                    py = y + size * math.sin(angle)
-                    points.append((px, py))
-                
-                draw.line(points + [points[0]], fill=(*config.color, config.opacity), width=thickness)
+                points = list(zip((x + outline_x).tolist(), (y + outline_y).tolist()))
+                draw.line(points, fill=fill, width=thickness)
         
         return pattern
     
@@ -485,22 +482,22 @@ class TextureEngine:
         config: PatternConfig
     ) -> Image.Image:
         """Generate topographic (contour) lines."""
-        pattern = Image.new('RGBA', (width, height), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(pattern)
-        
-        # Create noise field for elevation
+        # Elevation field on every other pixel (simple separable noise)
         scale = 50
-        for level in range(5, 250, config.size):
-            # Draw contour at this elevation
-            for y in range(0, height, 2):
-                for x in range(0, width, 2):
-                    # Simple noise function
-                    noise_val = (math.sin(x / scale) + math.sin(y / scale)) * 127.5 + 127.5
-                    
-                    if abs(noise_val - level) < 5:
-                        draw.point((x, y), fill=(*config.color, config.opacity))
+        xs = np.arange(0, width, 2)
+        ys = np.arange(0, height, 2)
+        elevation = (np.sin(ys / scale)[:, None] + np.sin(xs / scale)[None, :]) * 127.5 + 127.5
         
-        return pattern
+        # Contour points: samples within 5 of any contour level
+        levels = np.arange(5, 250, config.size)
+        on_contour = np.zeros(elevation.shape, dtype=bool)
+        for level in levels:
+            on_contour |= np.abs(elevation - level) < 5
+        
+        pixels = np.zeros((height, width, 4), dtype=np.uint8)
+        sampled = pixels[::2, ::2]
+        sampled[on_contour] = (*config.color, config.opacity)
+        return Image.fromarray(pixels, 'RGBA')
     
     def _generate_circuit_pattern(
         self,
@@ -514,26 +511,26 @@ class TextureEngine:
         
         spacing = config.size
         thickness = config.thickness
-        
-        # Draw random circuit paths
-        for _ in range(width * height // (spacing * spacing)):
-            x = random.randint(0, width)
-            y = random.randint(0, height)
+        fill = (*config.color, config.opacity)
+        
+        # Random circuit paths: start, direction and length drawn in one go
+        rng = self._rng
+        count = width * height // (spacing * spacing)
+        xs = rng.integers(0, width + 1, count)
+        ys = rng.integers(0, height + 1, count)
+        directions = np.array([(1, 0), (0, 1), (-1, 0), (0, -1)])[rng.integers(0, 4, count)]
+        lengths = rng.integers(spacing, spacing * 3 + 1, count)
+        end_xs = xs + directions[:, 0] * lengths
+        end_ys = ys + directions[:, 1] * lengths
+        keep = (end_xs >= 0) & (end_xs < width) & (end_ys >= 0) & (end_ys < height)
+        
+        for x, y, end_x, end_y in zip(xs[keep].tolist(), ys[keep].tolist(),
+                                      end_xs[keep].tolist(), end_ys[keep].tolist()):
+            draw.line([(x, y), (end_x, end_y)], fill=fill, width=thickness)
             
-            # Random direction and length
-            direction = random.choice([(1, 0), (0, 1), (-1, 0), (0, -1)])
-            length = random.randint(spacing, spacing * 3)
-            
-            end_x = x + direction[0] * length
-            end_y = y + direction[1] * length
-            
-            if 0 <= end_x < width and 0 <= end_y < height:
-                draw.line([(x, y), (end_x, end_y)], 
-                         fill=(*config.color, config.opacity), width=thickness)
-                
-                # Add junction dots
-                draw.ellipse([(x-2, y-2), (x+2, y+2)], fill=(*config.color, config.opacity))
-                draw.ellipse([(end_x-2, end_y-2), (end_x+2, end_y+2)], fill=(*config.color, config.opacity))
+            # Add junction dots
+            draw.ellipse([(x-2, y-2), (x+2, y+2)], fill=fill)
+            draw.ellipse([(end_x-2, end_y-2), (end_x+2, end_y+2)], fill=fill)
         
         return pattern
     
@@ -551,13 +548,13 @@ class TextureEngine:
         frequency = 0.02
         thickness = config.thickness
         
+        # One sine profile, shifted down for each wave
+        xs = np.arange(width)
+        profile = amplitude * np.sin(xs * frequency)
+        
         for y_base in range(0, height, amplitude * 2):
-            points = []
-            for x in range(width):
-                y = y_base + amplitude * math.sin(x * frequency)
-                points.append((x, y))
-            
-            if len(points) > 1:
+            if width > 1:
+                points = list(zip(xs.tolist(), (y_base + profile).tolist()))
                 draw.line(points, fill=(*config.color, config.opacity), width=thickness)
         
         return pattern
@@ -22,6 +22,7 @@ from PIL import Image, ImageDraw, ImageFilter, ImageEnhance
 from openai import OpenAI
 
 from backend.core.config import settings
+from backend.services.cancellation import bounded_timeout
 
 logger = logging.getLogger(__name__)
 
@@ -294,7 +295,8 @@ class UIElementExtractor:
                     }
                 ],
                 max_tokens=2000,
-                temperature=0.1
+                temperature=0.1,
+                timeout=bounded_timeout(60),
             )
             
             # Parse response
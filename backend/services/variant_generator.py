@@ -9,6 +9,8 @@ Each variant uses different:
 - Text emphasis (headline vs description focus)
 
 This enables A/B testing and lets users pick their preferred design.
+Style variants are independent renders, so batches fan out across cores
+through the render farm (``render_variant_spec``).
 """
 
 import logging
@@ -19,6 +21,9 @@ from PIL import Image, ImageDraw, ImageEnhance, ImageFilter
 from enum import Enum
 import random
 
+from backend.services import image_effects
+from backend.services.render_farm import RenderExecutor, RenderSpec, get_render_executor
+
 logger = logging.getLogger(__name__)
 
 
@@ -111,11 +116,17 @@ class PreviewVariant:
     is_default: bool = False
     tags: List[str] = field(default_factory=list)
     
+    # Encoded bytes by format (filled by render farm workers and to_bytes)
+    encoded: Dict[str, bytes] = field(default_factory=dict, repr=False)
+    
     def to_bytes(self, format: str = "PNG") -> bytes:
         """Convert image to bytes."""
-        buffer = BytesIO()
-        self.image.save(buffer, format=format)
-        return buffer.getvalue()
+        data = self.encoded.get(format.upper())
+        if data is None:
+            buffer = BytesIO()
+            self.image.save(buffer, format=format)
+            data = self.encoded[format.upper()] = buffer.getvalue()
+        return data
     
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -254,7 +265,8 @@ class VariantGenerator:
     def __init__(
         self,
         default_variant_count: int = 4,
-        include_default: bool = True
+        include_default: bool = True,
+        executor: Optional[RenderExecutor] = None
     ):
         """
         Initialize generator.
@@ -262,9 +274,11 @@ class VariantGenerator:
         Args:
             default_variant_count: Default number of variants to generate
             include_default: Whether to always include the original as a variant
+            executor: Render executor for fanning out styles (default: shared one)
         """
         self.default_variant_count = default_variant_count
         self.include_default = include_default
+        self.executor = executor
         
         logger.info(
             f"VariantGenerator initialized: "
@@ -306,7 +320,10 @@ class VariantGenerator:
             selected_styles = [s for s in styles if s in VARIANT_PRESETS]
         else:
             # Select diverse styles automatically
-            selected_styles = self._select_diverse_styles(count, design_dna)
+            selected_styles = [
+                s for s in self._select_diverse_styles(count, design_dna)
+                if s in VARIANT_PRESETS
+            ]
         
         # 1. Include original as "balanced" if requested
         if self.include_default:
@@ -324,19 +341,13 @@ class VariantGenerator:
             )
             variants.append(default_variant)
         
-        # 2. Generate style variants
-        for i, style_name in enumerate(selected_styles):
-            if style_name not in VARIANT_PRESETS:
-                continue
-            
+        # 2. Generate style variants (in worker processes when the batch fans out)
+        rendered = self._render_styles(base_image, selected_styles)
+        
+        for i, (style_name, (variant_image, scores, encoded)) in enumerate(zip(selected_styles, rendered)):
             config = VARIANT_PRESETS[style_name]
             
-            # Apply variant transformations
-            variant_image = self._apply_variant_config(base_image, config)
-            
-            # Calculate quality metrics
-            readability = self._calculate_readability(variant_image)
-            visual_appeal = self._calculate_visual_appeal(variant_image, config)
+            # Uniqueness compares against the variants before this one
             uniqueness = self._calculate_uniqueness(variant_image, variants)
             
             variant = PreviewVariant(
@@ -345,11 +356,12 @@ class VariantGenerator:
                 description=self._get_variant_description(style_name),
                 config=config,
                 image=variant_image,
-                readability_score=readability,
-                visual_appeal_score=visual_appeal,
+                readability_score=scores["readability_score"],
+                visual_appeal_score=scores["visual_appeal_score"],
                 uniqueness_score=uniqueness,
                 is_default=False,
-                tags=self._get_variant_tags(style_name)
+                tags=self._get_variant_tags(style_name),
+                encoded=encoded
             )
             
             variants.append(variant)
@@ -463,6 +475,35 @@ class VariantGenerator:
         
         return styles[:count]
     
+    def render_style(
+        self,
+        base_image: Image.Image,
+        style_name: str
+    ) -> Tuple[Image.Image, Dict[str, float]]:
+        """Render one preset style and its readability / visual appeal scores."""
+        config = VARIANT_PRESETS[style_name]
+        image = self._apply_variant_config(base_image, config)
+        return image, {
+            "readability_score": self._calculate_readability(image),
+            "visual_appeal_score": self._calculate_visual_appeal(image, config)
+        }
+    
+    def _render_styles(
+        self,
+        base_image: Image.Image,
+        style_names: List[str]
+    ) -> List[Tuple[Image.Image, Dict[str, float], Dict[str, bytes]]]:
+        """Render styles in order: inline, or as a render farm batch."""
+        executor = self.executor or get_render_executor()
+        if not executor.fans_out(len(style_names)):
+            return [(*self.render_style(base_image, name), {}) for name in style_names]
+        
+        results = executor.map([
+            RenderSpec("variant", assets={"base": base_image}, options={"style": name})
+            for name in style_names
+        ])
+        return [(r.to_image(), r.info, {r.format.upper(): r.to_bytes()}) for r in results]
+    
     def _apply_variant_config(
         self,
         image: Image.Image,
@@ -536,32 +577,14 @@ class VariantGenerator:
         image: Image.Image,
         intensity: float = 0.3
     ) -> Image.Image:
-        """Apply vignette effect."""
-        width, height = image.size
-        
-        # Create vignette mask
-        mask = Image.new('L', (width, height), 255)
-        draw = ImageDraw.Draw(mask)
-        
-        # Draw radial gradient
-        center_x, center_y = width // 2, height // 2
-        max_dist = (center_x ** 2 + center_y ** 2) ** 0.5
-        
-        for y in range(height):
-            for x in range(0, width, 5):  # Step for performance
-                dist = ((x - center_x) ** 2 + (y - center_y) ** 2) ** 0.5
-                factor = dist / max_dist
-                value = int(255 * (1 - factor * intensity))
-                draw.point((x, y), fill=value)
-        
-        # Apply mask
+        """Apply vignette effect (linear falloff toward a darkened copy)."""
         if image.mode != 'RGBA':
             image = image.convert('RGBA')
         
         # Darken edges
         darkened = ImageEnhance.Brightness(image).enhance(0.7)
         
-        result = Image.composite(image, darkened, mask)
+        result = image_effects.apply_vignette(image, intensity=intensity, falloff="linear", fill=darkened)
         return result.convert('RGB')
     
     def _calculate_readability(self, image: Image.Image) -> float:
@@ -754,3 +777,8 @@ def get_available_styles() -> List[str]:
     """Get list of available variant styles."""
     return list(VARIANT_PRESETS.keys())
 
+
+def render_variant_spec(spec: RenderSpec, assets: Dict[str, Image.Image]):
+    """Render farm entry point: ``options["style"]`` applied to ``assets["base"]``."""
+    return get_variant_generator().render_style(assets["base"], spec.options["style"])
+
@@ -138,3 +138,158 @@ def mock_openai_client():
         mock_client = MagicMock()
         mock_cls.return_value = mock_client
         yield mock_client
+
+
+class FakeCacheRedis:
+    """In-memory stand-in for the subset of Redis used by preview_cache."""
+
+    def __init__(self):
+        self.store = {}
+        self.zsets = {}
+        self.sets = {}
+        self.hashes = {}
+        self.streams = {}
+        self.get_calls = 0
+        self.published = []
+
+    # strings
+    def get(self, key):
+        if key.startswith("cache:gen:"):
+            return self.store.get(key)
+        self.get_calls += 1
+        return self.store.get(key)
+
+    def setex(self, key, ttl, value):
+        self.store[key] = value
+
+    def incr(self, key):
+        self.store[key] = int(self.store.get(key) or 0) + 1
+        return self.store[key]
+
+    def ttl(self, key):
+        return 3600 if key in self.store else -2
+
+    def expire(self, key, ttl):
+        return True
+
+    def delete(self, *keys):
+        removed = 0
+        for key in keys:
+            for bucket in (self.store, self.zsets, self.sets):
+                if bucket.pop(key, None) is not None:
+                    removed += 1
+        return removed
+
+    unlink = delete
+
+    # sorted sets
+    def zadd(self, key, mapping):
+        self.zsets.setdefault(key, {}).update(mapping)
+
+    def zrem(self, key, member):
+        self.zsets.get(key, {}).pop(member, None)
+
+    def zremrangebyscore(self, key, low, high):
+        zset = self.zsets.get(key, {})
+        high = float("inf") if high == "+inf" else float(high)
+        for member in [m for m, score in zset.items() if score <= high]:
+            del zset[member]
+
+    def zcount(self, key, low, high):
+        high = float("inf") if high == "+inf" else float(high)
+        return sum(1 for score in self.zsets.get(key, {}).values() if float(low) <= score <= high)
+
+    # sets
+    def sadd(self, key, member):
+        self.sets.setdefault(key, set()).add(member)
+
+    def smembers(self, key):
+        return set(self.sets.get(key, set()))
+
+    # hashes
+    def hincrbyfloat(self, key, field, amount):
+        bucket = self.hashes.setdefault(key, {})
+        bucket[field] = bucket.get(field, 0.0) + float(amount)
+        return bucket[field]
+
+    def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    # streams (ids are "<ms>-<seq>")
+    def xadd(self, key, fields, id="*", maxlen=None, approximate=True):
+        import time
+        entries = self.streams.setdefault(key, [])
+        ms = int(time.time() * 1000)
+        last_ms, last_seq = map(int, entries[-1][0].split("-")) if entries else (0, -1)
+        entry_id = f"{ms}-0" if ms > last_ms else f"{last_ms}-{last_seq + 1}"
+        entries.append((entry_id, {k.encode() if isinstance(k, str) else k: v for k, v in fields.items()}))
+        if maxlen is not None:
+            del entries[:-maxlen]
+        return entry_id
+
+    @staticmethod
+    def _stream_bound(value, open_end, default_seq):
+        if value == open_end:
+            return (default_seq, default_seq)
+        ms, _, seq = str(value).partition("-")
+        return (int(ms), int(seq) if seq else default_seq)
+
+    def _stream_range(self, key, low, high):
+        lo = self._stream_bound(low, "-", 0)
+        hi = self._stream_bound(high, "+", float("inf"))
+        return [e for e in self.streams.get(key, [])
+                if lo <= tuple(map(int, e[0].split("-"))) <= hi]
+
+    def xrange(self, key, min="-", max="+", count=None):
+        return self._stream_range(key, min, max)[:count]
+
+    def xrevrange(self, key, max="+", min="-", count=None):
+        return list(reversed(self._stream_range(key, min, max)))[:count]
+
+    def xtrim(self, key, maxlen=None, minid=None, approximate=True):
+        entries = self.streams.get(key, [])
+        if minid is not None:
+            floor = tuple(map(int, minid.split("-")))
+            self.streams[key] = [e for e in entries if tuple(map(int, e[0].split("-"))) >= floor]
+        return len(entries) - len(self.streams.get(key, []))
+
+    def publish(self, channel, message):
+        import json
+        self.published.append((channel, json.loads(message)))
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self)
+
+
+class _FakePipeline:
+    def __init__(self, client):
+        self._client = client
+        self._results = []
+
+    def __getattr__(self, name):
+        method = getattr(self._client, name)
+
+        def queued(*args, **kwargs):
+            self._results.append(method(*args, **kwargs))
+            return self
+        return queued
+
+    def execute(self):
+        results, self._results = self._results, []
+        return results
+
+
+@pytest.fixture
+def fake_cache_redis(monkeypatch):
+    """Point preview_cache at a FakeCacheRedis with a fresh local tier."""
+    from backend.services import preview_cache as cache_module
+    from backend.services.preview_cache import LocalLRUCache
+
+    client = FakeCacheRedis()
+    monkeypatch.setattr(cache_module, "get_redis_client", lambda: client)
+    monkeypatch.setattr(cache_module, "get_redis_binary_client", lambda: client)
+    monkeypatch.setattr(cache_module, "_local_tier", LocalLRUCache(max_bytes=10_000, max_ttl_seconds=300))
+    monkeypatch.setattr(cache_module, "_ensure_invalidation_listener", lambda: None)
+    monkeypatch.setattr(cache_module, "_redis_tier_stats", {"hits": 0, "misses": 0})
+    monkeypatch.setattr(cache_module, "_generation_cache", {})
+    return client
@@ -0,0 +1,94 @@
+"""Tests for the versioned cache payload codecs."""
+import json
+
+import pytest
+
+from backend.services import cache_codec
+from backend.services.cache_codec import decode_payload, encode_payload, get_codec, payload_body_size
+
+PAYLOAD = {
+    "title": "Build Better Software",
+    "tags": ["saas", "developer tools"],
+    "blueprint": {"template_type": "hero", "primary_color": "#3B82F6", "coherence_score": 0.91},
+    "quality_scores": {"overall": 0.88, "debug": {"retry_attempts_used": 1, "thresholds": None}},
+    "primary_image_base64": "iVBORw0KGgo" * 200,
+}
+
+
+@pytest.mark.parametrize("codec_name", ["json", "msgpack", "msgpack+zstd"])
+def test_round_trip_per_codec(codec_name):
+    codec = get_codec(codec_name)
+    if codec.name != codec_name:
+        pytest.skip(f"{codec_name} not installed")
+
+    payload = encode_payload(PAYLOAD, codec)
+
+    assert payload.startswith(cache_codec.MAGIC)
+    assert payload[len(cache_codec.MAGIC) + 1] == codec.codec_id
+    assert decode_payload(payload) == PAYLOAD
+
+
+@pytest.mark.parametrize("codec_name", ["json", "msgpack", "msgpack+zstd"])
+def test_body_size_is_the_uncompressed_length(codec_name):
+    codec = get_codec(codec_name)
+    if codec.name != codec_name:
+        pytest.skip(f"{codec_name} not installed")
+    uncompressed = get_codec("msgpack" if codec_name != "json" else "json").encode_body(PAYLOAD)
+
+    assert payload_body_size(encode_payload(PAYLOAD, codec)) == len(uncompressed)
+    assert payload_body_size(json.dumps(PAYLOAD)) == len(json.dumps(PAYLOAD))
+
+
+def test_legacy_json_entries_still_decode():
+    legacy = json.dumps(PAYLOAD)
+
+    assert decode_payload(legacy) == PAYLOAD
+    assert decode_payload(legacy.encode("utf-8")) == PAYLOAD
+
+
+def test_newer_format_version_is_rejected():
+    payload = bytearray(encode_payload(PAYLOAD, get_codec("json")))
+    payload[len(cache_codec.MAGIC)] = cache_codec.FORMAT_VERSION + 1
+
+    with pytest.raises(ValueError):
+        decode_payload(bytes(payload))
+
+
+def test_compressed_payload_is_smaller_than_json():
+    codec = get_codec("msgpack+zstd")
+    if codec.name != "msgpack+zstd":
+        pytest.skip("zstandard not installed")
+
+    assert len(encode_payload(PAYLOAD, codec)) < len(json.dumps(PAYLOAD)) / 4
+
+
+def test_dictionary_entries_decode_after_rotation():
+    if not (cache_codec.MSGPACK_AVAILABLE and cache_codec.ZSTD_AVAILABLE):
+        pytest.skip("zstandard not installed")
+    samples = [
+        {**PAYLOAD, "title": f"Page {i}", "blueprint": {**PAYLOAD["blueprint"], "coherence_score": i / 100}}
+        for i in range(200)
+    ]
+    old_dict = cache_codec.train_dictionary(samples, dict_size=4096)
+    new_dict = cache_codec.train_dictionary(samples[::-1], dict_size=2048)
+    codec = get_codec("msgpack+zstd")
+    try:
+        cache_codec.dictionaries.register(old_dict)
+        written_with_old = encode_payload(PAYLOAD, codec)
+        cache_codec.dictionaries.register(new_dict)
+
+        assert decode_payload(written_with_old) == PAYLOAD
+        assert decode_payload(encode_payload(PAYLOAD, codec)) == PAYLOAD
+    finally:
+        cache_codec.dictionaries.reset()
+
+
+def test_stats_report_ratio_and_timings():
+    cache_codec.stats.reset()
+    decode_payload(encode_payload(PAYLOAD))
+
+    report = cache_codec.get_codec_stats()
+
+    assert report["encodes"] == 1 and report["decodes"] == 1
+    assert report["compression_ratio_vs_json"] is not None
+    assert report["avg_encode_ms"] >= 0.0
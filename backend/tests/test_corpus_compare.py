@@ -0,0 +1,92 @@
+"""Tests for corpus run tables and run-to-run regression diffing."""
+import json
+import random
+
+from backend.scripts.preview_engine.run_corpus import (
+    aggregate,
+    compare_runs,
+    format_tables,
+    holm_adjust,
+    main,
+    mann_whitney_greater,
+)
+
+
+def _run(seed, capture_ms=1000.0, render_ms=400.0, ok_rate=1.0, title_rate=1.0, n=12):
+    rng = random.Random(seed)
+    records = []
+    for i in range(n):
+        category = "saas_landing" if i % 2 else "ecommerce"
+        capture = capture_ms * rng.uniform(0.9, 1.1)
+        render = render_ms * rng.uniform(0.9, 1.1)
+        ok = rng.random() < ok_rate
+        records.append({
+            "url": f"https://site{i}.example",
+            "category": category,
+            "status": "ok" if ok else "fail",
+            "title_match": ok and rng.random() < title_rate,
+            "processing_time_ms": round(capture + render),
+            "visual_quality": 0.8,
+            "stages": {"capture": round(capture, 1), "render": round(render, 1)},
+        })
+    return records
+
+
+def test_aggregate_adds_category_and_stage_tables():
+    summary = aggregate(_run(1))
+
+    assert set(summary["by_category"]) == {"saas_landing", "ecommerce"}
+    assert summary["by_category"]["ecommerce"]["total"] == 6
+    assert list(summary["stages"]) == ["capture", "render"]  # ordered by total time
+    assert abs(sum(s["share"] for s in summary["stages"].values()) - 1.0) < 0.01
+    assert "capture" in format_tables(summary)
+
+
+def test_mann_whitney_detects_shift_and_ignores_noise():
+    rng = random.Random(0)
+    base = [rng.gauss(100, 5) for _ in range(20)]
+    assert mann_whitney_greater(base, [v * 1.3 for v in base]) < 0.001
+    assert mann_whitney_greater(base, [rng.gauss(100, 5) for _ in range(20)]) > 0.05
+    assert mann_whitney_greater(base, [1.0, 2.0]) is None
+
+
+def test_compare_flags_slower_stage_but_not_noise():
+    result = compare_runs(_run(1), _run(2, render_ms=600.0))
+    flagged = {(c["scope"], c["name"], c["metric"]) for c in result["regressions"]}
+
+    assert ("stage", "render", "latency_ms") in flagged
+    assert ("stage", "capture", "latency_ms") not in flagged
+    assert compare_runs(_run(1), _run(2))["regressions"] == []
+
+
+def test_holm_adjust_steps_down_and_keeps_order():
+    assert holm_adjust([0.01, None, 0.04, 0.03]) == [0.03, None, 0.06, 0.06]
+
+
+def test_identical_runs_report_no_regressions_without_effect_floors():
+    # 14 checks per pair at alpha=0.05: uncorrected, a few of these pairs
+    # would flag something purely by chance.
+    for seed in range(0, 40, 2):
+        result = compare_runs(_run(seed, n=40), _run(seed + 1, n=40),
+                              min_latency_change=0.0, min_quality_drop=0.0)
+        assert result["regressions"] == [], seed
+
+
+def test_compare_flags_quality_drop():
+    result = compare_runs(_run(1, n=40), _run(2, n=40, title_rate=0.3))
+    flagged = {(c["name"], c["metric"]) for c in result["regressions"]}
+
+    assert ("all", "title_fidelity") in flagged
+
+
+def test_compare_subcommand_exit_code(tmp_path, capsys):
+    for name, records in (("base", _run(1)), ("same", _run(2)), ("slow", _run(3, capture_ms=1500.0))):
+        run_dir = tmp_path / name
+        run_dir.mkdir()
+        for i, record in enumerate(records):
+            (run_dir / f"{i}.json").write_text(json.dumps(record))
+        (run_dir / "SUMMARY.json").write_text(json.dumps(aggregate(records)))
+
+    assert main(["compare", str(tmp_path / "base"), str(tmp_path / "same")]) == 0
+    assert main(["compare", str(tmp_path / "base"), str(tmp_path / "slow")]) == 1
+    assert "REGRESSION" in capsys.readouterr().out
@@ -163,6 +163,41 @@ class TestDemoFlowErrorHandling:
         validate_url_security("https://example.com")
         validate_url_security("http://localhost:3000")
 
+    def _create_job(self, profile, user):
+        """Call create_demo_job with the queue and auth lookups patched out."""
+        from backend.api.v1 import routes_demo_optimized as routes
+        from backend.schemas.demo_schemas import DemoJobRequest
+
+        db = MagicMock()
+        db.query.return_value.filter.return_value.first.return_value = user
+        request_data = DemoJobRequest(url="https://example.com", quality_mode="fast", profile=profile)
+        with patch.object(routes, "get_authenticated_user_id", return_value=user.id if user else None), \
+                patch.object(routes, "check_rate_limit", return_value=True), \
+                patch.object(routes, "get_rq_redis_connection"), \
+                patch.object(routes, "Queue"), \
+                patch.object(routes, "log_activity"), \
+                patch.object(routes, "enqueue_traced", return_value=MagicMock(id="job-1")) as enqueue:
+            response = routes.create_demo_job(request_data, MagicMock(), db)
+        return response, enqueue
+
+    def test_profiled_demo_job_requires_an_admin(self):
+        """profile=True is refused for anonymous and non-admin callers."""
+        from fastapi import HTTPException
+
+        for user in (None, MagicMock(id=7, is_admin=False)):
+            with pytest.raises(HTTPException) as exc:
+                self._create_job(True, user)
+            assert exc.value.status_code == 403
+
+    def test_profile_flag_reaches_the_job(self):
+        """An admin's profile flag is enqueued with the job; plain jobs stay unprofiled."""
+        response, enqueue = self._create_job(True, MagicMock(id=1, is_admin=True))
+        assert response.job_id == "job-1"
+        assert enqueue.call_args.args[2:] == ("https://example.com/", "fast", True)
+
+        _, enqueue = self._create_job(False, None)
+        assert enqueue.call_args.args[2:] == ("https://example.com/", "fast", False)
+
 
 class TestQualityGatePaths:
     """Validate quality gate logic and thresholds."""
@@ -0,0 +1,71 @@
+"""Tests for the process-wide font registry."""
+import os
+import shutil
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from backend.services import font_registry
+from backend.services.font_manager import FontManager
+from backend.services.font_registry import FontRegistry, style_weight
+from backend.services.preview_image_generator import _load_font
+
+FONT_DIR = "/usr/share/fonts/truetype/dejavu"
+pytestmark = pytest.mark.skipif(not os.path.isdir(FONT_DIR), reason="DejaVu fonts not installed")
+
+
+def test_index_resolves_families_and_weights_and_caches_instances():
+    registry = FontRegistry([FONT_DIR], max_instances=2, prefetch_enabled=False)
+    assert "DejaVu Sans" in registry.families() and "DejaVu Sans Mono" in registry.families()
+    assert registry.find("dejavu-sans", 600).path.endswith("DejaVuSans-Bold.ttf")
+    assert registry.find("DejaVu Sans", 300).path.endswith("DejaVuSans.ttf")
+    assert style_weight("SemiBold Italic") == (600, True) and style_weight("Book") == (400, False)
+
+    font = registry.font(["Inter", "DejaVu Serif"], 40, weight=700)
+    assert font.path.endswith("DejaVuSerif-Bold.ttf") and registry.font("DejaVu Serif", 40, weight=700) is font
+    assert registry.font("Missing", 40).path.endswith("DejaVuSans.ttf")  # SANS_FALLBACKS
+    registry.font("DejaVu Sans", 41)
+    assert registry.font("DejaVu Serif", 40, weight=700) is not font  # evicted (LRU of 2)
+
+    assert _load_font(8).size == 12 and _load_font(40) is _load_font(40)
+    assert _load_font(40, bold=False).path.endswith("DejaVuSans.ttf")
+
+
+def test_missing_family_renders_with_fallback_while_download_runs(tmp_path, monkeypatch):
+    release = threading.Event()
+    downloads = []
+
+    def download_font(name, weight):
+        downloads.append((name, weight))
+        release.wait(10)
+        path = tmp_path / f"{name.lower()}-{weight}.ttf"
+        shutil.copy(f"{FONT_DIR}/DejaVuSerif-Bold.ttf", path)
+        return str(path)
+
+    monkeypatch.setattr(font_registry, "get_font_manager", lambda: SimpleNamespace(download_font=download_font))
+    registry = FontRegistry([FONT_DIR], prefetch_enabled=True)
+
+    assert registry.font("Inter", 40, weight=700).path.endswith("DejaVuSans-Bold.ttf")  # no wait
+    futures = registry.prefetch(["Inter", "Impact"], weight=700)  # Impact isn't downloadable
+    assert len(futures) == 1 and registry.prefetch(["Inter"], weight=700) == []
+    release.set()
+    assert futures[0].result(10).weight == 700
+    assert registry.font("Inter", 40, weight=700).path == str(tmp_path / "inter-700.ttf")
+    assert downloads == [("Inter", 700)]
+    assert FontRegistry([FONT_DIR], prefetch_enabled=False).prefetch(["Inter"]) == []
+
+
+def test_font_manager_schedules_downloads_instead_of_blocking(tmp_path, monkeypatch):
+    prefetched = []
+    registry = FontRegistry([FONT_DIR], prefetch_enabled=False)
+    monkeypatch.setattr(registry, "prefetch", lambda families, weight=400: prefetched.append((list(families), weight)))
+    monkeypatch.setattr(font_registry, "_registry", registry)
+
+    manager = FontManager(cache_dir=tmp_path)
+    monkeypatch.setattr(manager, "download_font", lambda *a, **k: pytest.fail("downloaded during a render"))
+    assert manager._system_fonts["dejavusans-bold"] == f"{FONT_DIR}/DejaVuSans-Bold.ttf"
+
+    typography = manager.get_typography_for_personality("friendly")
+    assert typography.headline_font.path == f"{FONT_DIR}/DejaVuSans.ttf"  # the personality's fallback
+    assert (["Nunito", "Poppins", "Quicksand", "Lato"], 600) in prefetched
@@ -0,0 +1,81 @@
+"""Tests for the shared, cached post-processing effects."""
+import math
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from backend.services import image_effects
+from backend.services.adaptive_template_engine import apply_noise_texture
+from backend.services.depth_engine import DepthEngine, ElevationLevel, create_glow_effect, create_inner_shadow
+from backend.services.quality_assurance_engine import QualityAssuranceEngine
+
+
+def test_vignette_mask_matches_per_pixel_formula_and_is_cached():
+    width, height, intensity = 61, 40, 0.3
+    mask = np.asarray(image_effects.vignette_mask((width, height), intensity))
+    cx, cy = width // 2, height // 2
+    max_dist = math.sqrt(cx ** 2 + cy ** 2)
+    expected = np.array([
+        [int(255 * (1 - (math.hypot(x - cx, y - cy) / max_dist) ** 2 * intensity)) for x in range(width)]
+        for y in range(height)
+    ])
+    assert np.abs(mask.astype(int) - expected).max() <= 1
+    assert image_effects.vignette_mask((width, height), intensity) is image_effects.vignette_mask(
+        (width, height), intensity)
+
+
+def test_qa_vignette_darkens_corners_only():
+    image = Image.new('RGB', (200, 100), (200, 200, 200))
+    result = QualityAssuranceEngine()._apply_vignette(image, intensity=0.3)
+    assert result.mode == 'RGBA'
+    assert result.getpixel((100, 50))[3] == 255
+    assert result.getpixel((0, 0))[3] < 200
+
+
+def test_noise_is_monochrome_bounded_and_keeps_alpha():
+    image = Image.new('RGBA', (120, 80), (100, 150, 200, 77))
+    noisy = np.asarray(apply_noise_texture(image, intensity=0.04)).astype(int)
+    delta = noisy[..., :3] - np.array([100, 150, 200])
+
+    assert (delta[..., 0] == delta[..., 1]).all() and (delta[..., 1] == delta[..., 2]).all()
+    assert np.abs(delta).max() <= int(0.5 * 255 * 0.04)
+    assert delta.std() > 1
+    assert (noisy[..., 3] == 77).all()
+
+
+def test_inner_shadow_matches_line_drawing():
+    base = Image.new('RGBA', (80, 60), (200, 210, 220, 255))
+    bounds, depth = (10, 5, 50, 40), 4
+
+    reference = base.copy()
+    shadow = Image.new('RGBA', bounds[2:], (0, 0, 0, 0))
+    draw = ImageDraw.Draw(shadow)
+    for i in range(depth):
+        alpha = int(50 * (1 - i / depth))
+        draw.line([(0, i), (bounds[2], i)], fill=(0, 0, 0, alpha))
+    for i in range(depth):
+        alpha = int(50 * (1 - i / depth))
+        draw.line([(i, 0), (i, bounds[3])], fill=(0, 0, 0, alpha))
+    reference.paste(shadow, bounds[:2], shadow)
+
+    assert np.array_equal(np.asarray(create_inner_shadow(base.copy(), bounds, depth)), np.asarray(reference))
+
+
+def test_glow_and_drop_shadow_are_positioned_on_the_element():
+    image = Image.new('RGBA', (400, 300), (255, 255, 255, 255))
+    glowing = create_glow_effect(image, (150, 120, 100, 60), (255, 0, 0), intensity=10)
+    assert glowing.size == (400, 300)
+    assert glowing.getpixel((145, 150))[1] < 255   # tinted just outside the element
+    assert glowing.getpixel((20, 20)) == (255, 255, 255, 255)
+
+    engine = DepthEngine()
+    element = Image.new('RGBA', (100, 50), (255, 255, 255, 255))
+    shadow = engine.get_shadow_composition(ElevationLevel.FLOATING, "modern")
+    canvas = engine.apply_shadow_to_image(element, (100, 100, 100, 50), shadow, canvas_size=(400, 300))
+    assert canvas.getpixel((150, 125)) == (255, 255, 255, 255)
+    assert canvas.getpixel((150, 155))[3] > 0       # shadow below the element
+    assert canvas.getpixel((10, 10))[3] == 0
+
+    before = image_effects.blurred_box_mask.cache_info().hits
+    engine.apply_shadow_to_image(element, (50, 50, 100, 50), shadow, canvas_size=(400, 300))
+    assert image_effects.blurred_box_mask.cache_info().hits == before + 3
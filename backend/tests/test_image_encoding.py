@@ -0,0 +1,90 @@
+"""Tests for budgeted WebP/JPEG preview variants."""
+from io import BytesIO
+
+import pytest
+from PIL import Image, JpegImagePlugin
+
+from backend.services import image_encoding
+from backend.services.image_encoding import (
+    accepted_formats,
+    encode_to_budget,
+    encode_variants,
+    pick_variant,
+    quality_ladder,
+    upload_preview_image,
+    variant_key,
+)
+from backend.services.render_layers import normalize_stops, render_gradient
+
+
+@pytest.fixture(scope="module")
+def preview_png():
+    image = render_gradient((600, 315), normalize_stops([(37, 99, 235), (245, 158, 11)]), "diagonal")
+    buffer = BytesIO()
+    image.save(buffer, format="PNG", optimize=False)
+    return buffer.getvalue()
+
+
+def test_budget_search_picks_highest_fitting_quality(preview_png):
+    image = Image.open(BytesIO(preview_png))
+    sizes = {q: len(image_encoding._encode(image, image_encoding.FORMATS["webp"], q)) for q in quality_ladder()}
+    budget = sorted(sizes.values())[len(sizes) // 2]
+    expected = max(q for q, size in sizes.items() if size <= budget)
+
+    encoded = encode_to_budget(image, "webp", budget)
+    assert (encoded.quality, encoded.within_budget) == (expected, True)
+    assert encoded.size == sizes[expected]
+
+    floor = encode_to_budget(image, "webp", 100)
+    assert (floor.quality, floor.within_budget) == (quality_ladder()[-1], False)
+
+
+def test_variants_keep_png_and_full_chroma_jpeg(preview_png):
+    variants = encode_variants(preview_png, ["webp", "jpeg"], budget_bytes=150 * 1024)
+    assert variants["png"].data is preview_png
+    assert variants["webp"].data[8:12] == b"WEBP"
+    jpeg = Image.open(BytesIO(variants["jpeg"].data))
+    assert JpegImagePlugin.get_sampling(jpeg) == 0  # 4:4:4
+    assert variants["webp"].size < variants["png"].size and variants["jpeg"].size < variants["png"].size
+
+
+def test_accept_negotiation(monkeypatch):
+    assert accepted_formats(None) == ["png", "jpeg"]
+    assert accepted_formats("application/json") == []
+    assert accepted_formats("image/avif,image/webp,image/*;q=0.8,*/*;q=0.5") == ["png", "webp", "jpeg"]
+    assert accepted_formats("image/webp;q=0, image/png") == ["png"]
+
+    index = {
+        "png": {"url": "https://cdn/p.png", "bytes": 400_000, "content_type": "image/png"},
+        "webp": {"url": "https://cdn/p.webp", "bytes": 30_000, "content_type": "image/webp"},
+        "jpeg": {"url": "https://cdn/p.jpg", "bytes": 80_000, "content_type": "image/jpeg"},
+    }
+    monkeypatch.setattr(image_encoding, "get_cached_image_variants", lambda url: index if url.endswith("p.png") else None)
+    assert pick_variant("https://cdn/p.png", "image/webp,*/*")["url"] == "https://cdn/p.webp"
+    assert pick_variant("https://cdn/p.png", "*/*")["url"] == "https://cdn/p.jpg"
+    assert pick_variant("https://cdn/p.png", "application/json") == {"url": "https://cdn/p.png", "content_type": None}
+    assert pick_variant("https://cdn/other.png", "image/webp")["url"] == "https://cdn/other.png"
+
+
+def test_upload_stores_variants_next_to_png_write_behind(preview_png, monkeypatch):
+    uploads, indexed = {}, {}
+
+    def upload(data, filename, content_type):
+        uploads[filename] = content_type
+        return f"https://cdn/{filename}"
+
+    monkeypatch.setattr(image_encoding, "upload_file_to_r2", upload)
+    monkeypatch.setattr(image_encoding, "set_cached_image_variants", indexed.__setitem__)
+    monkeypatch.setattr(image_encoding, "_publisher", image_encoding.ImageVariantPublisher())
+
+    url = upload_preview_image(preview_png, "previews/demo/abc.png")
+    assert url == "https://cdn/previews/demo/abc.png"
+    assert image_encoding.flush_image_variants(timeout=30)
+    assert uploads == {
+        "previews/demo/abc.png": "image/png",
+        "previews/demo/abc.webp": "image/webp",
+        "previews/demo/abc.jpg": "image/jpeg",
+    }
+    assert set(indexed[url]) == {"png", "webp", "jpeg"}
+    assert indexed[url]["webp"]["url"] == "https://cdn/previews/demo/abc.webp"
+    assert variant_key("previews/x.v1/name", "jpeg") == "previews/x.v1/name.jpg"
@@ -0,0 +1,72 @@
+"""Tests for the per-job decoded-image cache, draft decoding and reduce-first resizing."""
+from io import BytesIO
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from backend.services.image_loading import current_image_cache, load_image, resize_image, track_images
+
+
+def _encode(image: Image.Image, fmt: str, **params) -> bytes:
+    buffer = BytesIO()
+    image.save(buffer, format=fmt, **params)
+    return buffer.getvalue()
+
+
+@pytest.fixture(scope="module")
+def photo():
+    x = np.linspace(0, 255, 1600)[None, :, None]
+    y = np.linspace(0, 255, 1200)[:, None, None]
+    pixels = np.concatenate([x + 0 * y, y + 0 * x, (x + y) / 2], axis=2)
+    noise = np.random.default_rng(3).normal(0, 6, pixels.shape)
+    return Image.fromarray(np.clip(pixels + noise, 0, 255).astype(np.uint8))
+
+
+def test_decodes_once_per_job_and_hands_out_copies(photo):
+    png = _encode(photo, "PNG")
+    assert current_image_cache() is None
+    load_image(png, "RGB")  # outside a job: nothing cached or counted
+
+    with track_images("test") as stats:
+        first = load_image(png, "RGB")
+        first.putpixel((0, 0), (1, 2, 3))
+        with track_images("nested") as inner:
+            second = load_image(bytes(png), "RGB")  # equal content, different object
+        rgba = load_image(png, "RGBA")
+
+    assert inner is stats
+    assert second.getpixel((0, 0)) != (1, 2, 3) and second.tobytes() == photo.tobytes()
+    assert rgba.mode == "RGBA"
+    assert (stats.decodes, stats.cache_hits, stats.drafted) == (3, 1, 0)
+    assert stats.decode_saved_ms > 0 and stats.to_dict()["saved_ms"] == round(stats.saved_ms, 1)
+
+
+def test_jpeg_draft_decodes_at_the_smallest_covering_scale(photo):
+    jpeg = _encode(photo, "JPEG", quality=90)
+    with track_images("test") as stats:
+        drafted = load_image(jpeg, "RGB", target=(100, 100))
+        assert drafted.size == (400, 300)  # 1/4 scale still covers 2x the target
+        assert load_image(jpeg, "RGB", target=(50, 50)).size == (400, 300)  # reuses the 1/4 decode
+        assert load_image(jpeg, "RGB").size == (1600, 1200)
+    assert (stats.decodes, stats.cache_hits, stats.drafted) == (3, 1, 1)
+    assert stats.decode_saved_ms > 0
+
+    full = Image.open(BytesIO(jpeg)).convert("RGB").resize((100, 75), Image.Resampling.LANCZOS)
+    thumb = resize_image(drafted, (100, 75))
+    assert np.abs(np.asarray(thumb, int) - np.asarray(full, int)).mean() < 2
+
+
+def test_resize_reduces_large_factors_before_lanczos(photo):
+    with track_images("test") as stats:
+        small = resize_image(photo, (200, 150))
+        medium = resize_image(photo, (1000, 750))
+        large = resize_image(photo, (2000, 1500))
+    assert (stats.resizes, stats.reduced) == (3, 1)
+    assert stats.resize_saved_ms > 0 and stats.resize_ms > 0
+
+    assert small.tobytes() == photo.resize((200, 150), Image.Resampling.LANCZOS, reducing_gap=2.0).tobytes()
+    assert medium.tobytes() == photo.resize((1000, 750), Image.Resampling.LANCZOS).tobytes()
+    assert large.size == (2000, 1500)
+    exact = np.asarray(photo.resize((200, 150), Image.Resampling.LANCZOS), int)
+    assert np.abs(np.asarray(small, int) - exact).mean() < 1
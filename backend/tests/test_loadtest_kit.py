@@ -0,0 +1,132 @@
+"""Tests for the local load-test stand-ins and driver (loopback only)."""
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+
+import pytest
+import requests
+from openai import OpenAI
+
+from backend.core.config import settings
+from backend.scripts.loadtest import driver, fake_openai, object_store, site_farm
+from backend.services import r2_client
+from backend.services.pipeline_hooks import InputValidator
+from backend.services.preview.corpus.golden_corpus import get_corpus
+
+
+def _base(server):
+    return "http://%s:%s" % server.server_address[:2]
+
+
+def test_fake_openai_speaks_the_sdk_protocol():
+    rules = [{"match": "brand", "content": {"brand_name": "Acme"}}]
+    state = fake_openai.FakeOpenAI(latency="fixed:0", rules=rules, seed=1)
+    server = fake_openai.serve(state)
+    try:
+        client = OpenAI(api_key="sk-test", base_url=_base(server) + "/v1", max_retries=0)
+        default = client.chat.completions.create(
+            model="gpt-4o-mini", messages=[{"role": "user", "content": "Describe the page"}]
+        )
+        canned = client.chat.completions.create(
+            model="gpt-4o", messages=[{"role": "user", "content": "Extract the BRAND colors"}]
+        )
+    finally:
+        server.shutdown()
+
+    assert json.loads(default.choices[0].message.content)["title"]
+    assert json.loads(canned.choices[0].message.content) == {"brand_name": "Acme"}
+    assert canned.usage.total_tokens > 0
+    assert state.requests == 2
+
+    failing = fake_openai.FakeOpenAI(latency="fixed:0", error_rate=1.0)
+    status, _ = failing.respond({"messages": []})
+    assert status in (429, 500)
+    with pytest.raises(ValueError):
+        fake_openai.parse_latency("gamma:1")
+
+
+def test_upload_file_to_r2_round_trips_through_object_store(monkeypatch):
+    store = object_store.ObjectStore()
+    server = object_store.serve(store)
+    base = _base(server)
+    monkeypatch.setattr(settings, "R2_ENDPOINT_URL", base)
+    monkeypatch.setattr(settings, "R2_ACCESS_KEY_ID", "loadtest")
+    monkeypatch.setattr(settings, "R2_SECRET_ACCESS_KEY", "loadtest")
+    monkeypatch.setattr(settings, "R2_BUCKET_NAME", "bucket")
+    monkeypatch.setattr(settings, "R2_PUBLIC_BASE_URL", f"{base}/bucket")
+    try:
+        url = r2_client.upload_file_to_r2(b"\x89PNG-bytes", "previews/a.png", "image/png")
+        fetched = requests.get(url, timeout=5)
+    finally:
+        server.shutdown()
+
+    assert url == f"{base}/bucket/previews/a.png"
+    assert fetched.status_code == 200
+    assert fetched.content == b"\x89PNG-bytes"
+    assert fetched.headers["Content-Type"] == "image/png"
+    assert store.puts == 1
+
+
+def test_decode_aws_chunked():
+    framed = b"5;chunk-signature=ab\r\nhello\r\n6\r\n world\r\n0\r\nx-amz-checksum-crc32:AAAA\r\n\r\n"
+    assert object_store.decode_aws_chunked(framed) == b"hello world"
+
+
+def test_site_farm_serves_corpus_pages_allowed_by_validator(monkeypatch):
+    entries = get_corpus()[:3]
+    server = site_farm.serve(site_farm.SiteFarm(entries))
+    try:
+        index = requests.get(_base(server) + "/index.json", timeout=5).json()
+        page = requests.get(index[0]["url"], timeout=5)
+        missing = requests.get(_base(server) + "/nope/", timeout=5)
+    finally:
+        server.shutdown()
+
+    assert [e["source"] for e in index] == [e.url for e in entries]
+    assert page.status_code == 200 and "og:title" in page.text
+    assert missing.status_code == 404
+
+    with pytest.raises(ValueError):
+        InputValidator.validate_url(index[0]["url"])
+    monkeypatch.setattr(InputValidator, "ALLOWED_PRIVATE_HOSTS", frozenset({"127.0.0.1"}))
+    assert InputValidator.validate_url(index[0]["url"]) == index[0]["url"]
+
+
+def test_driver_reports_throughput_errors_and_percentiles():
+    calls = {"n": 0}
+
+    class _Api(BaseHTTPRequestHandler):
+        def do_POST(self):  # noqa: N802
+            self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            calls["n"] += 1
+            status = 429 if calls["n"] % 4 == 0 else 200
+            body = b'{"title": "ok"}'
+            self.send_response(status)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            return
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Api)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        config = driver.LoadConfig(
+            api=_base(server), urls=["http://127.0.0.1/x/"], mix=driver.parse_mix("preview=1"),
+            concurrency=2, duration_s=30, max_requests=8, seed=3,
+        )
+        report = driver.LoadDriver(config).run()
+    finally:
+        server.shutdown()
+
+    overall = report["overall"]
+    assert overall["count"] == 8
+    assert overall["ok"] == 6
+    assert overall["errors"] == {"http_429": 2}
+    assert overall["error_rate"] == 0.25
+    assert overall["p50_ms"] is not None and overall["throughput_per_s"] > 0
+    assert driver.percentile([10, 20, 30, 40], 50) == 20
+    assert driver.percentile([10, 20, 30, 40], 99) == 40
+    with pytest.raises(ValueError):
+        driver.parse_mix("scrape=1")
@@ -0,0 +1,78 @@
+"""Tests for the in-process metrics registry and Prometheus exposition."""
+import pytest
+from fastapi import HTTPException
+
+from backend.services.pipeline_context import PipelineContext
+from backend.services.preview.observability import metrics as metrics_module
+from backend.services.preview.observability.metrics import MetricsRegistry
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    hist = registry.histogram("demo_seconds", "Demo.", ("stage",), buckets=(0.1, 1.0))
+    hist.observe(0.05, stage="capture")
+    hist.observe(0.1, stage="capture")
+    hist.observe(3.0, stage="capture")
+
+    text = registry.render()
+
+    assert "# TYPE demo_seconds histogram" in text
+    assert 'demo_seconds_bucket{stage="capture",le="0.1"} 2' in text
+    assert 'demo_seconds_bucket{stage="capture",le="1"} 2' in text
+    assert 'demo_seconds_bucket{stage="capture",le="+Inf"} 3' in text
+    assert 'demo_seconds_count{stage="capture"} 3' in text
+    assert 'demo_seconds_sum{stage="capture"} 3.15' in text
+
+
+def test_counter_rejects_wrong_labels():
+    registry = MetricsRegistry()
+    counter = registry.counter("hits", "Hits.", ("tier",))
+    counter.inc(tier="local")
+    try:
+        counter.inc(result="hit")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("expected ValueError for unknown label")
+    assert 'hits_total{tier="local"} 1' in registry.render()
+
+
+def test_flush_to_redis_aggregates_work_horse_deltas(fake_cache_redis):
+    registry = MetricsRegistry()
+    counter = registry.counter("jobs", "Jobs.", ("queue",))
+    counter.inc(queue="preview_generation")
+    registry.flush_to_redis(fake_cache_redis, "metrics:w1")
+    counter.inc(2, queue="preview_generation")
+    registry.flush_to_redis(fake_cache_redis, "metrics:w1")
+
+    merged = MetricsRegistry.load_from_redis(fake_cache_redis, "metrics:w1")
+
+    assert registry.snapshot() == {}
+    assert 'jobs_total{queue="preview_generation"} 3' in registry.render(extra=merged)
+
+
+def test_pipeline_stages_feed_stage_duration_histogram():
+    metrics_module.STAGE_DURATION.reset()
+    ctx = PipelineContext.create(url="https://example.com")
+    with ctx.stage("capture"):
+        pass
+
+    text = metrics_module.render_metrics()
+
+    assert 'preview_stage_duration_seconds_count{stage="capture",status="ok"} 1' in text
+
+
+def test_api_metrics_endpoint_requires_the_metrics_token(monkeypatch):
+    from backend import main
+
+    monkeypatch.delenv("PREVIEW_METRICS_TOKEN", raising=False)
+    with pytest.raises(HTTPException) as disabled:
+        main.metrics(authorization="Bearer anything")
+    assert disabled.value.status_code == 404
+
+    monkeypatch.setenv("PREVIEW_METRICS_TOKEN", "s3cret")
+    for header in (None, "Bearer wrong", "s3cret"):
+        with pytest.raises(HTTPException) as denied:
+            main.metrics(authorization=header)
+        assert denied.value.status_code == 401
+    assert b"# TYPE" in main.metrics(authorization="Bearer s3cret").body
@@ -0,0 +1,150 @@
+"""Tests for cooperative cancellation and deadline propagation."""
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+from backend.services import cancellation
+from backend.services.cancellation import (
+    CancellationToken,
+    DeadlineExceeded,
+    PipelineCancelled,
+    bind_current,
+    bounded_timeout,
+    current_token,
+    use_token,
+)
+from backend.services.pipeline_context import PipelineContext
+from backend.services.preview.observability.job_trace import JobTraceStore
+
+
+def test_bounded_timeout_clamps_to_remaining_deadline(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(cancellation.time, "monotonic", lambda: now[0])
+    token = CancellationToken.with_timeout(10)
+
+    with use_token(token):
+        assert bounded_timeout(60) == 10
+        now[0] += 9.5
+        # Never hand a client 0, which several treat as "no timeout"
+        assert bounded_timeout(60) == 1.0
+        now[0] += 1
+        with pytest.raises(DeadlineExceeded):
+            bounded_timeout(60)
+
+
+def test_no_token_keeps_default_timeouts():
+    assert current_token().remaining() is None
+    assert bounded_timeout(45) == 45
+
+
+def test_bind_current_propagates_token_to_worker_threads():
+    token = CancellationToken()
+    with use_token(token), ThreadPoolExecutor(max_workers=1) as executor:
+        assert executor.submit(bind_current(current_token)).result() is token
+        assert executor.submit(current_token).result() is not token
+
+
+def test_stage_entry_stops_cancelled_job_and_records_it():
+    token = CancellationToken()
+    ctx = PipelineContext.create(url="https://example.com", cancel_token=token)
+    with ctx.stage("capture"):
+        pass
+
+    ctx.cancel("user navigated away")
+
+    with pytest.raises(PipelineCancelled, match="user navigated away"):
+        with ctx.stage("classify"):
+            pytest.fail("stage body must not run after cancellation")
+    assert ctx.stages[-1].name == "classify"
+    assert ctx.stages[-1].skipped is True
+
+
+def test_context_without_caller_token_expires_with_budget(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(cancellation.time, "monotonic", lambda: now[0])
+    ctx = PipelineContext.create(url="https://example.com", total_budget_seconds=5)
+
+    assert ctx.should_stop() is False
+    now[0] += 6
+    assert ctx.is_expired() is True
+    with pytest.raises(DeadlineExceeded):
+        ctx.check_cancelled("image_generation")
+
+
+
+def _latest_trace():
+    return JobTraceStore.get_instance().list_recent(limit=1)[0]
+
+
+def _engine_failing_quality(monkeypatch, token, on_assess, renders):
+    """Engine with stubbed capture/extraction whose quality gate always asks for a retry."""
+    from backend.services import preview_engine
+    from backend.services.preview_engine import PreviewEngine, PreviewEngineConfig
+
+    def render(*args, **kwargs):
+        renders.append(f"https://cdn/preview-{len(renders)}.png")
+        return renders[-1]
+
+    def assess_quality(**kwargs):
+        on_assess()
+        return SimpleNamespace(
+            overall_quality_score=0.3, design_fidelity_score=0.3, visual_quality_score=0.3,
+            extraction_quality_score=0.3, contrast_score=None, should_retry=True,
+            suggestions=["boost contrast"],
+            quality_level=SimpleNamespace(value="poor"), gate_status=SimpleNamespace(value="retry"),
+        )
+
+    monkeypatch.setattr(preview_engine, "upload_file_to_r2", lambda *a, **k: "https://cdn/screenshot.png")
+    engine = PreviewEngine(PreviewEngineConfig(
+        is_demo=True, enable_cache=False, enable_ui_element_extraction=False, cancel_token=token,
+    ))
+    monkeypatch.setattr(engine, "_capture_page", lambda url: (b"png", "<title>Acme</title>", {}))
+    monkeypatch.setattr(engine, "_extract_brand_elements", lambda *a, **k: {})
+    monkeypatch.setattr(engine, "_extract_from_html_only", lambda *a, **k: {"title": "Acme widgets for teams"})
+    monkeypatch.setattr(engine, "_generate_composited_image", render)
+    engine.quality_orchestrator = SimpleNamespace(
+        assess_quality=assess_quality, enforce_quality_gates=lambda metrics: False,
+    )
+    return engine
+
+
+def test_deadline_during_quality_retry_ships_the_latest_preview(monkeypatch, fake_cache_redis):
+    now = [0.0]
+    monkeypatch.setattr(cancellation.time, "monotonic", lambda: now[0])
+    renders = []
+
+    def past_deadline():
+        now[0] += 61
+
+    engine = _engine_failing_quality(monkeypatch, CancellationToken.with_timeout(60), past_deadline, renders)
+    result = engine.generate("https://acme.example")
+
+    assert len(renders) == 2  # the initial render and the retry that crossed the deadline
+    assert result.composited_preview_image_url == renders[-1]
+    assert result.quality_scores["debug"]["final_decision"] == "deadline"
+    assert "Quality retries stopped at the job deadline" in result.warnings
+    trace = _latest_trace()
+    assert (trace["terminal_status"], trace["failure_reason"]) == ("finished", "quality_budget_exceeded")
+
+
+def test_deadline_before_a_preview_exists_is_not_reported_as_shipped(monkeypatch, fake_cache_redis):
+    now = [0.0]
+    monkeypatch.setattr(cancellation.time, "monotonic", lambda: now[0])
+    token = CancellationToken.with_timeout(60)
+    engine = _engine_failing_quality(monkeypatch, token, lambda: None, [])
+    now[0] += 61
+
+    with pytest.raises(DeadlineExceeded):
+        engine.generate("https://acme.example")
+    trace = _latest_trace()
+    assert (trace["terminal_status"], trace["failure_reason"]) == ("failed", "deadline_exceeded")
+
+
+def test_cancellation_during_quality_retry_still_aborts(monkeypatch, fake_cache_redis):
+    token = CancellationToken()
+    engine = _engine_failing_quality(monkeypatch, token, lambda: token.cancel("user navigated away"), [])
+
+    with pytest.raises(PipelineCancelled, match="user navigated away"):
+        engine.generate("https://acme.example")
+    assert _latest_trace()["failure_reason"] == "job_cancelled"
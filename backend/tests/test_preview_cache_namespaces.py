@@ -0,0 +1,64 @@
+"""Tests for generation-counter namespaces and maintained cache indexes."""
+from backend.services import preview_cache as cache_module
+from backend.services.preview_cache import flush_namespace, generate_cache_key, namespace_for_prefix
+
+URL = "https://example.com/pricing"
+
+
+def test_prefixes_map_to_namespaces():
+    assert namespace_for_prefix("demo:preview:v3:ultra:") == "demo"
+    assert namespace_for_prefix("preview:analysis:abc") == "analysis"
+    assert namespace_for_prefix("preview:enhanced:") == "engine"
+    assert namespace_for_prefix("other:") == "default"
+
+
+def test_generation_zero_keeps_legacy_key_format(fake_cache_redis):
+    key = generate_cache_key(URL, "demo:preview:v3:fast:")
+
+    assert key == generate_cache_key(URL, "demo:preview:v3:fast:", generation=0)
+    assert ":g" not in key[len("demo:preview:v3:fast:"):]
+
+
+def test_flush_is_single_incr_and_hides_old_entries(fake_cache_redis):
+    old_key = generate_cache_key(URL, "demo:preview:v3:fast:")
+    cache_module.cache_set(old_key, {"title": "Old"}, 3600)
+    analysis_key = generate_cache_key(URL, cache_module.CacheConfig.ANALYSIS_PREFIX)
+    cache_module.cache_set(analysis_key, {"title": "Analysis"}, 3600)
+
+    result = flush_namespace("demo")
+
+    assert result == {"generation": 1, "orphaned_entries": 1}
+    new_key = generate_cache_key(URL, "demo:preview:v3:fast:")
+    assert new_key != old_key and ":g1:" in new_key
+    assert cache_module.cache_get(new_key) is None
+    # Other namespaces are untouched
+    assert cache_module.cache_get(analysis_key) == {"title": "Analysis"}
+    assert fake_cache_redis.published[-1][1] == {"namespace": "demo"}
+
+
+def test_entry_counts_come_from_namespace_indexes(fake_cache_redis):
+    for i in range(3):
+        url = f"https://example.com/{i}"
+        cache_module.cache_set(generate_cache_key(url, "demo:preview:v3:balanced:"), {"i": i}, 3600)
+    cache_module.cache_analysis(URL, {"title": "Analysis"})
+
+    stats = cache_module.get_namespace_stats()
+
+    assert stats["demo"] == {"generation": 0, "entries": 3}
+    assert stats["analysis"]["entries"] == 1
+    flush_namespace("demo")
+    assert cache_module.get_namespace_stats()["demo"] == {"generation": 1, "entries": 0}
+
+
+def test_invalidate_cache_uses_url_index(fake_cache_redis):
+    flush_namespace("demo")
+    key = generate_cache_key(URL, "demo:preview:v3:ultra:")
+    cache_module.cache_set(key, {"title": "Ultra"}, 3600)
+    other = generate_cache_key("https://example.com/other", "demo:preview:v3:ultra:")
+    cache_module.cache_set(other, {"title": "Other"}, 3600)
+
+    assert cache_module.invalidate_cache(URL) is True
+
+    assert key not in fake_cache_redis.store
+    assert other in fake_cache_redis.store
+    assert cache_module.get_namespace_stats()["demo"]["entries"] == 1
@@ -57,6 +57,9 @@ def test_invalidate_cache_includes_demo_v3_quality_mode_prefixes(monkeypatch):
     deleted_keys = []
 
     class DummyRedis:
+        def smembers(self, key):
+            return set()
+
         def delete(self, *keys):
             deleted_keys.extend(keys)
             return len(keys)
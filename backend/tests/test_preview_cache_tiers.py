@@ -0,0 +1,77 @@
+"""Tests for the in-process LRU tier in front of the Redis preview cache."""
+import json
+
+from backend.services import preview_cache as cache_module
+from backend.services.preview_cache import LocalLRUCache
+
+
+def test_lru_evicts_oldest_when_over_byte_budget():
+    tier = LocalLRUCache(max_bytes=100, max_ttl_seconds=60)
+    tier.set("a", {"v": 1}, 40, 60)
+    tier.set("b", {"v": 2}, 40, 60)
+    tier.get("a")  # refresh "a" so "b" is least recently used
+    tier.set("c", {"v": 3}, 40, 60)
+
+    assert tier.get("b") is None
+    assert tier.get("a") == {"v": 1}
+    assert tier.stats()["bytes"] == 80
+    assert tier.stats()["evictions"] == 1
+
+
+def test_lru_respects_entry_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    tier = LocalLRUCache(max_bytes=100, max_ttl_seconds=60)
+    tier.set("a", {"v": 1}, 10, 30)
+
+    now[0] += 29
+    assert tier.get("a") == {"v": 1}
+    now[0] += 2
+    assert tier.get("a") is None
+    assert tier.stats()["entries"] == 0
+
+
+def test_second_read_is_served_from_local_tier(fake_cache_redis):
+    fake_cache_redis.store["k"] = json.dumps({"title": "Example"}).encode()
+
+    assert cache_module.cache_get("k") == {"title": "Example"}
+    assert cache_module.cache_get("k") == {"title": "Example"}
+
+    assert fake_cache_redis.get_calls == 1
+    stats = cache_module.get_tier_stats()
+    assert stats["local"]["hits"] == 1
+    assert stats["redis"]["hits"] == 1
+
+
+def test_invalidate_cache_evicts_local_entries_and_broadcasts(fake_cache_redis):
+    url = "https://example.com/page"
+    cache_module.cache_analysis(url, {"title": "Example"})
+    assert cache_module.get_cached_analysis(url)["title"] == "Example"
+
+    assert cache_module.invalidate_cache(url) is True
+
+    assert cache_module.get_cached_analysis(url) is None
+    channel, message = fake_cache_redis.published[-1]
+    assert channel == cache_module.CacheConfig.INVALIDATION_CHANNEL
+    assert cache_module.generate_cache_key(url, cache_module.CacheConfig.ANALYSIS_PREFIX) in message["keys"]
+
+
+def test_invalidation_message_from_another_worker_evicts_prefix(fake_cache_redis):
+    cache_module.cache_set("demo:preview:abc", {"title": "x"}, 3600)
+    cache_module.cache_set("preview:focus:abc", {"main_url": "y"}, 3600)
+
+    cache_module._apply_invalidation_message(json.dumps({"prefix": "demo:preview:"}))
+
+    assert cache_module.get_local_tier().get("demo:preview:abc") is None
+    assert cache_module.get_local_tier().get("preview:focus:abc") == {"main_url": "y"}
+
+
+def test_local_tier_counts_uncompressed_bytes(fake_cache_redis):
+    # ~200 KB of repetitive JSON compresses to a few hundred bytes with zstd;
+    # the 10 KB local budget must still see it as 200 KB and refuse it.
+    payload = {"rows": [{"title": "Example", "score": 0.5}] * 6000}
+    assert cache_module.cache_set("big", payload, 60)
+    assert cache_module.get_tier_stats()["local"]["bytes"] == 0
+
+    cache_module.cache_set("small", {"title": "Example"}, 60)
+    assert 0 < cache_module.get_tier_stats()["local"]["bytes"] < 100
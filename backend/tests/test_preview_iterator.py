@@ -0,0 +1,39 @@
+"""Tests for the preview iteration loop."""
+from types import SimpleNamespace
+
+from backend.services import preview_iterator
+from backend.services.quality_critic import ImprovementAction, ImprovementPriority, QualityVerdict
+
+DATA = {
+    "title": "ship previews that convert every shared link into clicks, without design work or templates",
+    "description": "All-in-one link previews",
+    "cta_text": "Try it",
+    "domain": "example.com",
+    "credibility_items": [{"value": "10k users"}],
+}
+
+
+def test_iterations_record_render_time(monkeypatch):
+    scores = iter([0.5, 0.9])
+    title_action = ImprovementAction("Shorten headline", "title", ImprovementPriority.HIGH, "clarity")
+
+    def critique(image, data, design_dna, original_url):
+        return SimpleNamespace(
+            scores=SimpleNamespace(overall=next(scores, 0.9)), verdict=QualityVerdict.GOOD,
+            improvement_actions=[title_action], iteration_focus=None, to_dict=dict,
+        )
+
+    rendered = []
+
+    def regenerate(data):
+        rendered.append(data["title"])
+        return data, b"png"
+
+    monkeypatch.setattr(preview_iterator, "get_quality_critic", lambda threshold: SimpleNamespace(critique=critique))
+    final, summary = preview_iterator.PreviewIterator(max_iterations=1).iterate(
+        DATA, b"png", regenerate_callback=regenerate
+    )
+    first = summary.iteration_results[0]
+    assert rendered == [final["title"]] and len(final["title"]) < len(DATA["title"])
+    assert first.render_ms > 0
+    assert first.to_dict()["render_ms"] == first.render_ms
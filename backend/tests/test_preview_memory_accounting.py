@@ -0,0 +1,65 @@
+"""Tests for per-stage memory accounting and the memory-budget guard."""
+import tracemalloc
+
+import pytest
+
+from backend.services.pipeline_context import PipelineContext
+from backend.services.preview.observability import memory
+from backend.services.preview.observability.job_trace import JobTrace, StageTiming
+from backend.services.preview.observability.memory import (
+    MemoryMonitor,
+    current_memory_monitor,
+    track_memory,
+)
+
+
+def test_stage_records_tracemalloc_allocations():
+    was_tracing = tracemalloc.is_tracing()
+    ctx = PipelineContext.create(url="https://example.com")
+    with track_memory("tracemalloc") as monitor:
+        with ctx.stage("capture"):
+            retained = bytearray(8 * 1024 * 1024)
+        summary = monitor.summary()
+    assert current_memory_monitor() is None
+    assert tracemalloc.is_tracing() is was_tracing
+
+    stage_memory = ctx.stages[-1].memory
+    assert stage_memory["alloc_net_mb"] >= 7.5
+    assert stage_memory["alloc_peak_mb"] >= 7.5
+    assert summary["mode"] == "tracemalloc"
+    assert summary["alloc_peak_mb"] >= 7.5
+    del retained
+
+
+def test_budget_guard_flags_rss_growth(monkeypatch):
+    rss = [100 * 1024 * 1024]
+    monkeypatch.setattr(memory, "current_rss_bytes", lambda: rss[0])
+    monitor = MemoryMonitor("rss", budget_mb=64).start()
+    try:
+        handle = monitor.stage_enter("image_generation")
+        rss[0] += 96 * 1024 * 1024
+        monitor.sample()
+        rss[0] -= 32 * 1024 * 1024
+        stage = monitor.stage_exit(handle)
+    finally:
+        monitor.stop()
+
+    assert stage == {"rss_start_mb": 100.0, "rss_peak_mb": 196.0, "rss_delta_mb": 64.0}
+    summary = monitor.summary()
+    assert summary["rss_growth_mb"] == 96.0
+    assert summary["peak_stage"] == "image_generation"
+    assert summary["over_budget"] is True
+
+
+def test_memory_is_serialized_on_trace():
+    trace = JobTrace(url="https://example.com", memory={"rss_peak_mb": 512.0, "over_budget": False})
+    trace.add_stage(StageTiming(name="capture", started_at=0, finished_at=1, duration_ms=1000,
+                                memory={"rss_peak_mb": 512.0}))
+    payload = trace.to_dict()
+    assert payload["memory"]["rss_peak_mb"] == pytest.approx(512.0)
+    assert payload["stage_timings"][0]["memory"] == {"rss_peak_mb": 512.0}
+
+
+def test_tracking_off_yields_no_monitor():
+    with track_memory("off") as monitor:
+        assert monitor is None
@@ -0,0 +1,68 @@
+"""Tests for the opt-in sampling profiler attached to JobTrace."""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.services.cancellation import bind_current
+from backend.services.pipeline_context import PipelineContext
+from backend.services.preview.observability.diagnosis import diagnose
+from backend.services.preview.observability.job_trace import JobTrace
+from backend.services.preview.observability.profiler import (
+    NO_STAGE,
+    current_sampler,
+    profile_job,
+    render_collapsed,
+    should_profile,
+)
+
+
+def _busy(seconds):
+    end = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < end:
+        total += 1
+    return total
+
+
+def test_should_profile_respects_explicit_choice_and_rate():
+    assert should_profile(True, rate=0.0) is True
+    assert should_profile(False, rate=1.0) is False
+    assert should_profile(None, rate=0.0) is False
+    assert should_profile(None, rate=1.0) is True
+
+
+def test_samples_are_folded_per_stage_including_worker_threads():
+    ctx = PipelineContext.create(url="https://example.com")
+    with profile_job(True, interval_ms=1) as sampler:
+        with ctx.stage("classify"):
+            _busy(0.05)
+        with ctx.stage("parallel_extraction"), ThreadPoolExecutor(max_workers=1) as pool:
+            pool.submit(bind_current(_busy), 0.05).result()
+            sampler.sample_once()
+    assert current_sampler() is None
+
+    profile = sampler.to_dict()
+    stages = profile["stages"]
+    assert stages["classify"]["samples"] > 0
+    assert stages["classify"]["cpu_ms"] > 0
+    assert any("_busy" in stack for stack in stages["classify"]["stacks"])
+    # The worker's stacks are attributed to the stage that submitted it
+    assert any(
+        "_busy" in stack and "_bound" in stack
+        for stack in stages["parallel_extraction"]["stacks"]
+    )
+    assert set(stages) <= {"classify", "parallel_extraction", NO_STAGE}
+
+
+def test_profile_is_carried_on_trace_and_rendered_collapsed():
+    profile = {
+        "interval_ms": 10,
+        "samples": 3,
+        "duration_ms": 30,
+        "stages": {"capture": {"samples": 3, "cpu_ms": 1.5, "stacks": {"a.py:f;b.py:g": 3}}},
+    }
+    trace = JobTrace(url="https://example.com", profile=profile)
+    payload = trace.to_dict()
+
+    assert render_collapsed(payload["profile"]) == "capture;a.py:f;b.py:g 3\n"
+    assert diagnose(payload)["profile_stages"] == {"capture": {"samples": 3, "cpu_ms": 1.5}}
+    assert diagnose(JobTrace().to_dict())["profile_stages"] is None
@@ -0,0 +1,121 @@
+"""Tests for the record-and-replay harness (no network, no OpenAI key)."""
+import pytest
+import requests
+from openai.resources.chat.completions import Completions
+from openai.types.chat import ChatCompletion
+
+from backend.scripts.preview_engine.replay import (
+    Fixture,
+    Recorder,
+    Replayer,
+    run_engine,
+    summarize,
+)
+from backend.services import playwright_screenshot, r2_client
+
+
+def _completion(text):
+    return ChatCompletion.model_validate({
+        "id": "cmpl-1",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "gpt-4o",
+        "choices": [{
+            "index": 0,
+            "finish_reason": "stop",
+            "message": {"role": "assistant", "content": text},
+        }],
+    })
+
+
+def _pipeline():
+    """Stand-in for the engine touching every recorded seam."""
+    screenshot, html, dom = playwright_screenshot.capture_screenshot_and_html("https://example.com")
+    logo = requests.get("https://example.com/logo.png", timeout=5)
+    answer = Completions.create(None, model="gpt-4o", messages=[{"role": "user", "content": html}])
+    uploaded = r2_client.upload_file_to_r2(b"composited", "previews/x.png", "image/png")
+    return screenshot, dom, logo.content, answer.choices[0].message.content, uploaded
+
+
+@pytest.fixture
+def live_seams(monkeypatch):
+    def fake_request(self, method, url, *args, **kwargs):
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b"logo-bytes"
+        response.headers["Content-Type"] = "image/png"
+        return response
+
+    monkeypatch.setattr(playwright_screenshot, "capture_screenshot_and_html",
+                        lambda url: (b"png-bytes", "<h1>Hi</h1>", {"elements": [1]}))
+    monkeypatch.setattr(requests.Session, "request", fake_request)
+    monkeypatch.setattr(Completions, "create", lambda self, **kw: _completion("hero copy"))
+    monkeypatch.setattr(r2_client, "upload_file_to_r2", lambda data, name, ctype: f"https://cdn/{name}")
+
+
+def test_recorded_job_replays_offline(tmp_path, live_seams, monkeypatch):
+    fixture = Fixture.for_url(tmp_path, "https://example.com")
+    with Recorder(fixture):
+        live = _pipeline()
+
+    # Take the "network" away: every seam now fails unless replayed
+    def offline(*args, **kwargs):
+        raise AssertionError("live call during replay")
+    monkeypatch.setattr(playwright_screenshot, "capture_screenshot_and_html", offline)
+    monkeypatch.setattr(requests.Session, "request", offline)
+    monkeypatch.setattr(Completions, "create", offline)
+
+    loaded = Fixture.discover(tmp_path)
+    assert [f.url for f in loaded] == ["https://example.com"]
+    with Replayer(loaded[0]) as replayer:
+        replayed = _pipeline()
+        served = requests.get(replayed[-1]).content
+
+    assert replayed[:4] == live[:4]
+    assert replayed[-1].startswith("https://replay.local/")
+    assert served == b"composited"
+    assert replayer.misses == []
+
+
+def test_unrecorded_calls_fail_like_offline_network(tmp_path):
+    fixture = Fixture(tmp_path / "empty", "https://example.com")
+    with Replayer(fixture) as replayer:
+        with pytest.raises(requests.ConnectionError):
+            requests.get("https://example.com/missing.png")
+    assert replayer.misses == ["http GET https://example.com/missing.png"]
+
+
+def test_summary_flags_nondeterministic_output():
+    records = [
+        {"url": "a", "status": "ok", "elapsed_ms": 100.0, "composited_image_sha": "x"},
+        {"url": "a", "status": "ok", "elapsed_ms": 300.0, "composited_image_sha": "y"},
+        {"url": "b", "status": "fail", "elapsed_ms": 5.0},
+    ]
+    summary = summarize(records)
+    assert summary["ok"] == 2 and summary["runs"] == 3
+    assert summary["p50_ms"] == 100.0
+    assert summary["nondeterministic_urls"] == ["a"]
+
+
+def test_replays_run_the_quality_modes_engine_config(monkeypatch):
+    from backend.services import image_encoding, preview_engine, preview_tracer
+
+    configs = []
+
+    class Engine:
+        def __init__(self, config):
+            configs.append(config)
+
+        def generate(self, url, cache_key_prefix):
+            raise RuntimeError("offline")
+
+    monkeypatch.setattr(preview_engine, "PreviewEngine", Engine)
+    monkeypatch.setattr(image_encoding, "flush_image_variants", lambda: None)
+    monkeypatch.setattr(preview_tracer, "flush_trace_reports", lambda: None)
+    fast = run_engine("https://example.com", "fast")
+    ultra = run_engine("https://example.com", "ultra")
+
+    assert (fast["quality_mode"], fast["status"]) == ("fast", "fail")
+    assert (configs[0].enable_multi_agent, configs[0].max_quality_iterations) == (False, 2)
+    assert (configs[1].enable_multi_agent, configs[1].max_quality_iterations) == (True, 4)
+    assert configs[1].enforce_target_quality and ultra["quality_mode"] == "ultra"
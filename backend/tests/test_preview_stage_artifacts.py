@@ -0,0 +1,87 @@
+"""Tests for stage-level artifacts shared across quality modes."""
+from backend.services import preview_cache as cache_module
+from backend.services.preview.artifacts import (
+    RANK_HTML,
+    RANK_MULTI_AGENT,
+    RANK_VISION,
+    StageArtifacts,
+)
+
+URL = "https://example.com/product"
+
+
+def test_capture_and_brand_round_trip_across_jobs(fake_cache_redis):
+    first = StageArtifacts.load(URL)
+    assert first.highest_cached_stage() is None
+    first.store_capture(b"\x89PNG-bytes", "<html></html>", {"raw_top_texts": ["Hi"]}, "https://cdn/s.png")
+    first.store_brand({"colors": {"primary_color": "#112233"}})
+
+    second = StageArtifacts.load(URL)
+
+    bundle = second.capture_bundle()
+    assert bundle["screenshot_bytes"] == b"\x89PNG-bytes"
+    assert bundle["dom_data"] == {"raw_top_texts": ["Hi"]}
+    assert bundle["screenshot_url"] == "https://cdn/s.png"
+    assert second.brand["brand_elements"]["colors"]["primary_color"] == "#112233"
+    assert second.highest_cached_stage() == "brand"
+
+
+def test_reasoning_reuse_requires_sufficient_rank(fake_cache_redis):
+    StageArtifacts.load(URL).store_reasoning({"title": "Vision"}, RANK_VISION, {"elements": []})
+    artifacts = StageArtifacts.load(URL)
+
+    # fast (HTML) and balanced (vision) can reuse; ultra (multi-agent) cannot
+    assert artifacts.usable_reasoning(RANK_HTML, needs_ui_elements=False)["ai_result"] == {"title": "Vision"}
+    assert artifacts.usable_reasoning(RANK_VISION, needs_ui_elements=True)["ui_elements"] == {"elements": []}
+    assert artifacts.usable_reasoning(RANK_MULTI_AGENT, needs_ui_elements=False) is None
+
+
+def test_missing_ui_elements_are_flagged_for_extraction(fake_cache_redis):
+    StageArtifacts.load(URL).store_reasoning({"title": "HTML"}, RANK_HTML, None)
+
+    reasoning = StageArtifacts.load(URL).usable_reasoning(RANK_HTML, needs_ui_elements=True)
+
+    assert reasoning["ai_result"] == {"title": "HTML"}
+    assert reasoning["ui_elements"] is None
+
+
+def test_degraded_run_does_not_overwrite_richer_artifacts(fake_cache_redis):
+    StageArtifacts.load(URL).store_blueprint({"title": "Ultra"}, RANK_MULTI_AGENT)
+
+    artifacts = StageArtifacts.load(URL)
+    artifacts.store_blueprint({"title": "Fallback"}, RANK_HTML)
+
+    assert StageArtifacts.load(URL).usable_blueprint(RANK_HTML) == {"title": "Ultra"}
+
+
+def test_loaded_artifacts_are_private_to_the_job(fake_cache_redis):
+    StageArtifacts.load(URL).store_blueprint({"title": "Ultra", "tags": ["a"]}, RANK_MULTI_AGENT)
+    StageArtifacts.load(URL).store_brand({"colors": {"primary_color": "#112233"}})
+
+    first = StageArtifacts.load(URL)
+    blueprint = first.usable_blueprint(RANK_HTML)
+    blueprint["title"] = "Edited"
+    blueprint["tags"].append("b")
+    first.brand["brand_elements"]["colors"]["primary_color"] = "#000000"
+
+    second = StageArtifacts.load(URL)
+    assert second.usable_blueprint(RANK_HTML) == {"title": "Ultra", "tags": ["a"]}
+    assert second.brand["brand_elements"]["colors"]["primary_color"] == "#112233"
+
+
+def test_disabled_artifacts_neither_read_nor_write(fake_cache_redis):
+    StageArtifacts.load(URL).store_brand({"colors": {}})
+
+    disabled = StageArtifacts.load(URL, enabled=False)
+    assert disabled.brand is None
+    disabled.store_brand({"colors": {"primary_color": "#000000"}})
+
+    assert StageArtifacts.load(URL).brand == {"brand_elements": {"colors": {}}}
+
+
+def test_invalidate_cache_drops_stage_artifacts(fake_cache_redis):
+    StageArtifacts.load(URL).store_brand({"colors": {}})
+
+    assert cache_module.invalidate_cache(URL) is True
+
+    assert StageArtifacts.load(URL).brand is None
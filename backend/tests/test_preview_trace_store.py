@@ -0,0 +1,108 @@
+"""Tests for the Redis Streams JobTrace backend and window queries."""
+import time
+
+from backend.services.demo_quality_profiles import quality_mode_from_cache_prefix
+from backend.services.preview.observability.job_trace import (
+    JobTraceStore,
+    StageTiming,
+    new_job_trace,
+)
+from backend.services.preview.observability.reason_codes import FailureReason, PreviewLane
+from backend.services.preview.observability.trace_store import (
+    RedisStreamTraceBackend,
+    failure_histogram,
+    slowest_jobs,
+    stage_percentiles,
+)
+
+
+def _trace(url, lane, mode, capture_ms, failed=False):
+    trace = new_job_trace(url=url, lane=lane)
+    trace.quality_mode = mode
+    now = time.time()
+    trace.add_stage(StageTiming("capture", now, now, capture_ms))
+    trace.add_stage(StageTiming("render", now, now, 100.0))
+    trace.add_stage(StageTiming("ai_reasoning", now, now, 0.0, skipped=True))
+    if failed:
+        trace.finalize_failure(FailureReason.CAPTURE_TIMEOUT, "timed out")
+    else:
+        trace.finalize_success()
+    return trace
+
+
+def _store(client):
+    store = JobTraceStore()
+    RedisStreamTraceBackend(client_factory=lambda: client).install(store)
+    return store
+
+
+def test_traces_are_shared_across_workers_through_redis(fake_cache_redis):
+    worker_a, worker_b = _store(fake_cache_redis), _store(fake_cache_redis)
+    traces = [
+        _trace("https://www.shop.example/p/1", PreviewLane.FAST, "fast", 800.0),
+        _trace("https://docs.example/guide", PreviewLane.DEEP, "balanced", 2400.0),
+        _trace("https://shop.example/p/2", PreviewLane.FAST, "fast", 1200.0, failed=True),
+    ]
+    for trace in traces:
+        worker_a.save(trace)
+
+    assert worker_b.get(traces[1].job_id)["url"] == "https://docs.example/guide"
+    assert [p["job_id"] for p in worker_b.list_recent(limit=2)] == [traces[2].job_id, traces[1].job_id]
+
+    since = time.time() - 60
+    assert len(worker_b.query(since)) == 3
+    fast = worker_b.query(since, lane="fast", domain="shop.example")
+    assert {s["job_id"] for s in fast} == {traces[0].job_id, traces[2].job_id}
+    assert worker_b.query(since, quality_mode="balanced")[0]["stages"] == {"capture": 2400.0, "render": 100.0}
+    assert worker_b.query(time.time() + 60) == []
+
+
+def test_window_statistics():
+    summaries = [
+        {"job_id": str(i), "total_ms": ms, "status": status, "failure_reason": reason,
+         "stages": {"capture": ms * 0.8, "render": ms * 0.2}}
+        for i, (ms, status, reason) in enumerate([
+            (1000, "finished", None),
+            (2000, "finished", "render_palette_fallback"),
+            (3000, "failed", "capture_timeout"),
+            (4000, "failed", "capture_timeout"),
+        ])
+    ]
+    stats = stage_percentiles(summaries)
+    assert list(stats["stages"]) == ["capture", "render"]
+    assert stats["stages"]["capture"]["p90_ms"] == 3200.0
+    assert stats["total"]["p99_ms"] == 4000.0
+
+    failures = failure_histogram(summaries)
+    assert failures["failure_rate"] == 0.5
+    assert failures["reasons"] == {"capture_timeout": 2, "render_palette_fallback": 1}
+
+    assert [s["job_id"] for s in slowest_jobs(summaries, 2)] == ["3", "2"]
+
+
+def test_unreachable_redis_falls_back_to_lru():
+    store = _store(None)
+    trace = _trace("https://example.com", PreviewLane.FAST, None, 500.0)
+    store.save(trace)
+
+    assert store.get(trace.job_id)["job_id"] == trace.job_id
+    assert [s["job_id"] for s in store.query(time.time() - 60)] == [trace.job_id]
+
+
+def test_quality_mode_from_cache_prefix():
+    assert quality_mode_from_cache_prefix("demo:preview:v3:ultra:") == "ultra"
+    assert quality_mode_from_cache_prefix("corpus:balanced:") == "balanced"
+    assert quality_mode_from_cache_prefix("saas:preview:") is None
+
+
+def test_query_pages_through_the_whole_window(fake_cache_redis, monkeypatch):
+    from backend.services.preview.observability import trace_store
+
+    monkeypatch.setattr(trace_store, "QUERY_PAGE_SIZE", 2)
+    store = _store(fake_cache_redis)
+    traces = [_trace(f"https://site{i}.example", PreviewLane.FAST, "fast", 500.0) for i in range(5)]
+    for trace in traces:
+        store.save(trace)
+
+    # Several entries share a millisecond, so paging must step by sequence number
+    assert [s["job_id"] for s in store.query(time.time() - 60)] == [t.job_id for t in traces]
@@ -0,0 +1,89 @@
+"""Tests for sampled, write-behind PreviewTracer report publishing."""
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from backend.services import preview_tracer
+from backend.services.preview_tracer import (
+    MAX_TRACE_STEPS,
+    PreviewTracer,
+    TraceReportPublisher,
+    flush_trace_reports,
+)
+
+
+@pytest.fixture
+def uploads(monkeypatch):
+    """Slow fake R2 upload recording (filename, html) pairs."""
+    done = []
+    release = threading.Event()
+
+    def upload(data, filename, content_type):
+        release.wait(5)
+        done.append((filename, data.decode("utf-8")))
+        return f"https://r2.test/{filename}"
+
+    monkeypatch.setattr(preview_tracer, "upload_file_to_r2", upload)
+    monkeypatch.setattr(preview_tracer, "public_url_for", lambda name: f"https://r2.test/{name}")
+    monkeypatch.setattr(preview_tracer, "_publisher", TraceReportPublisher(max_pending=2))
+    monkeypatch.setattr(preview_tracer, "TRACE_REPORT_SLOW_MS", 20000)
+    return SimpleNamespace(done=done, release=release)
+
+
+def test_failed_job_report_is_queued_without_blocking(uploads):
+    tracer = PreviewTracer("https://example.com", sample_rate=0.0)
+    tracer.add_step("Capture Page", image_bytes=b"\x89PNG")
+    tracer.add_step("Fatal Error", error="boom")
+
+    started = time.monotonic()
+    url = tracer.finish(failed=True)
+    assert time.monotonic() - started < 0.5
+    assert url == f"https://r2.test/{tracer.report_filename()}"
+    assert uploads.done == []
+
+    uploads.release.set()
+    assert flush_trace_reports(timeout=5)
+    (filename, html), = uploads.done
+    assert filename == tracer.report_filename()
+    assert "Fatal Error" in html and "data:image/png;base64,iVBORw==" in html
+
+
+def test_sampling_rate_and_slow_threshold(uploads, monkeypatch):
+    uploads.release.set()
+    assert PreviewTracer("https://example.com", sample_rate=0.0).finish() is None
+    assert PreviewTracer("https://example.com", sample_rate=1.0).finish() is not None
+
+    slow = PreviewTracer("https://example.com", sample_rate=0.0)
+    slow.start_time -= 30
+    assert slow.publish_reason() == "slow"
+    assert slow.finish() is not None
+    monkeypatch.setattr(preview_tracer, "TRACE_REPORT_ON_FAILURE", False)
+    assert PreviewTracer("https://example.com", sample_rate=0.0).publish_reason(failed=True) is None
+    assert flush_trace_reports(timeout=5)
+    assert len(uploads.done) == 2  # sampled + slow
+
+
+def test_full_queue_drops_reports(uploads):
+    urls = [PreviewTracer(f"https://e{i}.com", sample_rate=1.0).finish() for i in range(6)]
+    uploads.release.set()
+    flush_trace_reports(timeout=5)
+
+    publisher = preview_tracer._publisher
+    assert None in urls
+    assert publisher.stats["dropped"] == urls.count(None)
+    assert publisher.stats["published"] == len(uploads.done) == 6 - urls.count(None)
+
+
+def test_step_buffer_is_bounded():
+    tracer = PreviewTracer("https://example.com")
+    for i in range(MAX_TRACE_STEPS + 10):
+        tracer.add_step(f"step {i}")
+    tracer.add_step("big", image_bytes=b"x" * (preview_tracer.MAX_STEP_IMAGE_BYTES + 1))
+
+    assert len(tracer.steps) == MAX_TRACE_STEPS
+    assert tracer.dropped_steps == 11
+    assert tracer.steps[0]["name"] == "step 0"
+    assert tracer.steps[-1]["image_bytes"] is None
+    assert "image omitted" in tracer.steps[-1]["details"]
@@ -0,0 +1,156 @@
+"""Tests for span tracing across the API, RQ and pipeline boundaries."""
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+import rq
+from openai import OpenAI
+
+from backend.queue.queue_connection import enqueue_traced
+from backend.scripts.loadtest import fake_openai
+from backend.services.cancellation import bind_current
+from backend.services.pipeline_context import PipelineContext
+from backend.services.preview.observability import tracing
+from backend.services.preview.observability.tracing import (
+    FileSpanExporter,
+    extract,
+    flush_spans,
+    start_span,
+)
+
+
+@pytest.fixture
+def spans(tmp_path, monkeypatch):
+    """Route spans to a JSON-lines file; returns a reader of exported spans."""
+    path = tmp_path / "spans.jsonl"
+    monkeypatch.setattr(tracing, "_processor", tracing._processor)
+    monkeypatch.setattr(tracing, "_configured", tracing._configured)
+    tracing.configure(FileSpanExporter(str(path), service_name="preview-test"))
+
+    def read():
+        assert flush_spans(timeout=5)
+        out = {}
+        for line in path.read_text().splitlines():
+            (resource,) = json.loads(line)["resourceSpans"]
+            for span in resource["scopeSpans"][0]["spans"]:
+                out[span["name"]] = span
+        return out
+
+    return read
+
+
+def test_traceparent_round_trip():
+    with start_span("disabled") as span:
+        assert span.context is None  # tracing off by default
+
+    ctx = extract("00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01")
+    assert ctx.trace_id == "4bf92f3577b34da6a3ce929d0e0e4736" and ctx.sampled
+    assert ctx.traceparent == "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01"
+    assert not extract("00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-00").sampled
+    assert extract("garbage") is None
+    assert extract("00-" + "0" * 32 + "-00f067aa0ba902b7-01") is None
+
+
+def test_trace_follows_job_from_enqueue_through_worker_and_stages(spans, monkeypatch):
+    from backend.queue import worker as worker_module
+
+    enqueued = {}
+
+    class _Queue:
+        name = "preview_generation"
+
+        def enqueue(self, func, *args, meta=None, **kwargs):
+            enqueued["meta"] = meta
+            return SimpleNamespace(id="job-1")
+
+    with start_span("POST /api/v1/demo-v2/jobs", kind="server") as request_span:
+        enqueue_traced(_Queue(), print, "https://example.com", job_timeout="15m")
+    assert extract(enqueued["meta"]["traceparent"]).trace_id == request_span.context.trace_id
+
+    def job_body():
+        ctx = PipelineContext.create(url="https://example.com")
+        with ctx.stage("capture"):
+            pass
+        # Worker threads: bound callables nest under the stage, unbound ones under the job root
+        with ctx.stage("parallel_extraction"):
+            thread = threading.Thread(target=bind_current(lambda: start_span("bound").__enter__().end()))
+            thread.start()
+            thread.join()
+        unbound = threading.Thread(target=lambda: ctx.stage("unbound").__enter__().__exit__(None, None, None))
+        unbound.start()
+        unbound.join()
+        return True
+
+    job = SimpleNamespace(
+        id="job-1", func_name="generate_demo_preview_job", meta=enqueued["meta"],
+        enqueued_at=datetime.now(timezone.utc) - timedelta(seconds=2),
+    )
+    monkeypatch.setattr(rq.Worker, "perform_job", lambda self, job, queue: job_body())
+    monkeypatch.setattr(worker_module.MetricsWorker, "_flush_metrics", lambda self: None)
+    worker = worker_module.MetricsWorker.__new__(worker_module.MetricsWorker)
+    assert worker.perform_job(job, _Queue())
+
+    exported = spans()
+    trace_ids = {span["traceId"] for span in exported.values()}
+    assert trace_ids == {request_span.context.trace_id}
+
+    enqueue = exported["rq.enqueue preview_generation"]
+    wait = exported["rq.queue_wait"]
+    consumer = exported["rq.job generate_demo_preview_job"]
+    assert wait["parentSpanId"] == consumer["parentSpanId"] == enqueue["spanId"]
+    assert (int(wait["endTimeUnixNano"]) - int(wait["startTimeUnixNano"])) / 1e9 >= 2
+    assert consumer["kind"] == 5 and consumer["status"] == {"code": 1}
+
+    assert exported["stage.capture"]["parentSpanId"] == consumer["spanId"]
+    assert exported["bound"]["parentSpanId"] == exported["stage.parallel_extraction"]["spanId"]
+    assert exported["stage.unbound"]["parentSpanId"] == consumer["spanId"]
+
+
+def test_horse_exit_flushes_share_one_deadline(monkeypatch):
+    from backend.queue import worker as worker_module
+
+    granted = []
+
+    def stalled(timeout):
+        granted.append(timeout)
+        time.sleep(timeout)
+        return False
+
+    for name in ("flush_spans", "flush_trace_reports", "flush_image_variants"):
+        monkeypatch.setattr(worker_module, name, stalled)
+    monkeypatch.setattr(worker_module, "EXIT_FLUSH_BUDGET_SECONDS", 0.2)
+    monkeypatch.setattr(rq.Worker, "perform_job", lambda self, job, queue: True)
+    monkeypatch.setattr(worker_module.MetricsWorker, "_flush_metrics", lambda self: None)
+    worker = worker_module.MetricsWorker.__new__(worker_module.MetricsWorker)
+    job = SimpleNamespace(id="job-1", func_name="generate_demo_preview_job", meta={}, enqueued_at=None)
+
+    started = time.monotonic()
+    assert worker.perform_job(job, SimpleNamespace(name="preview_generation"))
+    assert time.monotonic() - started < 0.4
+    assert len(granted) == 3 and sum(granted) <= 0.2 + 1e-6
+    assert granted[1:] == [0.0, 0.0]
+
+
+def test_openai_calls_and_errors_become_spans(spans):
+    server = fake_openai.serve(fake_openai.FakeOpenAI(latency="fixed:0", seed=1))
+    try:
+        client = OpenAI(api_key="sk-test", base_url="http://%s:%s/v1" % server.server_address[:2],
+                        max_retries=0)
+        with start_span("preview.generate"):
+            client.chat.completions.create(model="gpt-4o-mini", messages=[{"role": "user", "content": "hi"}])
+            with pytest.raises(RuntimeError):
+                with start_span("r2.upload", kind="client"):
+                    raise RuntimeError("bucket gone")
+    finally:
+        server.shutdown()
+
+    exported = spans()
+    ai = exported["openai.chat.completions"]
+    attributes = {a["key"]: a["value"] for a in ai["attributes"]}
+    assert ai["parentSpanId"] == exported["preview.generate"]["spanId"]
+    assert attributes["gen_ai.request.model"] == {"stringValue": "gpt-4o-mini"}
+    assert int(attributes["gen_ai.usage.input_tokens"]["intValue"]) > 0
+    assert exported["r2.upload"]["status"] == {"code": 2, "message": "RuntimeError: bucket gone"}
@@ -0,0 +1,128 @@
+"""Tests for the process-pool render farm."""
+import time
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from backend.services import render_farm
+from backend.services.cancellation import CancellationToken, DeadlineExceeded, use_token
+from backend.services.platform_optimizer import Platform, PlatformOptimizer
+from backend.services.render_farm import RenderExecutor, RenderSpec, SharedImage, SharedImages
+from backend.services.variant_generator import VariantGenerator
+
+
+def _swatch(spec, assets):
+    image = Image.new("RGB", (8, 4), spec.palette["fill"])
+    return image, {"base_size": assets["base"].size, "title": spec.text.get("title")}
+
+
+def _fail(spec, assets):
+    raise ValueError(spec.options["message"])
+
+
+@pytest.fixture
+def base_image():
+    rng = np.random.default_rng(3)
+    return Image.fromarray(rng.integers(0, 255, (120, 240, 3), dtype=np.uint8))
+
+
+@pytest.fixture(scope="module")
+def pool():
+    executor = RenderExecutor(workers=2)
+    yield executor
+    executor.shutdown()
+
+
+def test_pool_renders_match_inline_renders(pool, base_image):
+    inline = VariantGenerator(executor=RenderExecutor(workers=0)).generate_variants(base_image, variant_count=5)
+    fanned = VariantGenerator(executor=pool).generate_variants(base_image, variant_count=5)
+    assert [v.id for v in fanned.variants] == [v.id for v in inline.variants]
+    for a, b in zip(inline.variants, fanned.variants):
+        assert a.image.tobytes() == b.image.tobytes()
+        assert (a.readability_score, a.visual_appeal_score, a.uniqueness_score) == (
+            b.readability_score, b.visual_appeal_score, b.uniqueness_score)
+    assert fanned.variants[1].encoded["PNG"] == fanned.variants[1].to_bytes("PNG")
+
+    platforms = [Platform.TWITTER, Platform.INSTAGRAM, Platform.DISCORD]
+    content = {"title": "A headline that is far too long for the tighter platform limits"}
+    inline = PlatformOptimizer(executor=RenderExecutor(workers=0)).optimize_for_multiple_platforms(
+        base_image, platforms, content)
+    fanned = PlatformOptimizer(executor=pool).optimize_for_multiple_platforms(base_image, platforms, content)
+    for platform in platforms:
+        a, b = inline.variants[platform], fanned.variants[platform]
+        assert a.image.tobytes() == b.image.tobytes()
+        assert a.to_dict() == b.to_dict()
+
+
+def test_specs_carry_palette_text_and_shared_assets(pool, base_image):
+    render_farm.register_renderer("test.swatch", _swatch)
+    specs = [
+        RenderSpec("test.swatch", palette={"fill": (255, 0, 0)}, text={"title": "a"}, assets={"base": base_image}),
+        RenderSpec("test.swatch", palette={"fill": (0, 0, 255)}, assets={"base": base_image}),
+    ]
+    results = pool.map(specs)
+    assert [r.to_image().getpixel((0, 0)) for r in results] == [(255, 0, 0), (0, 0, 255)]
+    assert results[0].info == {"base_size": (240, 120), "title": "a"}
+    assert results[0].data.startswith(b"\x89PNG")
+
+    inline = RenderExecutor(workers=0).render(specs[0])
+    assert inline.data is None and inline.to_bytes() == results[0].to_bytes()
+
+
+def test_renderer_errors_propagate_and_release_shared_memory(pool, base_image, monkeypatch):
+    render_farm.register_renderer("test.fail", _fail)
+    handles = []
+    original_share = SharedImages.share
+
+    def share(self, image):
+        handle = original_share(self, image)
+        handles.append(handle)
+        return handle
+
+    monkeypatch.setattr(SharedImages, "share", share)
+    specs = [RenderSpec("test.fail", assets={"base": base_image}, options={"message": "boom"})] * 2
+    with pytest.raises(ValueError, match="boom"):
+        pool.map(specs)
+    assert len(set(handles)) == 1  # one block for the image both specs use
+    with pytest.raises(FileNotFoundError):
+        handles[0].open()
+
+    with pytest.raises(KeyError):
+        RenderExecutor(workers=0).render(RenderSpec("test.missing"))
+
+
+def test_shared_image_round_trips_pixels():
+    image = Image.new("P", (5, 3))
+    image.putpalette([10, 20, 30] * 256)
+    with SharedImages() as shared:
+        handle = shared.share(image)
+        assert isinstance(handle, SharedImage) and handle.mode == "RGB"
+        assert handle.open().getpixel((4, 2)) == (10, 20, 30)
+
+
+def _sleep(spec, assets):
+    time.sleep(spec.options["seconds"])
+    return Image.new("RGB", (2, 2))
+
+
+def test_pool_wait_stops_at_the_job_deadline(pool):
+    render_farm.register_renderer("test.sleep", _sleep)
+    specs = [RenderSpec("test.sleep", options={"seconds": 2})] * 4
+    started = time.monotonic()
+    with use_token(CancellationToken.with_timeout(0.5)), pytest.raises(DeadlineExceeded):
+        pool.map(specs)
+    assert time.monotonic() - started < 1.5
+
+
+def test_pool_is_opt_in_and_shut_down_after_jobs(monkeypatch):
+    monkeypatch.delenv("PREVIEW_RENDER_WORKERS", raising=False)
+    assert render_farm._configured_workers() == 0
+    monkeypatch.setenv("PREVIEW_RENDER_WORKERS", "3")
+    assert render_farm._configured_workers() == 3
+
+    executor = RenderExecutor(workers=2)
+    monkeypatch.setattr(render_farm, "_executor", executor)
+    executor._get_pool()
+    render_farm.shutdown_render_executor()
+    assert executor._pool is None
@@ -0,0 +1,94 @@
+"""Tests for the cached gradient / overlay layer library."""
+import numpy as np
+from PIL import Image, ImageDraw
+
+from backend.services import render_layers
+from backend.services.gradient_generator import generate_smooth_gradient, lab_to_rgb, rgb_to_lab
+from backend.services.render_layers import LayerCache, gradient_layer, ramp_mask
+
+
+def test_vectorized_lab_matches_scalar_conversion():
+    colors = np.array([(0, 0, 0), (255, 255, 255), (37, 99, 235), (245, 158, 11), (3, 200, 90)])
+    lab = render_layers.rgb_to_lab_array(colors)
+    for color, row in zip(colors, lab):
+        assert np.allclose(row, rgb_to_lab(*color), atol=1e-6)
+        assert np.allclose(render_layers.lab_to_rgb_array(row), lab_to_rgb(*row), atol=1e-6)
+
+
+def test_lab_gradient_matches_per_pixel_interpolation_within_dither():
+    c1, c2 = (37, 99, 235), (245, 158, 11)
+    width, height = 48, 20
+    produced = np.asarray(render_layers.render_gradient(
+        (width, height), render_layers.normalize_stops([c1, c2]), "horizontal")).astype(int)
+    lab1, lab2 = np.array(rgb_to_lab(*c1)), np.array(rgb_to_lab(*c2))
+    expected = np.array([lab_to_rgb(*(lab1 + (lab2 - lab1) * (x / width))) for x in range(width)])
+    # Ordered dither in [-1, 1) then truncation, as apply_fast_dithering
+    error = produced - expected[None, :, :]
+    assert -2 <= error.min() and error.max() < 1
+    assert abs(error.mean() + 0.5) < 0.1
+
+
+def test_overlay_and_fade_layers_match_per_row_drawing():
+    size = (300, 120)
+    reference = Image.new('RGBA', size, (0, 0, 0, 0))
+    draw = ImageDraw.Draw(reference)
+    for y in range(size[1]):
+        draw.line([(0, y), (size[0], y)], fill=(0, 0, 0, int(15 + 35 * (y / size[1]))))
+    overlay = gradient_layer(size, ((0, 0, 0, 15), (0, 0, 0, 50)), "vertical", dither=0, space="rgb")
+    assert np.array_equal(np.asarray(overlay), np.asarray(reference))
+
+    fade_reference = Image.new('L', size, 255)
+    draw = ImageDraw.Draw(fade_reference)
+    for x in range(80):
+        draw.line([(x, 0), (x, size[1] - 1)], fill=int(255 * ((x / 80) ** 2)))
+    fade = ramp_mask(size, 0, 255, "horizontal", extent=80, easing="ease_in")
+    assert np.array_equal(np.asarray(fade), np.asarray(fade_reference))
+
+
+def test_layers_are_cached_with_per_template_stats():
+    render_layers.clear_layer_cache()
+    stops = ((10, 20, 30), (200, 100, 50))
+    first = gradient_layer((64, 32), stops, "radial", template="hero")
+    assert gradient_layer((64, 32), stops, "radial", template="hero") is first
+    assert gradient_layer((64, 32), stops, "radial", template="profile") is first
+    assert gradient_layer((64, 32), stops, "diagonal", template="hero") is not first
+
+    stats = render_layers.layer_cache_stats()
+    assert (stats["hero"]["hits"], stats["hero"]["misses"]) == (1, 2)
+    assert stats["profile"] == {**stats["profile"], "hits": 1, "misses": 0, "hit_rate": 1.0}
+    assert stats["profile"]["saved_ms"] > 0
+
+    # Callers of generate_smooth_gradient get a private copy
+    copy = generate_smooth_gradient(64, 32, (10, 20, 30), (200, 100, 50), style="radial")
+    copy.paste((255, 0, 0), (0, 0, 64, 32))
+    assert first.getpixel((0, 0)) != (255, 0, 0)
+
+
+def test_cache_evicts_least_recently_used_by_bytes():
+    cache = LayerCache(max_bytes=3 * 100)
+    build = lambda: Image.new('L', (10, 10))  # noqa: E731 — 100 bytes each
+    a = cache.get("a", build)
+    cache.get("b", build)
+    cache.get("c", build)
+    assert cache.get("a", build) is a  # refreshes "a"
+    cache.get("d", build)
+    assert len(cache) == 3 and cache.nbytes == 300
+    assert cache.get("a", build) is a
+    assert cache.stats()["default"]["misses"] == 4
+    cache.get("b", build)
+    assert cache.stats()["default"]["misses"] == 5
+
+
+def test_readability_overlay_is_built_once_per_size_and_color():
+    from backend.services.readability_auto_fixer import ReadabilityAutoFixer
+
+    render_layers.clear_layer_cache()
+    fixer = ReadabilityAutoFixer()
+    image = Image.new("RGB", (120, 63), (240, 240, 240))
+    first, _ = fixer._inject_text_overlay(image, None, (240, 240, 240))
+    second, _ = fixer._inject_text_overlay(image, None, (240, 240, 240))
+    fixer._inject_text_overlay(image, None, (10, 10, 10))
+
+    assert np.array_equal(np.asarray(first), np.asarray(second))
+    assert render_layers.layer_cache_stats()["readability"]["hits"] == 1
+    assert render_layers.layer_cache_stats()["readability"]["misses"] == 2
@@ -0,0 +1,93 @@
+"""Tests for the rendering micro-benchmark baseline gate."""
+import json
+
+
+def _load_module():
+    from backend.scripts import benchmark_rendering as br
+    return br
+
+
+BASELINE = {
+    "tolerance": 0.3,
+    "memory_tolerance": 0.5,
+    "calibration_ops_per_sec": 10.0,
+    "benchmarks": {
+        "gradient.linear": {"ops_per_sec": 2.0, "peak_kb": 10000.0},
+        "readability.fix": {"ops_per_sec": 4.0, "peak_kb": 1000.0},
+    },
+}
+
+
+def test_within_tolerance_passes():
+    br = _load_module()
+    results = {
+        "gradient.linear": {"ops_per_sec": 1.5, "peak_kb": 12000.0},
+        "readability.fix": {"ops_per_sec": 5.0, "peak_kb": 900.0},
+    }
+    ok, lines = br.compare_to_baseline(results, BASELINE, calibration=10.0)
+    assert ok is True
+    assert all(line.startswith("OK") for line in lines)
+
+
+def test_speed_and_memory_regressions_fail():
+    br = _load_module()
+    results = {
+        "gradient.linear": {"ops_per_sec": 1.0, "peak_kb": 10000.0},
+        "readability.fix": {"ops_per_sec": 4.0, "peak_kb": 1000.0 * 1.5 + br.MEMORY_SLACK_KB + 1},
+    }
+    ok, lines = br.compare_to_baseline(results, BASELINE, calibration=10.0)
+    assert ok is False
+    assert sum(line.startswith("SLOW") for line in lines) == 2
+    assert br.regressed_benchmarks(results, BASELINE, calibration=10.0) == ["gradient.linear", "readability.fix"]
+
+
+def test_expectations_scale_with_machine_calibration():
+    br = _load_module()
+    # Half-speed machine: 1.0 ops/s on gradient is the expected 50% of baseline
+    results = {"gradient.linear": {"ops_per_sec": 1.0, "peak_kb": 10000.0}}
+    ok, _ = br.compare_to_baseline(results, BASELINE, calibration=5.0)
+    assert ok is True
+
+    ok, lines = br.compare_to_baseline({"new.fn": {"ops_per_sec": 1.0, "peak_kb": 1.0}}, BASELINE)
+    assert ok is True and lines[0].startswith("NEW")
+
+
+def test_per_case_calibration_takes_precedence():
+    br = _load_module()
+    baseline = {**BASELINE, "benchmarks": {
+        "gradient.linear": {"ops_per_sec": 2.0, "peak_kb": 10000.0, "calibration_ops_per_sec": 10.0},
+    }}
+    # The machine ran this case at half speed, even though the run-wide calibration looked normal
+    slow_phase = {"gradient.linear": {"ops_per_sec": 1.0, "peak_kb": 10000.0, "calibration_ops_per_sec": 5.0}}
+    assert br.compare_to_baseline(slow_phase, baseline, calibration=10.0)[0] is True
+
+    fast_phase = {"gradient.linear": {"ops_per_sec": 2.0, "peak_kb": 10000.0, "calibration_ops_per_sec": 20.0}}
+    assert br.compare_to_baseline(fast_phase, baseline, calibration=10.0)[0] is False
+
+
+def test_fixture_screenshot_is_deterministic():
+    br = _load_module()
+    assert br.make_screenshot(320, 200) == br.make_screenshot(320, 200)
+
+
+def test_committed_baseline_is_loadable():
+    br = _load_module()
+    baseline = br.load_baseline()
+    assert baseline["calibration_ops_per_sec"] > 0
+    assert "gradient.linear" in baseline["benchmarks"]
+    json.dumps(baseline)
+
+
+def test_slow_cases_take_the_median_of_a_fixed_run_count(monkeypatch):
+    br = _load_module()
+    calls = []
+    fn = lambda: calls.append(1)
+
+    # Fast cases: never fewer than MIN_RUNS samples, however short --min-time is
+    assert br.measure(fn, min_time=0.0, trace_memory=False)["runs"] == br.MIN_RUNS
+
+    # Slow cases: exactly slow_runs samples, even with time to spare
+    monkeypatch.setattr(br, "SLOW_CALL_SECONDS", 0.0)
+    calls.clear()
+    assert br.measure(fn, min_time=60.0, trace_memory=False, slow_runs=3)["runs"] == 3
+    assert len(calls) == 4  # warm-up + 3 timed
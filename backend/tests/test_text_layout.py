@@ -0,0 +1,93 @@
+"""Tests for the cached text layout service."""
+import random
+
+import pytest
+from PIL import Image, ImageDraw
+
+from backend.services import text_layout
+from backend.services.preview_image_generator import _fit_text_to_box, _load_font, _wrap_text
+from backend.services.text_layout import break_lines, fit_font_size, font_metrics, track_render
+
+WORDS = (
+    "Ship previews that convert WAVY AV To Ty the all-in-one platform turns every shared link "
+    "into scroll-stopping, on-brand preview your customers actually click. Brand colors logos"
+).split()
+
+
+@pytest.fixture
+def draw():
+    return ImageDraw.Draw(Image.new('RGB', (10, 10)))
+
+
+def _reference_wrap(text, font, max_width, draw):
+    lines, current = [], []
+    for word in text.split():
+        bbox = draw.textbbox((0, 0), ' '.join(current + [word]), font=font)
+        if bbox[2] - bbox[0] <= max_width:
+            current.append(word)
+        else:
+            if current:
+                lines.append(' '.join(current))
+            current = [word]
+    if current:
+        lines.append(' '.join(current))
+    return lines
+
+
+def test_break_lines_matches_textbbox_wrapping(draw):
+    rng = random.Random(5)
+    for _ in range(300):
+        font = _load_font(rng.choice([18, 28, 42, 56, 80]), bold=rng.random() < 0.5)
+        text = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 20)))
+        max_width = rng.randint(150, 900)
+        assert break_lines(text, font, max_width) == _reference_wrap(text, font, max_width, draw)
+
+
+def test_char_widths_match_textbbox(draw):
+    font = _load_font(66, bold=True)
+    metrics = font_metrics(font)
+    for char in "AVij .,W9":
+        bbox = draw.textbbox((0, 0), char, font=font)
+        assert metrics.char_width(char) == bbox[2] - bbox[0]
+    assert font_metrics(_load_font(66, bold=True)) is metrics
+
+
+def test_fit_font_size_binary_search():
+    sizes = range(48, 23, -2)
+    calls = []
+
+    def fits(size):
+        calls.append(size)
+        return size <= 31
+
+    assert fit_font_size(sizes, fits) == 30
+    assert len(calls) <= 4
+    assert fit_font_size(sizes, lambda size: False) is None
+    assert fit_font_size(sizes, lambda size: True) == 48
+
+
+def test_fit_text_to_box_matches_linear_search(draw):
+    text = "This is a very long headline that should require font size reduction to fit properly"
+    for max_width, max_height in [(400, 80), (600, 200), (900, 120), (300, 40)]:
+        expected = None
+        for size in range(48, 23, -2):
+            lines = _wrap_text(text, _load_font(size), max_width, draw)
+            height = sum(draw.textbbox((0, 0), line, font=_load_font(size))[3]
+                         - draw.textbbox((0, 0), line, font=_load_font(size))[1] + 4 for line in lines)
+            if height <= max_height:
+                expected = (size, lines)
+                break
+        expected = expected or (24, _wrap_text(text, _load_font(24), max_width, draw))
+        font, lines = _fit_text_to_box(text, max_width, max_height, draw)
+        assert (font.size, lines) == expected
+
+
+def test_repeat_renders_save_measurements(draw):
+    text_layout.clear_text_layout_cache()
+    text = ' '.join(WORDS[:14])
+    with track_render() as first:
+        _fit_text_to_box(text, 500, 120, draw)
+    with track_render() as second:
+        _fit_text_to_box(text, 500, 120, draw)
+    assert first.measured > 0
+    assert second.measured == 0 and second.saved == second.requested > 0
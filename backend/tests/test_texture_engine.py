@@ -0,0 +1,79 @@
+"""Tests for the vectorized texture/pattern generators against the per-pixel originals."""
+import math
+
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw
+
+from backend.services.texture_engine import (
+    PatternConfig,
+    PatternType,
+    TextureConfig,
+    TextureEngine,
+    TextureType,
+)
+
+
+def _pattern(pattern_type, size=10, thickness=3):
+    return PatternConfig(pattern_type, color=(10, 20, 30), size=size, opacity=60, thickness=thickness)
+
+
+def _reference_dot_grid(width, height, config):
+    pattern = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(pattern)
+    r = config.thickness
+    for y in range(0, height, config.size):
+        for x in range(0, width, config.size):
+            draw.ellipse([(x - r, y - r), (x + r, y + r)], fill=(*config.color, config.opacity))
+    return pattern
+
+
+def _reference_topographic(width, height, config):
+    pattern = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(pattern)
+    for level in range(5, 250, config.size):
+        for y in range(0, height, 2):
+            for x in range(0, width, 2):
+                if abs((math.sin(x / 50) + math.sin(y / 50)) * 127.5 + 127.5 - level) < 5:
+                    draw.point((x, y), fill=(*config.color, config.opacity))
+    return pattern
+
+
+@pytest.mark.parametrize("size,spacing,radius", [((101, 77), 10, 3), ((99, 50), 7, 3), ((40, 40), 6, 3)])
+def test_dot_grid_matches_per_dot_drawing(size, spacing, radius):
+    config = _pattern(PatternType.DOT_GRID, spacing, radius)
+    produced = TextureEngine(seed=1).generate_pattern(*size, config)
+    assert np.array_equal(np.asarray(produced), np.asarray(_reference_dot_grid(*size, config)))
+
+
+def test_topographic_matches_per_pixel_loop():
+    config = _pattern(PatternType.TOPOGRAPHIC, size=24)
+    produced = TextureEngine(seed=1).generate_pattern(160, 120, config)
+    assert np.array_equal(np.asarray(produced), np.asarray(_reference_topographic(160, 120, config)))
+
+
+def test_weaves_without_noise_are_exact():
+    quiet = TextureConfig(TextureType.CANVAS, intensity=0.0, scale=1.0, opacity=255, blend_mode="overlay")
+    canvas = np.asarray(TextureEngine(seed=1).generate_texture(16, 8, quiet))[..., 0]
+    expected = [[255 if (x // 4) % 2 == (y // 4) % 2 else 245 for x in range(16)] for y in range(8)]
+    assert canvas.tolist() == expected
+
+
+@pytest.mark.parametrize("texture_type,mean,std", [
+    (TextureType.PAPER, 248.6, 4.1),
+    (TextureType.CANVAS, 249.3, 5.0),
+    (TextureType.CONCRETE, 199.0, 4.3),
+    (TextureType.FABRIC, 232.5, 5.8),
+    (TextureType.METAL, 200.1, 7.0),
+])
+def test_textures_keep_their_look_and_are_seeded(texture_type, mean, std):
+    # Reference statistics measured on the per-pixel implementation at 1200x630
+    config = TextureConfig(texture_type, intensity=0.5, scale=1.0, opacity=80, blend_mode="overlay")
+    image = TextureEngine(seed=7).generate_texture(1200, 630, config)
+    gray = np.asarray(image)[..., 0].astype(np.float64)
+
+    assert image.mode == 'RGBA' and image.size == (1200, 630)
+    assert abs(gray.mean() - mean) < 1.0
+    assert abs(gray.std() - std) < 0.6
+    again = TextureEngine(seed=7).generate_texture(1200, 630, config)
+    assert np.array_equal(np.asarray(image), np.asarray(again))
@@ -117,6 +117,8 @@ export type PreviewFailureReason =
   | 'quality_gate_failed'
   | 'quality_budget_exceeded'
   | 'status_check_transient'
+  | 'job_cancelled'
+  | 'deadline_exceeded'
   | 'unknown'
 
 /**
@@ -154,6 +156,8 @@ export const FAILURE_REASON_COPY: Record<PreviewFailureReason, string> = {
   quality_budget_exceeded:
     'We hit our time budget and shipped the best result we had.',
   status_check_transient: 'Status check hiccup — refresh in a moment.',
+  job_cancelled: 'This preview was cancelled before it finished.',
+  deadline_exceeded: 'This preview ran out of time before it finished. Please try again.',
   unknown: 'Something went wrong generating your preview.',
 }
 